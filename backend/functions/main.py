@@ -10,10 +10,18 @@ import os
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from mangum import Mangum
 
 from src.elevenlabs import router as elevenlabs_router
 from src.gemini import router as gemini_router
+from src.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from src.middleware.rate_limit_backend import get_rate_limit_backend
+from src.single_flight import single_flight_stats
+from src.tip_cache import get_tip_cache
+from src.tts_cache import get_tts_cache
+from src.tts_stream import tts_stream_stats
+from src.upstream import upstream_stats
 
 # Load environment variables
 load_dotenv()
@@ -38,6 +46,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record request latency per route (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(elevenlabs_router)
 app.include_router(gemini_router)
@@ -59,7 +70,82 @@ async def root():
 @app.get("/health")
 async def health():
     """Global health check endpoint."""
-    return {"status": "healthy", "service": "bachatabro-backend"}
+    return {
+        "status": "healthy",
+        "service": "bachatabro-backend",
+        "rate_limiter": get_rate_limit_backend().stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
+def _cache_lookups():
+    tts = get_tts_cache().stats()
+    tip = get_tip_cache().stats()
+    yield {"cache": "tts", "result": "memory_hit"}, tts["memory_hits"]
+    yield {"cache": "tts", "result": "disk_hit"}, tts["disk_hits"]
+    yield {"cache": "tts", "result": "miss"}, tts["misses"]
+    for result, field in (("hit", "hits"), ("stale_hit", "stale_hits"), ("fallback_hit", "fallback_hits"), ("miss", "misses")):
+        yield {"cache": "tip", "result": result}, tip[field]
+
+
+def _rate_limit(field: str):
+    def collect():
+        stats = get_rate_limit_backend().stats()
+        yield {"backend": stats["backend"]}, stats[field]
+    return collect
+
+
+def _single_flight(field: str):
+    def collect():
+        for group, stats in single_flight_stats().items():
+            yield {"group": group}, stats[field]
+    return collect
+
+
+def _tts_streams():
+    stats = tts_stream_stats()
+    for result, field in (("completed", "completed"), ("interrupted", "interrupted"), ("error", "errors")):
+        yield {"result": result}, stats[field]
+
+
+# Read at scrape time from the counters each component already keeps
+registry.collector(
+    "bachatabro_cache_lookups_total", "TTS and coaching-tip cache lookups by result.", "counter", _cache_lookups
+)
+registry.collector(
+    "bachatabro_rate_limit_checks_total", "Rate limit checks.", "counter", _rate_limit("checks")
+)
+registry.collector(
+    "bachatabro_rate_limit_denied_total", "Requests rejected by the rate limiter (including fail-closed).", "counter",
+    _rate_limit("denied"),
+)
+registry.collector(
+    "bachatabro_rate_limit_backend_errors_total", "Rate limit backend failures.", "counter", _rate_limit("errors")
+)
+registry.collector(
+    "bachatabro_single_flight_executions_total", "Upstream calls made for coalesced requests.", "counter",
+    _single_flight("executions"),
+)
+registry.collector(
+    "bachatabro_single_flight_coalesced_total", "Requests that joined an identical in-flight call.", "counter",
+    _single_flight("coalesced"),
+)
+registry.collector(
+    "bachatabro_upstream_in_flight", "Upstream calls currently running.", "gauge",
+    lambda: (({"upstream": name}, stats["in_flight"]) for name, stats in upstream_stats().items()),
+)
+registry.collector(
+    "bachatabro_tts_streams_total", "Streamed TTS responses by result.", "counter", _tts_streams
+)
+registry.collector(
+    "bachatabro_tts_stream_bytes_total", "Audio bytes streamed.", "counter",
+    lambda: [({}, tts_stream_stats()["bytes_streamed"])],
+)
 
 
 # AWS Lambda / Google Cloud Functions handler
@@ -0,0 +1,192 @@
+"""
+Streaming reader for binary speech-to-text uploads.
+
+The JSON STT endpoint takes base64 audio, so the client uploads a third
+more than the recording and the server holds the raw body, the decoded
+JSON string and the decoded audio at the same time. read_audio_upload()
+reads the request body chunk by chunk instead:
+
+- raw bodies (audio/* or application/octet-stream) are the recording itself
+- multipart/form-data bodies carry it in the "audio" part, parsed as it
+  streams in; other parts are small text fields such as "language"
+
+The size cap is enforced while reading (and up front from Content-Length),
+so an oversized upload is rejected without being buffered. Audio chunks
+are written into one BytesIO, which is handed to the STT client as a file
+object without another copy.
+"""
+
+import io
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+AUDIO_FIELD = "audio"
+
+# Limit for each non-audio multipart field (e.g. language)
+MAX_FIELD_BYTES = 1024
+
+# Allowance for multipart boundaries and part headers over the audio cap
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+RAW_CONTENT_TYPES = ("application/octet-stream",)
+
+
+class UploadError(Exception):
+    """An upload was rejected; carries the HTTP status to respond with."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+@dataclass
+class AudioUpload:
+    """Audio read from an upload, positioned at the start."""
+    audio: io.BytesIO
+    size: int
+    content_type: str
+    fields: dict[str, str] = field(default_factory=dict)
+
+
+def _too_large(max_bytes: int) -> UploadError:
+    return UploadError(413, f"Audio exceeds maximum size of {max_bytes // (1024 * 1024)}MB")
+
+
+class _AudioSink:
+    """BytesIO that refuses to grow past max_bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.buffer = io.BytesIO()
+        self.size = 0
+        self.max_bytes = max_bytes
+
+    def write(self, data) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self.buffer.write(data)
+
+
+class _MultipartAudioReader:
+    """python-multipart callbacks routing the audio part into an _AudioSink."""
+
+    def __init__(self, sink: _AudioSink):
+        self.sink = sink
+        self.fields: dict[str, str] = {}
+        self.audio_content_type = ""
+        self.seen_audio = False
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers: dict[bytes, bytes] = {}
+        self._name: Optional[str] = None
+        self._value = bytearray()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": lambda data, start, end: self._header_field.extend(data[start:end]),
+            "on_header_value": lambda data, start, end: self._header_value.extend(data[start:end]),
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+        self._name = None
+        self._value = bytearray()
+
+    def on_header_end(self) -> None:
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def on_headers_finished(self) -> None:
+        _, params = parse_options_header(self._headers.get(b"content-disposition"))
+        name = params.get(b"name")
+        self._name = name.decode("utf-8", "replace") if name is not None else None
+        if self._name == AUDIO_FIELD:
+            if self.seen_audio:
+                raise UploadError(400, f"Only one '{AUDIO_FIELD}' part is allowed")
+            self.seen_audio = True
+            content_type, _ = parse_options_header(self._headers.get(b"content-type"))
+            self.audio_content_type = content_type.decode("latin-1")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._name == AUDIO_FIELD:
+            self.sink.write(memoryview(data)[start:end])
+        elif self._name is not None:
+            self._value.extend(data[start:end])
+            if len(self._value) > MAX_FIELD_BYTES:
+                raise UploadError(400, f"Field '{self._name}' is too long")
+
+    def on_part_end(self) -> None:
+        if self._name is not None and self._name != AUDIO_FIELD:
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
+
+
+async def read_audio_upload(
+    content_type: Optional[str],
+    content_length: Optional[str],
+    stream: AsyncIterator[bytes],
+    max_bytes: int
+) -> AudioUpload:
+    """
+    Read audio from a raw or multipart request body.
+
+    Args:
+        content_type: Request Content-Type header.
+        content_length: Request Content-Length header, if any.
+        stream: Request body chunks (e.g. Request.stream()).
+        max_bytes: Largest accepted recording.
+
+    Returns:
+        AudioUpload with the audio and any multipart text fields.
+
+    Raises:
+        UploadError: 413 if the audio is over max_bytes, 415 for other
+                     content types, 400 for empty or malformed uploads.
+    """
+    media_type, params = parse_options_header(content_type)
+    media_type = media_type.decode("latin-1").lower()
+    multipart = media_type == "multipart/form-data"
+    if not multipart and not (media_type.startswith("audio/") or media_type in RAW_CONTENT_TYPES):
+        raise UploadError(415, "Send audio as multipart/form-data, audio/* or application/octet-stream")
+
+    if content_length is not None and content_length.isdigit():
+        allowance = MULTIPART_OVERHEAD_BYTES if multipart else 0
+        if int(content_length) > max_bytes + allowance:
+            raise _too_large(max_bytes)
+
+    sink = _AudioSink(max_bytes)
+    fields: dict[str, str] = {}
+    if multipart:
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise UploadError(400, "Missing multipart boundary")
+        reader = _MultipartAudioReader(sink)
+        parser = MultipartParser(boundary, reader.callbacks())
+        try:
+            async for chunk in stream:
+                parser.write(chunk)
+            parser.finalize()
+        except MultipartParseError:
+            raise UploadError(400, "Invalid multipart data") from None
+        if not reader.seen_audio:
+            raise UploadError(400, f"Field '{AUDIO_FIELD}' is required")
+        fields = reader.fields
+        media_type = reader.audio_content_type or "application/octet-stream"
+    else:
+        async for chunk in stream:
+            sink.write(chunk)
+
+    if sink.size == 0:
+        raise UploadError(400, "Audio is empty")
+
+    sink.buffer.seek(0)
+    return AudioUpload(audio=sink.buffer, size=sink.size, content_type=media_type, fields=fields)
@@ -7,15 +7,26 @@ Provides secure API access to ElevenLabs without exposing API keys to the client
 import base64
 import logging
 import os
-from typing import Optional
+import time
+from typing import BinaryIO, Iterator, Optional, Union
 
 from dotenv import load_dotenv
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from .middleware.rate_limiter import get_rate_limiter
-from .middleware.validator import validate_tts_request, validate_stt_request
+from .audio_upload import UploadError, read_audio_upload
+from .middleware.rate_limit_backend import get_rate_limit_backend
+from .middleware.validator import (
+    MAX_AUDIO_SIZE_BYTES,
+    validate_stt_request,
+    validate_stt_upload,
+    validate_tts_request,
+)
+from .single_flight import get_single_flight, single_flight_stats
+from .tts_cache import cache_key, get_tts_cache
+from .tts_stream import AudioRelay, record_cache_hit, tts_stream_stats
+from .upstream import UpstreamTimeoutError, get_upstream_pool
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +38,13 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/elevenlabs", tags=["elevenlabs"])
 
+# Per-call timeout for ElevenLabs requests (seconds)
+ELEVENLABS_TIMEOUT_SECONDS = float(os.getenv("ELEVENLABS_TIMEOUT_SECONDS", "30"))
+
+# Streamed TTS is MP3, the same format the JSON endpoint returns and caches
+TTS_STREAM_OUTPUT_FORMAT = "mp3_44100_128"
+TTS_STREAM_MEDIA_TYPE = "audio/mpeg"
+
 # Voice configuration by language
 # Using actual ElevenLabs voice IDs (not display names)
 # See: https://elevenlabs.io/docs/api-reference/voices
@@ -90,8 +108,25 @@ class STTResponse(BaseModel):
     language: str
 
 
+def _resolve_voice(body: TTSRequest) -> tuple[str, str]:
+    """Voice ID and model for a TTS request."""
+    config = VOICE_CONFIG.get(body.language or "en", VOICE_CONFIG["en"])
+    
+    # If voiceId provided, use it directly; otherwise use default
+    # voiceId can be either a voice ID or a voice name
+    voice_id = body.voiceId
+    if not voice_id:
+        voice_id = config["default"]
+    elif voice_id in config.get("available", {}):
+        # Map voice name to ID if it's a name
+        voice_id = config["available"][voice_id]
+    # Otherwise assume it's already a valid voice ID
+    
+    return voice_id, config["model"]
+
+
 @router.post("/tts", response_model=TTSResponse)
-async def text_to_speech(request: Request, body: TTSRequest):
+async def text_to_speech(request: Request, response: Response, body: TTSRequest):
     """
     Convert text to speech using ElevenLabs.
     
@@ -99,15 +134,14 @@ async def text_to_speech(request: Request, body: TTSRequest):
         body: TTSRequest with text, voiceId, and language
         
     Returns:
-        TTSResponse with base64 encoded audio
+        TTSResponse with base64 encoded audio (X-Cache header: HIT or MISS)
     """
     # Check rate limit
     client_ip = request.headers.get("X-Forwarded-For", request.client.host)
     if client_ip:
         client_ip = client_ip.split(",")[0].strip()
     
-    rate_limiter = get_rate_limiter()
-    result = rate_limiter.check(client_ip or "unknown")
+    result = await get_rate_limit_backend().check(client_ip or "unknown")
     
     if not result.allowed:
         logger.warning(f"Rate limit exceeded for client: {client_ip}")
@@ -122,21 +156,25 @@ async def text_to_speech(request: Request, body: TTSRequest):
         raise HTTPException(status_code=validation.error_code, detail=validation.error_message)
     
     language = body.language or "en"
-    config = VOICE_CONFIG.get(language, VOICE_CONFIG["en"])
+    voice_id, model_id = _resolve_voice(body)
     
-    # If voiceId provided, use it directly; otherwise use default
-    # voiceId can be either a voice ID or a voice name
-    voice_id = body.voiceId
-    if not voice_id:
-        voice_id = config["default"]
-    elif voice_id in config.get("available", {}):
-        # Map voice name to ID if it's a name
-        voice_id = config["available"][voice_id]
-    # Otherwise assume it's already a valid voice ID
+    logger.info(f"TTS request: {len(body.text)} chars, voice={voice_id}, lang={language}")
     
-    model_id = config["model"]
+    # Estimate duration (rough: ~10 chars per second for speech)
+    estimated_duration_ms = int(len(body.text) * 100)
     
-    logger.info(f"TTS request: {len(body.text)} chars, voice={voice_id}, lang={language}")
+    # Identical phrases are served from the cache without calling ElevenLabs
+    tts_cache = get_tts_cache()
+    key = cache_key(body.text, voice_id, model_id, "mp3")
+    cached_audio = await tts_cache.get_async(key, characters=len(body.text))
+    if cached_audio is not None:
+        response.headers["X-Cache"] = "HIT"
+        return TTSResponse(
+            audio=base64.b64encode(cached_audio).decode("utf-8"),
+            format="mp3",
+            durationMs=estimated_duration_ms,
+        )
+    response.headers["X-Cache"] = "MISS"
     
     # Get ElevenLabs API key
     api_key = os.getenv("ELEVENLABS_API_KEY")
@@ -144,39 +182,123 @@ async def text_to_speech(request: Request, body: TTSRequest):
         logger.error("ELEVENLABS_API_KEY not configured")
         raise HTTPException(status_code=500, detail="Service not configured")
     
-    try:
-        from elevenlabs import ElevenLabs
-        
-        client = ElevenLabs(api_key=api_key)
-        
-        audio_generator = client.text_to_speech.convert(
-            voice_id=voice_id,
-            text=body.text,
-            model_id=model_id,
+    async def synthesize() -> bytes:
+        audio = await get_upstream_pool("elevenlabs").run(
+            _synthesize,
+            api_key,
+            voice_id,
+            body.text,
+            model_id,
+            timeout=ELEVENLABS_TIMEOUT_SECONDS,
+            operation="tts",
         )
-        
-        # Collect audio chunks
-        audio_chunks = []
-        for chunk in audio_generator:
-            audio_chunks.append(chunk)
-        
-        audio_bytes = b"".join(audio_chunks)
+        if not audio:
+            raise ValueError("ElevenLabs returned no audio")
+        await tts_cache.put_async(key, audio)
+        return audio
+    
+    try:
+        # Identical phrases requested at the same time share one synthesis
+        audio_bytes = await get_single_flight("elevenlabs-tts").do(key, synthesize)
         audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
         
-        # Estimate duration (rough: ~10 chars per second for speech)
-        estimated_duration_ms = int(len(body.text) * 100)
-        
         return TTSResponse(
             audio=audio_base64,
             format="mp3",
             durationMs=estimated_duration_ms,
         )
         
+    except UpstreamTimeoutError as e:
+        logger.error(f"ElevenLabs API timeout: {e}")
+        raise HTTPException(status_code=504, detail="Text-to-speech timed out")
     except Exception as e:
         logger.error(f"ElevenLabs API error: {e}")
         raise HTTPException(status_code=500, detail="Text-to-speech conversion failed")
 
 
+@router.post(
+    "/tts/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {TTS_STREAM_MEDIA_TYPE: {}}}},
+)
+async def text_to_speech_stream(request: Request, body: TTSRequest):
+    """
+    Convert text to speech, streaming raw MP3 bytes as ElevenLabs produces them.
+    
+    Args:
+        body: TTSRequest with text, voiceId, and language
+        
+    Returns:
+        Chunked audio/mpeg response (X-Cache header: HIT or MISS; on a miss,
+        Server-Timing reports time-to-first-byte as ttfb)
+    """
+    started_at = time.perf_counter()
+    
+    # Check rate limit
+    client_ip = request.headers.get("X-Forwarded-For", request.client.host)
+    if client_ip:
+        client_ip = client_ip.split(",")[0].strip()
+    
+    result = await get_rate_limit_backend().check(client_ip or "unknown")
+    
+    if not result.allowed:
+        logger.warning(f"Rate limit exceeded for client: {client_ip}")
+        raise HTTPException(
+            status_code=429,
+            detail={"error": "Too many requests", "retry_after": result.retry_after}
+        )
+    
+    # Validate request
+    validation = validate_tts_request(body.model_dump())
+    if not validation.valid:
+        raise HTTPException(status_code=validation.error_code, detail=validation.error_message)
+    
+    voice_id, model_id = _resolve_voice(body)
+    
+    logger.info(f"TTS stream request: {len(body.text)} chars, voice={voice_id}, lang={body.language or 'en'}")
+    
+    # Shares the cache with the JSON endpoint (same key, same MP3 bytes)
+    tts_cache = get_tts_cache()
+    key = cache_key(body.text, voice_id, model_id, "mp3")
+    cached_audio = await tts_cache.get_async(key, characters=len(body.text))
+    if cached_audio is not None:
+        record_cache_hit(len(cached_audio))
+        return Response(content=cached_audio, media_type=TTS_STREAM_MEDIA_TYPE, headers={"X-Cache": "HIT"})
+    
+    # Get ElevenLabs API key
+    api_key = os.getenv("ELEVENLABS_API_KEY")
+    if not api_key:
+        logger.error("ELEVENLABS_API_KEY not configured")
+        raise HTTPException(status_code=500, detail="Service not configured")
+    
+    relay = AudioRelay(
+        lambda: _open_tts_stream(api_key, voice_id, body.text, model_id),
+        get_upstream_pool("elevenlabs"),
+        timeout=ELEVENLABS_TIMEOUT_SECONDS,
+        on_complete=lambda audio: tts_cache.put_async(key, audio),
+        max_tee_bytes=tts_cache.max_entry_bytes,
+        started_at=started_at,
+    )
+    try:
+        # Errors before the first chunk still get a proper status code
+        await relay.start()
+    except UpstreamTimeoutError as e:
+        logger.error(f"ElevenLabs API timeout: {e}")
+        raise HTTPException(status_code=504, detail="Text-to-speech timed out")
+    except Exception as e:
+        logger.error(f"ElevenLabs API error: {e}")
+        raise HTTPException(status_code=500, detail="Text-to-speech conversion failed")
+    
+    return StreamingResponse(
+        relay.body(),
+        media_type=TTS_STREAM_MEDIA_TYPE,
+        headers={
+            "X-Cache": "MISS",
+            "Server-Timing": f"ttfb;dur={relay.ttfb_seconds * 1000:.1f}",
+        },
+    )
+
+
 @router.post("/stt", response_model=STTResponse)
 async def speech_to_text(request: Request, body: STTRequest):
     """
@@ -193,8 +315,7 @@ async def speech_to_text(request: Request, body: STTRequest):
     if client_ip:
         client_ip = client_ip.split(",")[0].strip()
     
-    rate_limiter = get_rate_limiter()
-    result = rate_limiter.check(client_ip or "unknown")
+    result = await get_rate_limit_backend().check(client_ip or "unknown")
     
     if not result.allowed:
         logger.warning(f"Rate limit exceeded for client: {client_ip}")
@@ -226,13 +347,90 @@ async def speech_to_text(request: Request, body: STTRequest):
         raise HTTPException(status_code=400, detail="Invalid base64 audio data")
     
     try:
-        from elevenlabs import ElevenLabs
+        result = await get_upstream_pool("elevenlabs").run(
+            _transcribe,
+            api_key,
+            audio_bytes,
+            language,
+            timeout=ELEVENLABS_TIMEOUT_SECONDS,
+            operation="stt",
+        )
         
-        client = ElevenLabs(api_key=api_key)
+        return STTResponse(
+            transcript=result.text,
+            confidence=getattr(result, "confidence", 0.9),
+            language=language,
+        )
         
-        result = client.speech_to_text.convert(
-            audio=audio_bytes,
-            language_code=language,
+    except UpstreamTimeoutError as e:
+        logger.error(f"ElevenLabs STT API timeout: {e}")
+        raise HTTPException(status_code=504, detail="Speech-to-text timed out")
+    except Exception as e:
+        logger.error(f"ElevenLabs STT API error: {e}")
+        raise HTTPException(status_code=500, detail="Speech-to-text conversion failed")
+
+
+@router.post("/stt/upload", response_model=STTResponse)
+async def speech_to_text_upload(request: Request, language: Optional[str] = None):
+    """
+    Convert speech to text from a binary upload.
+    
+    The body is either the raw recording (Content-Type audio/* or
+    application/octet-stream, language in the query string) or
+    multipart/form-data with an "audio" file part and an optional
+    "language" field. It is read as a stream and rejected with 413 as soon
+    as it exceeds MAX_AUDIO_SIZE_BYTES.
+    
+    Returns:
+        STTResponse with transcript
+    """
+    # Check rate limit (before reading the body)
+    client_ip = request.headers.get("X-Forwarded-For", request.client.host)
+    if client_ip:
+        client_ip = client_ip.split(",")[0].strip()
+    
+    result = await get_rate_limit_backend().check(client_ip or "unknown")
+    
+    if not result.allowed:
+        logger.warning(f"Rate limit exceeded for client: {client_ip}")
+        raise HTTPException(
+            status_code=429,
+            detail={"error": "Too many requests", "retry_after": result.retry_after}
+        )
+    
+    # Get ElevenLabs API key
+    api_key = os.getenv("ELEVENLABS_API_KEY")
+    if not api_key:
+        logger.error("ELEVENLABS_API_KEY not configured")
+        raise HTTPException(status_code=500, detail="Service not configured")
+    
+    try:
+        upload = await read_audio_upload(
+            request.headers.get("content-type"),
+            request.headers.get("content-length"),
+            request.stream(),
+            MAX_AUDIO_SIZE_BYTES,
+        )
+    except UploadError as e:
+        logger.warning(f"STT upload rejected: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    language = language or upload.fields.get("language")
+    validation = validate_stt_upload(language)
+    if not validation.valid:
+        raise HTTPException(status_code=validation.error_code, detail=validation.error_message)
+    language = language or "en"
+    
+    logger.info(f"STT upload: {upload.size} bytes {upload.content_type}, lang={language}")
+    
+    try:
+        result = await get_upstream_pool("elevenlabs").run(
+            _transcribe,
+            api_key,
+            upload.audio,
+            language,
+            timeout=ELEVENLABS_TIMEOUT_SECONDS,
+            operation="stt",
         )
         
         return STTResponse(
@@ -241,11 +439,56 @@ async def speech_to_text(request: Request, body: STTRequest):
             language=language,
         )
         
+    except UpstreamTimeoutError as e:
+        logger.error(f"ElevenLabs STT API timeout: {e}")
+        raise HTTPException(status_code=504, detail="Speech-to-text timed out")
     except Exception as e:
         logger.error(f"ElevenLabs STT API error: {e}")
         raise HTTPException(status_code=500, detail="Speech-to-text conversion failed")
 
 
+def _synthesize(api_key: str, voice_id: str, text: str, model_id: str) -> bytes:
+    """Blocking ElevenLabs TTS call; runs on the upstream pool."""
+    from elevenlabs import ElevenLabs
+    
+    client = ElevenLabs(api_key=api_key)
+    
+    audio_generator = client.text_to_speech.convert(
+        voice_id=voice_id,
+        text=text,
+        model_id=model_id,
+    )
+    
+    # Collect audio chunks
+    return b"".join(audio_generator)
+
+
+def _open_tts_stream(api_key: str, voice_id: str, text: str, model_id: str) -> Iterator[bytes]:
+    """Blocking ElevenLabs streaming TTS call; chunks are pulled on the upstream pool."""
+    from elevenlabs import ElevenLabs
+    
+    client = ElevenLabs(api_key=api_key)
+    
+    return client.text_to_speech.stream(
+        voice_id=voice_id,
+        text=text,
+        model_id=model_id,
+        output_format=TTS_STREAM_OUTPUT_FORMAT,
+    )
+
+
+def _transcribe(api_key: str, audio: Union[bytes, BinaryIO], language: str):
+    """Blocking ElevenLabs STT call; runs on the upstream pool."""
+    from elevenlabs import ElevenLabs
+    
+    client = ElevenLabs(api_key=api_key)
+    
+    return client.speech_to_text.convert(
+        audio=audio,
+        language_code=language,
+    )
+
+
 @router.get("/voices")
 async def get_voices(language: Optional[str] = None):
     """Get available voices by language."""
@@ -275,4 +518,11 @@ async def get_voices(language: Optional[str] = None):
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "elevenlabs-proxy"}
+    return {
+        "status": "healthy",
+        "service": "elevenlabs-proxy",
+        "upstream": get_upstream_pool("elevenlabs").stats(),
+        "tts_cache": get_tts_cache().stats(),
+        "single_flight": single_flight_stats(),
+        "tts_stream": tts_stream_stats(),
+    }
@@ -5,16 +5,21 @@ Provides secure API access to Google Gemini for generating coaching tips
 and performance reviews without exposing API keys to the client.
 """
 
+import hashlib
 import logging
 import os
 from typing import Optional
 
 from dotenv import load_dotenv
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
-from .middleware.rate_limiter import get_rate_limiter
+from .gemini_client import get_gemini_client
+from .metrics import record_fallback
+from .middleware.rate_limit_backend import get_rate_limit_backend
 from .middleware.validator import validate_coaching_request, validate_review_request
+from .single_flight import get_single_flight, single_flight_stats
+from .tip_cache import canonical_tip_key, get_tip_cache
 
 # Load environment variables
 load_dotenv()
@@ -108,7 +113,7 @@ class PerformanceReviewResponse(BaseModel):
 
 
 @router.post("/coaching-tip", response_model=CoachingTipResponse)
-async def generate_coaching_tip(request: Request, body: CoachingTipRequest):
+async def generate_coaching_tip(request: Request, response: Response, body: CoachingTipRequest):
     """
     Generate a coaching tip based on pose analysis.
     
@@ -116,15 +121,15 @@ async def generate_coaching_tip(request: Request, body: CoachingTipRequest):
         body: CoachingTipRequest with score, weakPoints, strongPoints, language
         
     Returns:
-        CoachingTipResponse with tip and targetBodyPart
+        CoachingTipResponse with tip and targetBodyPart (X-Cache header:
+        HIT, STALE, FALLBACK or MISS)
     """
     # Check rate limit
     client_ip = request.headers.get("X-Forwarded-For", request.client.host)
     if client_ip:
         client_ip = client_ip.split(",")[0].strip()
     
-    rate_limiter = get_rate_limiter()
-    result = rate_limiter.check(client_ip or "unknown")
+    result = await get_rate_limit_backend().check(client_ip or "unknown")
     
     if not result.allowed:
         logger.warning(f"Rate limit exceeded for client: {client_ip}")
@@ -167,15 +172,22 @@ Be encouraging and specific. Give ONE actionable tip.{language_instruction}
 
 Respond with ONLY the coaching tip, nothing else."""
 
-    # Call Gemini API
-    tip = _call_gemini(prompt)
+    async def generate_tip() -> str | None:
+        # Call Gemini API
+        tip = await _call_gemini(prompt)
+        # Ensure word limit
+        return truncate_to_word_limit(tip, MAX_COACHING_TIP_WORDS) if tip else None
     
-    if tip is None:
+    def fallback_tip() -> str:
         # Fallback to generic tip
-        tip = _get_fallback_tip(language, score)
+        return truncate_to_word_limit(_get_fallback_tip(language, score), MAX_COACHING_TIP_WORDS)
     
-    # Ensure word limit
-    tip = truncate_to_word_limit(tip, MAX_COACHING_TIP_WORDS)
+    # Repeated requests (same score bucket, body parts and language) are served from the cache
+    key = canonical_tip_key(score, weak_points, strong_points, language)
+    tip, cache_status = await get_tip_cache().get_or_generate(key, generate_tip, fallback_tip)
+    if cache_status == "fallback":
+        record_fallback("coaching_tip")
+    response.headers["X-Cache"] = cache_status.upper()
     
     return CoachingTipResponse(
         tip=tip,
@@ -199,8 +211,7 @@ async def generate_performance_review(request: Request, body: PerformanceReviewR
     if client_ip:
         client_ip = client_ip.split(",")[0].strip()
     
-    rate_limiter = get_rate_limiter()
-    result = rate_limiter.check(client_ip or "unknown")
+    result = await get_rate_limit_backend().check(client_ip or "unknown")
     
     if not result.allowed:
         logger.warning(f"Rate limit exceeded for client: {client_ip}")
@@ -278,11 +289,13 @@ Include:
 
 Respond with ONLY the review, nothing else."""
 
-    # Call Gemini API
-    review = _call_gemini(prompt)
+    # Call Gemini API; identical reviews requested at the same time share one call
+    prompt_key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    review = await get_single_flight("gemini-review").do(prompt_key, lambda: _call_gemini(prompt))
     
     if review is None:
         # Fallback to generic review
+        record_fallback("performance_review")
         review = _get_fallback_review(language, final_score, song_title)
     
     # Ensure word limit
@@ -305,36 +318,25 @@ Respond with ONLY the review, nothing else."""
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "gemini-proxy"}
+    return {
+        "status": "healthy",
+        "service": "gemini-proxy",
+        "client": get_gemini_client().stats(),
+        "upstream": get_gemini_client().pool.stats(),
+        "tip_cache": get_tip_cache().stats(),
+        "single_flight": single_flight_stats(),
+    }
 
 
-def _call_gemini(prompt: str) -> str | None:
+async def _call_gemini(prompt: str) -> str | None:
     """
     Call Gemini API with the given prompt.
     
-    Returns the generated text or None if the call fails.
+    Uses the shared client, so Vertex AI is initialized once per process,
+    and runs the SDK call on the Gemini upstream pool so the event loop
+    isn't blocked. Returns the generated text or None if the call fails.
     """
-    try:
-        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-        location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
-        
-        if not project_id:
-            logger.error("GOOGLE_CLOUD_PROJECT not configured")
-            return None
-        
-        from google.cloud import aiplatform
-        from vertexai.generative_models import GenerativeModel
-        
-        aiplatform.init(project=project_id, location=location)
-        
-        model = GenerativeModel("gemini-2.0-flash-001")
-        response = model.generate_content(prompt)
-        
-        return response.text.strip()
-        
-    except Exception as e:
-        logger.error(f"Gemini API error: {e}")
-        return None
+    return await get_gemini_client().generate_async(prompt)
 
 
 def _get_fallback_tip(language: str, score: float) -> str:
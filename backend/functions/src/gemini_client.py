@@ -0,0 +1,232 @@
+"""
+Process-wide Gemini model holder.
+
+Initializing Vertex AI and constructing the GenerativeModel used to happen
+on every coaching-tip and performance-review request. GeminiClient does it
+once, lazily on the first request, and shares the model across concurrent
+requests. It also records how much time goes into initialization versus
+generation.
+
+Calls go through the "gemini" upstream pool (src/upstream.py), so async
+endpoints await generate_async() without blocking the event loop.
+"""
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Optional
+
+from .upstream import UpstreamPool, UpstreamTimeoutError, get_upstream_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-2.0-flash-001"
+DEFAULT_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class GeminiClientStats:
+    """Counters and timings for the Gemini client."""
+    init_count: int = 0
+    init_failures: int = 0
+    init_seconds: float = 0.0
+    generate_count: int = 0
+    generate_failures: int = 0
+    generate_timeouts: int = 0
+    generate_seconds: float = 0.0
+    last_generate_seconds: Optional[float] = None
+
+
+class GeminiClient:
+    """
+    Lazily initialized, thread-safe Gemini model holder.
+
+    The first generate() call initializes Vertex AI and builds the model
+    under a lock; later calls reuse it. A failed initialization is retried
+    on the next call. Initialization and generation run on the upstream
+    pool; generation is abandoned after timeout_seconds.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        project_id: Optional[str] = None,
+        location: Optional[str] = None,
+        pool: Optional[UpstreamPool] = None
+    ):
+        """
+        Initialize the holder (no network calls until first use).
+
+        Args:
+            model_name: Gemini model. Defaults to GEMINI_MODEL env var or DEFAULT_MODEL.
+            timeout_seconds: Per-request generation timeout.
+                             Defaults to GEMINI_TIMEOUT_SECONDS env var or 10.
+            project_id: GCP project. Defaults to GOOGLE_CLOUD_PROJECT env var.
+            location: GCP region. Defaults to GOOGLE_CLOUD_LOCATION env var or us-central1.
+            pool: Thread pool for SDK calls. Defaults to the global "gemini" pool.
+        """
+        self.model_name = model_name or os.getenv("GEMINI_MODEL", DEFAULT_MODEL)
+        self.timeout_seconds = timeout_seconds or float(
+            os.getenv("GEMINI_TIMEOUT_SECONDS", str(DEFAULT_TIMEOUT_SECONDS))
+        )
+        self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.location = location or os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
+        self._model: Any = None
+        self._init_lock = Lock()
+        self._stats_lock = Lock()
+        self._stats = GeminiClientStats()
+        self._pool = pool
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the model has been created."""
+        return self._model is not None
+
+    def _create_model(self) -> Any:
+        """Initialize Vertex AI and build the model (called once, under the lock)."""
+        from google.cloud import aiplatform
+        from vertexai.generative_models import GenerativeModel
+
+        aiplatform.init(project=self.project_id, location=self.location)
+        return GenerativeModel(self.model_name)
+
+    def get_model(self) -> Any:
+        """
+        Return the shared model, creating it on first use.
+
+        Raises:
+            RuntimeError: If GOOGLE_CLOUD_PROJECT is not configured.
+            Exception: Whatever Vertex AI raised during initialization.
+        """
+        model = self._model
+        if model is not None:
+            return model
+
+        with self._init_lock:
+            if self._model is not None:
+                return self._model
+            if not self.project_id:
+                raise RuntimeError("GOOGLE_CLOUD_PROJECT not configured")
+
+            start = time.perf_counter()
+            try:
+                model = self._create_model()
+            except Exception:
+                with self._stats_lock:
+                    self._stats.init_failures += 1
+                    self._stats.init_seconds += time.perf_counter() - start
+                raise
+
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._stats.init_count += 1
+                self._stats.init_seconds += elapsed
+            logger.info(f"Gemini model {self.model_name} initialized in {elapsed * 1000:.0f}ms")
+            self._model = model
+            return model
+
+    @property
+    def pool(self) -> UpstreamPool:
+        """Thread pool the SDK calls run on."""
+        if self._pool is None:
+            self._pool = get_upstream_pool("gemini")
+        return self._pool
+
+    def generate(self, prompt: str) -> Optional[str]:
+        """
+        Generate text for a prompt, blocking the calling thread.
+
+        Returns:
+            The stripped response text, or None if initialization or
+            generation failed or timed out.
+        """
+        try:
+            model = self.get_model()
+        except Exception as e:
+            logger.error(f"Gemini init error: {e}")
+            return None
+
+        start = time.perf_counter()
+        try:
+            response = self.pool.call(
+                model.generate_content, prompt, timeout=self.timeout_seconds, operation="generate"
+            )
+            return self._response_text(response, start)
+        except Exception as e:
+            return self._generate_failed(e, start)
+
+    async def generate_async(self, prompt: str) -> Optional[str]:
+        """
+        Generate text for a prompt without blocking the event loop.
+
+        Returns:
+            The stripped response text, or None if initialization or
+            generation failed or timed out.
+        """
+        try:
+            model = self._model or await self.pool.run(self.get_model, operation="init")
+        except Exception as e:
+            logger.error(f"Gemini init error: {e}")
+            return None
+
+        start = time.perf_counter()
+        try:
+            response = await self.pool.run(
+                model.generate_content, prompt, timeout=self.timeout_seconds, operation="generate"
+            )
+            return self._response_text(response, start)
+        except Exception as e:
+            return self._generate_failed(e, start)
+
+    def _response_text(self, response: Any, start: float) -> str:
+        text = response.text.strip()
+        self._record_generate(time.perf_counter() - start)
+        return text
+
+    def _generate_failed(self, error: Exception, start: float) -> None:
+        if isinstance(error, UpstreamTimeoutError):
+            self._record_generate(time.perf_counter() - start, timed_out=True)
+            logger.error(f"Gemini API timeout after {self.timeout_seconds}s")
+        else:
+            self._record_generate(time.perf_counter() - start, failed=True)
+            logger.error(f"Gemini API error: {error}")
+        return None
+
+    def _record_generate(self, elapsed: float, failed: bool = False, timed_out: bool = False) -> None:
+        with self._stats_lock:
+            self._stats.generate_count += 1
+            self._stats.generate_seconds += elapsed
+            self._stats.last_generate_seconds = elapsed
+            if failed:
+                self._stats.generate_failures += 1
+            if timed_out:
+                self._stats.generate_timeouts += 1
+
+    def stats(self) -> dict:
+        """Snapshot of the counters plus configuration."""
+        with self._stats_lock:
+            snapshot = asdict(self._stats)
+        snapshot.update({
+            "model": self.model_name,
+            "timeout_seconds": self.timeout_seconds,
+            "initialized": self.initialized,
+        })
+        return snapshot
+
+
+# Global Gemini client instance
+_gemini_client: Optional[GeminiClient] = None
+_gemini_client_lock = Lock()
+
+
+def get_gemini_client() -> GeminiClient:
+    """Get or create the global Gemini client instance."""
+    global _gemini_client
+    if _gemini_client is None:
+        with _gemini_client_lock:
+            if _gemini_client is None:
+                _gemini_client = GeminiClient()
+    return _gemini_client
@@ -0,0 +1,254 @@
+"""
+Prometheus metrics for the backend.
+
+Only a few things are recorded on the request path, each a lock and a
+few additions:
+
+- request latency per route template, method and status (MetricsMiddleware,
+  a pure ASGI middleware, so streaming responses aren't buffered)
+- upstream call latency per upstream, operation and outcome (UpstreamPool)
+- fallback responses served when Gemini fails
+
+Everything else (cache hits, rate-limit denials, coalescing, streaming) is
+already counted by the component that owns it; collectors read those
+counters when /metrics is scraped, so they cost nothing per request.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+# Seconds; covers in-memory cache hits through slow upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Labelled histogram with fixed buckets."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation for the given label values (in label_names order)."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        for label_values, counts, total, count in sorted(snapshot):
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Labelled monotonically increasing counter."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increment the series for the given label values (in label_names order)."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(
+            f"{self.name}{_format_labels(dict(zip(self.label_names, label_values)))} {_format_value(value)}"
+            for label_values, value in snapshot
+        )
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Collector:
+    """Metric family whose samples are read from existing stats at scrape time."""
+
+    def __init__(self, name: str, help_text: str, metric_type: str, collect: Callable[[], Iterable[tuple[dict[str, str], float]]]):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self._collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+            for labels, value in self._collect()
+        )
+        return lines
+
+
+class MetricsRegistry:
+    """Histograms and scrape-time collectors, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._lock = Lock()
+
+    def histogram(self, name: str, help_text: str, label_names: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help_text, label_names, buckets)
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...]) -> Counter:
+        """Get or create a counter."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Counter(name, help_text, label_names)
+            return metric
+
+    def collector(
+        self,
+        name: str,
+        help_text: str,
+        metric_type: str,
+        collect: Callable[[], Iterable[tuple[dict[str, str], float]]]
+    ) -> None:
+        """Register (or replace) a scrape-time collector; metric_type is counter or gauge."""
+        with self._lock:
+            self._metrics[name] = Collector(name, help_text, metric_type, collect)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the histograms recorded on the request path
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "bachatabro_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+
+UPSTREAM_DURATION = registry.histogram(
+    "bachatabro_upstream_call_duration_seconds",
+    "Upstream (Gemini, ElevenLabs) call latency by operation and outcome, including queueing for a thread.",
+    ("upstream", "operation", "outcome"),
+)
+
+
+FALLBACKS = registry.counter(
+    "bachatabro_fallbacks_total",
+    "Responses served from a generic fallback because the upstream failed.",
+    ("kind",),
+)
+
+
+def observe_upstream(upstream: str, operation: str, outcome: str, seconds: float) -> None:
+    """Record one upstream call (outcome: ok, error or timeout)."""
+    UPSTREAM_DURATION.observe(seconds, upstream, operation, outcome)
+
+
+def record_fallback(kind: str) -> None:
+    """Count one fallback response (kind: coaching_tip or performance_review)."""
+    FALLBACKS.inc(kind)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency per route template."""
+
+    def __init__(self, app, histogram: Optional[Histogram] = None):
+        self.app = app
+        self.histogram = histogram or REQUEST_DURATION
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; using its
+            # template (not the raw path) keeps label cardinality bounded
+            route = scope.get("route")
+            self.histogram.observe(
+                time.perf_counter() - started,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                scope["method"],
+                str(status),
+            )
@@ -1,11 +1,12 @@
 """Middleware components for request validation and rate limiting."""
 
 from .rate_limiter import RateLimiter
-from .validator import validate_tts_request, validate_stt_request, validate_coaching_request
+from .validator import validate_tts_request, validate_stt_request, validate_stt_upload, validate_coaching_request
 
 __all__ = [
     "RateLimiter",
     "validate_tts_request",
     "validate_stt_request", 
+    "validate_stt_upload",
     "validate_coaching_request",
 ]
@@ -0,0 +1,287 @@
+"""
+Pluggable state backends for rate limiting.
+
+The in-memory RateLimiter counts per process, so with N instances behind
+Cloud Run or Lambda the effective limit is N times the configured one, and
+a cold start resets it. RATE_LIMIT_BACKEND selects where counts live:
+
+- memory (default): the process-local RateLimiter
+- redis: a sliding window in a Redis sorted set per client, shared by all
+  instances. Each check is one EVALSHA round trip running an atomic Lua
+  script, timed by the server clock so instance clock skew doesn't matter.
+
+If the shared store fails or is slower than RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+the check fails open (request allowed) or closed (request rejected)
+according to RATE_LIMIT_FAIL_OPEN. Check latency, errors and fail-open /
+fail-closed decisions are counted for every backend, as are denials.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Optional
+
+from .rate_limiter import RateLimiter, RateLimitResult, get_rate_limiter
+from .redis_client import RedisClient, RedisError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REDIS_TIMEOUT_SECONDS = 0.05
+DEFAULT_KEY_PREFIX = "ratelimit:"
+
+# KEYS[1]: client key. ARGV: window seconds, limit, unique member.
+# Returns {allowed, count before this request, reset time, server time};
+# times are strings because Lua numbers are truncated to integers in replies.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local reset = now + window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+  reset = tonumber(oldest[2]) + window
+end
+if count >= limit then
+  return {0, count, tostring(reset), tostring(now)}
+end
+redis.call('ZADD', key, now, ARGV[3])
+redis.call('PEXPIRE', key, math.ceil(window * 1000))
+return {1, count, tostring(reset), tostring(now)}
+"""
+SLIDING_WINDOW_SHA = hashlib.sha1(SLIDING_WINDOW_SCRIPT.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class RateLimitBackendStats:
+    """Counters for a rate limit backend."""
+    checks: int = 0
+    denied: int = 0
+    errors: int = 0
+    failed_open: int = 0
+    failed_closed: int = 0
+    check_seconds_total: float = 0.0
+    check_seconds_max: float = 0.0
+
+
+class RateLimitBackend(ABC):
+    """Base class: times checks and applies the failure policy."""
+
+    name = "base"
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        window_seconds: int = 60,
+        fail_open: Optional[bool] = None
+    ):
+        """
+        Args:
+            requests_per_minute: Maximum requests allowed per window.
+                                 Defaults to RATE_LIMIT_REQUESTS_PER_MINUTE env var or 100.
+            window_seconds: Time window in seconds (default 60).
+            fail_open: Allow requests when the backend fails.
+                       Defaults to RATE_LIMIT_FAIL_OPEN env var or true.
+        """
+        self.requests_per_minute = requests_per_minute or int(
+            os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", "100")
+        )
+        self.window_seconds = window_seconds
+        if fail_open is None:
+            fail_open = os.getenv("RATE_LIMIT_FAIL_OPEN", "true").lower() in ("1", "true", "yes")
+        self.fail_open = fail_open
+        self._stats = RateLimitBackendStats()
+        self._lock = Lock()
+
+    async def check(self, client_id: str) -> RateLimitResult:
+        """
+        Check if a request from client_id is allowed.
+
+        Never raises for backend failures: the result follows the
+        fail-open / fail-closed policy instead.
+        """
+        started = time.perf_counter()
+        failed = False
+        try:
+            result = await self._check(client_id)
+        except Exception as e:
+            failed = True
+            logger.error(f"Rate limit backend {self.name} failed ({'open' if self.fail_open else 'closed'}): {e!r}")
+            result = self._failure_result()
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats.checks += 1
+            self._stats.check_seconds_total += elapsed
+            self._stats.check_seconds_max = max(self._stats.check_seconds_max, elapsed)
+            if not result.allowed:
+                self._stats.denied += 1
+            if failed:
+                self._stats.errors += 1
+                if self.fail_open:
+                    self._stats.failed_open += 1
+                else:
+                    self._stats.failed_closed += 1
+        return result
+
+    def _failure_result(self) -> RateLimitResult:
+        now = time.time()
+        if self.fail_open:
+            return RateLimitResult(allowed=True, remaining=0, reset_time=now + self.window_seconds)
+        return RateLimitResult(allowed=False, remaining=0, reset_time=now + 1, retry_after=1)
+
+    @abstractmethod
+    async def _check(self, client_id: str) -> RateLimitResult:
+        """Decide one request; errors and timeouts are handled by check()."""
+
+    def reset_all(self) -> None:
+        """Reset local rate limit state (for testing)."""
+
+    def stats(self) -> dict:
+        """Snapshot of the counters plus mean check latency."""
+        with self._lock:
+            snapshot = asdict(self._stats)
+        snapshot["check_seconds_avg"] = (
+            snapshot["check_seconds_total"] / snapshot["checks"] if snapshot["checks"] else 0.0
+        )
+        snapshot.update({"backend": self.name, "fail_open": self.fail_open})
+        return snapshot
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process counts (the RateLimiter)."""
+
+    name = "memory"
+
+    def __init__(self, limiter: Optional[RateLimiter] = None, **kwargs):
+        """
+        Args:
+            limiter: Limiter to use. Defaults to the global get_rate_limiter().
+        """
+        self.limiter = limiter or get_rate_limiter()
+        super().__init__(
+            requests_per_minute=self.limiter.requests_per_minute,
+            window_seconds=self.limiter.window_seconds,
+            **kwargs,
+        )
+
+    async def _check(self, client_id: str) -> RateLimitResult:
+        return self.limiter.check(client_id)
+
+    def reset_all(self) -> None:
+        self.limiter.reset_all()
+
+    def stats(self) -> dict:
+        snapshot = super().stats()
+        snapshot["limiter"] = self.limiter.stats()
+        return snapshot
+
+
+class RedisBackend(RateLimitBackend):
+    """Counts shared by all instances in a Redis sorted set per client."""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+        client: Optional[RedisClient] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            url: Server URL. Defaults to REDIS_URL env var.
+            timeout_seconds: Budget for one check, including connecting.
+                             Defaults to RATE_LIMIT_REDIS_TIMEOUT_SECONDS env var or 0.05.
+            key_prefix: Prefix for client keys.
+            client: Client to use instead of one built from url.
+        """
+        super().__init__(**kwargs)
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else float(
+            os.getenv("RATE_LIMIT_REDIS_TIMEOUT_SECONDS", str(DEFAULT_REDIS_TIMEOUT_SECONDS))
+        )
+        if client is None:
+            url = url or os.getenv("REDIS_URL")
+            if not url:
+                raise ValueError("REDIS_URL is required for the redis rate limit backend")
+            client = RedisClient(url, connect_timeout=self.timeout_seconds)
+        self.client = client
+        self.key_prefix = key_prefix
+        self.script_loads = 0
+
+    async def _check(self, client_id: str) -> RateLimitResult:
+        reply = await asyncio.wait_for(self._run_script(client_id), self.timeout_seconds)
+        allowed, count, reset_time, now = int(reply[0]), int(reply[1]), float(reply[2]), float(reply[3])
+        if not allowed:
+            return RateLimitResult(
+                allowed=False,
+                remaining=0,
+                reset_time=reset_time,
+                retry_after=int(reset_time - now) + 1,
+            )
+        return RateLimitResult(
+            allowed=True,
+            remaining=max(0, self.requests_per_minute - count) - 1,
+            reset_time=reset_time,
+        )
+
+    async def _run_script(self, client_id: str) -> list:
+        args = (1, self.key_prefix + client_id, self.window_seconds, self.requests_per_minute, uuid.uuid4().hex)
+        try:
+            return await self.client.execute("EVALSHA", SLIDING_WINDOW_SHA, *args)
+        except RedisError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+        # First use on this server (or after SCRIPT FLUSH): EVAL caches the script
+        self.script_loads += 1
+        return await self.client.execute("EVAL", SLIDING_WINDOW_SCRIPT, *args)
+
+    def stats(self) -> dict:
+        snapshot = super().stats()
+        snapshot.update({
+            "timeout_seconds": self.timeout_seconds,
+            "script_loads": self.script_loads,
+            "connections_opened": self.client.connections_opened,
+        })
+        return snapshot
+
+
+def create_rate_limit_backend(name: Optional[str] = None) -> RateLimitBackend:
+    """
+    Build the backend named by RATE_LIMIT_BACKEND (memory or redis).
+
+    Raises:
+        ValueError: For an unknown backend name or missing configuration.
+    """
+    name = (name or os.getenv("RATE_LIMIT_BACKEND", "memory")).lower()
+    if name == "memory":
+        return InMemoryBackend()
+    if name == "redis":
+        return RedisBackend()
+    raise ValueError(f"Unknown rate limit backend: {name!r}")
+
+
+# Global rate limit backend instance
+_rate_limit_backend: Optional[RateLimitBackend] = None
+_rate_limit_backend_lock = Lock()
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Get or create the global rate limit backend instance."""
+    global _rate_limit_backend
+    if _rate_limit_backend is None:
+        with _rate_limit_backend_lock:
+            if _rate_limit_backend is None:
+                _rate_limit_backend = create_rate_limit_backend()
+    return _rate_limit_backend
@@ -2,14 +2,31 @@
 Rate limiting middleware for API endpoints.
 
 Implements a sliding window rate limiter to prevent API abuse.
+
+Each client's request timestamps are kept in a deque in arrival order, so
+a check drops expired timestamps from the left and reads the oldest one
+in O(1) amortized time. Clients are spread over independently locked
+shards, so concurrent checks for different clients rarely contend.
+
+Memory is bounded: each shard keeps its clients in least-recently-seen
+order, drops clients with no requests left in the window as it goes, and
+never tracks more than its share of RATE_LIMIT_MAX_CLIENTS. When a shard
+is full of active clients, the least recently seen one is forgotten,
+which resets its window (fails open) rather than growing without bound.
 """
 
 import os
 import time
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
 from threading import Lock
-from typing import Optional
+from typing import Callable, Optional
+
+DEFAULT_MAX_CLIENTS = 100_000
+DEFAULT_SHARDS = 16
+
+# Idle clients checked for eviction per request
+EVICTION_SWEEP = 2
 
 
 @dataclass
@@ -21,65 +38,106 @@ class RateLimitResult:
     retry_after: Optional[int] = None
 
 
+@dataclass
+class RateLimiterStats:
+    """Counters for the rate limiter."""
+    checks: int = 0
+    rejected: int = 0
+    idle_evictions: int = 0
+    forced_evictions: int = 0
+
+
+class _Shard:
+    __slots__ = ("lock", "clients", "stats")
+
+    def __init__(self):
+        self.lock = Lock()
+        # client_id -> request timestamps, least recently seen client first
+        self.clients: OrderedDict[str, deque[float]] = OrderedDict()
+        self.stats = RateLimiterStats()
+
+
 class RateLimiter:
     """
     Sliding window rate limiter.
-    
+
     Tracks requests per client IP within a time window and enforces limits.
     """
-    
+
     def __init__(
         self,
         requests_per_minute: Optional[int] = None,
-        window_seconds: int = 60
+        window_seconds: int = 60,
+        max_clients: Optional[int] = None,
+        shards: Optional[int] = None,
+        clock: Callable[[], float] = time.time
     ):
         """
         Initialize rate limiter.
-        
+
         Args:
             requests_per_minute: Maximum requests allowed per window.
                                  Defaults to RATE_LIMIT_REQUESTS_PER_MINUTE env var or 100.
             window_seconds: Time window in seconds (default 60).
+            max_clients: Most clients tracked at once.
+                         Defaults to RATE_LIMIT_MAX_CLIENTS env var or 100000.
+            shards: Number of independently locked shards.
+                    Defaults to RATE_LIMIT_SHARDS env var or 16.
+            clock: Time source (for testing).
         """
         self.requests_per_minute = requests_per_minute or int(
             os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", "100")
         )
         self.window_seconds = window_seconds
-        self._requests: dict[str, list[float]] = defaultdict(list)
-        self._lock = Lock()
-    
+        self.max_clients = max_clients or int(os.getenv("RATE_LIMIT_MAX_CLIENTS", str(DEFAULT_MAX_CLIENTS)))
+        shard_count = shards or int(os.getenv("RATE_LIMIT_SHARDS", str(DEFAULT_SHARDS)))
+        shard_count = max(1, min(shard_count, self.max_clients))
+        self._shards = [_Shard() for _ in range(shard_count)]
+        # Floor division, so the shards together never hold more than max_clients
+        self._shard_capacity = self.max_clients // shard_count
+        self._clock = clock
+
+    def _shard(self, client_id: str) -> _Shard:
+        return self._shards[hash(client_id) % len(self._shards)]
+
     def check(self, client_id: str) -> RateLimitResult:
         """
         Check if a request from client_id is allowed.
-        
+
         Args:
             client_id: Unique identifier for the client (usually IP address).
-            
+
         Returns:
             RateLimitResult with allowed status and metadata.
         """
-        current_time = time.time()
+        current_time = self._clock()
         window_start = current_time - self.window_seconds
-        
-        with self._lock:
-            # Clean up old requests outside the window
-            self._requests[client_id] = [
-                ts for ts in self._requests[client_id]
-                if ts > window_start
-            ]
-            
-            request_count = len(self._requests[client_id])
+        shard = self._shard(client_id)
+
+        with shard.lock:
+            shard.stats.checks += 1
+            timestamps = shard.clients.get(client_id)
+            if timestamps is None:
+                self._make_room(shard, window_start)
+                timestamps = shard.clients[client_id] = deque()
+            else:
+                shard.clients.move_to_end(client_id)
+                # Clean up old requests outside the window
+                while timestamps and timestamps[0] <= window_start:
+                    timestamps.popleft()
+
+            request_count = len(timestamps)
             remaining = max(0, self.requests_per_minute - request_count)
-            
+
             # Calculate reset time (when oldest request expires)
-            if self._requests[client_id]:
-                oldest_request = min(self._requests[client_id])
-                reset_time = oldest_request + self.window_seconds
+            if timestamps:
+                reset_time = timestamps[0] + self.window_seconds
             else:
                 reset_time = current_time + self.window_seconds
-            
+
             if request_count >= self.requests_per_minute:
                 # Rate limit exceeded
+                shard.stats.rejected += 1
                 retry_after = int(reset_time - current_time) + 1
                 return RateLimitResult(
                     allowed=False,
@@ -87,34 +145,93 @@ class RateLimiter:
                     reset_time=reset_time,
                     retry_after=retry_after
                 )
-            
+
             # Request allowed - record it
-            self._requests[client_id].append(current_time)
-            
+            timestamps.append(current_time)
+
             return RateLimitResult(
                 allowed=True,
                 remaining=remaining - 1,  # -1 because we just used one
                 reset_time=reset_time
             )
-    
+
+    def _make_room(self, shard: _Shard, window_start: float) -> None:
+        """Drop idle clients, and the least recently seen one if the shard is full (lock held)."""
+        clients = shard.clients
+        for _ in range(EVICTION_SWEEP):
+            if not clients:
+                break
+            client_id, timestamps = next(iter(clients.items()))
+            if timestamps and timestamps[-1] > window_start:
+                break
+            del clients[client_id]
+            shard.stats.idle_evictions += 1
+
+        if len(clients) >= self._shard_capacity:
+            clients.popitem(last=False)
+            shard.stats.forced_evictions += 1
+
+    def evict_idle(self) -> int:
+        """
+        Drop every client with no requests left in the window.
+
+        Returns:
+            Number of clients dropped.
+        """
+        window_start = self._clock() - self.window_seconds
+        evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                idle = [
+                    client_id for client_id, timestamps in shard.clients.items()
+                    if not timestamps or timestamps[-1] <= window_start
+                ]
+                for client_id in idle:
+                    del shard.clients[client_id]
+                shard.stats.idle_evictions += len(idle)
+                evicted += len(idle)
+        return evicted
+
+    def stats(self) -> dict:
+        """Snapshot of the counters summed over shards, plus clients tracked."""
+        totals = RateLimiterStats()
+        clients = 0
+        for shard in self._shards:
+            with shard.lock:
+                for name, value in asdict(shard.stats).items():
+                    setattr(totals, name, getattr(totals, name) + value)
+                clients += len(shard.clients)
+        snapshot = asdict(totals)
+        snapshot.update({
+            "clients": clients,
+            "max_clients": self.max_clients,
+            "shards": len(self._shards),
+        })
+        return snapshot
+
     def reset(self, client_id: str) -> None:
         """Reset rate limit for a specific client (for testing)."""
-        with self._lock:
-            self._requests[client_id] = []
-    
+        shard = self._shard(client_id)
+        with shard.lock:
+            shard.clients.pop(client_id, None)
+
     def reset_all(self) -> None:
         """Reset all rate limits (for testing)."""
-        with self._lock:
-            self._requests.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.clients.clear()
 
 
 # Global rate limiter instance
 _rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = Lock()
 
 
 def get_rate_limiter() -> RateLimiter:
     """Get or create the global rate limiter instance."""
     global _rate_limiter
     if _rate_limiter is None:
-        _rate_limiter = RateLimiter()
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
     return _rate_limiter
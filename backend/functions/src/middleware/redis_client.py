@@ -0,0 +1,186 @@
+"""
+Minimal asyncio client for the Redis protocol (RESP2).
+
+The shared rate limiter only needs a handful of commands (EVALSHA, EVAL,
+SCRIPT LOAD, PING), so this speaks the wire protocol directly instead of
+adding a client library to every deployment. Works with Redis, Valkey,
+Memorystore, ElastiCache and any other RESP server.
+
+Connections are pooled and reused; a connection that errors or times out
+mid-command is closed rather than returned to the pool, since its reply
+stream can no longer be trusted.
+"""
+
+import asyncio
+import ssl
+from typing import Optional, Union
+from urllib.parse import unquote, urlparse
+
+DEFAULT_POOL_SIZE = 8
+
+Reply = Union[None, int, bytes, str, list]
+
+
+class RedisError(Exception):
+    """Error reply from the server (e.g. NOSCRIPT, WRONGTYPE)."""
+
+
+class RedisConnectionError(Exception):
+    """The server couldn't be reached or the connection broke."""
+
+
+def encode_command(*args: Union[str, bytes, int, float]) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        else:
+            data = repr(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Reply:
+    """
+    Read one RESP reply.
+
+    Simple strings are returned as str, bulk strings as bytes, nulls as None.
+
+    Raises:
+        RedisError: For an error reply, or an array containing one (raised
+                    after the whole array has been read).
+        RedisConnectionError: If the connection closed mid-reply.
+    """
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise RedisConnectionError("Connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        raise RedisError(payload.decode("utf-8"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        try:
+            data = await reader.readexactly(length + 2)
+        except asyncio.IncompleteReadError:
+            raise RedisConnectionError("Connection closed by server") from None
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        items = []
+        error = None
+        for _ in range(length):
+            try:
+                items.append(await read_reply(reader))
+            except RedisError as e:
+                # Read the rest of the array so the connection stays in sync
+                error = error or e
+        if error is not None:
+            raise error
+        return items
+    raise RedisConnectionError(f"Unexpected reply type {kind!r}")
+
+
+class RedisClient:
+    """Pooled RESP client for one server."""
+
+    def __init__(self, url: str, pool_size: int = DEFAULT_POOL_SIZE, connect_timeout: Optional[float] = None):
+        """
+        Create the client (connections open on first use).
+
+        Args:
+            url: redis://[:password@]host[:port][/db] (rediss:// for TLS).
+            pool_size: Idle connections kept for reuse.
+            connect_timeout: Seconds allowed to open a connection (None: no limit).
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme!r}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.tls = parsed.scheme == "rediss"
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.connections_opened = 0
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=ssl.create_default_context() if self.tls else None),
+                self.connect_timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RedisConnectionError(f"Cannot connect to {self.host}:{self.port}: {e!r}") from None
+        self.connections_opened += 1
+
+        setup = []
+        if self.password is not None:
+            setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        try:
+            for command in setup:
+                writer.write(encode_command(*command))
+                await read_reply(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def execute(self, *args: Union[str, bytes, int, float]) -> Reply:
+        """
+        Send one command and return its reply.
+
+        Raises:
+            RedisError: For an error reply (the connection stays usable).
+            RedisConnectionError: If the connection failed.
+        """
+        connection = self._idle.pop() if self._idle else await self._connect()
+        reader, writer = connection
+        try:
+            writer.write(encode_command(*args))
+            await writer.drain()
+            reply = await read_reply(reader)
+        except RedisError:
+            self._release(connection)
+            raise
+        except (OSError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            raise RedisConnectionError(repr(e)) from None
+        except BaseException:
+            # Cancelled or timed out mid-command: the reply may still arrive
+            writer.close()
+            raise
+        self._release(connection)
+        return reply
+
+    def _release(self, connection: tuple[asyncio.StreamReader, asyncio.StreamWriter]) -> None:
+        if len(self._idle) < self.pool_size and not connection[1].is_closing():
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
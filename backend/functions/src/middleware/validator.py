@@ -19,6 +19,8 @@ SUPPORTED_LANGUAGES = {"en", "es", "de", "ru"}
 ERROR_CODES = {
     "bad_request": 400,
     "unauthorized": 401,
+    "payload_too_large": 413,
+    "unsupported_media_type": 415,
     "rate_limited": 429,
     "server_error": 500,
 }
@@ -201,6 +203,28 @@ def validate_stt_request(data: dict[str, Any]) -> ValidationResult:
     return ValidationResult(valid=True)
 
 
+def validate_stt_upload(language: Optional[str]) -> ValidationResult:
+    """
+    Validate the parameters of a binary speech-to-text upload.
+    
+    The audio itself is size-checked while it is read (see audio_upload).
+    
+    Args:
+        language: Language from the query string or multipart field.
+        
+    Returns:
+        ValidationResult with valid status or error details.
+    """
+    if language and language not in SUPPORTED_LANGUAGES:
+        return ValidationResult(
+            valid=False,
+            error_code=400,
+            error_message=f"Unsupported language '{language}'. Supported: {', '.join(SUPPORTED_LANGUAGES)}"
+        )
+    
+    return ValidationResult(valid=True)
+
+
 def validate_coaching_request(data: dict[str, Any]) -> ValidationResult:
     """
     Validate coaching tip request.
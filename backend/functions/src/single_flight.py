@@ -0,0 +1,145 @@
+"""
+Single-flight coalescing of identical in-flight upstream calls.
+
+When a class finishes the same song together, identical performance-review
+and TTS requests arrive in a burst. SingleFlight makes concurrent callers
+with the same key await one upstream call and share its result:
+
+- the first caller (leader) starts the call as a task; callers arriving
+  while it runs (followers) await the same task
+- an exception reaches every waiter, and the key is released so the next
+  request retries instead of reusing the failure
+- each waiter awaits through asyncio.shield, so a client disconnecting
+  doesn't cancel the call for the others; the call is cancelled only when
+  every waiter has gone
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters for one coalescing group."""
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    cancelled_waiters: int = 0
+    abandoned: int = 0
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self, name: str):
+        """
+        Create a coalescing group.
+
+        Args:
+            name: Group name, used in metrics.
+        """
+        self.name = name
+        self._flights: dict[str, _Flight] = {}
+        self._stats = SingleFlightStats()
+        self._lock = Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Keys with a call currently running."""
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Canonical request key.
+            fn: Coroutine function making the upstream call.
+
+        Returns:
+            fn()'s result (the same object for every caller sharing the call).
+
+        Raises:
+            Exception: Whatever fn() raised, in every waiter.
+            asyncio.CancelledError: If this caller was cancelled.
+        """
+        with self._lock:
+            self._stats.calls += 1
+            flight = self._flights.get(key)
+            if flight is None:
+                self._stats.executions += 1
+                flight = _Flight(asyncio.get_running_loop().create_task(fn()))
+                self._flights[key] = flight
+                flight.task.add_done_callback(lambda task, key=key: self._finished(key, task))
+            else:
+                self._stats.coalesced += 1
+            flight.waiters += 1
+
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                # This waiter was cancelled (e.g. client disconnected); the call goes on for the others
+                with self._lock:
+                    self._stats.cancelled_waiters += 1
+                    flight.waiters -= 1
+                    abandon = flight.waiters == 0
+                    if abandon:
+                        self._stats.abandoned += 1
+                        if self._flights.get(key) is flight:
+                            del self._flights[key]
+                if abandon:
+                    flight.task.cancel()
+            raise
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight.task is task:
+                del self._flights[key]
+            if not task.cancelled() and task.exception() is not None:
+                self._stats.errors += 1
+
+    def stats(self) -> dict:
+        """Snapshot of the counters plus coalescing rate."""
+        with self._lock:
+            snapshot = asdict(self._stats)
+            snapshot["in_flight"] = len(self._flights)
+        snapshot["coalesce_rate"] = snapshot["coalesced"] / snapshot["calls"] if snapshot["calls"] else 0.0
+        return snapshot
+
+
+# Global coalescing groups, one per name
+_groups: dict[str, SingleFlight] = {}
+_groups_lock = Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get or create the global coalescing group for a name."""
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.get(name)
+            if group is None:
+                group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def single_flight_stats() -> dict[str, dict]:
+    """Stats for every coalescing group created so far."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
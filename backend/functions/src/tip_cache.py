@@ -0,0 +1,278 @@
+"""
+TTL cache for generated coaching tips.
+
+Coaching-tip requests are highly repetitive (score, a few body parts, four
+languages), so most of them can be answered from memory instead of
+calling Gemini. Requests are canonicalized first: the score is bucketed,
+the target body part (first weak point) is kept and the remaining points
+are sorted. Each key holds a small pool of tip variants so a dancer doesn't
+hear the same line every time.
+
+- hit: a random variant is returned; while the pool is smaller than
+  TIP_CACHE_VARIANTS, another variant is generated in the background
+  (duplicates of a pooled tip are dropped)
+- stale (past the TTL but within TIP_CACHE_STALE_SECONDS): with
+  stale-while-revalidate on, a cached variant is returned immediately and
+  the entry is refreshed in the background
+- miss: the tip is generated inline; if that fails, a stale tip for the
+  key is served if there is one, otherwise the fallback tip is cached for
+  a short TTL so an outage doesn't send every request to Gemini
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Awaitable, Callable, Optional
+
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_STALE_SECONDS = 86400.0
+DEFAULT_FALLBACK_TTL_SECONDS = 30.0
+DEFAULT_VARIANTS = 3
+DEFAULT_MAX_ENTRIES = 2048
+
+# Width of a score bucket in percentage points
+SCORE_BUCKET = 10
+
+
+def score_bucket(score: float) -> int:
+    """Bucket index for a 0-100 score (100 shares the top bucket)."""
+    return min(int(score // SCORE_BUCKET), (100 // SCORE_BUCKET) - 1)
+
+
+def _canonical_points(points: list[str]) -> list[str]:
+    return sorted({point.strip().lower() for point in points if point.strip()})
+
+
+def canonical_tip_key(score: float, weak_points: list[str], strong_points: list[str], language: str) -> str:
+    """
+    Cache key for a coaching-tip request.
+
+    The first weak point is the tip's target body part, so it stays in
+    place; the other weak points and the strong points are order-insensitive.
+    """
+    target = weak_points[0].strip().lower() if weak_points else "overall"
+    return "|".join([
+        language,
+        str(score_bucket(score)),
+        target,
+        ",".join(_canonical_points(weak_points[1:])),
+        ",".join(_canonical_points(strong_points)),
+    ])
+
+
+@dataclass
+class TipCacheStats:
+    """Counters for the coaching-tip cache."""
+    hits: int = 0
+    stale_hits: int = 0
+    fallback_hits: int = 0
+    misses: int = 0
+    generated: int = 0
+    generate_failures: int = 0
+    background_refreshes: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class _Entry:
+    variants: list[str]
+    expires_at: float
+    fallback: bool = False
+
+
+class TipCache:
+    """Variant-pooling TTL cache with optional stale-while-revalidate."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        stale_seconds: Optional[float] = None,
+        fallback_ttl_seconds: Optional[float] = None,
+        variants: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        stale_while_revalidate: Optional[bool] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Freshness of generated tips. Defaults to TIP_CACHE_TTL_SECONDS env var or 3600.
+            stale_seconds: How long past the TTL a tip may still be served while it
+                           is refreshed. Defaults to TIP_CACHE_STALE_SECONDS env var or 86400.
+            fallback_ttl_seconds: Lifetime of cached fallback tips.
+                                  Defaults to TIP_CACHE_FALLBACK_TTL_SECONDS env var or 30.
+            variants: Tips kept per key. Defaults to TIP_CACHE_VARIANTS env var or 3.
+            max_entries: Keys kept (least recently used dropped first).
+                         Defaults to TIP_CACHE_MAX_ENTRIES env var or 2048.
+            stale_while_revalidate: Refresh in the background instead of inline.
+                                    Defaults to TIP_CACHE_SWR env var or true.
+            clock: Monotonic time source (for testing).
+            rng: Random source for picking variants (for testing).
+        """
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("TIP_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS))
+        )
+        self.stale_seconds = stale_seconds if stale_seconds is not None else float(
+            os.getenv("TIP_CACHE_STALE_SECONDS", str(DEFAULT_STALE_SECONDS))
+        )
+        self.fallback_ttl_seconds = fallback_ttl_seconds if fallback_ttl_seconds is not None else float(
+            os.getenv("TIP_CACHE_FALLBACK_TTL_SECONDS", str(DEFAULT_FALLBACK_TTL_SECONDS))
+        )
+        self.variants = variants or int(os.getenv("TIP_CACHE_VARIANTS", str(DEFAULT_VARIANTS)))
+        self.max_entries = max_entries or int(os.getenv("TIP_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+        if stale_while_revalidate is None:
+            stale_while_revalidate = os.getenv("TIP_CACHE_SWR", "true").lower() in ("1", "true", "yes")
+        self.stale_while_revalidate = stale_while_revalidate
+
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._stats = TipCacheStats()
+        self._lock = Lock()
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Optional[str]]],
+        fallback: Callable[[], str]
+    ) -> tuple[str, str]:
+        """
+        Return a tip for key, generating one only when nothing usable is cached.
+
+        Args:
+            key: canonical_tip_key() of the request.
+            generate: Coroutine function returning a new tip, or None on failure.
+            fallback: Returns the fallback tip when generation fails.
+
+        Returns:
+            (tip, status) with status one of "hit", "stale", "fallback", "miss".
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                fresh = now < entry.expires_at
+                if fresh and entry.fallback:
+                    self._stats.fallback_hits += 1
+                    return self._rng.choice(entry.variants), "fallback"
+                if fresh:
+                    self._stats.hits += 1
+                    if len(entry.variants) < self.variants:
+                        self._schedule(key, generate, grow=True)
+                    return self._rng.choice(entry.variants), "hit"
+                if (
+                    not entry.fallback
+                    and self.stale_while_revalidate
+                    and now < entry.expires_at + self.stale_seconds
+                ):
+                    self._stats.stale_hits += 1
+                    self._schedule(key, generate, grow=False)
+                    return self._rng.choice(entry.variants), "stale"
+            self._stats.misses += 1
+
+        tip = await self._generate(generate)
+        if tip is not None:
+            self._store(key, tip)
+            return tip, "miss"
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.fallback and now < entry.expires_at + self.stale_seconds:
+                # Generation failed: a stale real tip beats the generic fallback
+                self._stats.stale_hits += 1
+                return self._rng.choice(entry.variants), "stale"
+        tip = fallback()
+        self._store(key, tip, fallback=True)
+        return tip, "fallback"
+
+    async def _generate(self, generate: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        try:
+            tip = await generate()
+        except Exception:
+            tip = None
+        with self._lock:
+            if tip:
+                self._stats.generated += 1
+            else:
+                self._stats.generate_failures += 1
+        return tip or None
+
+    def _store(self, key: str, tip: str, fallback: bool = False, grow: bool = False) -> None:
+        """Add a tip to key's pool, or start a new pool (fresh TTL)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if grow and entry is not None and not entry.fallback and now < entry.expires_at:
+                if tip not in entry.variants and len(entry.variants) < self.variants:
+                    entry.variants.append(tip)
+                return
+            ttl = self.fallback_ttl_seconds if fallback else self.ttl_seconds
+            self._entries[key] = _Entry(variants=[tip], expires_at=now + ttl, fallback=fallback)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def _schedule(self, key: str, generate: Callable[[], Awaitable[Optional[str]]], grow: bool) -> None:
+        """Start one background refresh per key (lock held)."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._stats.background_refreshes += 1
+        task = asyncio.get_running_loop().create_task(self._refresh(key, generate, grow))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: str, generate: Callable[[], Awaitable[Optional[str]]], grow: bool) -> None:
+        try:
+            tip = await self._generate(generate)
+            if tip is not None:
+                self._store(key, tip, grow=grow)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def drain(self) -> None:
+        """Wait for background refreshes to finish (for testing and shutdown)."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def clear(self) -> None:
+        """Drop all entries (for testing)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of the counters plus size and hit rate."""
+        with self._lock:
+            snapshot = asdict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["variants"] = sum(len(entry.variants) for entry in self._entries.values())
+        lookups = snapshot["hits"] + snapshot["stale_hits"] + snapshot["fallback_hits"] + snapshot["misses"]
+        served = snapshot["hits"] + snapshot["stale_hits"] + snapshot["fallback_hits"]
+        snapshot["hit_rate"] = served / lookups if lookups else 0.0
+        return snapshot
+
+
+# Global tip cache instance
+_tip_cache: Optional[TipCache] = None
+_tip_cache_lock = Lock()
+
+
+def get_tip_cache() -> TipCache:
+    """Get or create the global coaching-tip cache instance."""
+    global _tip_cache
+    if _tip_cache is None:
+        with _tip_cache_lock:
+            if _tip_cache is None:
+                _tip_cache = TipCache()
+    return _tip_cache
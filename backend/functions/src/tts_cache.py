@@ -0,0 +1,307 @@
+"""
+Content-addressed cache for synthesized speech.
+
+Coaching phrases repeat constantly across users, and ElevenLabs bills per
+character, so identical requests shouldn't be synthesized twice. Audio is
+keyed on sha256(normalized text, voice_id, model_id, format) and kept in
+two tiers:
+
+- memory: LRU, bounded by total bytes (TTS_CACHE_MEMORY_BYTES)
+- disk (optional, TTS_CACHE_DIR): one file per entry, bounded by total
+  bytes (TTS_CACHE_DISK_BYTES), least recently used evicted first;
+  survives restarts and is shared by workers on the same machine
+
+Disk hits are promoted to memory. The async endpoints use get_async() and
+put_async(), which run disk-tier file I/O in a worker thread so a slow
+disk never stalls the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRY_BYTES = 1024 * 1024
+
+
+def normalize_text(text: str) -> str:
+    """Text as it affects synthesis: NFC, trimmed, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, voice_id: str, model_id: str, audio_format: str = "mp3") -> str:
+    """sha256 hex key for a synthesis request."""
+    payload = json.dumps([normalize_text(text), voice_id, model_id, audio_format], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TTSCacheStats:
+    """Counters for the TTS cache."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    skipped_too_large: int = 0
+    memory_evictions: int = 0
+    disk_evictions: int = 0
+    memory_bytes: int = 0
+    memory_entries: int = 0
+    disk_bytes: int = 0
+    disk_entries: int = 0
+    bytes_served: int = 0
+    characters_saved: int = 0
+
+
+class TTSCache:
+    """Two-tier (memory LRU + optional disk) audio cache."""
+
+    def __init__(
+        self,
+        max_memory_bytes: Optional[int] = None,
+        disk_dir: Optional[Union[str, Path]] = None,
+        max_disk_bytes: Optional[int] = None,
+        max_entry_bytes: Optional[int] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_memory_bytes: Memory tier size. Defaults to TTS_CACHE_MEMORY_BYTES env var or 32 MiB.
+            disk_dir: Disk tier directory. Defaults to TTS_CACHE_DIR env var; no disk tier if unset.
+            max_disk_bytes: Disk tier size. Defaults to TTS_CACHE_DISK_BYTES env var or 512 MiB.
+            max_entry_bytes: Larger audio isn't cached. Defaults to
+                             TTS_CACHE_MAX_ENTRY_BYTES env var or 1 MiB.
+        """
+        self.max_memory_bytes = max_memory_bytes if max_memory_bytes is not None else int(
+            os.getenv("TTS_CACHE_MEMORY_BYTES", str(DEFAULT_MEMORY_BYTES))
+        )
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else int(
+            os.getenv("TTS_CACHE_DISK_BYTES", str(DEFAULT_DISK_BYTES))
+        )
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else int(
+            os.getenv("TTS_CACHE_MAX_ENTRY_BYTES", str(DEFAULT_MAX_ENTRY_BYTES))
+        )
+        disk_dir = disk_dir or os.getenv("TTS_CACHE_DIR")
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        # key -> size, least recently used first
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._stats = TTSCacheStats()
+        self._lock = Lock()
+
+        if self.disk_dir is not None:
+            self._load_disk_index()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.audio"
+
+    def _load_disk_index(self) -> None:
+        """Index existing disk entries, oldest access first, and trim to size."""
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.disk_dir.glob("*/*.audio"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if stat.st_size == 0:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._stats.disk_bytes += size
+        self._stats.disk_entries = len(self._disk)
+        self._evict_disk()
+
+    def get(self, key: str, characters: int = 0) -> Optional[bytes]:
+        """
+        Look up audio.
+
+        Args:
+            key: cache_key() of the request.
+            characters: Request length, counted as saved on a hit.
+
+        Returns:
+            The cached audio, or None on a miss.
+        """
+        audio, on_disk = self._get_memory(key, characters)
+        if audio is not None:
+            return audio
+        return self._get_disk(key, characters, on_disk)
+
+    async def get_async(self, key: str, characters: int = 0) -> Optional[bytes]:
+        """get() for the event loop; a disk-tier read runs in a worker thread."""
+        audio, on_disk = self._get_memory(key, characters)
+        if audio is not None:
+            return audio
+        if not on_disk:
+            return self._get_disk(key, characters, on_disk)
+        return await asyncio.to_thread(self._get_disk, key, characters, on_disk)
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store audio in both tiers (empty audio and entries over max_entry_bytes are skipped)."""
+        if self._put_memory(key, audio) and self.disk_dir is not None:
+            self._write_disk(key, audio)
+
+    async def put_async(self, key: str, audio: bytes) -> None:
+        """put() for the event loop; the disk-tier write runs in a worker thread."""
+        if self._put_memory(key, audio) and self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, audio)
+
+    def _get_memory(self, key: str, characters: int) -> Tuple[Optional[bytes], bool]:
+        """Memory-tier lookup: (audio or None, whether the disk tier has the key)."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self._record_hit(audio, characters, disk=False)
+                return audio, False
+            return None, key in self._disk
+
+    def _get_disk(self, key: str, characters: int, on_disk: bool) -> Optional[bytes]:
+        """Disk-tier lookup after a memory miss; hits are promoted to memory."""
+        audio = self._read_disk(key) if on_disk else None
+        with self._lock:
+            if audio is None:
+                self._stats.misses += 1
+                return None
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._store_memory(key, audio)
+            self._record_hit(audio, characters, disk=True)
+        return audio
+
+    def _put_memory(self, key: str, audio: bytes) -> bool:
+        """Store in the memory tier; False if the audio is empty or too large to cache at all."""
+        if not audio:
+            # An empty response is a failed synthesis; caching it would serve silence as a hit
+            logger.warning("TTS cache: not storing empty audio")
+            return False
+        with self._lock:
+            if len(audio) > self.max_entry_bytes:
+                self._stats.skipped_too_large += 1
+                return False
+            self._stats.stores += 1
+            self._store_memory(key, audio)
+        return True
+
+    def _record_hit(self, audio: bytes, characters: int, disk: bool) -> None:
+        if disk:
+            self._stats.disk_hits += 1
+        else:
+            self._stats.memory_hits += 1
+        self._stats.bytes_served += len(audio)
+        self._stats.characters_saved += characters
+
+    def _store_memory(self, key: str, audio: bytes) -> None:
+        """Insert into the memory tier and evict LRU entries (lock held)."""
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._stats.memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._stats.memory_bytes += len(audio)
+        while self._stats.memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._stats.memory_bytes -= len(evicted)
+            self._stats.memory_evictions += 1
+        self._stats.memory_entries = len(self._memory)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            audio = path.read_bytes()
+            # mtime doubles as last access time when the index is rebuilt
+            os.utime(path, (time.time(), time.time()))
+            return audio
+        except OSError:
+            with self._lock:
+                self._drop_disk(key)
+            return None
+
+    def _write_disk(self, key: str, audio: bytes) -> None:
+        path = self._disk_path(key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"TTS cache disk write failed: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._drop_disk(key)
+            self._disk[key] = len(audio)
+            self._stats.disk_bytes += len(audio)
+            self._stats.disk_entries = len(self._disk)
+            self._evict_disk()
+
+    def _drop_disk(self, key: str) -> None:
+        """Forget a disk entry (lock held)."""
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._stats.disk_bytes -= size
+            self._stats.disk_entries = len(self._disk)
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until under max_disk_bytes (lock held)."""
+        while self._stats.disk_bytes > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._stats.disk_bytes -= size
+            self._stats.disk_evictions += 1
+            self._disk_path(key).unlink(missing_ok=True)
+        self._stats.disk_entries = len(self._disk)
+
+    def clear(self) -> None:
+        """Drop the memory tier (for testing); disk files are kept."""
+        with self._lock:
+            self._memory.clear()
+            self._stats.memory_bytes = 0
+            self._stats.memory_entries = 0
+
+    def stats(self) -> dict:
+        """Snapshot of the counters plus hit rate and limits."""
+        with self._lock:
+            snapshot = asdict(self._stats)
+        lookups = snapshot["memory_hits"] + snapshot["disk_hits"] + snapshot["misses"]
+        snapshot.update({
+            "hit_rate": (snapshot["memory_hits"] + snapshot["disk_hits"]) / lookups if lookups else 0.0,
+            "max_memory_bytes": self.max_memory_bytes,
+            "max_disk_bytes": self.max_disk_bytes if self.disk_dir is not None else 0,
+            "disk_enabled": self.disk_dir is not None,
+        })
+        return snapshot
+
+
+# Global TTS cache instance
+_tts_cache: Optional[TTSCache] = None
+_tts_cache_lock = Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Get or create the global TTS cache instance."""
+    global _tts_cache
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                _tts_cache = TTSCache()
+    return _tts_cache
@@ -0,0 +1,167 @@
+"""
+Relay of streamed ElevenLabs audio to the client.
+
+The JSON TTS endpoint waits for the whole synthesis, then base64-encodes
+it, so time-to-first-audio equals the full synthesis time and the payload
+is a third larger. AudioRelay forwards raw chunks as the SDK produces them:
+
+- the SDK's chunk iterator is blocking, so each chunk is pulled on the
+  upstream pool with a per-chunk timeout
+- the first chunk is fetched before the response starts, so upstream
+  errors (including a stream with no audio at all) still become proper
+  status codes and time-to-first-byte can be reported in a header
+- the streamed chunks are collected (up to max_tee_bytes) and handed to
+  on_complete once the stream finishes, to fill the TTS cache; an
+  interrupted stream is never cached
+"""
+
+import inspect
+import time
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, Union
+
+from .upstream import UpstreamPool
+
+
+@dataclass
+class TTSStreamStats:
+    """Counters for streamed TTS responses."""
+    streams: int = 0
+    cache_hits: int = 0
+    completed: int = 0
+    interrupted: int = 0
+    errors: int = 0
+    chunks: int = 0
+    bytes_streamed: int = 0
+    ttfb_seconds_total: float = 0.0
+    ttfb_seconds_max: float = 0.0
+
+
+_stats = TTSStreamStats()
+_stats_lock = Lock()
+
+
+def record_cache_hit(size: int) -> None:
+    """Count a stream request answered from the TTS cache."""
+    with _stats_lock:
+        _stats.cache_hits += 1
+        _stats.bytes_streamed += size
+
+
+def tts_stream_stats() -> dict:
+    """Snapshot of the stream counters plus mean time-to-first-byte."""
+    with _stats_lock:
+        snapshot = asdict(_stats)
+    measured = snapshot["streams"] - snapshot["errors"]
+    snapshot["ttfb_seconds_avg"] = snapshot["ttfb_seconds_total"] / measured if measured else 0.0
+    return snapshot
+
+
+def _pull(chunks: Iterator[bytes]) -> Optional[bytes]:
+    """Next non-empty chunk, or None at the end (runs on the pool)."""
+    for chunk in chunks:
+        if chunk:
+            return chunk
+    return None
+
+
+class AudioRelay:
+    """Streams a blocking chunk iterator without blocking the event loop."""
+
+    def __init__(
+        self,
+        open_chunks: Callable[[], Iterator[bytes]],
+        pool: UpstreamPool,
+        timeout: Optional[float] = None,
+        on_complete: Optional[Callable[[bytes], Union[None, Awaitable[None]]]] = None,
+        max_tee_bytes: int = 0,
+        started_at: Optional[float] = None
+    ):
+        """
+        Prepare a relay; nothing is called until start().
+
+        Args:
+            open_chunks: Blocking callable returning the audio chunk iterator.
+            pool: Upstream pool the blocking calls run on.
+            timeout: Seconds allowed for each chunk (None: no limit).
+            on_complete: Called with the full audio once the stream finishes
+                         (awaited if it returns an awaitable).
+            max_tee_bytes: Audio larger than this isn't passed to on_complete.
+            started_at: perf_counter() value time-to-first-byte is measured
+                        from (defaults to when start() is called).
+        """
+        self._open_chunks = open_chunks
+        self._pool = pool
+        self._timeout = timeout
+        self._on_complete = on_complete
+        self._max_tee_bytes = max_tee_bytes
+        self._started_at = started_at
+        self._chunks: Optional[Iterator[bytes]] = None
+        self._first: Optional[bytes] = None
+        self.ttfb_seconds: Optional[float] = None
+
+    async def start(self) -> None:
+        """
+        Open the upstream stream and wait for the first chunk.
+
+        Raises:
+            UpstreamTimeoutError: If the first chunk didn't arrive in time.
+            ValueError: If the stream ended without producing any audio.
+            Exception: Whatever the SDK raised.
+        """
+        started_at = self._started_at if self._started_at is not None else time.perf_counter()
+        with _stats_lock:
+            _stats.streams += 1
+        try:
+            self._chunks = iter(
+                await self._pool.run(self._open_chunks, timeout=self._timeout, operation="tts_stream_open")
+            )
+            self._first = await self._pool.run(
+                _pull, self._chunks, timeout=self._timeout, operation="tts_stream_chunk"
+            )
+            if self._first is None:
+                raise ValueError("ElevenLabs stream produced no audio")
+        except Exception:
+            with _stats_lock:
+                _stats.errors += 1
+            raise
+
+        self.ttfb_seconds = time.perf_counter() - started_at
+        with _stats_lock:
+            _stats.ttfb_seconds_total += self.ttfb_seconds
+            _stats.ttfb_seconds_max = max(_stats.ttfb_seconds_max, self.ttfb_seconds)
+
+    async def body(self) -> AsyncIterator[bytes]:
+        """Yield the audio chunks; start() must have been awaited."""
+        tee: Optional[list[bytes]] = [] if self._on_complete is not None else None
+        tee_bytes = 0
+        completed = False
+        chunk = self._first
+        try:
+            while chunk is not None:
+                with _stats_lock:
+                    _stats.chunks += 1
+                    _stats.bytes_streamed += len(chunk)
+                if tee is not None:
+                    tee_bytes += len(chunk)
+                    if tee_bytes > self._max_tee_bytes:
+                        tee = None
+                    else:
+                        tee.append(chunk)
+                yield chunk
+                chunk = await self._pool.run(
+                    _pull, self._chunks, timeout=self._timeout, operation="tts_stream_chunk"
+                )
+            completed = True
+        finally:
+            # A disconnect or upstream failure mid-stream leaves partial audio
+            with _stats_lock:
+                if completed:
+                    _stats.completed += 1
+                else:
+                    _stats.interrupted += 1
+            if completed and tee:
+                result = self._on_complete(b"".join(tee))
+                if inspect.isawaitable(result):
+                    await result
@@ -0,0 +1,203 @@
+"""
+Bounded thread pools for blocking upstream SDK calls.
+
+The service uses the synchronous Gemini (Vertex AI) and ElevenLabs
+clients. Both SDKs also have async variants (GenerativeModel's
+generate_content_async, AsyncElevenLabs), but the synchronous clients are
+kept: GeminiClient.generate() still serves blocking callers, and the
+streaming TTS relay iterates the SDK's blocking chunk generator. Running
+every call through one pool per upstream gives both paths the same
+bounded concurrency, timeouts and stats.
+
+Calling a synchronous client inline from an async endpoint blocks the
+event loop, so one slow upstream call stalls every other request on the
+worker. UpstreamPool runs those calls on a dedicated, bounded thread pool
+per upstream and applies a per-call timeout, so the event loop keeps
+serving requests and one slow upstream can't take the other's threads.
+
+A timed-out call is abandoned, not killed: its thread stays busy until
+the SDK returns, which is why the pools are bounded.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Callable, Optional, TypeVar
+
+from .metrics import observe_upstream
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 16
+
+
+class UpstreamTimeoutError(Exception):
+    """An upstream call did not finish within its timeout."""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"{name} call timed out after {timeout}s")
+        self.name = name
+        self.timeout = timeout
+
+
+@dataclass
+class UpstreamStats:
+    """Counters for one upstream pool."""
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    queue_wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+
+class UpstreamPool:
+    """Dedicated bounded thread pool for one upstream service."""
+
+    def __init__(self, name: str, max_workers: Optional[int] = None):
+        """
+        Create the pool (threads start on demand).
+
+        Args:
+            name: Upstream name, used in logs and for the env var.
+            max_workers: Maximum concurrent calls. Defaults to the
+                         <NAME>_MAX_WORKERS env var, then UPSTREAM_MAX_WORKERS, then 16.
+        """
+        self.name = name
+        self.max_workers = max_workers or int(
+            os.getenv(f"{name.upper()}_MAX_WORKERS", os.getenv("UPSTREAM_MAX_WORKERS", str(DEFAULT_MAX_WORKERS)))
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._stats = UpstreamStats()
+        self._lock = Lock()
+
+    def _wrap(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Callable[[], T]:
+        """Callable for the executor that records queue wait and run time."""
+        submitted = time.perf_counter()
+
+        def call() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._stats.in_flight += 1
+                self._stats.max_in_flight = max(self._stats.max_in_flight, self._stats.in_flight)
+                self._stats.queue_wait_seconds += started - submitted
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._stats.in_flight -= 1
+                    self._stats.run_seconds += time.perf_counter() - started
+
+        return call
+
+    def _record(self, operation: str, started: float, failed: bool = False, timed_out: bool = False) -> None:
+        outcome = "timeout" if timed_out else "error" if failed else "ok"
+        observe_upstream(self.name, operation, outcome, time.perf_counter() - started)
+        with self._lock:
+            self._stats.calls += 1
+            if failed:
+                self._stats.failures += 1
+            if timed_out:
+                self._stats.timeouts += 1
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        timeout: Optional[float] = None,
+        operation: str = "call",
+        **kwargs: Any
+    ) -> T:
+        """
+        Run a blocking call on the pool without blocking the event loop.
+
+        Args:
+            fn: Blocking callable.
+            timeout: Seconds to wait, including time queued for a thread (None: no limit).
+            operation: Label for the call's latency histogram (e.g. tts, stt, generate).
+
+        Raises:
+            UpstreamTimeoutError: If the call didn't finish in time.
+            Exception: Whatever fn raised.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._wrap(fn, *args, **kwargs))
+        try:
+            result = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._record(operation, started, timed_out=True)
+            raise UpstreamTimeoutError(self.name, timeout) from None
+        except Exception:
+            self._record(operation, started, failed=True)
+            raise
+        self._record(operation, started)
+        return result
+
+    def call(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        timeout: Optional[float] = None,
+        operation: str = "call",
+        **kwargs: Any
+    ) -> T:
+        """
+        Blocking counterpart of run() for synchronous callers.
+
+        Raises:
+            UpstreamTimeoutError: If the call didn't finish in time.
+            Exception: Whatever fn raised.
+        """
+        started = time.perf_counter()
+        future = self._executor.submit(self._wrap(fn, *args, **kwargs))
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._record(operation, started, timed_out=True)
+            raise UpstreamTimeoutError(self.name, timeout) from None
+        except Exception:
+            self._record(operation, started, failed=True)
+            raise
+        self._record(operation, started)
+        return result
+
+    def stats(self) -> dict:
+        """Snapshot of the counters."""
+        with self._lock:
+            snapshot = asdict(self._stats)
+        snapshot["max_workers"] = self.max_workers
+        return snapshot
+
+    def shutdown(self) -> None:
+        """Stop accepting calls; running calls finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global pools, one per upstream name
+_pools: dict[str, UpstreamPool] = {}
+_pools_lock = Lock()
+
+
+def get_upstream_pool(name: str) -> UpstreamPool:
+    """Get or create the global pool for an upstream."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = UpstreamPool(name)
+    return pool
+
+
+def upstream_stats() -> dict[str, dict]:
+    """Stats for every pool created so far."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
@@ -0,0 +1,254 @@
+"""
+Property-based tests for binary speech-to-text uploads.
+
+Feature: elevenlabs-voice-coach
+Property 26: Bounded Audio Uploads
+Validates: Requirements 3.2, 15.2
+"""
+
+import base64
+import json
+import logging
+import tracemalloc
+
+import httpx
+import pytest
+from hypothesis import given, strategies as st, settings
+
+import src.elevenlabs as elevenlabs
+from main import app
+from src.audio_upload import UploadError, read_audio_upload
+from src.middleware.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY = "----bachatabro"
+RECEIVE_CHUNK = 64 * 1024
+
+
+class FakeTranscription:
+    text = "play uptown funk"
+    confidence = 0.97
+
+
+def multipart_body(audio: bytes, language: str | None = None, content_type: str = "audio/webm") -> bytes:
+    parts = []
+    if language is not None:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="language"\r\n\r\n{language}\r\n'.encode()
+        )
+    parts.append(
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="audio"; filename="clip.webm"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n".encode() + audio + b"\r\n"
+    )
+    parts.append(f"--{BOUNDARY}--\r\n".encode())
+    return b"".join(parts)
+
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def asgi_post(path: str, chunks: list[bytes], content_type: str) -> int:
+    """Send a request body to the app in chunks, as a server would; returns the status."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", content_type.encode()), (b"host", b"test")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    remaining = list(reversed(chunks))
+    status = None
+
+    async def receive():
+        if not remaining:
+            return {"type": "http.disconnect"}
+        chunk = remaining.pop()
+        return {"type": "http.request", "body": chunk, "more_body": bool(remaining)}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def split(body: bytes) -> list[bytes]:
+    return [body[start:start + RECEIVE_CHUNK] for start in range(0, len(body), RECEIVE_CHUNK)]
+
+
+@pytest.fixture
+def client():
+    get_rate_limiter().reset_all()
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.fixture
+def fake_stt(monkeypatch):
+    received = []
+
+    def transcribe(api_key, audio, language):
+        received.append((audio if isinstance(audio, bytes) else audio.getvalue(), language))
+        return FakeTranscription()
+
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setattr(elevenlabs, "_transcribe", transcribe)
+    get_rate_limiter().reset_all()
+    return received
+
+
+class TestBoundedAudioUploads:
+    """
+    Property 26: Bounded Audio Uploads
+
+    For any binary STT upload, the audio passed to ElevenLabs should equal
+    the uploaded bytes however the body is chunked, and any upload over
+    MAX_AUDIO_SIZE_BYTES should be rejected with 413 while it is read.
+
+    Validates: Requirements 3.2, 15.2
+    """
+
+    @given(
+        st.binary(min_size=1, max_size=2000),
+        st.integers(min_value=1, max_value=300),
+        st.sampled_from([None, "es"]),
+    )
+    @settings(max_examples=100)
+    async def test_multipart_audio_survives_any_chunking(self, audio: bytes, chunk_size: int, language):
+        """
+        Feature: elevenlabs-voice-coach, Property 26: Bounded Audio Uploads
+
+        The audio part is reassembled exactly, whatever the chunk boundaries.
+        """
+        upload = await read_audio_upload(
+            f"multipart/form-data; boundary={BOUNDARY}",
+            None,
+            chunked(multipart_body(audio, language), chunk_size),
+            max_bytes=2000,
+        )
+        assert upload.audio.getvalue() == audio
+        assert upload.size == len(audio)
+        assert upload.content_type == "audio/webm"
+        assert upload.fields.get("language") == language
+
+    @given(st.binary(min_size=1, max_size=500), st.integers(min_value=1, max_value=100))
+    @settings(max_examples=100)
+    async def test_size_cap_is_exact(self, audio: bytes, max_bytes: int):
+        """
+        Feature: elevenlabs-voice-coach, Property 26: Bounded Audio Uploads
+
+        Raw audio up to max_bytes is accepted; one byte more is a 413, even
+        without a Content-Length header.
+        """
+        if len(audio) <= max_bytes:
+            upload = await read_audio_upload("audio/wav", None, chunked(audio, 7), max_bytes)
+            assert upload.audio.getvalue() == audio
+        else:
+            with pytest.raises(UploadError) as error:
+                await read_audio_upload("audio/wav", None, chunked(audio, 7), max_bytes)
+            assert error.value.status_code == 413
+
+    async def test_oversized_upload_rejected_before_reading(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 26: Bounded Audio Uploads
+
+        A Content-Length over the cap is rejected without touching the body.
+        """
+        async def never_read():
+            raise AssertionError("body was read")
+            yield b""
+
+        with pytest.raises(UploadError) as error:
+            await read_audio_upload("audio/wav", str(11 * 1024 * 1024), never_read(), 10 * 1024 * 1024)
+        assert error.value.status_code == 413
+
+    async def test_raw_and_multipart_endpoint(self, client, fake_stt):
+        """
+        Feature: elevenlabs-voice-coach, Property 26: Bounded Audio Uploads
+
+        Raw bodies take the language from the query string, multipart
+        bodies from the "language" field; both reach ElevenLabs unchanged.
+        """
+        async with client:
+            raw = await client.post(
+                "/elevenlabs/stt/upload?language=de",
+                content=b"RIFF-raw-audio",
+                headers={"Content-Type": "audio/wav"},
+            )
+            form = await client.post(
+                "/elevenlabs/stt/upload",
+                files={"audio": ("clip.webm", b"webm-audio", "audio/webm")},
+                data={"language": "es"},
+            )
+
+        assert raw.status_code == form.status_code == 200
+        assert raw.json() == {"transcript": "play uptown funk", "confidence": 0.97, "language": "de"}
+        assert form.json()["language"] == "es"
+        assert fake_stt == [(b"RIFF-raw-audio", "de"), (b"webm-audio", "es")]
+
+    async def test_endpoint_rejects_bad_uploads(self, client, fake_stt, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 26: Bounded Audio Uploads
+
+        Oversized, empty, wrongly typed and wrong-language uploads never
+        reach ElevenLabs.
+        """
+        monkeypatch.setattr(elevenlabs, "MAX_AUDIO_SIZE_BYTES", 1024)
+        async with client:
+            too_large = await client.post(
+                "/elevenlabs/stt/upload", content=b"x" * 1025, headers={"Content-Type": "audio/wav"}
+            )
+            empty = await client.post("/elevenlabs/stt/upload", content=b"", headers={"Content-Type": "audio/wav"})
+            as_json = await client.post("/elevenlabs/stt/upload", json={"audio": "abc"})
+            missing = await client.post("/elevenlabs/stt/upload", files={"other": ("a.txt", b"abc")})
+            bad_language = await client.post(
+                "/elevenlabs/stt/upload?language=fr", content=b"audio", headers={"Content-Type": "audio/wav"}
+            )
+
+        assert too_large.status_code == 413
+        assert empty.status_code == 400
+        assert as_json.status_code == 415
+        assert missing.status_code == 400
+        assert bad_language.status_code == 400
+        assert fake_stt == []
+
+    async def test_peak_memory_below_json_path(self, fake_stt):
+        """
+        Feature: elevenlabs-voice-coach, Property 26: Bounded Audio Uploads
+
+        Uploading a 4 MB recording as multipart allocates less than half of
+        what the base64 JSON endpoint does.
+        """
+        audio = bytes(range(256)) * (4 * 1024 * 1024 // 256)
+        json_chunks = split(json.dumps({"audio": base64.b64encode(audio).decode(), "language": "en"}).encode())
+        multipart_chunks = split(multipart_body(audio, "en"))
+
+        peaks = {}
+        for path, chunks, content_type in (
+            ("/elevenlabs/stt", json_chunks, "application/json"),
+            ("/elevenlabs/stt/upload", multipart_chunks, f"multipart/form-data; boundary={BOUNDARY}"),
+        ):
+            tracemalloc.start()
+            status = await asgi_post(path, chunks, content_type)
+            _, peaks[path] = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert status == 200
+
+        logger.info(
+            "4 MB upload peak: json/base64 %.1f MiB, multipart %.1f MiB",
+            peaks["/elevenlabs/stt"] / 2**20, peaks["/elevenlabs/stt/upload"] / 2**20,
+        )
+        assert fake_stt[0][0] == fake_stt[1][0] == audio
+        assert peaks["/elevenlabs/stt/upload"] < peaks["/elevenlabs/stt"] / 2
@@ -0,0 +1,205 @@
+"""
+Property-based tests for the shared Gemini client.
+
+Feature: elevenlabs-voice-coach
+Property 22: Gemini Client Reuse
+Validates: Requirements 4.1, 4.2
+"""
+
+import threading
+import time
+
+from hypothesis import given, strategies as st, settings
+
+from src.gemini_client import GeminiClient, get_gemini_client
+from src.upstream import UpstreamPool
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for vertexai GenerativeModel."""
+
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return FakeResponse(f"  tip for {prompt}  ")
+
+
+class FakeGeminiClient(GeminiClient):
+    """GeminiClient whose model creation is counted instead of calling Vertex AI."""
+
+    def __init__(
+        self,
+        model: FakeModel | None = None,
+        init_delay: float = 0.0,
+        init_error: Exception | None = None,
+        **kwargs
+    ):
+        kwargs.setdefault("project_id", "test-project")
+        super().__init__(**kwargs)
+        self.fake_model = model or FakeModel()
+        self.init_delay = init_delay
+        self.init_error = init_error
+        self.create_calls = 0
+
+    def _create_model(self):
+        self.create_calls += 1
+        if self.init_delay:
+            time.sleep(self.init_delay)
+        if self.init_error:
+            raise self.init_error
+        return self.fake_model
+
+
+class TestGeminiClientReuse:
+    """
+    Property 22: Gemini Client Reuse
+
+    For any number of requests, concurrent or sequential, the Gemini model
+    is created at most once per process and every request uses it.
+
+    Validates: Requirements 4.1, 4.2
+    """
+
+    @given(st.integers(min_value=1, max_value=20))
+    @settings(max_examples=20, deadline=None)
+    def test_sequential_requests_initialize_once(self, requests: int):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        Sequential generate() calls create the model once.
+        """
+        client = FakeGeminiClient()
+        for i in range(requests):
+            assert client.generate(f"prompt {i}") == f"tip for prompt {i}"
+
+        stats = client.stats()
+        assert client.create_calls == 1
+        assert stats["init_count"] == 1
+        assert stats["generate_count"] == requests
+        assert client.fake_model.calls == requests
+
+    @given(st.integers(min_value=2, max_value=16))
+    @settings(max_examples=10, deadline=None)
+    def test_concurrent_requests_initialize_once(self, threads: int):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        Concurrent first requests share one slow initialization.
+        """
+        client = FakeGeminiClient(init_delay=0.02, pool=UpstreamPool("test", threads))
+        barrier = threading.Barrier(threads)
+        results = []
+
+        def worker(i: int):
+            barrier.wait()
+            results.append(client.generate(f"p{i}"))
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for worker_thread in workers:
+            worker_thread.start()
+        for worker_thread in workers:
+            worker_thread.join()
+
+        assert client.create_calls == 1
+        assert sorted(results) == sorted(f"tip for p{i}" for i in range(threads))
+
+    def test_init_and_generation_timed_separately(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        Init time is recorded once; generation time per call.
+        """
+        client = FakeGeminiClient(model=FakeModel(delay=0.01), init_delay=0.05)
+        client.generate("a")
+        client.generate("b")
+
+        stats = client.stats()
+        assert stats["init_seconds"] >= 0.05
+        assert stats["generate_seconds"] >= 0.02
+        assert stats["last_generate_seconds"] is not None
+        assert stats["initialized"] is True
+
+    def test_failed_init_is_retried(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        A failed initialization returns None and the next call tries again.
+        """
+        client = FakeGeminiClient(init_error=RuntimeError("no credentials"))
+        assert client.generate("a") is None
+        assert client.stats()["init_failures"] == 1
+
+        client.init_error = None
+        assert client.generate("b") == "tip for b"
+        assert client.create_calls == 2
+        assert client.stats()["init_count"] == 1
+
+    def test_missing_project_returns_none(self, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        Without GOOGLE_CLOUD_PROJECT, no model is created.
+        """
+        monkeypatch.delenv("GOOGLE_CLOUD_PROJECT", raising=False)
+        client = FakeGeminiClient(project_id=None)
+        assert client.generate("a") is None
+        assert client.create_calls == 0
+
+    def test_generation_timeout_returns_none(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        A call slower than timeout_seconds is abandoned and counted.
+        """
+        client = FakeGeminiClient(model=FakeModel(delay=0.3), timeout_seconds=0.05)
+        start = time.perf_counter()
+        assert client.generate("slow") is None
+        assert time.perf_counter() - start < 0.25
+
+        stats = client.stats()
+        assert stats["generate_timeouts"] == 1
+        assert stats["generate_failures"] == 0
+
+    def test_generation_error_returns_none(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        API errors fall back to None and are counted.
+        """
+        client = FakeGeminiClient(model=FakeModel(error=ValueError("quota")))
+        assert client.generate("a") is None
+        assert client.stats()["generate_failures"] == 1
+
+    def test_configuration_from_environment(self, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        GEMINI_MODEL and GEMINI_TIMEOUT_SECONDS configure the client.
+        """
+        monkeypatch.setenv("GEMINI_MODEL", "gemini-test-model")
+        monkeypatch.setenv("GEMINI_TIMEOUT_SECONDS", "2.5")
+        client = GeminiClient(project_id="test-project")
+        assert client.model_name == "gemini-test-model"
+        assert client.timeout_seconds == 2.5
+        assert not client.initialized
+
+    def test_global_client_is_shared(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 22: Gemini Client Reuse
+
+        get_gemini_client() returns the same instance every time.
+        """
+        assert get_gemini_client() is get_gemini_client()
@@ -0,0 +1,256 @@
+"""
+Property-based tests for request and upstream metrics.
+
+Feature: elevenlabs-voice-coach
+Property 27: Request Metrics
+Validates: Requirements 1.6
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+
+import httpx
+import pytest
+from hypothesis import given, strategies as st, settings
+
+import src.gemini_client as gemini_client
+import src.middleware.rate_limit_backend as rate_limit_backend
+from main import app
+from src.metrics import CONTENT_TYPE, Histogram, MetricsMiddleware, MetricsRegistry
+from src.middleware.rate_limit_backend import InMemoryBackend
+from src.middleware.rate_limiter import RateLimiter, get_rate_limiter
+from src.tip_cache import get_tip_cache
+from src.upstream import UpstreamPool
+from tests.test_gemini_client_property import FakeGeminiClient, FakeModel
+
+logger = logging.getLogger(__name__)
+
+LINE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+COACHING_TIP = {"score": 72, "weakPoints": ["arms"], "strongPoints": ["legs"]}
+
+
+def parse(text: str) -> list[tuple[str, dict[str, str], float]]:
+    """Samples of a Prometheus text exposition (comments skipped)."""
+    samples = []
+    # Only \n separates lines in the format (splitlines() also splits on \x1e etc.)
+    for line in text.split("\n"):
+        if not line or line.startswith("#"):
+            continue
+        match = LINE.match(line)
+        assert match, f"malformed line: {line!r}"
+        labels = dict(LABEL.findall(match["labels"] or ""))
+        value = math.inf if match["value"] == "+Inf" else float(match["value"])
+        samples.append((match["name"], labels, value))
+    return samples
+
+
+def sample(text: str, name: str, **labels: str) -> float:
+    """Value of the sample with this name and (at least) these labels, 0 if absent."""
+    for sample_name, sample_labels, value in parse(text):
+        if sample_name == name and labels.items() <= sample_labels.items():
+            return value
+    return 0
+
+
+@pytest.fixture
+def client():
+    get_rate_limiter().reset_all()
+    get_tip_cache().clear()
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _drive(asgi_app, requests: int) -> float:
+    """Seconds to serve requests through asgi_app without a server."""
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await asgi_app(dict(scope), receive, send)
+    return time.perf_counter() - started
+
+
+class TestRequestMetrics:
+    """
+    Property 27: Request Metrics
+
+    For any request, one latency observation is recorded under its route
+    template, method and status; upstream calls, fallbacks and rate-limit
+    denials show up on /metrics in Prometheus text format.
+
+    Validates: Requirements 1.6
+    """
+
+    @given(st.lists(st.floats(min_value=0, max_value=60, allow_nan=False), max_size=50))
+    @settings(max_examples=100)
+    def test_histogram_buckets_are_cumulative(self, observations: list[float]):
+        """
+        Feature: elevenlabs-voice-coach, Property 27: Request Metrics
+
+        Bucket counts never decrease, each counts the observations at or
+        below its bound, and +Inf equals the count.
+        """
+        histogram = Histogram("test_seconds", "Test.", ("route",))
+        for value in observations:
+            histogram.observe(value, "/x")
+
+        samples = parse("\n".join(histogram.render()))
+        buckets = [(labels["le"], value) for name, labels, value in samples if name == "test_seconds_bucket"]
+        counts = [count for _, count in buckets]
+
+        if observations:
+            assert counts == sorted(counts)
+            for bound, count in buckets:
+                assert count == sum(1 for value in observations if value <= float(bound))
+            assert sample("\n".join(histogram.render()), "test_seconds_count") == len(observations)
+            assert sample("\n".join(histogram.render()), "test_seconds_sum") == pytest.approx(sum(observations))
+        else:
+            assert buckets == []
+
+    @given(st.text(max_size=30))
+    @settings(max_examples=100)
+    def test_label_values_are_escaped(self, label_value: str):
+        """
+        Feature: elevenlabs-voice-coach, Property 27: Request Metrics
+
+        Any label value renders on one line and parses back unchanged.
+        """
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test.", ("kind",)).inc(label_value)
+
+        text = registry.render()
+        lines = [line for line in text.split("\n") if line and not line.startswith("#")]
+
+        assert len(lines) == 1
+        escaped = parse(text)[0][1]["kind"]
+        unescaped = re.sub(r'\\(.)', lambda m: "\n" if m[1] == "n" else m[1], escaped)
+        assert unescaped == label_value
+
+    async def test_requests_recorded_by_route_template(self, client):
+        """
+        Feature: elevenlabs-voice-coach, Property 27: Request Metrics
+
+        Each request adds exactly one observation under its route template
+        and status; unknown paths share one label.
+        """
+        async with client:
+            before = (await client.get("/metrics")).text
+            for _ in range(3):
+                await client.get("/health")
+            await client.get("/no/such/path")
+            await client.post("/gemini/coaching-tip", json={})
+            response = await client.get("/metrics")
+
+        after = response.text
+        assert response.headers["content-type"] == CONTENT_TYPE
+        name = "bachatabro_http_request_duration_seconds_count"
+        for labels, added in [
+            ({"route": "/health", "method": "GET", "status": "200"}, 3),
+            ({"route": "<unmatched>", "method": "GET", "status": "404"}, 1),
+            ({"route": "/gemini/coaching-tip", "method": "POST", "status": "422"}, 1),
+        ]:
+            assert sample(after, name, **labels) - sample(before, name, **labels) == added
+        assert "/no/such/path" not in after
+
+    async def test_upstream_failures_and_fallbacks_recorded(self, client, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 27: Request Metrics
+
+        A failing Gemini call is timed as an error and the fallback tip
+        it causes is counted.
+        """
+        fake = FakeGeminiClient(
+            model=FakeModel(error=RuntimeError("quota exceeded")),
+            pool=UpstreamPool("gemini-metrics-test", 2),
+        )
+        monkeypatch.setattr(gemini_client, "_gemini_client", fake)
+
+        async with client:
+            before = (await client.get("/metrics")).text
+            tip = await client.post("/gemini/coaching-tip", json=COACHING_TIP)
+            after = (await client.get("/metrics")).text
+
+        assert tip.headers["X-Cache"] == "FALLBACK"
+        upstream = {"upstream": "gemini-metrics-test", "operation": "generate", "outcome": "error"}
+        assert sample(after, "bachatabro_upstream_call_duration_seconds_count", **upstream) == 1
+        fallbacks = "bachatabro_fallbacks_total"
+        assert sample(after, fallbacks, kind="coaching_tip") - sample(before, fallbacks, kind="coaching_tip") == 1
+        lookups = "bachatabro_cache_lookups_total"
+        assert sample(after, lookups, cache="tip", result="miss") - sample(before, lookups, cache="tip", result="miss") == 1
+
+    async def test_rate_limit_denials_recorded(self, client, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 27: Request Metrics
+
+        Every 429 from the rate limiter is counted as a denial.
+        """
+        backend = InMemoryBackend(RateLimiter(requests_per_minute=2))
+        monkeypatch.setattr(rate_limit_backend, "_rate_limit_backend", backend)
+
+        async with client:
+            statuses = [
+                (await client.post("/gemini/coaching-tip", json={}, headers={"X-Forwarded-For": "10.7.7.7"})).status_code
+                for _ in range(4)
+            ]
+            for _ in range(4):
+                await client.post("/elevenlabs/stt/upload", content=b"x", headers={"X-Forwarded-For": "10.7.7.7"})
+            text = (await client.get("/metrics")).text
+
+        # Body validation runs before the handler, so these never reach the limiter
+        assert statuses == [422] * 4
+        assert sample(text, "bachatabro_rate_limit_checks_total", backend="memory") == 4
+        assert sample(text, "bachatabro_rate_limit_denied_total", backend="memory") == 2
+        assert sample(
+            text, "bachatabro_http_request_duration_seconds_count", route="/elevenlabs/stt/upload", status="429"
+        ) >= 2
+
+    async def test_middleware_overhead_is_negligible(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 27: Request Metrics
+
+        Recording a request costs a few microseconds, far below the
+        latency of any real endpoint.
+        """
+        requests = 20_000
+        histogram = Histogram("overhead_seconds", "Test.", ("route", "method", "status"))
+        wrapped = MetricsMiddleware(_noop_app, histogram=histogram)
+
+        # Best of a few rounds to keep scheduler noise out of the comparison
+        plain = min([await _drive(_noop_app, requests) for _ in range(3)])
+        measured = min([await _drive(wrapped, requests) for _ in range(3)])
+        overhead = (measured - plain) / requests
+
+        logger.info("metrics middleware overhead: %.2f us/request", overhead * 1e6)
+        assert sample("\n".join(histogram.render()), "overhead_seconds_count") == requests * 3
+        assert overhead < 20e-6
+
+    async def test_concurrent_observations_are_not_lost(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 27: Request Metrics
+
+        Observations from concurrent worker threads are all counted.
+        """
+        histogram = Histogram("threaded_seconds", "Test.", ("upstream",))
+        pool = UpstreamPool("metrics-threads", 8)
+
+        await asyncio.gather(*[
+            pool.run(lambda: [histogram.observe(0.01, "x") for _ in range(500)]) for _ in range(16)
+        ])
+
+        assert sample("\n".join(histogram.render()), "threaded_seconds_count") == 8000
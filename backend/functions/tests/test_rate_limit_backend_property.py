@@ -0,0 +1,372 @@
+"""
+Property-based tests for shared rate limit backends.
+
+Feature: elevenlabs-voice-coach
+Property 2: Rate Limiting Enforcement
+Validates: Requirements 1.4
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+
+import httpx
+import pytest
+from hypothesis import given, strategies as st, settings
+
+import src.middleware.rate_limit_backend as rate_limit_backend
+from main import app
+from src.middleware.rate_limit_backend import (
+    SLIDING_WINDOW_SCRIPT,
+    SLIDING_WINDOW_SHA,
+    InMemoryBackend,
+    RateLimitBackend,
+    RedisBackend,
+)
+from src.middleware.rate_limiter import RateLimiter
+from src.middleware.redis_client import RedisClient, RedisError, encode_command, read_reply
+
+logger = logging.getLogger(__name__)
+
+
+class StandInRedis:
+    """
+    Local RESP server standing in for Redis.
+
+    Runs the sliding-window script's logic in Python when it is called by
+    SHA (after EVAL has "loaded" it), so tests exercise the real client,
+    wire protocol and NOSCRIPT handling without a Redis install.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.scripts: set[str] = set()
+        self.zsets: dict[bytes, list[tuple[float, bytes]]] = {}
+        self.commands: list[bytes] = []
+        self.server = None
+        self.writers = set()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def start(self) -> "StandInRedis":
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self
+
+    async def stop(self) -> None:
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        await self.server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        self.writers.add(writer)
+        try:
+            while True:
+                try:
+                    command = await read_reply(reader)
+                except (Exception, asyncio.CancelledError):
+                    break
+                self.commands.append(command[0].upper())
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(self._reply(command))
+                await writer.drain()
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    def _reply(self, command: list[bytes]) -> bytes:
+        name = command[0].upper()
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"EXEC":
+            # Transaction whose second command failed: the error is an array element
+            return b"*3\r\n+OK\r\n-WRONGTYPE Operation against a key holding the wrong kind of value\r\n:3\r\n"
+        if name == b"EVAL":
+            sha = hashlib.sha1(command[1]).hexdigest()
+            self.scripts.add(sha)
+        elif name == b"EVALSHA":
+            sha = command[1].decode()
+            if sha not in self.scripts:
+                return b"-NOSCRIPT No matching script. Please use EVAL.\r\n"
+        else:
+            return b"-ERR unknown command\r\n"
+        if sha != SLIDING_WINDOW_SHA:
+            return b"-ERR unexpected script\r\n"
+        key, window, limit, member = command[3], float(command[4]), int(command[5]), command[6]
+        return self._sliding_window(key, window, limit, member)
+
+    def _sliding_window(self, key: bytes, window: float, limit: int, member: bytes) -> bytes:
+        now = time.time()
+        entries = [entry for entry in self.zsets.get(key, []) if entry[0] > now - window]
+        self.zsets[key] = entries
+        count = len(entries)
+        reset = entries[0][0] + window if entries else now + window
+        allowed = count < limit
+        if allowed:
+            entries.append((now, member))
+        reset_bulk, now_bulk = (str(value).encode() for value in (reset, now))
+        return b"*4\r\n:%d\r\n:%d\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n" % (
+            allowed, count, len(reset_bulk), reset_bulk, len(now_bulk), now_bulk
+        )
+
+
+@pytest.fixture
+async def redis_server():
+    server = await StandInRedis().start()
+    yield server
+    await server.stop()
+
+
+resp_arg = st.one_of(st.binary(max_size=50), st.text(max_size=20), st.integers(min_value=-10**12, max_value=10**12))
+
+
+class TestSharedRateLimiting:
+    """
+    Property 2: Rate Limiting Enforcement
+
+    For any number of instances sharing a backend, a client's requests are
+    limited once across all of them, and backend failures follow the
+    configured fail-open / fail-closed policy.
+
+    Validates: Requirements 1.4
+    """
+
+    @given(st.lists(resp_arg, min_size=1, max_size=8))
+    @settings(max_examples=100)
+    async def test_resp_encoding_round_trips(self, args: list):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        Any command encodes to a RESP array that parses back to its arguments.
+        """
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_command(*args))
+        reader.feed_eof()
+
+        parsed = await read_reply(reader)
+
+        expected = [arg if isinstance(arg, bytes) else str(arg).encode() for arg in args]
+        assert parsed == expected
+
+    async def test_instances_share_one_limit(self, redis_server):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        Three instances on one Redis allow the limit in total; three
+        in-memory instances allow it three times over.
+        """
+        shared = [RedisBackend(url=redis_server.url, requests_per_minute=5, timeout_seconds=1) for _ in range(3)]
+        local = [InMemoryBackend(RateLimiter(requests_per_minute=5)) for _ in range(3)]
+
+        shared_allowed = [(await shared[i % 3].check("10.0.0.1")).allowed for i in range(15)]
+        local_allowed = [(await local[i % 3].check("10.0.0.1")).allowed for i in range(15)]
+
+        assert sum(shared_allowed) == 5
+        assert shared_allowed[:5] == [True] * 5
+        assert sum(local_allowed) == 15
+
+        rejected = await shared[0].check("10.0.0.1")
+        assert rejected.retry_after >= 1
+        assert (await shared[1].check("10.0.0.2")).allowed
+
+    async def test_one_round_trip_per_check(self, redis_server):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        After the script is cached, each check is a single EVALSHA on a
+        reused connection.
+        """
+        backend = RedisBackend(url=redis_server.url, requests_per_minute=100, timeout_seconds=1)
+        await backend.check("warm-up")
+        assert redis_server.commands == [b"EVALSHA", b"EVAL"]
+
+        redis_server.commands.clear()
+        for i in range(20):
+            result = await backend.check("client")
+            assert result.remaining == 100 - i - 1
+
+        assert redis_server.commands == [b"EVALSHA"] * 20
+        stats = backend.stats()
+        assert stats["script_loads"] == 1
+        assert stats["connections_opened"] == 1
+
+    @pytest.mark.parametrize("fail_open", [True, False])
+    async def test_unreachable_backend_follows_policy(self, redis_server, fail_open):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        With the store down, checks are allowed (fail open) or rejected
+        with a retry hint (fail closed), and counted as errors.
+        """
+        url = redis_server.url
+        await redis_server.stop()
+        backend = RedisBackend(url=url, timeout_seconds=0.5, fail_open=fail_open)
+
+        result = await backend.check("client")
+
+        assert result.allowed is fail_open
+        if not fail_open:
+            assert result.retry_after == 1
+        stats = backend.stats()
+        assert stats["errors"] == 1
+        assert stats["failed_open" if fail_open else "failed_closed"] == 1
+
+    async def test_slow_backend_times_out_within_budget(self, redis_server):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        A store slower than the timeout costs at most the timeout, and the
+        connection it was using is not reused.
+        """
+        redis_server.delay = 0.3
+        backend = RedisBackend(url=redis_server.url, timeout_seconds=0.05, fail_open=True)
+
+        start = time.perf_counter()
+        result = await backend.check("client")
+        elapsed = time.perf_counter() - start
+
+        assert result.allowed
+        assert elapsed < 0.2
+        assert backend.stats()["check_seconds_max"] < 0.2
+        assert backend.client._idle == []
+
+    async def test_error_replies_keep_connection(self, redis_server):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        An error reply raises RedisError and leaves the connection usable.
+        """
+        client = RedisClient(redis_server.url)
+        with pytest.raises(RedisError):
+            await client.execute("NOPE")
+        assert await client.execute("PING") == "PONG"
+        assert client.connections_opened == 1
+        await client.close()
+
+    async def test_error_inside_array_keeps_connection_in_sync(self, redis_server):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        An error element inside an array reply raises RedisError only after
+        the rest of the array is read, so the next reply on the reused
+        connection is its own.
+        """
+        client = RedisClient(redis_server.url)
+        with pytest.raises(RedisError, match="WRONGTYPE"):
+            await client.execute("EXEC")
+        assert await client.execute("PING") == "PONG"
+        assert client.connections_opened == 1
+        await client.close()
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"*2\r\n*2\r\n-ERR first\r\n$1\r\na\r\n-ERR second\r\n:7\r\n")
+        reader.feed_eof()
+        with pytest.raises(RedisError, match="first"):
+            await read_reply(reader)
+        assert await read_reply(reader) == 7
+
+    async def test_check_latency_is_instrumented(self, redis_server):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        Both backends report mean and max check latency.
+        """
+        memory = InMemoryBackend(RateLimiter(requests_per_minute=10_000))
+        redis = RedisBackend(url=redis_server.url, requests_per_minute=10_000, timeout_seconds=1)
+        for i in range(200):
+            await memory.check(f"10.0.{i % 50}.1")
+            await redis.check(f"10.0.{i % 50}.1")
+
+        memory_stats, redis_stats = memory.stats(), redis.stats()
+        logger.info(
+            "check latency: memory %.1f us, redis stand-in %.1f us",
+            memory_stats["check_seconds_avg"] * 1e6, redis_stats["check_seconds_avg"] * 1e6,
+        )
+        assert memory_stats["checks"] == redis_stats["checks"] == 200
+        assert 0 < memory_stats["check_seconds_avg"] <= memory_stats["check_seconds_max"]
+        assert 0 < redis_stats["check_seconds_avg"] <= redis_stats["check_seconds_max"]
+
+    def test_backends_must_implement_check(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        The base class is abstract: a backend without _check can't be created.
+        """
+        class Incomplete(RateLimitBackend):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            RateLimitBackend(requests_per_minute=10)
+        with pytest.raises(TypeError):
+            Incomplete(requests_per_minute=10)
+
+    async def test_endpoints_use_configured_backend(self, redis_server, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        With the redis backend configured, endpoints return 429 once the
+        shared limit is reached and /health reports the backend.
+        """
+        backend = RedisBackend(url=redis_server.url, requests_per_minute=2, timeout_seconds=1)
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+        monkeypatch.setattr(rate_limit_backend, "_rate_limit_backend", backend)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = [
+                (await client.post("/elevenlabs/stt/upload", json={}, headers={"X-Forwarded-For": "10.9.9.9"})).status_code
+                for _ in range(3)
+            ]
+            health = await client.get("/health")
+
+        # The first two pass the rate limit and fail on content type
+        assert statuses == [415, 415, 429]
+        assert health.json()["rate_limiter"]["backend"] == "redis"
+
+
+@pytest.mark.skipif(not os.getenv("REDIS_URL"), reason="REDIS_URL not set")
+class TestRedisServer:
+    """
+    Property 2: Rate Limiting Enforcement
+
+    The sliding-window Lua script against a real Redis (REDIS_URL).
+
+    Validates: Requirements 1.4
+    """
+
+    async def test_sliding_window_script(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        The script returns {allowed, count, reset, now} as the backend
+        parses it, and instances sharing the server share one limit.
+        """
+        prefix = f"test:ratelimit:{uuid.uuid4().hex}:"
+        backends = [
+            RedisBackend(url=os.environ["REDIS_URL"], requests_per_minute=3, timeout_seconds=1, key_prefix=prefix)
+            for _ in range(2)
+        ]
+        try:
+            reply = await backends[0].client.execute("EVAL", SLIDING_WINDOW_SCRIPT, 1, prefix + "raw", 60, 3, "m1")
+            assert reply[:2] == [1, 0]
+            reset_time, now = float(reply[2]), float(reply[3])
+            assert now <= reset_time <= now + 60
+            assert abs(now - time.time()) < 60
+
+            results = [await backends[i % 2].check("client") for i in range(4)]
+
+            assert [result.allowed for result in results] == [True, True, True, False]
+            assert [result.remaining for result in results[:3]] == [2, 1, 0]
+            assert 1 <= results[3].retry_after <= 61
+            assert (await backends[1].check("other")).allowed
+        finally:
+            await backends[0].client.execute("DEL", prefix + "raw", prefix + "client", prefix + "other")
+            for backend in backends:
+                await backend.client.close()
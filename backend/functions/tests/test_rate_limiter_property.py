@@ -0,0 +1,163 @@
+"""
+Property-based tests for the rate limiter.
+
+Feature: elevenlabs-voice-coach
+Property 2: Rate Limiting Enforcement
+Validates: Requirements 1.4
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hypothesis import given, strategies as st, settings
+
+from src.middleware.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DISTINCT_IPS = 12_000
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def ip(i: int) -> str:
+    return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+class TestRateLimitingEnforcement:
+    """
+    Property 2: Rate Limiting Enforcement
+
+    For any sequence of requests from a single client, no more than the
+    limit are allowed within any window, and the limiter's memory stays
+    bounded however many clients it sees.
+
+    Validates: Requirements 1.4
+    """
+
+    @given(
+        st.integers(min_value=1, max_value=8),
+        st.lists(st.floats(min_value=0, max_value=5, allow_nan=False), min_size=1, max_size=80),
+    )
+    @settings(max_examples=100)
+    def test_matches_reference_sliding_window(self, limit: int, gaps: list[float]):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        Decisions, remaining counts and reset times match a direct
+        recomputation over all allowed timestamps.
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=limit, window_seconds=10, clock=clock)
+        allowed: list[float] = []
+
+        for gap in gaps:
+            clock.now += gap
+            in_window = [ts for ts in allowed if ts > clock.now - 10]
+            result = limiter.check("client")
+
+            assert result.allowed == (len(in_window) < limit)
+            if result.allowed:
+                allowed.append(clock.now)
+                assert result.remaining == limit - len(in_window) - 1
+            else:
+                assert result.retry_after >= 1
+            expected_reset = min(in_window) + 10 if in_window else clock.now + 10
+            assert result.reset_time == expected_reset
+
+    @given(st.integers(min_value=1, max_value=50), st.integers(min_value=1, max_value=8))
+    @settings(max_examples=50)
+    def test_tracked_clients_never_exceed_cap(self, max_clients: int, shards: int):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        However many distinct clients arrive, at most max_clients are tracked.
+        """
+        limiter = RateLimiter(requests_per_minute=5, max_clients=max_clients, shards=shards)
+        for i in range(max_clients * 4):
+            limiter.check(ip(i))
+            assert limiter.stats()["clients"] <= max_clients
+
+    def test_idle_clients_are_evicted(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        Clients with no requests left in the window are dropped as new
+        clients arrive, and all at once by evict_idle().
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=5, window_seconds=60, shards=1, clock=clock)
+        for i in range(100):
+            limiter.check(ip(i))
+
+        clock.now += 61
+        for i in range(100, 110):
+            limiter.check(ip(i))
+        stats = limiter.stats()
+        assert stats["idle_evictions"] == 20
+        assert stats["clients"] == 90
+
+        assert limiter.evict_idle() == 80
+        assert limiter.stats()["clients"] == 10
+
+    def test_concurrent_checks_respect_limit(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        Threads hammering one client never get more than the limit through.
+        """
+        limiter = RateLimiter(requests_per_minute=500, window_seconds=60)
+
+        def hammer(_):
+            return sum(limiter.check("shared").allowed for _ in range(200))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            allowed = sum(pool.map(hammer, range(8)))
+
+        assert allowed == 500
+        assert limiter.stats()["rejected"] == 8 * 200 - 500
+
+    def test_benchmark_distinct_ips(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 2: Rate Limiting Enforcement
+
+        12k distinct IPs with a cap of 5k tracked clients: memory stays at
+        the cap, and a check costs the same whether a client has 10 or
+        10,000 requests in its window.
+        """
+        limiter = RateLimiter(requests_per_minute=100, max_clients=5_000)
+        checks = 0
+        start = time.perf_counter()
+        for _ in range(3):
+            for i in range(DISTINCT_IPS):
+                limiter.check(ip(i))
+                checks += 1
+        elapsed = time.perf_counter() - start
+        stats = limiter.stats()
+
+        def per_check_seconds(limit: int) -> float:
+            heavy = RateLimiter(requests_per_minute=limit)
+            for _ in range(limit):
+                heavy.check("heavy")
+            start = time.perf_counter()
+            for _ in range(2_000):
+                heavy.check("heavy")
+            return (time.perf_counter() - start) / 2_000
+
+        light, full = per_check_seconds(10), per_check_seconds(10_000)
+        logger.info(
+            "%d checks over %d IPs: %.0f checks/s, %d clients tracked, %d forced evictions; "
+            "per check at 10 vs 10,000 in window: %.2f vs %.2f us",
+            checks, DISTINCT_IPS, checks / elapsed, stats["clients"], stats["forced_evictions"],
+            light * 1e6, full * 1e6,
+        )
+        assert stats["clients"] <= 5_000
+        assert stats["checks"] == checks
+        assert full < light * 5
@@ -0,0 +1,226 @@
+"""
+Property-based tests for coalescing of identical in-flight requests.
+
+Feature: elevenlabs-voice-coach
+Property 24: Request Coalescing
+Validates: Requirements 1.1, 4.1, 15.4
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from hypothesis import given, strategies as st, settings
+
+import src.elevenlabs as elevenlabs
+import src.gemini as gemini
+from main import app
+from src.middleware.rate_limiter import get_rate_limiter
+from src.single_flight import SingleFlight
+from src.tts_cache import get_tts_cache
+
+BURST = 10
+
+REVIEW = {"songTitle": "Obsesión", "songArtist": "Aventura", "finalScore": 84}
+
+
+@pytest.fixture
+def client():
+    get_rate_limiter().reset_all()
+    get_tts_cache().clear()
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+class TestRequestCoalescing:
+    """
+    Property 24: Request Coalescing
+
+    For any burst of concurrent identical requests, exactly one upstream
+    call should be made and every request should receive its result or
+    error; cancelling some requests should not cancel the call for the others.
+
+    Validates: Requirements 1.1, 4.1, 15.4
+    """
+
+    @given(st.integers(min_value=1, max_value=30))
+    @settings(max_examples=20, deadline=None)
+    def test_concurrent_callers_share_one_execution(self, callers: int):
+        """
+        Feature: elevenlabs-voice-coach, Property 24: Request Coalescing
+
+        N concurrent calls with the same key run fn once and all get its result.
+        """
+        async def burst():
+            group = SingleFlight("test")
+            executions = []
+
+            async def fetch():
+                executions.append(1)
+                await asyncio.sleep(0.01)
+                return object()
+
+            results = await asyncio.gather(*(group.do("key", fetch) for _ in range(callers)))
+            return group, executions, results
+
+        group, executions, results = asyncio.run(burst())
+
+        assert len(executions) == 1
+        assert all(result is results[0] for result in results)
+        stats = group.stats()
+        assert stats["calls"] == callers
+        assert stats["coalesced"] == callers - 1
+        assert stats["in_flight"] == 0
+
+    async def test_different_keys_are_not_coalesced(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 24: Request Coalescing
+
+        Calls with different keys each run their own fn.
+        """
+        group = SingleFlight("test")
+
+        async def fetch(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(*(group.do(f"key{i}", lambda i=i: fetch(i)) for i in range(5)))
+
+        assert results == list(range(5))
+        assert group.stats()["executions"] == 5
+
+    async def test_error_reaches_every_waiter_and_next_call_retries(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 24: Request Coalescing
+
+        An exception is raised in every waiter, and the key is released so
+        the next call runs fn again.
+        """
+        group = SingleFlight("test")
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            if len(attempts) == 1:
+                raise ValueError("upstream down")
+            return "ok"
+
+        results = await asyncio.gather(*(group.do("key", flaky) for _ in range(4)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        assert await group.do("key", flaky) == "ok"
+        assert len(attempts) == 2
+        assert group.stats()["errors"] == 1
+
+    async def test_cancelled_waiter_does_not_cancel_the_call(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 24: Request Coalescing
+
+        Cancelling one waiter leaves the shared call running for the others.
+        """
+        group = SingleFlight("test")
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(group.do("key", fetch))
+        second = asyncio.create_task(group.do("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "done"
+        assert first.cancelled()
+        stats = group.stats()
+        assert stats["cancelled_waiters"] == 1
+        assert stats["abandoned"] == 0
+
+    async def test_call_is_cancelled_when_every_waiter_is_gone(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 24: Request Coalescing
+
+        Once all waiters are cancelled the call is cancelled, and a new
+        call for the key starts fresh instead of joining the cancelled one.
+        """
+        group = SingleFlight("test")
+        finished = []
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            finished.append(1)
+            return "done"
+
+        waiters = [asyncio.create_task(group.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert await group.do("key", fetch) == "done"
+        assert finished == [1]
+        stats = group.stats()
+        assert stats["abandoned"] == 1
+        assert stats["executions"] == 2
+
+    async def test_tts_burst_makes_one_elevenlabs_call(self, client, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 24: Request Coalescing
+
+        A burst of identical /elevenlabs/tts requests synthesizes once.
+        """
+        calls = []
+
+        def synthesize(api_key, voice_id, text, model_id):
+            calls.append(text)
+            time.sleep(0.1)
+            return b"mp3-bytes"
+
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+        monkeypatch.setattr(elevenlabs, "_synthesize", synthesize)
+
+        async with client:
+            responses = await asyncio.gather(*(
+                client.post(
+                    "/elevenlabs/tts",
+                    json={"text": "Great job, class!"},
+                    headers={"X-Forwarded-For": f"10.0.1.{i}"},
+                )
+                for i in range(BURST)
+            ))
+            health = await client.get("/elevenlabs/health")
+
+        assert all(response.status_code == 200 for response in responses)
+        assert len({response.json()["audio"] for response in responses}) == 1
+        assert calls == ["Great job, class!"]
+        assert health.json()["single_flight"]["elevenlabs-tts"]["coalesced"] >= BURST - 1
+
+    async def test_review_burst_makes_one_gemini_call(self, client, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 24: Request Coalescing
+
+        A burst of identical /gemini/performance-review requests calls Gemini once.
+        """
+        prompts = []
+
+        async def call_gemini(prompt):
+            prompts.append(prompt)
+            await asyncio.sleep(0.1)
+            return "Amazing session! Keep your frame strong. Ready for another round?"
+
+        monkeypatch.setattr(gemini, "_call_gemini", call_gemini)
+
+        async with client:
+            responses = await asyncio.gather(*(
+                client.post(
+                    "/gemini/performance-review",
+                    json=REVIEW,
+                    headers={"X-Forwarded-For": f"10.0.2.{i}"},
+                )
+                for i in range(BURST)
+            ))
+
+        assert all(response.status_code == 200 for response in responses)
+        assert len({response.json()["review"] for response in responses}) == 1
+        assert len(prompts) == 1
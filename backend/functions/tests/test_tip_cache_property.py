@@ -0,0 +1,260 @@
+"""
+Property-based tests for the coaching-tip cache.
+
+Feature: elevenlabs-voice-coach
+Property 20: Response Caching
+Validates: Requirements 4.1, 15.4
+"""
+
+import random
+import time
+
+import httpx
+from hypothesis import given, strategies as st, settings
+
+import src.gemini as gemini
+from main import app
+from src.middleware.rate_limiter import get_rate_limiter
+from src.tip_cache import TipCache, canonical_tip_key, get_tip_cache, score_bucket
+
+
+body_parts = st.lists(
+    st.sampled_from(["arms", "legs", "hips", "shoulders", "timing", "leftArm", "rightLeg"]),
+    max_size=4,
+    unique=True,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TipGenerator:
+    """Counts calls and returns numbered tips (or None when failing)."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self) -> str | None:
+        self.calls += 1
+        return None if self.fail else f"tip {self.calls}"
+
+
+def fallback() -> str:
+    return "fallback tip"
+
+
+class TestCoachingTipCaching:
+    """
+    Property 20: Response Caching
+
+    For any repeated coaching-tip request with the same canonical inputs
+    (score bucket, target body part, other points in any order, language),
+    a cached tip should be returned without calling Gemini within the TTL.
+
+    Validates: Requirements 4.1, 15.4
+    """
+
+    @given(
+        st.floats(min_value=0, max_value=100),
+        body_parts,
+        body_parts,
+        st.sampled_from(["en", "es", "de", "ru"]),
+        st.randoms(),
+    )
+    @settings(max_examples=100)
+    def test_key_ignores_point_order_within_bucket(self, score, weak, strong, language, rnd):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Shuffling the non-target points or moving the score within its
+        bucket doesn't change the key.
+        """
+        key = canonical_tip_key(score, weak, strong, language)
+        shuffled_weak = weak[:1] + rnd.sample(weak[1:], len(weak[1:]))
+        shuffled_strong = rnd.sample(strong, len(strong))
+        same_bucket = min(score_bucket(score) * 10 + rnd.random() * 9.99, 100.0)
+        if score_bucket(same_bucket) != score_bucket(score):
+            same_bucket = score
+
+        assert canonical_tip_key(same_bucket, shuffled_weak, shuffled_strong, language) == key
+
+    @given(body_parts.filter(lambda points: len(points) >= 2))
+    @settings(max_examples=50)
+    def test_key_depends_on_target_body_part(self, weak):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        The first weak point is the tip's target, so it's part of the key.
+        """
+        swapped = [weak[1], weak[0]] + weak[2:]
+        assert canonical_tip_key(50, weak, [], "en") != canonical_tip_key(50, swapped, [], "en")
+
+    async def test_hit_within_ttl_skips_generation(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        A second request within the TTL is served from the cache.
+        """
+        cache = TipCache(ttl_seconds=60, variants=1, clock=FakeClock())
+        generate = TipGenerator()
+
+        assert await cache.get_or_generate("k", generate, fallback) == ("tip 1", "miss")
+        assert await cache.get_or_generate("k", generate, fallback) == ("tip 1", "hit")
+        assert generate.calls == 1
+
+    async def test_variant_pool_fills_in_background(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Hits grow the pool to the configured number of variants, then stop
+        generating; every variant gets served.
+        """
+        cache = TipCache(ttl_seconds=60, variants=3, clock=FakeClock(), rng=random.Random(1))
+        generate = TipGenerator()
+
+        await cache.get_or_generate("k", generate, fallback)
+        served = set()
+        for _ in range(30):
+            tip, status = await cache.get_or_generate("k", generate, fallback)
+            assert status == "hit"
+            served.add(tip)
+            await cache.drain()
+
+        assert generate.calls == 3
+        assert served == {"tip 1", "tip 2", "tip 3"}
+
+    async def test_stale_while_revalidate(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        After the TTL, the old tip is returned at once and replaced in the background.
+        """
+        clock = FakeClock()
+        cache = TipCache(ttl_seconds=60, stale_seconds=600, variants=1, clock=clock)
+        generate = TipGenerator()
+
+        await cache.get_or_generate("k", generate, fallback)
+        clock.now += 61
+        assert await cache.get_or_generate("k", generate, fallback) == ("tip 1", "stale")
+        await cache.drain()
+        assert await cache.get_or_generate("k", generate, fallback) == ("tip 2", "hit")
+
+        clock.now += 61 + 601
+        assert await cache.get_or_generate("k", generate, fallback) == ("tip 3", "miss")
+
+    async def test_without_swr_expired_tips_regenerate_inline(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        With stale-while-revalidate off, an expired entry is a miss.
+        """
+        clock = FakeClock()
+        cache = TipCache(ttl_seconds=60, variants=1, stale_while_revalidate=False, clock=clock)
+        generate = TipGenerator()
+
+        await cache.get_or_generate("k", generate, fallback)
+        clock.now += 61
+        assert await cache.get_or_generate("k", generate, fallback) == ("tip 2", "miss")
+
+    async def test_fallback_cached_briefly(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        A failed generation caches the fallback for the short fallback TTL.
+        """
+        clock = FakeClock()
+        cache = TipCache(ttl_seconds=60, fallback_ttl_seconds=5, variants=1, clock=clock)
+        failing = TipGenerator(fail=True)
+
+        assert await cache.get_or_generate("k", failing, fallback) == ("fallback tip", "fallback")
+        assert await cache.get_or_generate("k", failing, fallback) == ("fallback tip", "fallback")
+        assert failing.calls == 1
+
+        clock.now += 6
+        working = TipGenerator()
+        assert await cache.get_or_generate("k", working, fallback) == ("tip 1", "miss")
+
+    async def test_failed_refresh_serves_stale_tip(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Without SWR, a failed regeneration returns the stale tip rather than the fallback.
+        """
+        clock = FakeClock()
+        cache = TipCache(ttl_seconds=60, stale_seconds=600, variants=1, stale_while_revalidate=False, clock=clock)
+        await cache.get_or_generate("k", TipGenerator(), fallback)
+
+        clock.now += 61
+        assert await cache.get_or_generate("k", TipGenerator(fail=True), fallback) == ("tip 1", "stale")
+
+    async def test_max_entries_evicts_least_recently_used(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        The cache holds at most max_entries keys.
+        """
+        cache = TipCache(ttl_seconds=60, variants=1, max_entries=2, clock=FakeClock())
+        for key in ["a", "b", "a", "c"]:
+            await cache.get_or_generate(key, TipGenerator(), fallback)
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+        assert (await cache.get_or_generate("a", TipGenerator(), fallback))[1] == "hit"
+
+    async def test_hit_is_sub_millisecond(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Cached lookups average well under a millisecond.
+        """
+        cache = TipCache(ttl_seconds=60, variants=1)
+        generate = TipGenerator()
+        await cache.get_or_generate("k", generate, fallback)
+
+        lookups = 2000
+        start = time.perf_counter()
+        for _ in range(lookups):
+            await cache.get_or_generate("k", generate, fallback)
+        assert (time.perf_counter() - start) / lookups < 0.001
+
+    async def test_endpoint_serves_repeated_tips_from_cache(self, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Equivalent /gemini/coaching-tip requests call Gemini once.
+        """
+        prompts = []
+
+        async def call_gemini(prompt: str) -> str:
+            prompts.append(prompt)
+            return "Lift your arms with the beat!"
+
+        monkeypatch.setattr(gemini, "_call_gemini", call_gemini)
+        get_rate_limiter().reset_all()
+        get_tip_cache().clear()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post(
+                "/gemini/coaching-tip",
+                json={"score": 62, "weakPoints": ["arms", "hips"], "strongPoints": ["legs", "timing"]},
+            )
+            second = await client.post(
+                "/gemini/coaching-tip",
+                json={"score": 68, "weakPoints": ["arms", "hips"], "strongPoints": ["timing", "legs"]},
+            )
+            await get_tip_cache().drain()
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert first.json() == second.json()
+        # The second request only triggers background growth of the variant pool
+        assert len(prompts) <= 2
+        assert get_tip_cache().stats()["hits"] == 1
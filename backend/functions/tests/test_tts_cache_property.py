@@ -0,0 +1,245 @@
+"""
+Property-based tests for the TTS audio cache.
+
+Feature: elevenlabs-voice-coach
+Property 20: Response Caching
+Validates: Requirements 15.4
+"""
+
+import threading
+
+import httpx
+from hypothesis import given, strategies as st, settings
+
+import src.elevenlabs as elevenlabs
+from main import app
+from src.middleware.rate_limiter import get_rate_limiter
+from src.tts_cache import TTSCache, cache_key, get_tts_cache, normalize_text
+
+
+phrase = st.text(
+    alphabet=st.characters(blacklist_categories=("Cs",)),
+    min_size=1,
+    max_size=80,
+).filter(lambda text: text.strip())
+
+
+class TestResponseCaching:
+    """
+    Property 20: Response Caching
+
+    For any repeated TTS request with identical normalized text, voice,
+    model and format, the cached audio should be returned without making a
+    new ElevenLabs call, and the cache should stay within its size limits.
+
+    Validates: Requirements 15.4
+    """
+
+    @given(phrase, st.sampled_from([" ", "  ", "\n", "\t "]))
+    @settings(max_examples=100)
+    def test_whitespace_variants_share_a_key(self, text: str, padding: str):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Leading, trailing and repeated whitespace doesn't change the key.
+        """
+        padded = padding + padding.join(text.split()) + padding
+        assert cache_key(padded, "voice", "model") == cache_key(text, "voice", "model")
+        assert normalize_text(padded) == normalize_text(text)
+
+    @given(phrase)
+    @settings(max_examples=50)
+    def test_key_depends_on_voice_model_and_format(self, text: str):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Changing voice, model or format gives a different key.
+        """
+        base = cache_key(text, "voice", "model", "mp3")
+        assert cache_key(text, "other-voice", "model", "mp3") != base
+        assert cache_key(text, "voice", "other-model", "mp3") != base
+        assert cache_key(text, "voice", "model", "pcm") != base
+
+    @given(st.lists(st.binary(min_size=1, max_size=300), min_size=1, max_size=60))
+    @settings(max_examples=50)
+    def test_memory_tier_stays_within_limit(self, entries: list[bytes]):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        The memory tier never exceeds max_memory_bytes and keeps the most
+        recently stored entry.
+        """
+        cache = TTSCache(max_memory_bytes=1000, disk_dir=None)
+        for i, audio in enumerate(entries):
+            cache.put(f"key{i}", audio)
+            assert cache.stats()["memory_bytes"] <= 1000
+
+        assert cache.get(f"key{len(entries) - 1}") == entries[-1]
+
+    def test_lru_keeps_recently_used_entries(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Reading an entry protects it from the next eviction.
+        """
+        cache = TTSCache(max_memory_bytes=300, disk_dir=None)
+        cache.put("a", b"a" * 100)
+        cache.put("b", b"b" * 100)
+        cache.put("c", b"c" * 100)
+        assert cache.get("a") is not None
+
+        cache.put("d", b"d" * 100)
+        assert cache.get("b") is None
+        assert cache.get("a") == b"a" * 100
+        assert cache.stats()["memory_evictions"] == 1
+
+    def test_disk_tier_survives_restart_and_evicts(self, tmp_path):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        A new cache on the same directory serves earlier entries from disk;
+        the disk tier is trimmed to max_disk_bytes, oldest first.
+        """
+        cache = TTSCache(max_memory_bytes=10_000, disk_dir=tmp_path, max_disk_bytes=250)
+        cache.put("a", b"a" * 100)
+        cache.put("b", b"b" * 100)
+
+        restarted = TTSCache(max_memory_bytes=10_000, disk_dir=tmp_path, max_disk_bytes=250)
+        assert restarted.get("a", characters=12) == b"a" * 100
+        stats = restarted.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["characters_saved"] == 12
+
+        restarted.put("c", b"c" * 100)
+        stats = restarted.stats()
+        assert stats["disk_bytes"] <= 250
+        assert stats["disk_evictions"] == 1
+        # "b" was the least recently used on disk
+        assert not list(tmp_path.glob("*/b.audio"))
+        assert list(tmp_path.glob("*/a.audio"))
+
+    async def test_async_disk_tier_runs_off_the_event_loop(self, tmp_path):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        get_async() and put_async() do disk-tier file I/O in a worker
+        thread and count hits and misses like get() and put().
+        """
+        loop_thread = threading.get_ident()
+        io_threads = []
+
+        def record_thread(method):
+            def wrapper(*args):
+                io_threads.append(threading.get_ident())
+                return method(*args)
+            return wrapper
+
+        cache = TTSCache(max_memory_bytes=10_000, disk_dir=tmp_path)
+        cache._write_disk = record_thread(cache._write_disk)
+        await cache.put_async("a", b"a" * 100)
+        assert list(tmp_path.glob("*/a.audio"))
+
+        restarted = TTSCache(max_memory_bytes=10_000, disk_dir=tmp_path)
+        restarted._read_disk = record_thread(restarted._read_disk)
+        assert await restarted.get_async("a", characters=5) == b"a" * 100
+        # Promoted to memory: the second hit does no I/O
+        assert await restarted.get_async("a") == b"a" * 100
+        assert await restarted.get_async("missing") is None
+
+        assert len(io_threads) == 2
+        assert loop_thread not in io_threads
+        stats = restarted.stats()
+        assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+        assert stats["characters_saved"] == 5
+
+    def test_oversized_audio_is_not_cached(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Audio above max_entry_bytes is skipped.
+        """
+        cache = TTSCache(max_memory_bytes=10_000, disk_dir=None, max_entry_bytes=50)
+        cache.put("big", b"x" * 51)
+        assert cache.get("big") is None
+        assert cache.stats()["skipped_too_large"] == 1
+
+    def test_empty_audio_is_not_cached(self, tmp_path):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        Empty audio is never stored, and empty files left in the disk tier
+        are dropped when the index is rebuilt.
+        """
+        cache = TTSCache(max_memory_bytes=10_000, disk_dir=tmp_path, max_disk_bytes=10_000)
+        cache.put("empty", b"")
+        assert cache.get("empty") is None
+        assert cache.stats()["stores"] == 0
+        assert list(tmp_path.glob("*/*.audio")) == []
+
+        leftover = tmp_path / "ab" / "abc.audio"
+        leftover.parent.mkdir()
+        leftover.write_bytes(b"")
+        restarted = TTSCache(max_memory_bytes=10_000, disk_dir=tmp_path, max_disk_bytes=10_000)
+        assert restarted.get("abc") is None
+        assert not leftover.exists()
+        assert restarted.stats()["disk_entries"] == 0
+
+    async def test_empty_synthesis_fails_and_is_retried(self, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        When ElevenLabs returns no audio the request fails with a 500 and
+        nothing is cached, so the next identical request calls ElevenLabs
+        again.
+        """
+        responses = [b"", b"mp3-bytes"]
+        calls = []
+
+        def synthesize(api_key, voice_id, text, model_id):
+            calls.append(text)
+            return responses[len(calls) - 1]
+
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+        monkeypatch.setattr(elevenlabs, "_synthesize", synthesize)
+        get_rate_limiter().reset_all()
+        get_tts_cache().clear()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/elevenlabs/tts", json={"text": "Bend those knees!"})
+            second = await client.post("/elevenlabs/tts", json={"text": "Bend those knees!"})
+
+        assert first.status_code == 500
+        assert second.status_code == 200
+        assert second.headers["X-Cache"] == "MISS"
+        assert len(calls) == 2
+
+    async def test_repeated_tts_request_skips_elevenlabs(self, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 20: Response Caching
+
+        The second identical /elevenlabs/tts request is a cache hit and
+        doesn't call ElevenLabs.
+        """
+        calls = []
+
+        def synthesize(api_key, voice_id, text, model_id):
+            calls.append(text)
+            return b"mp3-bytes"
+
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+        monkeypatch.setattr(elevenlabs, "_synthesize", synthesize)
+        get_rate_limiter().reset_all()
+        get_tts_cache().clear()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/elevenlabs/tts", json={"text": "Keep those arms up!"})
+            second = await client.post("/elevenlabs/tts", json={"text": "  Keep those   arms up! "})
+
+        assert first.status_code == second.status_code == 200
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert first.json()["audio"] == second.json()["audio"]
+        assert calls == ["Keep those arms up!"]
+
@@ -0,0 +1,244 @@
+"""
+Tests for the streaming TTS endpoint.
+
+Feature: elevenlabs-voice-coach
+Property 25: Streaming Time-to-First-Byte
+Validates: Requirements 1.1, 15.4
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+import pytest
+from hypothesis import given, strategies as st, settings
+
+import src.elevenlabs as elevenlabs
+from main import app
+from src.middleware.rate_limiter import get_rate_limiter
+from src.tts_cache import get_tts_cache
+from src.tts_stream import AudioRelay
+from src.upstream import UpstreamPool
+
+logger = logging.getLogger(__name__)
+
+CHUNK_DELAY = 0.05
+CHUNKS = [b"ID3-header", b"frame-1", b"frame-2", b"frame-3", b"frame-4"]
+
+RELAY_POOL = UpstreamPool("relay-test", max_workers=2)
+
+
+def slow_chunks(api_key, voice_id, text, model_id):
+    """Stand-in for the SDK stream: one chunk every CHUNK_DELAY seconds."""
+    for chunk in CHUNKS:
+        time.sleep(CHUNK_DELAY)
+        yield chunk
+
+
+@pytest.fixture
+def client():
+    get_rate_limiter().reset_all()
+    get_tts_cache().clear()
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.fixture
+def streaming_elevenlabs(monkeypatch):
+    def synthesize(api_key, voice_id, text, model_id):
+        return b"".join(slow_chunks(api_key, voice_id, text, model_id))
+
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setattr(elevenlabs, "_open_tts_stream", slow_chunks)
+    monkeypatch.setattr(elevenlabs, "_synthesize", synthesize)
+    get_rate_limiter().reset_all()
+    get_tts_cache().clear()
+
+
+async def time_to_first_byte(path: str, payload: dict) -> tuple[float, float, bytes]:
+    """
+    Drive the ASGI app directly and time the first non-empty body message
+    (httpx's ASGITransport only returns once the whole body is sent).
+    """
+    request_body = json.dumps(payload).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.sleep(3600)
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": request_body, "more_body": False}
+
+    first_byte = None
+    body = []
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            body.append(message["body"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return first_byte - start, time.perf_counter() - start, b"".join(body)
+
+
+class TestStreamingTimeToFirstByte:
+    """
+    Property 25: Streaming Time-to-First-Byte
+
+    For any TTS stream request, the first audio bytes should reach the
+    client as soon as ElevenLabs produces them, the streamed bytes should
+    equal the synthesized audio, and a completed stream should fill the
+    TTS cache.
+
+    Validates: Requirements 1.1, 15.4
+    """
+
+    @given(st.lists(st.binary(max_size=64), max_size=12), st.integers(min_value=0, max_value=400))
+    @settings(max_examples=50, deadline=None)
+    def test_relay_preserves_audio(self, chunks: list[bytes], max_tee_bytes: int):
+        """
+        Feature: elevenlabs-voice-coach, Property 25: Streaming Time-to-First-Byte
+
+        The relay yields every byte in order (empty chunks dropped) and
+        passes the audio to on_complete only when it fits max_tee_bytes;
+        a stream with no audio fails in start().
+        """
+        completed = []
+
+        async def relay_all():
+            relay = AudioRelay(
+                lambda: iter(chunks),
+                RELAY_POOL,
+                on_complete=completed.append,
+                max_tee_bytes=max_tee_bytes,
+            )
+            await relay.start()
+            return [chunk async for chunk in relay.body()]
+
+        audio = b"".join(chunks)
+        if not audio:
+            with pytest.raises(ValueError):
+                asyncio.run(relay_all())
+            assert completed == []
+            return
+
+        streamed = asyncio.run(relay_all())
+
+        assert b"".join(streamed) == audio
+        assert all(streamed)
+        assert completed == ([audio] if len(audio) <= max_tee_bytes else [])
+
+    async def test_interrupted_stream_is_not_cached(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 25: Streaming Time-to-First-Byte
+
+        A stream that fails part-way never reaches on_complete.
+        """
+        def failing():
+            yield b"frame-1"
+            raise ConnectionError("upstream dropped")
+
+        completed = []
+        relay = AudioRelay(failing, RELAY_POOL, on_complete=completed.append, max_tee_bytes=1000)
+        await relay.start()
+
+        with pytest.raises(ConnectionError):
+            async for _ in relay.body():
+                pass
+        assert completed == []
+
+    async def test_stream_ttfb_beats_json_endpoint(self, streaming_elevenlabs):
+        """
+        Feature: elevenlabs-voice-coach, Property 25: Streaming Time-to-First-Byte
+
+        The streaming endpoint's first byte arrives after roughly one chunk,
+        while the JSON endpoint only responds after the full synthesis.
+        """
+        json_ttfb, _, json_body = await time_to_first_byte("/elevenlabs/tts", {"text": "Nice hip action!"})
+        get_tts_cache().clear()
+        stream_ttfb, stream_total, stream_body = await time_to_first_byte("/elevenlabs/tts/stream", {"text": "Nice hip action!"})
+
+        logger.info(
+            "%d chunks x %ss: json ttfb %.0f ms (%d bytes), stream ttfb %.0f ms (%d bytes, done in %.0f ms)",
+            len(CHUNKS), CHUNK_DELAY, json_ttfb * 1000, len(json_body),
+            stream_ttfb * 1000, len(stream_body), stream_total * 1000,
+        )
+        assert stream_body == b"".join(CHUNKS)
+        assert json_ttfb >= len(CHUNKS) * CHUNK_DELAY * 0.9
+        assert stream_ttfb < json_ttfb / 2
+
+    async def test_stream_response_headers_and_cache(self, client, streaming_elevenlabs):
+        """
+        Feature: elevenlabs-voice-coach, Property 25: Streaming Time-to-First-Byte
+
+        A miss streams audio/mpeg with a Server-Timing ttfb; the completed
+        stream is cached, so both endpoints then serve it without ElevenLabs.
+        """
+        async with client:
+            first = await client.post("/elevenlabs/tts/stream", json={"text": "Turn on two!"})
+            second = await client.post("/elevenlabs/tts/stream", json={"text": "Turn on two!"})
+            as_json = await client.post("/elevenlabs/tts", json={"text": "Turn on two!"})
+            health = await client.get("/elevenlabs/health")
+
+        assert first.status_code == second.status_code == 200
+        assert first.headers["content-type"] == "audio/mpeg"
+        assert first.headers["X-Cache"] == "MISS"
+        assert first.headers["Server-Timing"].startswith("ttfb;dur=")
+        assert second.headers["X-Cache"] == "HIT"
+        assert first.content == second.content == b"".join(CHUNKS)
+        assert as_json.headers["X-Cache"] == "HIT"
+        assert health.json()["tts_stream"]["ttfb_seconds_max"] > 0
+
+    async def test_upstream_errors_before_first_chunk(self, client, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 25: Streaming Time-to-First-Byte
+
+        Failures before any audio is sent still return 504 / 500, and a
+        stream that ends without audio is a 500 that isn't cached.
+        """
+        def stalled(api_key, voice_id, text, model_id):
+            time.sleep(0.2)
+            yield b"late"
+
+        def broken(api_key, voice_id, text, model_id):
+            raise RuntimeError("bad voice")
+
+        def silent(api_key, voice_id, text, model_id):
+            yield b""
+
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+        monkeypatch.setattr(elevenlabs, "ELEVENLABS_TIMEOUT_SECONDS", 0.05)
+        stores = get_tts_cache().stats()["stores"]
+        async with client:
+            monkeypatch.setattr(elevenlabs, "_open_tts_stream", stalled)
+            timed_out = await client.post("/elevenlabs/tts/stream", json={"text": "Slow"})
+            monkeypatch.setattr(elevenlabs, "_open_tts_stream", broken)
+            failed = await client.post("/elevenlabs/tts/stream", json={"text": "Broken"})
+            monkeypatch.setattr(elevenlabs, "_open_tts_stream", silent)
+            empty = await client.post("/elevenlabs/tts/stream", json={"text": "Silent"})
+
+        assert timed_out.status_code == 504
+        assert failed.status_code == 500
+        assert empty.status_code == 500
+        assert get_tts_cache().stats()["stores"] == stores
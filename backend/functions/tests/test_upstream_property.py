@@ -0,0 +1,176 @@
+"""
+Load tests for upstream calls from async endpoints.
+
+Feature: elevenlabs-voice-coach
+Property 23: Non-Blocking Upstream Calls
+Validates: Requirements 1.1, 4.1
+"""
+
+import asyncio
+import logging
+import time
+
+import httpx
+import pytest
+
+import src.elevenlabs as elevenlabs
+import src.gemini_client as gemini_client
+from main import app
+from src.middleware.rate_limiter import get_rate_limiter
+from src.tip_cache import get_tip_cache
+from src.tts_cache import get_tts_cache
+from src.upstream import UpstreamPool, UpstreamTimeoutError
+from tests.test_gemini_client_property import FakeGeminiClient, FakeModel
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_DELAY = 0.2
+CONCURRENT_REQUESTS = 8
+
+COACHING_TIP = {"score": 72, "weakPoints": ["arms"], "strongPoints": ["legs"]}
+
+
+@pytest.fixture
+def client():
+    get_rate_limiter().reset_all()
+    get_tts_cache().clear()
+    get_tip_cache().clear()
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.fixture
+def slow_gemini(monkeypatch):
+    fake = FakeGeminiClient(
+        model=FakeModel(delay=UPSTREAM_DELAY),
+        pool=UpstreamPool("gemini-test", CONCURRENT_REQUESTS),
+    )
+    monkeypatch.setattr(gemini_client, "_gemini_client", fake)
+    return fake
+
+
+@pytest.fixture
+def slow_elevenlabs(monkeypatch):
+    def synthesize(api_key, voice_id, text, model_id):
+        time.sleep(UPSTREAM_DELAY)
+        return b"mp3"
+
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setattr(elevenlabs, "_synthesize", synthesize)
+
+
+class TestNonBlockingUpstreamCalls:
+    """
+    Property 23: Non-Blocking Upstream Calls
+
+    For any set of concurrent requests, a slow upstream call should not
+    delay other requests on the same worker: upstream calls run on bounded
+    thread pools with per-call timeouts.
+
+    Validates: Requirements 1.1, 4.1
+    """
+
+    async def test_concurrent_coaching_tips_throughput(self, client, slow_gemini):
+        """
+        Feature: elevenlabs-voice-coach, Property 23: Non-Blocking Upstream Calls
+
+        Concurrent coaching tips overlap their upstream calls instead of
+        running one after another, as they did with the SDK called inline.
+        """
+        async def inline_call(i: int):
+            # Before: the synchronous SDK call made directly in the coroutine
+            return slow_gemini.generate(f"p{i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(inline_call(i) for i in range(CONCURRENT_REQUESTS)))
+        inline_seconds = time.perf_counter() - start
+
+        async with client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/gemini/coaching-tip", json=COACHING_TIP, headers={"X-Forwarded-For": f"10.0.0.{i}"})
+                for i in range(CONCURRENT_REQUESTS)
+            ))
+            pooled_seconds = time.perf_counter() - start
+
+        assert all(response.status_code == 200 for response in responses)
+        assert all(response.json()["tip"].startswith("tip for") for response in responses)
+        logger.info(
+            "%d requests x %ss upstream: inline %.1f req/s, pooled %.1f req/s",
+            CONCURRENT_REQUESTS, UPSTREAM_DELAY,
+            CONCURRENT_REQUESTS / inline_seconds, CONCURRENT_REQUESTS / pooled_seconds,
+        )
+        assert inline_seconds >= CONCURRENT_REQUESTS * UPSTREAM_DELAY * 0.9
+        assert pooled_seconds < inline_seconds / 3
+
+    async def test_health_responds_while_upstream_is_slow(self, client, slow_elevenlabs):
+        """
+        Feature: elevenlabs-voice-coach, Property 23: Non-Blocking Upstream Calls
+
+        The event loop keeps serving cheap requests while TTS calls are pending.
+        """
+        async with client:
+            pending = [
+                asyncio.create_task(client.post("/elevenlabs/tts", json={"text": f"hello {i}"}))
+                for i in range(CONCURRENT_REQUESTS)
+            ]
+            await asyncio.sleep(0.02)
+
+            start = time.perf_counter()
+            health = await client.get("/health")
+            health_seconds = time.perf_counter() - start
+
+            responses = await asyncio.gather(*pending)
+
+        assert health.status_code == 200
+        assert health_seconds < UPSTREAM_DELAY / 2
+        assert all(response.status_code == 200 for response in responses)
+
+    async def test_upstream_timeout_returns_504(self, client, slow_elevenlabs, monkeypatch):
+        """
+        Feature: elevenlabs-voice-coach, Property 23: Non-Blocking Upstream Calls
+
+        A TTS call slower than ELEVENLABS_TIMEOUT_SECONDS fails fast with 504.
+        """
+        monkeypatch.setattr(elevenlabs, "ELEVENLABS_TIMEOUT_SECONDS", 0.05)
+        async with client:
+            start = time.perf_counter()
+            response = await client.post("/elevenlabs/tts", json={"text": "hello"})
+            elapsed = time.perf_counter() - start
+
+        assert response.status_code == 504
+        assert elapsed < UPSTREAM_DELAY
+
+    async def test_pool_bounds_concurrency(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 23: Non-Blocking Upstream Calls
+
+        No more than max_workers upstream calls run at once.
+        """
+        pool = UpstreamPool("bounded", max_workers=2)
+        await asyncio.gather(*(pool.run(time.sleep, 0.05) for _ in range(6)))
+
+        stats = pool.stats()
+        assert stats["max_in_flight"] == 2
+        assert stats["calls"] == 6
+        assert stats["queue_wait_seconds"] > 0
+
+    async def test_pool_timeout_and_errors(self):
+        """
+        Feature: elevenlabs-voice-coach, Property 23: Non-Blocking Upstream Calls
+
+        Timeouts raise UpstreamTimeoutError; other errors propagate unchanged.
+        """
+        pool = UpstreamPool("errors", max_workers=2)
+        with pytest.raises(UpstreamTimeoutError):
+            await pool.run(time.sleep, 0.2, timeout=0.02)
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+
+        stats = pool.stats()
+        assert stats["timeouts"] == 1
+        assert stats["failures"] == 1
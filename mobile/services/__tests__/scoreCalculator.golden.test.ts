@@ -0,0 +1,81 @@
+/**
+ * Golden-file parity tests for score calculator service
+ *
+ * python-tools/fixtures/score_golden.json holds inputs and the outputs of
+ * this implementation for them. python-tools/test_score_engine.py checks
+ * the Python scoring engine against the same file, so a change here has to
+ * be made there too.
+ *
+ * After an intentional scoring change, regenerate the expected outputs:
+ *   UPDATE_SCORE_GOLDEN=1 npx jest scoreCalculator.golden
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+
+import {
+  calculateFrameScore,
+  calculateFinalScore,
+  calculateScoreBreakdown,
+  getPerformanceRating,
+  calculateWeightedScore,
+} from '../scoreCalculator';
+
+const GOLDEN_FILE = path.join(__dirname, '../../../python-tools/fixtures/score_golden.json');
+
+const golden = JSON.parse(fs.readFileSync(GOLDEN_FILE, 'utf8'));
+
+function scoreSession(session: any) {
+  const results = session.frames.map((frame: any) =>
+    calculateFrameScore(frame.user, frame.reference, session.threshold)
+  );
+  const frameScores = results.map((result: any) => result.score);
+  const finalScore = calculateFinalScore(frameScores);
+  return {
+    frameScores,
+    attemptedJoints: results.map((result: any) => result.attemptedJoints),
+    finalScore,
+    weightedScore: calculateWeightedScore(frameScores),
+    breakdown: calculateScoreBreakdown(results),
+    rating: getPerformanceRating(finalScore),
+  };
+}
+
+describe('scoreCalculator golden parity', () => {
+  if (process.env.UPDATE_SCORE_GOLDEN) {
+    it('updates the golden file', () => {
+      golden.frames.forEach((testCase: any) => {
+        testCase.expected = calculateFrameScore(testCase.user, testCase.reference, testCase.threshold);
+      });
+      golden.sessions.forEach((session: any) => {
+        session.expected = scoreSession(session);
+      });
+      golden.ratings.forEach((testCase: any) => {
+        testCase.rating = getPerformanceRating(testCase.score);
+      });
+      fs.writeFileSync(GOLDEN_FILE, JSON.stringify(golden, null, 1) + '\n');
+    });
+    return;
+  }
+
+  it.each(golden.frames.map((testCase: any) => [testCase.name, testCase]))(
+    'calculateFrameScore matches golden output: %s',
+    (_name: string, testCase: any) => {
+      const result = calculateFrameScore(testCase.user, testCase.reference, testCase.threshold);
+      expect(result).toEqual(testCase.expected);
+    }
+  );
+
+  it.each(golden.sessions.map((session: any) => [session.name, session]))(
+    'session scores match golden output: %s',
+    (_name: string, session: any) => {
+      expect(scoreSession(session)).toEqual(session.expected);
+    }
+  );
+
+  it('getPerformanceRating matches golden output', () => {
+    golden.ratings.forEach((testCase: any) => {
+      expect(getPerformanceRating(testCase.score)).toBe(testCase.rating);
+    });
+  });
+});
@@ -12,105 +12,108 @@ from __future__ import annotations
 
 import argparse
 import json
-import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import Dict, List, Tuple
 
-JOINT_MAP: Dict[str, Tuple[str, str, str]] = {
-    "leftArm": ("leftShoulder", "leftElbow", "leftWrist"),
-    "rightArm": ("rightShoulder", "rightElbow", "rightWrist"),
-    "leftThigh": ("leftHip", "leftKnee", "leftAnkle"),
-    "rightThigh": ("rightHip", "rightKnee", "rightAnkle"),
-}
+import numpy as np
 
-DUPLICATED_JOINTS = {
-    "leftElbow": "leftArm",
-    "rightElbow": "rightArm",
-    "leftLeg": "leftThigh",
-    "rightLeg": "rightThigh",
-}
-
-# Zero vector threshold - matches TypeScript ZERO_VECTOR_THRESHOLD (1e-9)
-EPSILON = 1e-9
-
-
-def calculate_angle(p1: Dict, p2: Dict, p3: Dict) -> float:
-    """Return the geometric angle between three points."""
-    v1 = (p1["x"] - p2["x"], p1["y"] - p2["y"])
-    v2 = (p3["x"] - p2["x"], p3["y"] - p2["y"])
-
-    mag1 = math.hypot(*v1)
-    mag2 = math.hypot(*v2)
-
-    if mag1 <= EPSILON or mag2 <= EPSILON:
-        return 0.0
-
-    cos_angle = (v1[0] * v2[0] + v1[1] * v2[1]) / (mag1 * mag2)
-    cos_angle = max(-1.0, min(1.0, cos_angle))
-    return math.degrees(math.acos(cos_angle))
-
-
-def joint_confidence(points: Iterable[Dict]) -> float:
-    """Return the minimum confidence value across the provided points."""
-    confidences = [float(point.get("confidence", 0.0)) for point in points]
-    if not confidences:
-        return 0.0
-    return min(confidences)
+from pose_manifest import MANIFEST_NAME, PoseManifest, iter_pose_files
+from pose_sequence import (
+    ANGLE_NAMES,
+    KEYPOINT_NAMES,
+    calculate_angles,
+    compute_angles,
+    keypoints_from_dict,
+)
 
 
 def recalculate_angles(keypoints: Dict[str, Dict]) -> Tuple[Dict[str, float], Dict[str, float]]:
     """Recompute joint angles plus their confidence metadata."""
-    angles: Dict[str, float] = {
-        "leftArm": 0.0,
-        "rightArm": 0.0,
-        "leftElbow": 0.0,
-        "rightElbow": 0.0,
-        "leftThigh": 0.0,
-        "rightThigh": 0.0,
-        "leftLeg": 0.0,
-        "rightLeg": 0.0,
-    }
-    angle_confidence: Dict[str, float] = {key: 0.0 for key in angles}
-
-    for joint, triple in JOINT_MAP.items():
-        points = [keypoints.get(name) for name in triple]
-        if any(point is None for point in points):
-            continue
-
-        confidence = joint_confidence(points)  # type: ignore[arg-type]
-        angle_confidence[joint] = confidence
-        if confidence == 0.0:
-            continue
-
-        angles[joint] = calculate_angle(points[0], points[1], points[2])  # type: ignore[arg-type]
-
-    for duplicate, source in DUPLICATED_JOINTS.items():
-        angle_confidence[duplicate] = angle_confidence.get(source, 0.0)
-        angles[duplicate] = angles.get(source, 0.0)
-
-    return angles, angle_confidence
-
-
-def process_pose_file(path: Path, dry_run: bool = False) -> None:
-    """Update a single pose JSON file in-place."""
+    return calculate_angles(keypoints)
+
+
+def recalculate_angles_batch(frames: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized recalculate_angles() over every frame of a file.
+
+    Returns:
+        (angles [N, 8], angle_confidence [N, 8]) in ANGLE_NAMES order
+    """
+    # float64 so unchanged files compare equal to what is stored
+    keypoints = np.array(
+        [keypoints_from_dict(frame.get("keypoints") or {}) for frame in frames],
+        dtype=np.float64,
+    ).reshape(len(frames), len(KEYPOINT_NAMES), 3)
+    return compute_angles(keypoints)
+
+
+# Stored values within this tolerance count as unchanged
+MATCH_TOLERANCE = 1e-6
+
+
+def _stored_matches(frames: List[Dict], field: str, values: np.ndarray) -> bool:
+    """True if every frame already stores these values for the field."""
+    stored = np.full(values.shape, np.nan)
+    for i, frame in enumerate(frames):
+        existing = frame.get(field)
+        if not isinstance(existing, dict):
+            return False
+        for j, name in enumerate(ANGLE_NAMES):
+            value = existing.get(name)
+            if not isinstance(value, (int, float)):
+                return False
+            stored[i, j] = value
+    return bool(np.allclose(stored, values, rtol=0.0, atol=MATCH_TOLERANCE))
+
+
+def process_pose_file(path: Path, dry_run: bool = False) -> Tuple[str, int]:
+    """
+    Update a single pose JSON file in-place.
+
+    The file is only rewritten when the recomputed angles or confidences
+    differ from what is stored, and then via a temp file + rename so a
+    crash never leaves a half-written pose file behind.
+
+    Returns:
+        ("changed" | "unchanged", number of frames)
+    """
     with path.open("r") as handle:
         data = json.load(handle)
 
     frames = data.get("frames", [])
-    for frame in frames:
-        keypoints = frame.get("keypoints", {})
-        angles, angle_confidence = recalculate_angles(keypoints)
-        frame["angles"] = angles
-        frame["angleConfidence"] = angle_confidence
+    angles, angle_confidence = recalculate_angles_batch(frames)
+
+    if _stored_matches(frames, "angles", angles) and _stored_matches(frames, "angleConfidence", angle_confidence):
+        return "unchanged", len(frames)
 
     if dry_run:
-        print(f"[dry-run] Would update {path} ({len(frames)} frames)")
-        return
+        return "changed", len(frames)
+
+    for frame, frame_angles, frame_confidence in zip(frames, angles.tolist(), angle_confidence.tolist()):
+        frame["angles"] = dict(zip(ANGLE_NAMES, frame_angles))
+        frame["angleConfidence"] = dict(zip(ANGLE_NAMES, frame_confidence))
 
-    with path.open("w") as handle:
-        json.dump(data, handle, indent=2)
-        handle.write("\n")
-    print(f"✓ Updated {path.name} with angle confidence metadata")
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with tmp_path.open("w") as handle:
+            json.dump(data, handle, indent=2)
+            handle.write("\n")
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return "changed", len(frames)
+
+
+def _process(path: Path, dry_run: bool) -> Tuple[Path, str, int, str]:
+    try:
+        status, frame_count = process_pose_file(path, dry_run)
+        return path, status, frame_count, ""
+    except Exception as exc:  # reported in the summary
+        return path, "failed", 0, f"{type(exc).__name__}: {exc}"
 
 
 def main() -> None:
@@ -126,16 +129,62 @@ def main() -> None:
         action="store_true",
         help="List files that would be updated without modifying them.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Skip files unchanged since their last backfill (uses manifest.json)",
+    )
 
     args = parser.parse_args()
 
-    pose_files = sorted(args.poses_dir.glob("*.json"))
+    manifest = None
+    if args.changed_only or (args.poses_dir / MANIFEST_NAME).exists():
+        manifest = PoseManifest(args.poses_dir)
+        manifest.refresh()
+
+    pose_files = manifest.needs_check("backfill") if args.changed_only else iter_pose_files(args.poses_dir)
     if not pose_files:
-        print(f"No pose files found in {args.poses_dir}")
+        print(f"No {'changed ' if args.changed_only else ''}pose files found in {args.poses_dir}")
         return
 
-    for pose_file in pose_files:
-        process_pose_file(pose_file, dry_run=args.dry_run)
+    jobs = min(args.jobs or os.cpu_count() or 1, len(pose_files))
+    counts = {"changed": 0, "unchanged": 0, "failed": 0}
+    outcomes = []
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_process, pose_file, args.dry_run) for pose_file in pose_files]
+        for future in as_completed(futures):
+            path, status, frame_count, error = future.result()
+            counts[status] += 1
+            outcomes.append((path, status))
+            if status == "failed":
+                print(f"✗ Failed {path.name}: {error}")
+            elif status == "unchanged":
+                print(f"= {path.name} already up to date ({frame_count} frames)")
+            elif args.dry_run:
+                print(f"[dry-run] Would update {path} ({frame_count} frames)")
+            else:
+                print(f"✓ Updated {path.name} with angle confidence metadata")
+
+    if manifest is not None and not args.dry_run:
+        manifest.refresh([path for path, status in outcomes if status == "changed"])
+        for path, status in outcomes:
+            if status != "failed":
+                manifest.record_check(path.name, "backfill", status)
+        manifest.save()
+
+    print(
+        f"\nSummary: {counts['changed']} {'to update' if args.dry_run else 'changed'}, "
+        f"{counts['unchanged']} unchanged, {counts['failed']} failed"
+    )
+    if counts["failed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
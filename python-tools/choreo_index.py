@@ -0,0 +1,710 @@
+#!/usr/bin/env python3
+"""
+Move-level embedding index over the reference pose files.
+
+Each song is cut into beat-aligned windows (BEATS_PER_WINDOW beats, a new
+window every HOP_BEATS beats) and every window gets a compact embedding:
+
+- the 8 joint angles, averaged over TIME_BINS sub-windows
+- the 12 body keypoints relative to the hip centre, scaled by torso length,
+  averaged over the same sub-windows, minus their window mean (the
+  trajectory of the move rather than where the dancer stands)
+
+Both parts are L2-normalized, so cosine similarity is a dot product.
+
+The index lives in its own directory (default <poses_dir>/choreo_index):
+
+    index.json       parameters, one entry per song (sha256, row range)
+    embeddings.npy   float32 [W, D], memory-mapped on load
+    windows.npz      song number, start and end (s) per row
+    lsh.npy          SimHash codes [W, LSH_TABLES]
+    songs/<stem>.npz per-song embeddings, reused while the file is unchanged
+
+build_index() only re-embeds songs whose sha256 changed (taken from the
+pose manifest when it's current), so rebuilding over the whole catalog
+after adding one song costs one song. Queries are exact (one matrix-vector
+product over all windows) or approximate (SimHash LSH: windows sharing a
+bucket with the query in any table, re-ranked exactly).
+
+The song BPM comes from the pose file's metadata ('bpm', 'beatOffset')
+when present, otherwise from --bpm.
+
+Usage:
+    uv run python choreo_index.py build --bpm 128
+    uv run python choreo_index.py move 30minutos 42.5
+    uv run python choreo_index.py similar 30minutos
+    uv run python choreo_index.py bench
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pose_manifest import PoseManifest, file_digest, iter_pose_files
+from pose_sequence import KEYPOINT_INDEX, KEYPOINT_NAMES, PoseSequence
+from score_engine import JOINT_CONFIDENCE_THRESHOLD, valid_joints
+
+
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 1
+
+# Bump when the embedding changes so build_index() re-embeds every song
+EMBEDDING_VERSION = 1
+
+DEFAULT_BPM = 128.0
+BEATS_PER_WINDOW = 4
+HOP_BEATS = 2
+TIME_BINS = 4
+
+# Windows where fewer frames than this have a pose are not indexed
+MIN_POSE_FRAMES = 0.5
+
+# Shoulders to ankles; the face keypoints add noise, not choreography
+BODY_KEYPOINTS = KEYPOINT_NAMES[5:]
+
+# Relative weight of the keypoint trajectory part of the embedding
+TRAJECTORY_WEIGHT = 0.7
+
+LSH_TABLES = 8
+LSH_BITS = 12
+LSH_SEED = 2024
+
+
+def beat_windows(
+    duration: float,
+    bpm: float = DEFAULT_BPM,
+    beat_offset: float = 0.0,
+    beats_per_window: int = BEATS_PER_WINDOW,
+    hop_beats: int = HOP_BEATS
+) -> np.ndarray:
+    """
+    Beat-aligned [start, end) windows covering a song.
+
+    Returns:
+        Array [W, 2] of window start and end times in seconds
+    """
+    beat = 60.0 / bpm
+    length = beats_per_window * beat
+    first = beat_offset % (hop_beats * beat)
+    starts = np.arange(first, duration - length + 1e-9, hop_beats * beat)
+    return np.stack([starts, starts + length], axis=1).reshape(-1, 2)
+
+
+def normalized_keypoints(keypoints: np.ndarray) -> np.ndarray:
+    """
+    Body keypoints relative to the hip centre, in torso lengths.
+
+    Args:
+        keypoints: Array [N, 17, 3]
+
+    Returns:
+        Array [N, 12, 2]; NaN where the keypoint, hips or shoulders weren't
+        detected
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    points = np.where(
+        keypoints[..., 2:3] >= JOINT_CONFIDENCE_THRESHOLD, keypoints[..., :2], np.nan
+    )
+    hips = points[:, [KEYPOINT_INDEX['leftHip'], KEYPOINT_INDEX['rightHip']]].mean(axis=1)
+    shoulders = points[:, [KEYPOINT_INDEX['leftShoulder'], KEYPOINT_INDEX['rightShoulder']]].mean(axis=1)
+    torso = np.linalg.norm(shoulders - hips, axis=-1)
+    torso = np.where(torso > 1e-6, torso, np.nan)
+
+    body = points[:, [KEYPOINT_INDEX[name] for name in BODY_KEYPOINTS]]
+    return (body - hips[:, None, :]) / torso[:, None, None]
+
+
+def _binned_mean(values: np.ndarray, bins: np.ndarray) -> np.ndarray:
+    """NaN-aware mean of values [N, F] per bin index [N] -> [TIME_BINS, F]."""
+    present = np.isfinite(values)
+    sums = np.zeros((TIME_BINS, values.shape[1]))
+    counts = np.zeros((TIME_BINS, values.shape[1]))
+    np.add.at(sums, bins, np.where(present, values, 0.0))
+    np.add.at(counts, bins, present)
+    with np.errstate(invalid='ignore'):
+        return sums / counts
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def embed_window(
+    angles: np.ndarray,
+    angle_confidence: np.ndarray,
+    keypoints: np.ndarray,
+    timestamps: np.ndarray,
+    start: float,
+    end: float
+) -> Optional[np.ndarray]:
+    """
+    Embedding of the frames with start <= timestamp < end.
+
+    Returns:
+        float32 vector [embedding_dims()], or None if too few frames have a pose
+    """
+    if len(timestamps) == 0:
+        return None
+
+    valid = valid_joints(angles, angle_confidence)
+    scaled = np.where(valid, (np.asarray(angles, dtype=np.float64) - 90.0) / 90.0, np.nan)
+    trajectory = normalized_keypoints(keypoints).reshape(len(timestamps), -1)
+
+    has_pose = valid.any(axis=1) & np.isfinite(trajectory).any(axis=1)
+    if has_pose.mean() < MIN_POSE_FRAMES:
+        return None
+
+    position = (np.asarray(timestamps) - start) / (end - start)
+    bins = np.clip((position * TIME_BINS).astype(np.int64), 0, TIME_BINS - 1)
+
+    angle_part = np.nan_to_num(_binned_mean(scaled, bins))
+    binned = _binned_mean(trajectory, bins)
+    with np.errstate(invalid='ignore'):
+        mean = np.nanmean(binned, axis=0) if np.isfinite(binned).any() else np.zeros(binned.shape[1])
+    trajectory_part = np.nan_to_num(binned - mean)
+
+    vector = np.concatenate([
+        _unit(angle_part.ravel()) * (1.0 - TRAJECTORY_WEIGHT),
+        _unit(trajectory_part.ravel()) * TRAJECTORY_WEIGHT,
+    ])
+    return _unit(vector).astype(np.float32)
+
+
+def embedding_dims() -> int:
+    """Length of the window embedding."""
+    return TIME_BINS * (8 + 2 * len(BODY_KEYPOINTS))
+
+
+def embed_sequence(
+    sequence: PoseSequence,
+    bpm: float = DEFAULT_BPM,
+    beat_offset: float = 0.0,
+    beats_per_window: int = BEATS_PER_WINDOW,
+    hop_beats: int = HOP_BEATS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embed every beat window of a song.
+
+    Returns:
+        (embeddings float32 [W, D], windows [W, 2]) for the windows with
+        enough tracked frames
+    """
+    windows = beat_windows(sequence.duration, bpm, beat_offset, beats_per_window, hop_beats)
+    bounds = np.searchsorted(sequence.timestamps, windows)
+
+    embeddings = []
+    kept = []
+    for (start, end), (first, last) in zip(windows, bounds):
+        vector = embed_window(
+            sequence.angles[first:last],
+            sequence.angle_confidence[first:last],
+            sequence.keypoints[first:last],
+            sequence.timestamps[first:last],
+            start,
+            end
+        )
+        if vector is not None:
+            embeddings.append(vector)
+            kept.append((start, end))
+
+    if not embeddings:
+        return np.zeros((0, embedding_dims()), dtype=np.float32), np.zeros((0, 2))
+    return np.stack(embeddings), np.asarray(kept)
+
+
+def lsh_planes(dims: int, tables: int = LSH_TABLES, bits: int = LSH_BITS, seed: int = LSH_SEED) -> np.ndarray:
+    """Random hyperplanes [tables * bits, dims]; fixed by the seed so codes are stable."""
+    return np.random.default_rng(seed).standard_normal((tables * bits, dims)).astype(np.float32)
+
+
+def lsh_codes(embeddings: np.ndarray, planes: np.ndarray, tables: int = LSH_TABLES) -> np.ndarray:
+    """
+    SimHash bucket per table.
+
+    Returns:
+        int64 codes [W, tables]
+    """
+    embeddings = np.atleast_2d(embeddings)
+    # Explicit bits: reshape can't infer -1 when there are no windows
+    bits = len(planes) // tables
+    signs = (embeddings @ planes.T > 0).reshape(len(embeddings), tables, bits)
+    weights = 1 << np.arange(bits, dtype=np.int64)
+    return (signs * weights).sum(axis=-1)
+
+
+def _save_npy(path: Path, array: np.ndarray) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _save_npz(path: Path, **arrays) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _read_index(index_dir: Path) -> Dict:
+    try:
+        with open(index_dir / INDEX_NAME, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_index(
+    poses_dir: Union[str, Path],
+    index_dir: Optional[Union[str, Path]] = None,
+    bpm: float = DEFAULT_BPM,
+    beats_per_window: int = BEATS_PER_WINDOW,
+    hop_beats: int = HOP_BEATS,
+    force: bool = False
+) -> Dict:
+    """
+    Build or update the index for every pose file in a directory.
+
+    Args:
+        poses_dir: Directory containing pose JSON files
+        index_dir: Index directory (default: <poses_dir>/choreo_index)
+        bpm: BPM for songs without 'bpm' in their metadata
+        beats_per_window: Window length in beats
+        hop_beats: Beats between window starts
+        force: Re-embed every song
+
+    Returns:
+        Dict with songs, windows, embedded (songs re-embedded), reused and
+        removed counts
+    """
+    poses_dir = Path(poses_dir)
+    index_dir = Path(index_dir) if index_dir else poses_dir / 'choreo_index'
+    songs_dir = index_dir / 'songs'
+    songs_dir.mkdir(parents=True, exist_ok=True)
+
+    params = {
+        'embeddingVersion': EMBEDDING_VERSION,
+        'bpm': bpm,
+        'beatsPerWindow': beats_per_window,
+        'hopBeats': hop_beats,
+        'timeBins': TIME_BINS,
+    }
+    previous = _read_index(index_dir)
+    if force or previous.get('version') != INDEX_VERSION or previous.get('params') != params:
+        previous_songs = {}
+    else:
+        previous_songs = {song['file']: song for song in previous.get('songs', [])}
+
+    manifest = PoseManifest(poses_dir)
+    pose_files = iter_pose_files(poses_dir)
+    songs = []
+    embedded = reused = 0
+    for path in pose_files:
+        cache = songs_dir / f"{path.stem}.npz"
+        old = previous_songs.get(path.name)
+        stat = path.stat()
+
+        if old and old['bytes'] == stat.st_size and old['mtimeNs'] == stat.st_mtime_ns and cache.exists():
+            songs.append(old)
+            reused += 1
+            continue
+
+        if manifest.is_current(path):
+            sha256 = manifest.entries[path.name]['sha256']
+        else:
+            sha256 = file_digest(path)
+        if old and old['sha256'] == sha256 and cache.exists():
+            songs.append({**old, 'bytes': stat.st_size, 'mtimeNs': stat.st_mtime_ns})
+            reused += 1
+            continue
+
+        try:
+            sequence = PoseSequence.from_json(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠ Skipping {path.name}: {e}")
+            continue
+        song_bpm = float(sequence.metadata.get('bpm') or bpm)
+        beat_offset = float(sequence.metadata.get('beatOffset') or 0.0)
+        embeddings, windows = embed_sequence(sequence, song_bpm, beat_offset, beats_per_window, hop_beats)
+        _save_npz(cache, embeddings=embeddings, windows=windows)
+        songs.append({
+            'file': path.name,
+            'songId': sequence.song_id or path.stem,
+            'bpm': song_bpm,
+            'beatOffset': beat_offset,
+            'windows': len(windows),
+            'bytes': stat.st_size,
+            'mtimeNs': stat.st_mtime_ns,
+            'sha256': sha256,
+        })
+        embedded += 1
+        print(f"  ✓ {path.name}: {len(windows)} windows @ {song_bpm:g} BPM")
+
+    current = {song['file'] for song in songs}
+    removed = 0
+    for cache in songs_dir.glob('*.npz'):
+        if f"{cache.stem}.json" not in current:
+            cache.unlink()
+            removed += 1
+
+    # Concatenating the cached per-song arrays is cheap; only changed songs were re-embedded
+    all_embeddings = [np.zeros((0, embedding_dims()), dtype=np.float32)]
+    song_numbers = [np.zeros(0, dtype=np.int32)]
+    bounds = [np.zeros((0, 2))]
+    row = 0
+    for number, song in enumerate(songs):
+        with np.load(songs_dir / f"{Path(song['file']).stem}.npz") as cached:
+            all_embeddings.append(cached['embeddings'])
+            bounds.append(cached['windows'])
+        count = len(all_embeddings[-1])
+        song_numbers.append(np.full(count, number, dtype=np.int32))
+        song['rows'] = [row, row + count]
+        row += count
+
+    embeddings = np.concatenate(all_embeddings).astype(np.float32)
+    windows = np.concatenate(bounds)
+    _save_npy(index_dir / 'embeddings.npy', embeddings)
+    _save_npy(index_dir / 'lsh.npy', lsh_codes(embeddings, lsh_planes(embedding_dims())))
+    _save_npz(
+        index_dir / 'windows.npz',
+        song=np.concatenate(song_numbers),
+        start=windows[:, 0],
+        end=windows[:, 1]
+    )
+
+    tmp_path = index_dir / f".{INDEX_NAME}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'version': INDEX_VERSION,
+            'params': params,
+            'dims': embedding_dims(),
+            'lsh': {'tables': LSH_TABLES, 'bits': LSH_BITS, 'seed': LSH_SEED},
+            'windows': len(embeddings),
+            'songs': songs,
+        }, f, indent=2)
+    os.replace(tmp_path, index_dir / INDEX_NAME)
+
+    return {
+        'songs': len(songs),
+        'windows': len(embeddings),
+        'embedded': embedded,
+        'reused': reused,
+        'removed': removed,
+    }
+
+
+class ChoreoIndex:
+    """Read-only view of a built index."""
+
+    def __init__(self, index_dir: Union[str, Path]):
+        """
+        Load an index directory.
+
+        Raises:
+            FileNotFoundError: If the index hasn't been built
+            ValueError: If it was built by an incompatible version
+        """
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / INDEX_NAME, 'r') as f:
+            header = json.load(f)
+        if header.get('version') != INDEX_VERSION or header.get('dims') != embedding_dims():
+            raise ValueError(f"Incompatible choreo index in {self.index_dir}; rebuild it")
+
+        self.params = header['params']
+        self.songs: List[Dict] = header['songs']
+        self.embeddings = np.load(self.index_dir / 'embeddings.npy', mmap_mode='r')
+        self.codes = np.load(self.index_dir / 'lsh.npy')
+        with np.load(self.index_dir / 'windows.npz') as windows:
+            self.song = windows['song']
+            self.start = windows['start']
+            self.end = windows['end']
+
+        lsh = header['lsh']
+        self._tables = lsh['tables']
+        self._planes = lsh_planes(header['dims'], lsh['tables'], lsh['bits'], lsh['seed'])
+        # Rows sorted by bucket per table: a bucket lookup is two binary searches
+        self._bucket_rows = np.argsort(self.codes.T, axis=1, kind='stable')
+        self._bucket_codes = np.take_along_axis(self.codes.T, self._bucket_rows, axis=1)
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def song_number(self, song: str) -> int:
+        """
+        Look a song up by file name, stem or songId.
+
+        Raises:
+            KeyError: If the song isn't indexed
+        """
+        for number, entry in enumerate(self.songs):
+            if song in (entry['file'], Path(entry['file']).stem, entry['songId']):
+                return number
+        raise KeyError(f"Song not in index: {song}")
+
+    def window_at(self, song: str, time_seconds: float) -> int:
+        """
+        Row of the window of a song whose centre is closest to a time.
+
+        Raises:
+            KeyError: If the song isn't indexed or has no windows
+        """
+        first, last = self.songs[self.song_number(song)]['rows']
+        if first == last:
+            raise KeyError(f"No indexed windows for {song}")
+        centres = (self.start[first:last] + self.end[first:last]) / 2
+        return first + int(np.argmin(np.abs(centres - time_seconds)))
+
+    def candidates(self, vector: np.ndarray) -> np.ndarray:
+        """Rows sharing a SimHash bucket with vector in at least one table."""
+        query = lsh_codes(vector, self._planes, self._tables)[0]
+        rows = []
+        for table, code in enumerate(query):
+            first = np.searchsorted(self._bucket_codes[table], code, side='left')
+            last = np.searchsorted(self._bucket_codes[table], code, side='right')
+            rows.append(self._bucket_rows[table, first:last])
+        return np.unique(np.concatenate(rows))
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 10,
+        approximate: bool = False,
+        exclude_song: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Nearest windows by cosine similarity.
+
+        Args:
+            vector: Query embedding [D]
+            k: Number of results
+            approximate: Score only the LSH candidates (falls back to exact
+                search when there are fewer than k)
+            exclude_song: Song number whose windows are left out
+
+        Returns:
+            Result dicts (row, song, songId, start, end, similarity), best first
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        rows = None
+        if approximate:
+            rows = self.candidates(vector)
+            if exclude_song is not None:
+                rows = rows[self.song[rows] != exclude_song]
+            if len(rows) < k:
+                rows = None
+
+        if rows is None:
+            similarity = np.asarray(self.embeddings @ vector)
+            if exclude_song is not None:
+                similarity = np.where(self.song == exclude_song, -np.inf, similarity)
+            rows = np.arange(len(similarity))
+        else:
+            similarity = np.asarray(self.embeddings[rows] @ vector)
+
+        k = min(k, int(np.isfinite(similarity).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-similarity, k - 1)[:k]
+        top = top[np.argsort(-similarity[top])]
+        return [self._result(int(rows[i]), float(similarity[i])) for i in top]
+
+    def _result(self, row: int, similarity: float) -> Dict:
+        song = self.songs[self.song[row]]
+        return {
+            'row': row,
+            'song': song['file'],
+            'songId': song['songId'],
+            'start': round(float(self.start[row]), 3),
+            'end': round(float(self.end[row]), 3),
+            'similarity': round(similarity, 4),
+        }
+
+    def find_move(
+        self,
+        song: str,
+        time_seconds: float,
+        k: int = 10,
+        approximate: bool = False,
+        other_songs: bool = False
+    ) -> List[Dict]:
+        """
+        Places in the catalog with the move danced at a given time.
+
+        Args:
+            song: Song containing the move
+            time_seconds: Time of the move
+            k: Number of results
+            approximate: Use the LSH index
+            other_songs: Leave out the query song itself
+
+        Returns:
+            Result dicts from search(), excluding the query window
+        """
+        row = self.window_at(song, time_seconds)
+        exclude = int(self.song[row]) if other_songs else None
+        results = self.search(self.embeddings[row], k + 1, approximate, exclude)
+        return [result for result in results if result['row'] != row][:k]
+
+    def similar_songs(self, song: str, k: int = 5) -> List[Dict]:
+        """
+        Songs whose moves best cover this song's moves.
+
+        For each window of the song, the best matching window in every other
+        song is found; a song's score is the mean of those best matches.
+
+        Returns:
+            Dicts (song, songId, similarity), best first
+        """
+        number = self.song_number(song)
+        first, last = self.songs[number]['rows']
+        indexed = [n for n, entry in enumerate(self.songs) if entry['rows'][1] > entry['rows'][0]]
+        others = [n for n in indexed if n != number]
+        if first == last or not others:
+            return []
+
+        similarity = np.asarray(self.embeddings[first:last]) @ np.asarray(self.embeddings).T
+        # Rows are stored song by song, so the per-song maxima are one reduceat
+        starts = [self.songs[n]['rows'][0] for n in indexed]
+        best = np.maximum.reduceat(similarity, starts, axis=1)
+        scores = best[:, [indexed.index(n) for n in others]].mean(axis=0)
+
+        order = np.argsort(-scores)[:k]
+        return [
+            {
+                'song': self.songs[others[i]]['file'],
+                'songId': self.songs[others[i]]['songId'],
+                'similarity': round(float(scores[i]), 4),
+            }
+            for i in order
+        ]
+
+
+def benchmark(index: ChoreoIndex, queries: int = 200, k: int = 10, seed: int = 0) -> Dict:
+    """
+    Exact vs approximate search on random indexed windows.
+
+    Returns:
+        Dict with per-query milliseconds for both, speedup, approximate
+        recall@k and mean candidate fraction
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), size=min(queries, len(index)), replace=False)
+    embeddings = np.asarray(index.embeddings)
+
+    started = time.perf_counter()
+    exact = [{r['row'] for r in index.search(embeddings[row], k)} for row in rows]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(rows)
+
+    started = time.perf_counter()
+    approximate = [{r['row'] for r in index.search(embeddings[row], k, approximate=True)} for row in rows]
+    approximate_ms = (time.perf_counter() - started) * 1000 / len(rows)
+
+    candidates = np.mean([len(index.candidates(embeddings[row])) / len(index) for row in rows])
+    recall = np.mean([len(a & e) / len(e) for a, e in zip(approximate, exact) if e])
+    return {
+        'queries': len(rows),
+        'windows': len(index),
+        'exactMs': round(exact_ms, 4),
+        'approximateMs': round(approximate_ms, 4),
+        'speedup': round(exact_ms / approximate_ms, 2) if approximate_ms > 0 else None,
+        'recall': round(float(recall), 4),
+        'candidateFraction': round(float(candidates), 4),
+    }
+
+
+def _print_results(results: List[Dict]) -> None:
+    for result in results:
+        print(
+            f"  {result['similarity']:.3f}  {result['songId']:<24} "
+            f"{result['start']:>7.2f}s - {result['end']:.2f}s"
+        )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Build and query the choreography embedding index')
+    parser.add_argument(
+        '--poses-dir',
+        default='../mobile/assets/poses',
+        help='Directory containing pose JSON files'
+    )
+    parser.add_argument(
+        '--index-dir',
+        default=None,
+        help='Index directory (default: <poses-dir>/choreo_index)'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build or update the index')
+    build_parser.add_argument('--bpm', type=float, default=DEFAULT_BPM, help='BPM for songs without metadata bpm')
+    build_parser.add_argument('--beats-per-window', type=int, default=BEATS_PER_WINDOW, help='Window length in beats')
+    build_parser.add_argument('--hop-beats', type=int, default=HOP_BEATS, help='Beats between windows')
+    build_parser.add_argument('--force', action='store_true', help='Re-embed every song')
+
+    move_parser = subparsers.add_parser('move', help='Find the move danced at a time elsewhere')
+    move_parser.add_argument('song', help='Song file, stem or songId')
+    move_parser.add_argument('time', type=float, help='Time of the move (seconds)')
+    move_parser.add_argument('-k', type=int, default=10, help='Number of results')
+    move_parser.add_argument('--approximate', action='store_true', help='Use the LSH index')
+    move_parser.add_argument('--other-songs', action='store_true', help='Only show other songs')
+
+    similar_parser = subparsers.add_parser('similar', help='Songs with similar moves')
+    similar_parser.add_argument('song', help='Song file, stem or songId')
+    similar_parser.add_argument('-k', type=int, default=5, help='Number of results')
+
+    bench_parser = subparsers.add_parser('bench', help='Exact vs approximate search speed and recall')
+    bench_parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    bench_parser.add_argument('-k', type=int, default=10, help='Neighbours per query')
+
+    args = parser.parse_args()
+    poses_dir = Path(args.poses_dir)
+    index_dir = Path(args.index_dir) if args.index_dir else poses_dir / 'choreo_index'
+
+    if args.command == 'build':
+        if not poses_dir.exists():
+            print(f"✗ Poses directory not found: {poses_dir}")
+            return
+        started = time.perf_counter()
+        stats = build_index(poses_dir, index_dir, args.bpm, args.beats_per_window, args.hop_beats, args.force)
+        print(
+            f"✓ {index_dir}: {stats['songs']} song(s), {stats['windows']} windows "
+            f"({stats['embedded']} embedded, {stats['reused']} reused, {stats['removed']} removed) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return
+
+    try:
+        index = ChoreoIndex(index_dir)
+    except FileNotFoundError:
+        print(f"✗ No index in {index_dir}; run: uv run python choreo_index.py build")
+        return
+    except ValueError as e:
+        print(f"✗ {e}")
+        return
+
+    try:
+        if args.command == 'move':
+            results = index.find_move(args.song, args.time, args.k, args.approximate, args.other_songs)
+            print(f"Moves like {args.song} @ {args.time:.2f}s:")
+            _print_results(results)
+        elif args.command == 'similar':
+            print(f"Songs with moves like {args.song}:")
+            for result in index.similar_songs(args.song, args.k):
+                print(f"  {result['similarity']:.3f}  {result['songId']}")
+        elif args.command == 'bench':
+            if not len(index):
+                print(f"✗ No indexed windows in {index_dir}")
+                return
+            print(json.dumps(benchmark(index, args.queries, args.k), indent=2))
+    except KeyError as e:
+        print(f"✗ {e.args[0]}")
+
+
+if __name__ == '__main__':
+    main()
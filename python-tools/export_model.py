@@ -13,6 +13,7 @@ from typing import Optional
 
 # Import the lightweight model
 from create_lightweight_model import LightweightPoseModel
+from model_config import resolve_input_size
 
 
 def load_pytorch_model(model_path: str) -> torch.nn.Module:
@@ -42,7 +43,8 @@ def load_pytorch_model(model_path: str) -> torch.nn.Module:
 def export_to_executorch(
     model: torch.nn.Module,
     output_path: str,
-    quantize: bool = True
+    quantize: bool = True,
+    input_size: Optional[int] = None
 ) -> None:
     """
     Export PyTorch model to ExecuTorch PTE format.
@@ -51,6 +53,7 @@ def export_to_executorch(
         model: PyTorch model to export
         output_path: Path to save .pte file
         quantize: Whether to apply quantization
+        input_size: Square input size (default: configured lightweight size)
     """
     print("\nExporting to ExecuTorch format...")
     
@@ -63,8 +66,9 @@ def export_to_executorch(
         print(f"  Make sure ExecuTorch is properly installed")
         return
     
-    # Create example input (192x192 RGB image)
-    example_input = (torch.randn(1, 3, 192, 192),)
+    # Create example input at the configured input size
+    input_size = resolve_input_size('lightweight', input_size)
+    example_input = (torch.randn(1, 3, input_size, input_size),)
     print(f"  Example input shape: {example_input[0].shape}")
     
     # Apply quantization if requested
@@ -124,13 +128,18 @@ def export_to_executorch(
             print(f"    Try enabling quantization with --quantize flag")
 
 
-def validate_exported_model(pte_path: str, pytorch_model: torch.nn.Module) -> bool:
+def validate_exported_model(
+    pte_path: str,
+    pytorch_model: torch.nn.Module,
+    input_size: Optional[int] = None
+) -> bool:
     """
     Validate exported ExecuTorch model against PyTorch baseline.
     
     Args:
         pte_path: Path to exported .pte file
         pytorch_model: Original PyTorch model
+        input_size: Square input size the model was exported with
         
     Returns:
         True if validation passes, False otherwise
@@ -158,7 +167,8 @@ def validate_exported_model(pte_path: str, pytorch_model: torch.nn.Module) -> bo
         print("✓ ExecuTorch model loaded successfully")
         
         # Create test input
-        test_input = torch.randn(1, 3, 192, 192)
+        input_size = resolve_input_size('lightweight', input_size)
+        test_input = torch.randn(1, 3, input_size, input_size)
         
         # Run PyTorch inference
         with torch.no_grad():
@@ -221,6 +231,12 @@ def main():
         default=True,
         help="Validate exported model (default: True)"
     )
+    parser.add_argument(
+        "--imgsz",
+        type=int,
+        default=None,
+        help="Input size (default: models/input_size.json or 192)"
+    )
     
     args = parser.parse_args()
     
@@ -232,11 +248,11 @@ def main():
     model = load_pytorch_model(args.model)
     
     # Export to ExecuTorch
-    export_to_executorch(model, args.output, args.quantize)
+    export_to_executorch(model, args.output, args.quantize, args.imgsz)
     
     # Validate if requested
     if args.validate and Path(args.output).exists():
-        validate_exported_model(args.output, model)
+        validate_exported_model(args.output, model, args.imgsz)
     
     print("\n" + "=" * 60)
     print("Export complete!")
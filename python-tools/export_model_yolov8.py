@@ -6,7 +6,8 @@ This script exports YOLOv8s-pose to ExecuTorch's portable format (.pte)
 for mobile deployment in React Native.
 
 The exported model:
-- Input: [1, 3, 256, 256] RGB tensor normalized to [0, 1]
+- Input: [1, 3, S, S] RGB tensor normalized to [0, 1], where S is the
+  configured YOLOv8 input size (256 unless overridden, see model_config.py)
 - Output: [1, 17, 3] keypoints tensor (x, y, confidence)
 """
 
@@ -16,6 +17,8 @@ import torch.nn as nn
 from pathlib import Path
 from typing import Optional
 
+from model_config import resolve_input_size
+
 
 class YOLOv8PoseForExport(nn.Module):
     """
@@ -25,12 +28,14 @@ class YOLOv8PoseForExport(nn.Module):
     making it compatible with ExecuTorch's static shape requirements.
     """
     
-    INPUT_SIZE = 256
+    INPUT_SIZE = resolve_input_size('yolov8')
     NUM_KEYPOINTS = 17
     
-    def __init__(self):
+    def __init__(self, input_size: Optional[int] = None):
         super().__init__()
         
+        self.input_size = resolve_input_size('yolov8', input_size)
+        
         from ultralytics import YOLO
         
         # Load pretrained YOLOv8s-pose
@@ -52,7 +57,7 @@ class YOLOv8PoseForExport(nn.Module):
         Forward pass with simplified output.
         
         Args:
-            x: Input tensor [B, 3, 256, 256]
+            x: Input tensor [B, 3, input_size, input_size]
             
         Returns:
             Keypoints tensor [B, 17, 3]
@@ -88,8 +93,8 @@ class YOLOv8PoseForExport(nn.Module):
         
         # Normalize x, y coordinates to [0, 1]
         kpts_normalized = kpts.clone()
-        kpts_normalized[:, :, 0] = kpts[:, :, 0] / self.INPUT_SIZE  # x
-        kpts_normalized[:, :, 1] = kpts[:, :, 1] / self.INPUT_SIZE  # y
+        kpts_normalized[:, :, 0] = kpts[:, :, 0] / self.input_size  # x
+        kpts_normalized[:, :, 1] = kpts[:, :, 1] / self.input_size  # y
         # confidence (index 2) is already normalized
         
         # Clamp to valid range
@@ -101,7 +106,8 @@ class YOLOv8PoseForExport(nn.Module):
 def export_to_executorch(
     output_path: str = "models/yolov8s_pose.pte",
     quantize: bool = False,
-    validate: bool = True
+    validate: bool = True,
+    input_size: Optional[int] = None
 ) -> None:
     """
     Export YOLOv8s-pose to ExecuTorch format.
@@ -110,17 +116,18 @@ def export_to_executorch(
         output_path: Path to save .pte file
         quantize: Whether to apply INT8 quantization
         validate: Whether to validate the exported model
+        input_size: Square input size (default: configured YOLOv8 size)
     """
     print("=" * 60)
     print("YOLOv8s-pose ExecuTorch Export")
     print("=" * 60)
     
     # Create model
-    model = YOLOv8PoseForExport()
+    model = YOLOv8PoseForExport(input_size)
     model.eval()
     
     # Create example input
-    example_input = torch.randn(1, 3, 256, 256)
+    example_input = torch.randn(1, 3, model.input_size, model.input_size)
     print(f"\nExample input shape: {example_input.shape}")
     
     # Test PyTorch inference
@@ -284,7 +291,10 @@ def validate_exported_model(
         return False
 
 
-def export_to_onnx(output_path: str = "models/yolov8s_pose.onnx") -> None:
+def export_to_onnx(
+    output_path: str = "models/yolov8s_pose.onnx",
+    input_size: Optional[int] = None
+) -> None:
     """
     Export YOLOv8s-pose to ONNX format (alternative export).
     
@@ -298,7 +308,7 @@ def export_to_onnx(output_path: str = "models/yolov8s_pose.onnx") -> None:
     from ultralytics import YOLO
     
     model = YOLO('yolov8s-pose.pt')
-    model.export(format='onnx', imgsz=256, simplify=True)
+    model.export(format='onnx', imgsz=resolve_input_size('yolov8', input_size), simplify=True)
     
     print(f"✓ ONNX model exported")
 
@@ -328,6 +338,12 @@ def main():
         action="store_true",
         help="Also export to ONNX format"
     )
+    parser.add_argument(
+        "--imgsz",
+        type=int,
+        default=None,
+        help="Input size (default: models/input_size.json or 256)"
+    )
     
     args = parser.parse_args()
     
@@ -335,12 +351,13 @@ def main():
     export_to_executorch(
         output_path=args.output,
         quantize=args.quantize,
-        validate=not args.no_validate
+        validate=not args.no_validate,
+        input_size=args.imgsz
     )
     
     # Optionally export to ONNX
     if args.onnx:
-        export_to_onnx()
+        export_to_onnx(input_size=args.imgsz)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Model input size configuration shared by extraction and export.
+
+The YOLOv8 wrapper and export modules hard-coded 256 and the lightweight
+path 192; the reference extraction (YOLOv8PoseDetector) passed no size, so
+ultralytics ran it at its own default of 640. The export defaults live here,
+and `models/input_size.json`, which `sweep_input_size.py --apply` writes
+after picking the best speed/accuracy trade-off, overrides them.
+
+Extraction only uses a configured size (`configured_input_size`): until a
+sweep has been applied it keeps running at 640, so reference poses are not
+downgraded by a size nobody measured.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Default square input sizes per model family
+DEFAULT_INPUT_SIZES = {
+    'yolov8': 256,
+    'lightweight': 192,
+}
+
+# Size ultralytics uses when no imgsz is passed (reference extraction)
+ULTRALYTICS_DEFAULT_SIZE = 640
+
+# Written by sweep_input_size.py --apply
+INPUT_SIZE_CONFIG = Path(__file__).parent / "models" / "input_size.json"
+
+# YOLOv8 strides require input sizes that are a multiple of 32
+STRIDE = 32
+
+
+def _is_valid_size(size) -> bool:
+    return isinstance(size, int) and not isinstance(size, bool) and size > 0 and size % STRIDE == 0
+
+
+def _read_config(config_path: Path) -> Dict:
+    """Read the config JSON; a missing or unreadable file counts as empty."""
+    if not config_path.exists():
+        return {}
+    try:
+        with open(config_path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ Ignoring unreadable {config_path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        print(f"⚠ Ignoring {config_path}: expected a JSON object")
+        return {}
+    return data
+
+
+def _configured_size(data: Dict, family: str, config_path: Path) -> Optional[int]:
+    """Size saved for a family, or None (with a warning) if it is not a valid size."""
+    size = data.get(family)
+    if size is None:
+        return None
+    if not _is_valid_size(size):
+        print(f"⚠ Ignoring {family} input size {size!r} in {config_path}: "
+              f"must be a positive multiple of {STRIDE}")
+        return None
+    return size
+
+
+def load_input_sizes(config_path: Path = INPUT_SIZE_CONFIG) -> Dict[str, int]:
+    """
+    Load configured input sizes, falling back to the defaults.
+
+    A malformed config or an invalid size only prints a warning, since this
+    runs at import time in the model and training modules.
+
+    Args:
+        config_path: Path to the input size config JSON
+
+    Returns:
+        Dictionary mapping model family to square input size
+    """
+    sizes = dict(DEFAULT_INPUT_SIZES)
+    data = _read_config(config_path)
+    for family in DEFAULT_INPUT_SIZES:
+        size = _configured_size(data, family, config_path)
+        if size is not None:
+            sizes[family] = size
+    return sizes
+
+
+def resolve_input_size(family: str, override: Optional[int] = None) -> int:
+    """
+    Return the input size to use for a model family.
+
+    Args:
+        family: 'yolov8' or 'lightweight'
+        override: Explicit size (e.g. from a --imgsz flag), wins if given
+
+    Returns:
+        Square input size in pixels
+    """
+    if family not in DEFAULT_INPUT_SIZES:
+        raise ValueError(f"Unknown model family: {family}")
+
+    size = override if override is not None else load_input_sizes()[family]
+
+    if not _is_valid_size(size):
+        raise ValueError(f"Input size must be a positive multiple of {STRIDE}, got {size}")
+
+    return size
+
+
+def configured_input_size(
+    family: str,
+    override: Optional[int] = None,
+    config_path: Path = INPUT_SIZE_CONFIG
+) -> Optional[int]:
+    """
+    Return an explicitly chosen input size, without falling back to defaults.
+
+    Args:
+        family: 'yolov8' or 'lightweight'
+        override: Explicit size (e.g. from a --imgsz flag), wins if given
+        config_path: Path to the input size config JSON
+
+    Returns:
+        The override or the size saved by a sweep, or None if neither is set
+    """
+    if family not in DEFAULT_INPUT_SIZES:
+        raise ValueError(f"Unknown model family: {family}")
+
+    if override is not None:
+        return resolve_input_size(family, override)
+    return _configured_size(_read_config(config_path), family, config_path)
+
+
+def save_input_size(
+    family: str,
+    size: int,
+    details: Optional[Dict] = None,
+    config_path: Path = INPUT_SIZE_CONFIG
+) -> None:
+    """
+    Persist the chosen input size for a model family.
+
+    Args:
+        family: 'yolov8' or 'lightweight'
+        size: Chosen square input size
+        details: Optional sweep summary stored alongside the size
+        config_path: Path to the input size config JSON
+    """
+    resolve_input_size(family, size)  # validate
+
+    data = _read_config(config_path)
+    data[family] = size
+    if details is not None:
+        data.setdefault('sweeps', {})[family] = details
+
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = config_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    tmp_path.replace(config_path)
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Time-chunked pose files for loading and regenerating by segment.
+
+A full-song pose JSON has to be parsed completely before the first frame
+can be used. A chunked asset splits the same frames into fixed-duration
+files next to the song's JSON:
+
+    <songId>.chunks/
+        index.json        song header + one entry per chunk
+        chunk_0000.json   frames with 0 <= timestamp < chunk_seconds
+        chunk_0001.json   ...
+
+Each chunk file is valid JSON on its own (so the app can require it) and
+keeps one frame per line. The index stores, per chunk, its time range,
+first frame and frame count plus the byte offset of every seekStep-th
+frame line, so load_segment() reads only the lines covering [t0, t1).
+
+regenerate_segment() re-runs pose detection for the chunks overlapping a
+time range (e.g. after a video edit) and rewrites just those chunks and
+the index. Edits that shift the timing of later footage still need a
+full extraction.
+
+Usage:
+    uv run python pose_chunks.py split ../mobile/assets/poses/30minutos.json
+    uv run python pose_chunks.py segment ../mobile/assets/poses/30minutos.chunks 60 70
+    uv run python pose_chunks.py regenerate ../songs/30minutos.mp4 \\
+        ../mobile/assets/poses/30minutos.chunks --start 60 --end 70
+"""
+
+import argparse
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+
+
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 1
+
+DEFAULT_CHUNK_SECONDS = 10.0
+
+# Seconds between byte offsets stored in the index
+SEEK_SECONDS = 1.0
+
+
+def chunks_dir_for(pose_file: Union[str, Path]) -> Path:
+    """<stem>.chunks directory next to a pose JSON file."""
+    return Path(pose_file).with_suffix('.chunks')
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _encode_chunk(sequence: PoseSequence, number: int, start: float, end: float, seek_step: int) -> Dict:
+    """
+    Encode one chunk file.
+
+    Returns:
+        Dict with the file bytes ('data') and its index entry ('entry')
+    """
+    header = json.dumps({'songId': sequence.song_id, 'chunk': number, 'start': start, 'end': end})
+    parts = [header[:-1].encode() + b', "frames": [\n']
+    offset = len(parts[0])
+    offsets = []
+
+    frames = sequence.to_frames()
+    for i, frame in enumerate(frames):
+        if i % seek_step == 0:
+            offsets.append(offset)
+        line = json.dumps(frame, separators=(',', ':')).encode()
+        line += b',\n' if i < len(frames) - 1 else b'\n'
+        parts.append(line)
+        offset += len(line)
+    parts.append(b']}\n')
+
+    data = b''.join(parts)
+    return {
+        'data': data,
+        'entry': {
+            'file': f"chunk_{number:04d}.json",
+            'start': start,
+            'end': end,
+            'firstFrame': int(sequence.frame_numbers[0]) if len(sequence) else None,
+            'frameCount': len(sequence),
+            'bytes': len(data),
+            'offsets': offsets,
+        },
+    }
+
+
+def _write_index(chunks_dir: Path, index: Dict) -> None:
+    chunks = index['chunks']
+    index['totalFrames'] = sum(chunk['frameCount'] for chunk in chunks)
+    index['duration'] = chunks[-1]['end'] if chunks else 0.0
+    _atomic_write(chunks_dir / INDEX_NAME, json.dumps(index, indent=2).encode())
+
+
+def write_chunks(
+    sequence: PoseSequence,
+    chunks_dir: Union[str, Path],
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS
+) -> Dict:
+    """
+    Split a sequence into chunk files plus index.json.
+
+    Chunk files are written before the index, each via temp file + rename;
+    chunk files left over from a previous, longer split are removed.
+
+    Args:
+        sequence: Poses for the whole song
+        chunks_dir: Output directory (usually chunks_dir_for(pose_file))
+        chunk_seconds: Duration of each chunk
+
+    Returns:
+        The index
+    """
+    if chunk_seconds <= 0:
+        raise ValueError(f"chunk_seconds must be positive, got {chunk_seconds}")
+
+    chunks_dir = Path(chunks_dir)
+    chunks_dir.mkdir(parents=True, exist_ok=True)
+
+    seek_step = max(1, round(sequence.fps * SEEK_SECONDS))
+    chunk_count = max(1, math.ceil(sequence.duration / chunk_seconds - 1e-9))
+
+    entries = []
+    for number in range(chunk_count):
+        start = round(number * chunk_seconds, 6)
+        end = round((number + 1) * chunk_seconds, 6) if number < chunk_count - 1 else round(sequence.duration, 6)
+        # The last chunk takes everything left, however the timestamps round
+        chunk = sequence.slice_time(start, end if number < chunk_count - 1 else math.inf)
+        encoded = _encode_chunk(chunk, number, start, end, seek_step)
+        _atomic_write(chunks_dir / encoded['entry']['file'], encoded['data'])
+        entries.append(encoded['entry'])
+
+    index = {
+        'version': INDEX_VERSION,
+        'songId': sequence.song_id,
+        'fps': sequence.fps,
+        'chunkSeconds': chunk_seconds,
+        'seekStep': seek_step,
+        'metadata': sequence.metadata,
+        'chunks': entries,
+    }
+    _write_index(chunks_dir, index)
+
+    current = {entry['file'] for entry in entries}
+    for stale in chunks_dir.glob('chunk_*.json'):
+        if stale.name not in current:
+            stale.unlink()
+
+    return index
+
+
+class ChunkedPoses:
+    """Reader for a <songId>.chunks directory."""
+
+    def __init__(self, chunks_dir: Union[str, Path]):
+        self.chunks_dir = Path(chunks_dir)
+        with open(self.chunks_dir / INDEX_NAME, 'r') as f:
+            self.index = json.load(f)
+        if self.index.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported chunk index version: {self.index.get('version')}")
+
+    @property
+    def song_id(self) -> str:
+        return self.index['songId']
+
+    @property
+    def fps(self) -> float:
+        return self.index['fps']
+
+    @property
+    def duration(self) -> float:
+        return self.index['duration']
+
+    def chunks_for(self, t0: float, t1: float) -> List[Dict]:
+        """Index entries of the chunks overlapping [t0, t1)."""
+        return [chunk for chunk in self.index['chunks'] if chunk['start'] < t1 and chunk['end'] > t0]
+
+    def _iter_frames(self, chunk: Dict, t0: float, t1: float) -> Iterator[Dict]:
+        offsets = chunk['offsets']
+        if not offsets:
+            return
+
+        # Start at the last stored offset before t0
+        estimate = int(max(t0 - chunk['start'], 0.0) * self.fps) // self.index['seekStep']
+        k = min(max(estimate, 0), len(offsets) - 1)
+
+        with open(self.chunks_dir / chunk['file'], 'rb') as f:
+            while True:
+                f.seek(offsets[k])
+                line = f.readline()
+                first = json.loads(line.rstrip(b'\n').rstrip(b','))
+                if first['timestamp'] <= t0 or k == 0:
+                    break
+                k -= 1  # timestamps not on the fps grid: step back
+
+            frame = first
+            while True:
+                if frame['timestamp'] >= t1:
+                    return
+                if frame['timestamp'] >= t0:
+                    yield frame
+                line = f.readline()
+                if not line.startswith(b'{'):
+                    return  # closing "]}"
+                frame = json.loads(line.rstrip(b'\n').rstrip(b','))
+
+    def load_segment(self, t0: float, t1: float) -> PoseSequence:
+        """
+        Load the frames with t0 <= timestamp < t1.
+
+        Only the chunk files overlapping the range are opened, and only
+        from the nearest stored offset before t0.
+        """
+        frames = []
+        for chunk in self.chunks_for(t0, t1):
+            frames.extend(self._iter_frames(chunk, t0, t1))
+        return PoseSequence.from_frames(frames, self.fps, self.song_id, self.index.get('metadata'))
+
+    def load_all(self) -> PoseSequence:
+        """Load every chunk."""
+        return self.load_segment(-math.inf, math.inf)
+
+
+def load_segment(chunks_dir: Union[str, Path], t0: float, t1: float) -> PoseSequence:
+    """Load the frames of a chunked pose asset with t0 <= timestamp < t1."""
+    return ChunkedPoses(chunks_dir).load_segment(t0, t1)
+
+
+def regenerate_segment(
+    video_path: str,
+    chunks_dir: Union[str, Path],
+    t0: float,
+    t1: float,
+    model_name: str = 'yolov8s-pose.pt',
+    device: str = 'auto',
+    input_size: Optional[int] = None,
+    detector=None
+) -> List[str]:
+    """
+    Re-extract poses for the chunks overlapping [t0, t1).
+
+    The pose JSON next to the chunks directory (if any) is rebuilt from
+    the chunks afterwards so both stay in sync.
+
+    Args:
+        video_path: Edited source video (same fps as the chunked asset)
+        chunks_dir: Chunked pose asset to update
+        t0: Start of the edited range in seconds
+        t1: End of the edited range in seconds
+        model_name: YOLOv8 model name or path
+        device: Device to run on
+        input_size: Square inference size (default: configured YOLOv8 size)
+        detector: Already loaded detector to reuse
+
+    Returns:
+        Names of the rewritten chunk files
+    """
+    import cv2
+    from tqdm import tqdm
+
+    from preprocess_video_yolov8 import YOLOv8PoseDetector
+
+    chunks_dir = Path(chunks_dir)
+    chunked = ChunkedPoses(chunks_dir)
+    index = chunked.index
+    affected = chunked.chunks_for(t0, t1)
+    if not affected:
+        raise ValueError(f"No chunks overlap {t0}-{t1}s (asset is {chunked.duration:.1f}s)")
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if abs(fps - chunked.fps) > 1e-3:
+        cap.release()
+        raise ValueError(f"Video is {fps} fps but the pose asset is {chunked.fps} fps; run a full extraction")
+
+    if detector is None:
+        detector = YOLOv8PoseDetector(model_name, device, input_size)
+
+    last_chunk = index['chunks'][-1]['file']
+    rewritten = []
+    position = 0  # index of the next frame the capture returns
+
+    try:
+        for chunk in affected:
+            number = index['chunks'].index(chunk)
+            first = round(chunk['start'] * fps)
+            # The last chunk runs to the end of the (possibly longer) video
+            end_frame = round(chunk['end'] * fps) if chunk['file'] != last_chunk else None
+
+            # CAP_PROP_POS_FRAMES can land on the nearest keyframe instead,
+            # which would shift every pose in the chunk; skip forward with
+            # grab() (no frame conversion) so frame numbers stay exact
+            while position < first and cap.grab():
+                position += 1
+
+            rows = []
+            with tqdm(desc=chunk['file'], unit='frame') as pbar:
+                while end_frame is None or first + len(rows) < end_frame:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    rows.append(detector.detect_keypoints(frame))
+                    pbar.update(1)
+            position += len(rows)
+
+            sequence = PoseSequence(
+                np.array(rows, dtype=np.float32).reshape(-1, len(KEYPOINT_NAMES), 3),
+                fps,
+                chunked.song_id,
+                frame_numbers=np.arange(first, first + len(rows), dtype=np.int32),
+                metadata=index.get('metadata')
+            )
+            chunk_end = chunk['end'] if end_frame is not None else round(sequence.duration, 6)
+            encoded = _encode_chunk(sequence, number, chunk['start'], chunk_end, index['seekStep'])
+            _atomic_write(chunks_dir / encoded['entry']['file'], encoded['data'])
+            index['chunks'][number] = encoded['entry']
+            rewritten.append(encoded['entry']['file'])
+    finally:
+        cap.release()
+
+    _write_index(chunks_dir, index)
+
+    pose_file = chunks_dir.with_suffix('.json')
+    if pose_file.exists():
+        from pose_manifest import record_pose_file
+
+        sequence = ChunkedPoses(chunks_dir).load_all()
+        sequence.to_json(pose_file)
+        record_pose_file(pose_file, sequence)
+
+    return rewritten
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Split, read and regenerate time-chunked pose files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    split = subparsers.add_parser('split', help='Chunk an existing pose JSON file')
+    split.add_argument('pose_file', help='Pose JSON file')
+    split.add_argument(
+        '--chunk-seconds',
+        type=float,
+        default=DEFAULT_CHUNK_SECONDS,
+        help=f'Chunk duration (default: {DEFAULT_CHUNK_SECONDS:g})'
+    )
+
+    segment = subparsers.add_parser('segment', help='Load a time range and print a summary')
+    segment.add_argument('chunks_dir', help='<songId>.chunks directory')
+    segment.add_argument('start', type=float, help='Start time in seconds')
+    segment.add_argument('end', type=float, help='End time in seconds')
+    segment.add_argument('--output', default=None, help='Write the segment as pose JSON')
+
+    regenerate = subparsers.add_parser('regenerate', help='Re-extract the chunks covering a time range')
+    regenerate.add_argument('video', help='Edited source video')
+    regenerate.add_argument('chunks_dir', help='<songId>.chunks directory')
+    regenerate.add_argument('--start', type=float, required=True, help='Start of the edit in seconds')
+    regenerate.add_argument('--end', type=float, required=True, help='End of the edit in seconds')
+    regenerate.add_argument('--model', default='yolov8s-pose.pt', help='YOLOv8 model name or path')
+    regenerate.add_argument(
+        '--device',
+        default='auto',
+        choices=['auto', 'cpu', 'cuda', 'mps'],
+        help='Device to run inference on'
+    )
+    regenerate.add_argument('--imgsz', type=int, default=None, help='Inference input size')
+
+    args = parser.parse_args()
+
+    if args.command == 'split':
+        sequence = PoseSequence.from_json(args.pose_file)
+        chunks_dir = chunks_dir_for(args.pose_file)
+        index = write_chunks(sequence, chunks_dir, args.chunk_seconds)
+        print(f"✓ {len(index['chunks'])} chunk(s) of {args.chunk_seconds:g}s written to {chunks_dir}")
+
+    elif args.command == 'segment':
+        sequence = load_segment(args.chunks_dir, args.start, args.end)
+        print(f"✓ {len(sequence)} frames between {args.start:g}s and {args.end:g}s")
+        if args.output:
+            sequence.to_json(args.output)
+            print(f"✓ Segment saved to {args.output}")
+
+    elif args.command == 'regenerate':
+        rewritten = regenerate_segment(
+            args.video,
+            args.chunks_dir,
+            args.start,
+            args.end,
+            model_name=args.model,
+            device=args.device,
+            input_size=args.imgsz
+        )
+        print(f"✓ Regenerated {', '.join(rewritten)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Quantized, delta-encoded pose export (.posez) for the mobile bundle.
+
+The JSON pose assets spell out every keypoint and angle as text and
+dominate the app bundle. A .posez file stores only what the angles are
+computed from:
+
+- x/y quantized to uint16 over XY_RANGE (normalized coordinates can sit
+  slightly outside [0, 1])
+- confidence quantized to uint8, rounded to nearest but kept on the same
+  side of zero and of JOINT_CONFIDENCE_THRESHOLD, so a keypoint that was
+  seen never decodes as unseen and scoring gates the same joints
+- each keypoint's track delta-encoded over time with wraparound, split
+  into byte planes and zlib-compressed
+
+Angles and angle confidences are recomputed from the decoded keypoints
+(pose_sequence.compute_angles), so check_accuracy() compares them to the
+original angles.
+
+Layout: magic, uint32 version, uint32 header length, JSON header, then
+the zlib stream. The header lists the sections of the decompressed data.
+
+Usage:
+    uv run python pose_codec.py encode ../mobile/assets/poses --report posez_report.json
+    uv run python pose_codec.py decode ../mobile/assets/poses/30minutos.posez 30minutos.json
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+from score_engine import JOINT_CONFIDENCE_THRESHOLD
+
+
+POSEZ_MAGIC = b'POSZ'
+POSEZ_VERSION = 1
+
+# Quantization range for normalized x/y
+XY_RANGE = (-0.5, 1.5)
+XY_LEVELS = 65535
+CONFIDENCE_LEVELS = 255
+# Lowest quantized confidence that decodes at or above the scoring threshold
+CONFIDENCE_THRESHOLD_LEVEL = math.ceil(JOINT_CONFIDENCE_THRESHOLD * CONFIDENCE_LEVELS)
+
+ZLIB_LEVEL = 9
+
+# Default accuracy gate for encode --check
+MAX_ANGLE_ERROR = 1.0
+
+
+def _delta(values: np.ndarray) -> np.ndarray:
+    """Differences along axis 0; unsigned dtypes wrap around."""
+    deltas = values.copy()
+    deltas[1:] -= values[:-1]
+    return deltas
+
+
+def _undelta(deltas: np.ndarray) -> np.ndarray:
+    """Inverse of _delta() (cumulative sum in the same wrapping dtype)."""
+    return np.cumsum(deltas, axis=0, dtype=deltas.dtype)
+
+
+def _byte_planes(values: np.ndarray) -> bytes:
+    """High bytes then low bytes of a uint16 array (compresses better)."""
+    values = values.astype('<u2')
+    return (values >> 8).astype(np.uint8).tobytes() + (values & 0xFF).astype(np.uint8).tobytes()
+
+
+def _from_byte_planes(data: bytes, count: int) -> np.ndarray:
+    planes = np.frombuffer(data, dtype=np.uint8, count=2 * count).reshape(2, count).astype(np.uint16)
+    return (planes[0] << 8) | planes[1]
+
+
+def quantize(sequence: PoseSequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize keypoints.
+
+    Returns:
+        (xy uint16 [N, 17, 2], confidence uint8 [N, 17])
+    """
+    low, high = XY_RANGE
+    xy = np.clip((sequence.keypoints[:, :, :2].astype(np.float64) - low) / (high - low), 0.0, 1.0)
+    xy = np.rint(xy * XY_LEVELS).astype(np.uint16)
+    confidence = np.clip(sequence.keypoints[:, :, 2].astype(np.float64), 0.0, 1.0)
+    levels = np.rint(confidence * CONFIDENCE_LEVELS)
+    levels = np.where(confidence > 0, np.maximum(levels, 1), 0)
+    levels = np.where(
+        confidence >= JOINT_CONFIDENCE_THRESHOLD,
+        np.maximum(levels, CONFIDENCE_THRESHOLD_LEVEL),
+        np.minimum(levels, CONFIDENCE_THRESHOLD_LEVEL - 1),
+    )
+    return xy, levels.astype(np.uint8)
+
+
+def dequantize(xy: np.ndarray, confidence: np.ndarray) -> np.ndarray:
+    """Inverse of quantize(): keypoints float32 [N, 17, 3]."""
+    low, high = XY_RANGE
+    keypoints = np.empty(xy.shape[:2] + (3,), dtype=np.float32)
+    keypoints[:, :, :2] = xy.astype(np.float64) / XY_LEVELS * (high - low) + low
+    keypoints[:, :, 2] = confidence.astype(np.float64) / CONFIDENCE_LEVELS
+    return keypoints
+
+
+def encode(sequence: PoseSequence) -> bytes:
+    """
+    Encode a sequence as .posez bytes.
+
+    Args:
+        sequence: Poses to encode
+
+    Returns:
+        File contents
+    """
+    n = len(sequence)
+    xy, confidence = quantize(sequence)
+
+    # Time runs along the last axis so each keypoint's track is contiguous
+    sections = {
+        'xy': _byte_planes(_delta(xy).transpose(1, 2, 0)),
+        'confidence': _delta(confidence).T.tobytes(),
+    }
+
+    # Frame numbers and timestamps are usually 0..N-1 and frame / fps
+    frame_numbers = 'range'
+    if not np.array_equal(sequence.frame_numbers, np.arange(n)):
+        frame_numbers = 'delta'
+        sections['frameNumbers'] = _delta(sequence.frame_numbers.astype('<i4')).tobytes()
+
+    timestamps = 'grid'
+    if sequence.fps <= 0 or not np.allclose(sequence.timestamps, sequence.frame_numbers / sequence.fps,
+                                            rtol=0.0, atol=1e-9):
+        timestamps = 'float64'
+        sections['timestamps'] = sequence.timestamps.astype('<f8').tobytes()
+
+    header = json.dumps({
+        'songId': sequence.song_id,
+        'fps': sequence.fps,
+        'frameCount': n,
+        'metadata': sequence.metadata,
+        'xyRange': list(XY_RANGE),
+        'frameNumbers': frame_numbers,
+        'timestamps': timestamps,
+        'sections': {name: len(data) for name, data in sections.items()},
+    }).encode('utf-8')
+
+    return b''.join([
+        POSEZ_MAGIC,
+        np.array([POSEZ_VERSION, len(header)], dtype='<u4').tobytes(),
+        header,
+        zlib.compress(b''.join(sections.values()), ZLIB_LEVEL),
+    ])
+
+
+def decode(data: bytes) -> PoseSequence:
+    """
+    Decode .posez bytes.
+
+    Raises:
+        ValueError: If the data is not a supported .posez file
+    """
+    if data[:len(POSEZ_MAGIC)] != POSEZ_MAGIC:
+        raise ValueError("Not a .posez file")
+    version, header_len = np.frombuffer(data, dtype='<u4', count=2, offset=len(POSEZ_MAGIC))
+    if version != POSEZ_VERSION:
+        raise ValueError(f"Unsupported .posez version {version}")
+    start = len(POSEZ_MAGIC) + 8
+    header = json.loads(data[start:start + int(header_len)])
+    if tuple(header['xyRange']) != XY_RANGE:
+        raise ValueError(f"Unsupported xyRange {header['xyRange']}")
+
+    payload = zlib.decompress(data[start + int(header_len):])
+    sections = {}
+    offset = 0
+    for name, length in header['sections'].items():
+        sections[name] = payload[offset:offset + length]
+        offset += length
+
+    n = header['frameCount']
+    k = len(KEYPOINT_NAMES)
+    xy = _undelta(_from_byte_planes(sections['xy'], n * k * 2).reshape(k, 2, n).transpose(2, 0, 1))
+    confidence = _undelta(np.frombuffer(sections['confidence'], dtype=np.uint8).reshape(k, n).T)
+
+    if header['frameNumbers'] == 'range':
+        frame_numbers = np.arange(n, dtype=np.int32)
+    else:
+        frame_numbers = _undelta(np.frombuffer(sections['frameNumbers'], dtype='<i4'))
+
+    timestamps = None
+    if header['timestamps'] == 'float64':
+        timestamps = np.frombuffer(sections['timestamps'], dtype='<f8')
+
+    return PoseSequence(
+        dequantize(xy, confidence),
+        header['fps'],
+        header['songId'],
+        timestamps=timestamps,
+        frame_numbers=frame_numbers,
+        metadata=header['metadata']
+    )
+
+
+def save_posez(sequence: PoseSequence, path: Union[str, Path]) -> int:
+    """Write a .posez file atomically; returns its size in bytes."""
+    path = Path(path)
+    data = encode(sequence)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return len(data)
+
+
+def load_posez(path: Union[str, Path]) -> PoseSequence:
+    """Read a .posez file."""
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+
+def check_accuracy(original: PoseSequence, decoded: PoseSequence) -> Dict:
+    """
+    Compare a decoded sequence with the original.
+
+    Angles are compared where the original angle confidence is non-zero;
+    confidenceFlips counts angles that switched between zero and non-zero
+    confidence, thresholdFlips those that crossed JOINT_CONFIDENCE_THRESHOLD
+    (either would change which joints scoring uses).
+
+    Returns:
+        Dict with maxAngleError, meanAngleError, p99AngleError (degrees),
+        maxKeypointError, maxConfidenceError, confidenceFlips and
+        thresholdFlips
+    """
+    if len(original) != len(decoded):
+        raise ValueError(f"Frame count changed: {len(original)} -> {len(decoded)}")
+
+    seen = original.angle_confidence > 0
+    angle_error = np.abs(decoded.angles - original.angles)[seen]
+    keypoint_error = np.abs(decoded.keypoints - original.keypoints)
+
+    return {
+        'maxAngleError': float(angle_error.max()) if angle_error.size else 0.0,
+        'meanAngleError': float(angle_error.mean()) if angle_error.size else 0.0,
+        'p99AngleError': float(np.percentile(angle_error, 99)) if angle_error.size else 0.0,
+        'maxKeypointError': float(keypoint_error[:, :, :2].max()) if keypoint_error.size else 0.0,
+        'maxConfidenceError': float(keypoint_error[:, :, 2].max()) if keypoint_error.size else 0.0,
+        'confidenceFlips': int((seen != (decoded.angle_confidence > 0)).sum()),
+        'thresholdFlips': int((
+            (original.angle_confidence >= JOINT_CONFIDENCE_THRESHOLD)
+            != (decoded.angle_confidence >= JOINT_CONFIDENCE_THRESHOLD)
+        ).sum()),
+    }
+
+
+def encode_file(json_path: Path, output_dir: Path, check: bool = True) -> Dict:
+    """
+    Encode one pose JSON file and measure it.
+
+    Returns:
+        Report entry with byte sizes (JSON, gzipped JSON, .posez) and,
+        if check is set, the accuracy of the decoded file
+    """
+    sequence = PoseSequence.from_json(json_path)
+    posez_path = output_dir / f"{json_path.stem}.posez"
+    posez_bytes = save_posez(sequence, posez_path)
+
+    json_bytes = json_path.stat().st_size
+    with open(json_path, 'rb') as f:
+        gzip_bytes = len(gzip.compress(f.read(), compresslevel=9))
+
+    entry = {
+        'file': json_path.name,
+        'output': str(posez_path),
+        'frames': len(sequence),
+        'jsonBytes': json_bytes,
+        'jsonGzipBytes': gzip_bytes,
+        'posezBytes': posez_bytes,
+        'ratio': round(json_bytes / posez_bytes, 1) if posez_bytes else 0.0,
+        'bytesPerFrame': round(posez_bytes / len(sequence), 1) if len(sequence) else 0.0,
+    }
+    if check:
+        entry['accuracy'] = check_accuracy(sequence, load_posez(posez_path))
+    return entry
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Export pose JSON files as quantized .posez files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    encode_parser = subparsers.add_parser('encode', help='Encode pose JSON files')
+    encode_parser.add_argument('path', help='Pose JSON file or directory')
+    encode_parser.add_argument(
+        '--output-dir',
+        default=None,
+        help='Where to write .posez files (default: next to the JSON)'
+    )
+    encode_parser.add_argument(
+        '--max-angle-error',
+        type=float,
+        default=MAX_ANGLE_ERROR,
+        help=f'Fail if any decoded angle is off by more degrees (default: {MAX_ANGLE_ERROR:g})'
+    )
+    encode_parser.add_argument(
+        '--no-check',
+        action='store_true',
+        help='Skip the decode accuracy check'
+    )
+    encode_parser.add_argument('--report', default=None, help='Write a JSON size/accuracy report')
+
+    decode_parser = subparsers.add_parser('decode', help='Decode a .posez file back to pose JSON')
+    decode_parser.add_argument('posez', help='.posez file')
+    decode_parser.add_argument('output', help='Pose JSON output path')
+
+    args = parser.parse_args()
+
+    if args.command == 'decode':
+        sequence = load_posez(args.posez)
+        sequence.to_json(args.output)
+        print(f"✓ Decoded {len(sequence)} frames to {args.output}")
+        return
+
+    from pose_manifest import iter_pose_files
+
+    path = Path(args.path)
+    json_files: List[Path] = iter_pose_files(path) if path.is_dir() else [path]
+    if not json_files:
+        print(f"No pose files found in {path}")
+        return
+
+    entries = []
+    failed = False
+    print(f"{'File':<28} {'Frames':>7} {'JSON':>10} {'JSON.gz':>10} {'posez':>10} {'Ratio':>7} {'Max err':>8}")
+    for json_file in json_files:
+        output_dir = Path(args.output_dir) if args.output_dir else json_file.parent
+        entry = encode_file(json_file, output_dir, check=not args.no_check)
+        entries.append(entry)
+
+        accuracy = entry.get('accuracy', {})
+        max_error = accuracy.get('maxAngleError')
+        status = ''
+        if max_error is not None and max_error > args.max_angle_error:
+            status = '  ✗ exceeds --max-angle-error'
+            failed = True
+        elif accuracy.get('confidenceFlips') or accuracy.get('thresholdFlips'):
+            status = '  ✗ confidence gating changed'
+            failed = True
+        print(
+            f"{entry['file']:<28} {entry['frames']:>7} {entry['jsonBytes']:>10,} "
+            f"{entry['jsonGzipBytes']:>10,} {entry['posezBytes']:>10,} {entry['ratio']:>6}x "
+            + (f"{max_error:>7.3f}°" if max_error is not None else f"{'-':>8}") + status
+        )
+
+    total_json = sum(e['jsonBytes'] for e in entries)
+    total_posez = sum(e['posezBytes'] for e in entries)
+    print(f"\nTotal: {total_json:,} bytes JSON -> {total_posez:,} bytes posez")
+
+    if args.report:
+        report_file = Path(args.report)
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, 'w') as f:
+            json.dump({
+                'xyRange': list(XY_RANGE),
+                'maxAngleErrorLimit': args.max_angle_error,
+                'totalJsonBytes': total_json,
+                'totalPosezBytes': total_posez,
+                'files': entries,
+            }, f, indent=2)
+        print(f"Report saved to {report_file}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
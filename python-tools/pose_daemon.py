@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Persistent pose extraction daemon for Bachata Bro.
+
+Every run of preprocess_video_yolov8.py, regenerate_poses.py or
+visualize_tracking.py used to pay the torch/ultralytics import and the
+YOLOv8 model load, which for a short clip takes longer than inference.
+This daemon keeps models hot and runs jobs submitted over a Unix socket
+one at a time, streaming progress back to the client.
+
+Protocol (one JSON object per line):
+    client -> daemon: {"type": "extract" | "visualize" | "ping" | "shutdown", ...}
+    daemon -> client: {"event": "queued", "position": n}
+                      {"event": "started"}
+                      {"event": "progress", "frame": n, "total": n}
+                      {"event": "done", ...} | {"event": "error", "message": "..."}
+
+The CLIs call submit_job() first and fall back to running locally when no
+daemon is listening, so nothing changes unless the daemon was started.
+
+Usage:
+    uv run python pose_daemon.py start --preload yolov8s-pose.pt
+    uv run python pose_daemon.py status
+    uv run python pose_daemon.py stop
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+# Socket path can be overridden so several checkouts can run their own daemon
+SOCKET_ENV = 'BACHATABRO_POSE_DAEMON'
+DEFAULT_SOCKET_PATH = '/tmp/bachatabro-pose-daemon.sock'
+
+# Detectors kept in memory, least recently used evicted first
+MAX_CACHED_MODELS = 2
+
+TERMINAL_EVENTS = ('done', 'error', 'pong', 'stopping')
+
+
+def get_socket_path(socket_path: Optional[str] = None) -> str:
+    """Return the daemon socket path (argument, then env, then default)."""
+    return socket_path or os.environ.get(SOCKET_ENV, DEFAULT_SOCKET_PATH)
+
+
+class Job:
+    """A queued request and the channel its events are streamed through."""
+
+    def __init__(self, request: Dict):
+        self.request = request
+        self.events: queue.Queue = queue.Queue()
+
+    def emit(self, event: str, **fields) -> None:
+        self.events.put({'event': event, **fields})
+
+
+class PoseWorker:
+    """Runs jobs sequentially on a single thread with a hot model cache."""
+
+    def __init__(self, max_models: int = MAX_CACHED_MODELS):
+        self.jobs: queue.Queue = queue.Queue()
+        self.max_models = max_models
+        self.detectors: OrderedDict = OrderedDict()
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.current: Optional[Dict] = None
+        self._thread = threading.Thread(target=self._run, name='pose-worker', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.jobs.put(None)
+
+    def submit(self, job: Job) -> int:
+        """Queue a job and return its position (0 = runs next)."""
+        position = self.jobs.qsize() + (1 if self.current else 0)
+        self.jobs.put(job)
+        return position
+
+    def get_detector(self, model_name: str, device: str, input_size: Optional[int]):
+        """
+        Return a loaded detector, loading it on first use.
+
+        Args:
+            model_name: YOLOv8 model name or path
+            device: Device to run on
+            input_size: Square inference size (None = configured size)
+
+        Returns:
+            YOLOv8PoseDetector instance
+        """
+        from model_config import configured_input_size
+        from preprocess_video_yolov8 import YOLOv8PoseDetector
+
+        key: Tuple = (model_name, device, configured_input_size('yolov8', input_size))
+        if key in self.detectors:
+            self.detectors.move_to_end(key)
+            return self.detectors[key]
+
+        detector = YOLOv8PoseDetector(model_name, device, input_size)
+        self.detectors[key] = detector
+        while len(self.detectors) > self.max_models:
+            self.detectors.popitem(last=False)
+        return detector
+
+    def status(self) -> Dict:
+        return {
+            'queued': self.jobs.qsize(),
+            'current': self.current,
+            'models': [list(key) for key in self.detectors],
+            'jobsCompleted': self.jobs_completed,
+            'jobsFailed': self.jobs_failed,
+        }
+
+    def _run(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+
+            request = job.request
+            self.current = {'type': request.get('type'), 'video': request.get('video')}
+            job.emit('started')
+            start = time.time()
+
+            try:
+                result = self._execute(job)
+                self.jobs_completed += 1
+                job.emit('done', seconds=time.time() - start, **result)
+            except Exception as e:
+                self.jobs_failed += 1
+                job.emit('error', message=f"{type(e).__name__}: {e}")
+            finally:
+                self.current = None
+
+    def _execute(self, job: Job) -> Dict:
+        request = job.request
+        model_name = request.get('model', 'yolov8s-pose.pt')
+        device = request.get('device', 'auto')
+        input_size = request.get('imgsz')
+
+        def progress(frame: int, total: int) -> None:
+            job.emit('progress', frame=frame, total=total)
+
+        detector = self.get_detector(model_name, device, input_size)
+
+        if request['type'] == 'extract':
+            from preprocess_video_yolov8 import extract_poses_from_video
+            extract_poses_from_video(
+                request['video'],
+                request['output'],
+                model_name=model_name,
+                device=device,
+                progress_callback=progress,
+                input_size=input_size,
+                detector=detector,
+                chunk_seconds=request.get('chunk_seconds')
+            )
+            return {'output': request['output']}
+
+        if request['type'] == 'visualize':
+            from visualize_tracking import visualize_tracking
+            visualize_tracking(
+                request['video'],
+                request['output'],
+                model_name,
+                device,
+                request.get('show_all', False),
+                headless=True,
+                model=detector.model,
+                progress_callback=progress
+            )
+            return {'output': request['output']}
+
+        raise ValueError(f"Unknown job type: {request['type']}")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one request line and streams the job's events back."""
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            self._send({'event': 'error', 'message': f"Invalid request: {e}"})
+            return
+
+        worker: PoseWorker = self.server.worker
+        request_type = request.get('type')
+
+        if request_type == 'ping':
+            self._send({'event': 'pong', 'pid': os.getpid(), **worker.status()})
+            return
+
+        if request_type == 'shutdown':
+            self._send({'event': 'stopping'})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        if request_type not in ('extract', 'visualize') or 'video' not in request:
+            self._send({'event': 'error', 'message': f"Invalid request: {request}"})
+            return
+
+        job = Job(request)
+        self._send({'event': 'queued', 'position': worker.submit(job)})
+
+        # Keep forwarding until the job finishes; if the client went away
+        # the job still runs to completion and writes its output.
+        connected = True
+        while True:
+            event = job.events.get()
+            if connected:
+                connected = self._send(event)
+            if event['event'] in TERMINAL_EVENTS:
+                return
+
+    def _send(self, event: Dict) -> bool:
+        try:
+            self.wfile.write((json.dumps(event) + '\n').encode('utf-8'))
+            self.wfile.flush()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
+
+class PoseDaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, worker: PoseWorker):
+        self.worker = worker
+        super().__init__(socket_path, _RequestHandler)
+
+
+def is_running(socket_path: Optional[str] = None) -> bool:
+    """Return True if a daemon answers on the socket."""
+    return ping(socket_path) is not None
+
+
+def ping(socket_path: Optional[str] = None) -> Optional[Dict]:
+    """Return the daemon status, or None if it is not running."""
+    try:
+        return _request({'type': 'ping'}, socket_path)
+    except (ConnectionError, RuntimeError):
+        return None
+
+
+def submit_job(
+    request: Dict,
+    socket_path: Optional[str] = None,
+    on_event: Optional[Callable[[Dict], None]] = None
+) -> Optional[Dict]:
+    """
+    Submit a job to the daemon and wait for it to finish.
+
+    Args:
+        request: Job request ({"type": "extract", "video": ..., "output": ...})
+        socket_path: Daemon socket (default: $BACHATABRO_POSE_DAEMON or /tmp)
+        on_event: Called with every event streamed back
+
+    Returns:
+        The final "done" event, or None if no daemon is running
+
+    Raises:
+        RuntimeError: If the daemon reports an error for the job
+    """
+    path = get_socket_path(socket_path)
+    if not Path(path).exists():
+        return None
+
+    try:
+        event = _request(request, path, on_event)
+    except ConnectionError:
+        return None
+
+    if event['event'] == 'error':
+        raise RuntimeError(event['message'])
+    return event
+
+
+def _request(
+    request: Dict,
+    socket_path: Optional[str] = None,
+    on_event: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """Send a request and return the terminal event."""
+    path = get_socket_path(socket_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"Pose daemon not running at {path}") from e
+
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+
+        with sock.makefile('r', encoding='utf-8') as stream:
+            for line in stream:
+                event = json.loads(line)
+                if on_event:
+                    on_event(event)
+                if event['event'] in TERMINAL_EVENTS:
+                    return event
+    finally:
+        sock.close()
+
+    raise RuntimeError("Pose daemon closed the connection before the job finished")
+
+
+class ProgressPrinter:
+    """Default on_event handler: prints queue state and a progress bar."""
+
+    def __init__(self, desc: str = "Processing frames"):
+        self.desc = desc
+        self.pbar = None
+
+    def __call__(self, event: Dict) -> None:
+        kind = event['event']
+        if kind == 'queued' and event['position'] > 0:
+            print(f"Queued behind {event['position']} job(s)...")
+        elif kind == 'progress':
+            from tqdm import tqdm
+            if self.pbar is None:
+                self.pbar = tqdm(total=event['total'], desc=self.desc, unit="frame")
+            self.pbar.update(event['frame'] - self.pbar.n)
+        elif kind in TERMINAL_EVENTS and self.pbar is not None:
+            self.pbar.close()
+
+
+def submit_extract(
+    video_path: str,
+    output_path: str,
+    model_name: str = 'yolov8s-pose.pt',
+    device: str = 'auto',
+    input_size: Optional[int] = None,
+    socket_path: Optional[str] = None,
+    chunk_seconds: Optional[float] = None
+) -> bool:
+    """
+    Run extract_poses_from_video() on the daemon if one is running.
+
+    Returns:
+        True if the daemon handled the job, False if it should run locally
+    """
+    request = {
+        'type': 'extract',
+        'video': str(Path(video_path).resolve()),
+        'output': str(Path(output_path).resolve()),
+        'model': model_name,
+        'device': device,
+        'imgsz': input_size,
+        'chunk_seconds': chunk_seconds,
+    }
+    event = submit_job(request, socket_path, ProgressPrinter())
+    if event is None:
+        return False
+
+    print(f"✓ Output saved to {event['output']} (pose daemon, {event['seconds']:.1f}s)")
+    return True
+
+
+def serve(
+    socket_path: Optional[str] = None,
+    preload: Optional[str] = None,
+    device: str = 'auto',
+    input_size: Optional[int] = None
+) -> None:
+    """
+    Run the daemon in the foreground until stopped.
+
+    Args:
+        socket_path: Socket to listen on
+        preload: Optional model to load before accepting jobs
+        device: Device for the preloaded model
+        input_size: Inference size for the preloaded model
+    """
+    path = get_socket_path(socket_path)
+
+    if Path(path).exists():
+        if is_running(path):
+            print(f"✗ Pose daemon already running at {path}")
+            sys.exit(1)
+        os.unlink(path)  # stale socket from a crashed daemon
+
+    worker = PoseWorker()
+    if preload:
+        worker.get_detector(preload, device, input_size)
+
+    server = PoseDaemonServer(path, worker)
+    os.chmod(path, 0o600)
+    worker.start()
+
+    print(f"✓ Pose daemon listening on {path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        worker.stop()
+        server.server_close()
+        if Path(path).exists():
+            os.unlink(path)
+    print("✓ Pose daemon stopped")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Persistent pose extraction daemon'
+    )
+    parser.add_argument(
+        '--socket',
+        default=None,
+        help=f'Unix socket path (default: ${SOCKET_ENV} or {DEFAULT_SOCKET_PATH})'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    start_parser = subparsers.add_parser('start', help='Run the daemon in the foreground')
+    start_parser.add_argument(
+        '--preload',
+        default=None,
+        help='Model to load before accepting jobs (e.g. yolov8s-pose.pt)'
+    )
+    start_parser.add_argument(
+        '--device',
+        default='auto',
+        choices=['auto', 'cpu', 'cuda', 'mps'],
+        help='Device for the preloaded model'
+    )
+    start_parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=None,
+        help='Inference size for the preloaded model'
+    )
+    subparsers.add_parser('status', help='Show daemon status')
+    subparsers.add_parser('stop', help='Stop a running daemon')
+
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        serve(args.socket, args.preload, args.device, args.imgsz)
+    elif args.command == 'status':
+        status = ping(args.socket)
+        if status is None:
+            print(f"✗ Pose daemon not running at {get_socket_path(args.socket)}")
+            sys.exit(1)
+        print(f"✓ Pose daemon running (pid {status['pid']})")
+        print(f"  Current job: {status['current'] or 'idle'}")
+        print(f"  Queued: {status['queued']}")
+        print(f"  Loaded models: {status['models'] or 'none'}")
+        print(f"  Jobs completed: {status['jobsCompleted']} (failed: {status['jobsFailed']})")
+    elif args.command == 'stop':
+        try:
+            _request({'type': 'shutdown'}, args.socket)
+            print("✓ Pose daemon stopping")
+        except (ConnectionError, RuntimeError):
+            print(f"✗ Pose daemon not running at {get_socket_path(args.socket)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
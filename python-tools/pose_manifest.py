@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Manifest of the pose files in a poses directory.
+
+Validation, backfill and the app only need a handful of facts about each
+pose file (song, fps, frame count, model, checksum, coverage), but used to
+open and parse every file to get them. manifest.json in the poses directory
+records those facts per file and is kept up to date incrementally:
+
+- extraction records the file it just wrote (no re-parse)
+- refresh() re-scans only files whose size or mtime changed
+- tools record per-file checks (validation, backfill) against the file's
+  sha256, so "what changed since it was last validated" is a lookup
+
+Usage:
+    uv run python pose_manifest.py                     # refresh and list
+    uv run python pose_manifest.py --stale --imgsz 256 # what needs work
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+from pose_sequence import ANGLE_NAMES, KEYPOINT_NAMES, PoseSequence
+
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Other formats of the same song kept next to <stem>.json
+VARIANT_SUFFIXES = {
+    'pseq': '.pseq',
+    'chunks': '.chunks',
+    'posez': '.posez',
+}
+
+# Keypoints at or above this confidence count as detected
+DETECTION_THRESHOLD = 0.5
+
+
+def iter_pose_files(poses_dir: Union[str, Path]) -> List[Path]:
+    """
+    List the pose JSON files in a directory.
+
+    Skips the manifest itself and hidden files (temp files being written).
+    """
+    return sorted(
+        path for path in Path(poses_dir).glob('*.json')
+        if path.name != MANIFEST_NAME and not path.name.startswith('.')
+    )
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def coverage_stats(
+    keypoint_confidence: np.ndarray,
+    angle_confidence: Optional[np.ndarray]
+) -> Dict:
+    """
+    Summarize how much of a song the model actually tracked.
+
+    Args:
+        keypoint_confidence: Array [N, 17]
+        angle_confidence: Stored angle confidences [N, 8], or None if the
+            file has no angleConfidence (needs backfill)
+
+    Returns:
+        Dict with detectedFrames (fraction of frames with at least half the
+        keypoints detected), meanKeypointConfidence, angleCoverage (fraction
+        of non-zero angle confidences) and hasAngleConfidence
+    """
+    if len(keypoint_confidence) == 0:
+        return {
+            'detectedFrames': 0.0,
+            'meanKeypointConfidence': 0.0,
+            'angleCoverage': 0.0,
+            'hasAngleConfidence': angle_confidence is not None,
+        }
+
+    detected = (keypoint_confidence >= DETECTION_THRESHOLD).sum(axis=1) >= len(KEYPOINT_NAMES) / 2
+    return {
+        'detectedFrames': round(float(detected.mean()), 4),
+        'meanKeypointConfidence': round(float(keypoint_confidence.mean()), 4),
+        'angleCoverage': round(float((angle_confidence > 0).mean()), 4) if angle_confidence is not None else 0.0,
+        'hasAngleConfidence': angle_confidence is not None,
+    }
+
+
+def scan_pose_file(path: Path) -> Dict:
+    """
+    Read a pose file once (streamed) and describe it.
+
+    Returns:
+        Manifest fields that depend on the file contents
+    """
+    from pose_stream import iter_pose_file
+
+    header: Dict = {}
+    keypoint_confidence = []
+    angle_confidence = []
+    has_angle_confidence = True
+    last_timestamp = 0.0
+
+    for frame in iter_pose_file(str(path), header):
+        keypoints = frame.get('keypoints') or {}
+        keypoint_confidence.append([(keypoints.get(name) or {}).get('confidence', 0.0) for name in KEYPOINT_NAMES])
+        stored = frame.get('angleConfidence')
+        if has_angle_confidence and isinstance(stored, dict) and len(stored) == len(ANGLE_NAMES):
+            angle_confidence.append([stored[name] for name in ANGLE_NAMES])
+        else:
+            has_angle_confidence = False
+        last_timestamp = frame.get('timestamp', last_timestamp)
+
+    n = len(keypoint_confidence)
+    fps = header.get('fps', 0.0)
+    return {
+        'songId': header.get('songId', path.stem),
+        'fps': fps,
+        'totalFrames': header.get('totalFrames', n),
+        'frameCount': n,
+        'duration': round(last_timestamp + (1.0 / fps if fps and n else 0.0), 3),
+        'modelVersion': header.get('modelVersion'),
+        'inputSize': header.get('inputSize'),
+        'coverage': coverage_stats(
+            np.array(keypoint_confidence, dtype=np.float64).reshape(n, len(KEYPOINT_NAMES)),
+            np.array(angle_confidence, dtype=np.float64).reshape(n, len(ANGLE_NAMES)) if has_angle_confidence else None
+        ),
+    }
+
+
+def describe_sequence(sequence: PoseSequence) -> Dict:
+    """Manifest fields for a sequence that was just written as JSON."""
+    return {
+        'songId': sequence.song_id,
+        'fps': sequence.fps,
+        'totalFrames': len(sequence),
+        'frameCount': len(sequence),
+        'duration': round(sequence.duration, 3),
+        'modelVersion': sequence.metadata.get('modelVersion'),
+        'inputSize': sequence.metadata.get('inputSize'),
+        'coverage': coverage_stats(sequence.keypoints[:, :, 2], sequence.angle_confidence),
+    }
+
+
+class PoseManifest:
+    """
+    In-memory view of <poses_dir>/manifest.json.
+
+    Changes are kept per entry and merged into the on-disk manifest by
+    save(), under a file lock, so the extractor, the watcher and tools
+    running at the same time don't drop each other's updates.
+    """
+
+    def __init__(self, poses_dir: Union[str, Path]):
+        self.poses_dir = Path(poses_dir)
+        self.path = self.poses_dir / MANIFEST_NAME
+        self.entries: Dict[str, Dict] = self._read()
+        self._changed = set()
+        self._removed = set()
+
+    def _read(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}  # rebuilt by the next refresh()
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('files', {})
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        self.poses_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.poses_dir / f".{MANIFEST_NAME}.lock", 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """Merge this manifest's changes into the file on disk atomically."""
+        if not self._changed and not self._removed:
+            return
+
+        with self._locked():
+            entries = self._read()
+            for name in self._removed:
+                entries.pop(name, None)
+            for name in self._changed:
+                entries[name] = self.entries[name]
+            self.entries = entries
+
+            tmp_path = self.path.with_name(f".{MANIFEST_NAME}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'version': MANIFEST_VERSION,
+                    'generatedAt': datetime.now().isoformat(timespec='seconds'),
+                    'files': dict(sorted(entries.items())),
+                }, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+        self._changed.clear()
+        self._removed.clear()
+
+    def _set(self, name: str, entry: Dict) -> None:
+        self.entries[name] = entry
+        self._changed.add(name)
+        self._removed.discard(name)
+
+    def _variants(self, path: Path) -> Dict[str, str]:
+        variants = {'json': path.name}
+        for variant, suffix in VARIANT_SUFFIXES.items():
+            candidate = path.with_suffix(suffix)
+            if candidate.exists():
+                variants[variant] = candidate.name
+        return variants
+
+    def _entry(self, path: Path, contents: Dict) -> Dict:
+        stat = path.stat()
+        previous = self.entries.get(path.name, {})
+        return {
+            'file': path.name,
+            **contents,
+            'bytes': stat.st_size,
+            'mtimeNs': stat.st_mtime_ns,
+            'sha256': file_digest(path),
+            'variants': self._variants(path),
+            # Kept so tools can tell "changed since checked" from "never checked"
+            'checks': previous.get('checks', {}),
+        }
+
+    def is_current(self, path: Path) -> bool:
+        """True if the entry for this file matches its size and mtime."""
+        entry = self.entries.get(path.name)
+        if entry is None:
+            return False
+        stat = path.stat()
+        return entry.get('bytes') == stat.st_size and entry.get('mtimeNs') == stat.st_mtime_ns
+
+    def record(self, path: Union[str, Path], sequence: Optional[PoseSequence] = None) -> Dict:
+        """
+        Add or replace the entry for a pose file.
+
+        Args:
+            path: Pose JSON file
+            sequence: The sequence just written to path (skips re-reading it)
+
+        Returns:
+            The new entry
+        """
+        path = Path(path)
+        contents = describe_sequence(sequence) if sequence is not None else scan_pose_file(path)
+        entry = self._entry(path, contents)
+        self._set(path.name, entry)
+        return entry
+
+    def refresh(self, paths: Optional[List[Path]] = None) -> Tuple[int, int]:
+        """
+        Re-scan files that changed since they were recorded.
+
+        Args:
+            paths: Files to check (default: every pose file in the directory,
+                and entries whose file is gone are dropped)
+
+        Returns:
+            Tuple of (updated, removed) counts
+        """
+        updated = removed = 0
+
+        if paths is None:
+            paths = iter_pose_files(self.poses_dir)
+            present = {path.name for path in paths}
+            for name in list(self.entries):
+                if name not in present:
+                    del self.entries[name]
+                    self._removed.add(name)
+                    self._changed.discard(name)
+                    removed += 1
+
+        for path in paths:
+            path = Path(path)
+            if not path.exists():
+                continue
+            if self.is_current(path):
+                # Variants are cheap to check and can appear on their own
+                entry = self.entries[path.name]
+                variants = self._variants(path)
+                if entry.get('variants') != variants:
+                    self._set(path.name, {**entry, 'variants': variants})
+                continue
+            try:
+                self.record(path)
+            except ValueError as e:
+                # Unparseable: keep size/checksum so validation still sees it
+                self._set(path.name, self._entry(path, {'songId': path.stem, 'error': str(e)}))
+            updated += 1
+
+        return updated, removed
+
+    def record_check(self, name: str, check: str, status: str, **details) -> None:
+        """
+        Record the outcome of a per-file check against its current checksum.
+
+        Args:
+            name: Pose file name
+            check: Check name ('validation', 'backfill', ...)
+            status: Outcome, e.g. 'valid', 'invalid', 'unchanged'
+            **details: Extra fields stored with the check
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            return
+        checks = dict(entry.get('checks', {}))
+        checks[check] = {
+            'status': status,
+            'sha256': entry['sha256'],
+            'checkedAt': datetime.now().isoformat(timespec='seconds'),
+            **details,
+        }
+        self._set(name, {**entry, 'checks': checks})
+
+    def needs_check(self, check: str) -> List[Path]:
+        """Files that were never checked, or changed since they were."""
+        return [
+            self.poses_dir / name
+            for name, entry in sorted(self.entries.items())
+            if entry.get('checks', {}).get(check, {}).get('sha256') != entry.get('sha256')
+        ]
+
+    def needs_regeneration(
+        self,
+        model_version: Optional[str] = None,
+        input_size: Optional[int] = None
+    ) -> List[Tuple[str, List[str]]]:
+        """
+        Files whose contents no longer match what extraction would produce.
+
+        Args:
+            model_version: Expected modelVersion (None = don't compare)
+            input_size: Expected inputSize (None = don't compare)
+
+        Returns:
+            List of (file name, reasons)
+        """
+        stale = []
+        for name, entry in sorted(self.entries.items()):
+            reasons = []
+            if 'error' in entry:
+                reasons.append(f"unreadable: {entry['error']}")
+            if entry.get('checks', {}).get('validation', {}).get('status') == 'invalid' \
+                    and entry['checks']['validation'].get('sha256') == entry.get('sha256'):
+                reasons.append("failed validation")
+            if model_version is not None and entry.get('modelVersion') != model_version:
+                reasons.append(f"modelVersion {entry.get('modelVersion')} != {model_version}")
+            if input_size is not None and entry.get('inputSize') != input_size:
+                reasons.append(f"inputSize {entry.get('inputSize')} != {input_size}")
+            if entry.get('totalFrames') != entry.get('frameCount'):
+                reasons.append(f"{entry.get('frameCount')} frames, header says {entry.get('totalFrames')}")
+            if reasons:
+                stale.append((name, reasons))
+        return stale
+
+
+def record_pose_file(path: Union[str, Path], sequence: Optional[PoseSequence] = None) -> None:
+    """
+    Update the manifest next to a pose file that was just written.
+
+    Hidden files (temp outputs renamed into place later) are skipped; the
+    caller records the final path instead.
+    """
+    path = Path(path)
+    if path.name.startswith('.') or path.suffix != '.json':
+        return
+    manifest = PoseManifest(path.parent)
+    manifest.record(path, sequence)
+    manifest.save()
+
+
+def print_manifest(manifest: PoseManifest) -> None:
+    """Print one line per pose file."""
+    print(f"{'File':<32} {'Frames':>7} {'Duration':>9} {'MB':>7} {'Detected':>9}  Validation  Variants")
+    for name, entry in sorted(manifest.entries.items()):
+        coverage = entry.get('coverage', {})
+        validation = entry.get('checks', {}).get('validation', {})
+        if validation and validation.get('sha256') != entry.get('sha256'):
+            status = 'changed'
+        else:
+            status = validation.get('status', '-')
+        print(
+            f"{name:<32} {entry.get('frameCount', 0):>7} {entry.get('duration', 0.0):>8.1f}s "
+            f"{entry.get('bytes', 0) / 1e6:>7.2f} {coverage.get('detectedFrames', 0.0):>9.1%}  "
+            f"{status:<10}  {','.join(entry.get('variants', {}))}"
+        )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Build or show the pose file manifest')
+    parser.add_argument(
+        '--poses-dir',
+        default='../mobile/assets/poses',
+        help='Directory containing pose JSON files'
+    )
+    parser.add_argument(
+        '--stale',
+        action='store_true',
+        help='List files that need validating or regenerating'
+    )
+    parser.add_argument(
+        '--model-version',
+        default=None,
+        help='With --stale: expected modelVersion'
+    )
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=None,
+        help='With --stale: expected inputSize'
+    )
+
+    args = parser.parse_args()
+
+    poses_dir = Path(args.poses_dir)
+    if not poses_dir.exists():
+        print(f"✗ Poses directory not found: {poses_dir}")
+        return
+
+    manifest = PoseManifest(poses_dir)
+    updated, removed = manifest.refresh()
+    manifest.save()
+    print(f"✓ {manifest.path}: {len(manifest.entries)} file(s), {updated} updated, {removed} removed\n")
+
+    if not args.stale:
+        print_manifest(manifest)
+        return
+
+    to_validate = manifest.needs_check('validation')
+    print(f"Needs validation: {len(to_validate)}")
+    for path in to_validate:
+        print(f"  - {path.name}")
+
+    stale = manifest.needs_regeneration(args.model_version, args.imgsz)
+    print(f"Needs regeneration: {len(stale)}")
+    for name, reasons in stale:
+        print(f"  - {name}: {'; '.join(reasons)}")
+
+
+if __name__ == '__main__':
+    main()
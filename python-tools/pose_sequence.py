@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Shared pose data core for the python-tools.
+
+Keypoint names, the joint angle map and the angle math used to be copied
+into the extractors, the backfill script, the model wrapper and both
+validators, and every tool passed frames around as dict-of-dict. This
+module holds the single copy and a columnar PoseSequence:
+
+    keypoints         float32 [N, 17, 3]  (x, y, confidence) in KEYPOINT_NAMES order
+    angles            float64 [N, 8]      degrees, ANGLE_NAMES order
+    angle_confidence  float64 [N, 8]      min confidence of the joint's keypoints
+    timestamps        float64 [N]         seconds
+    frame_numbers     int32   [N]
+
+Sequences load from and save to the pose JSON format used by the app,
+and to a compact binary format (.pseq) that loads via mmap without
+copying. Slicing by index or time returns views, not copies.
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+# COCO keypoint names (17 keypoints)
+KEYPOINT_NAMES = [
+    'nose', 'leftEye', 'rightEye', 'leftEar', 'rightEar',
+    'leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow',
+    'leftWrist', 'rightWrist', 'leftHip', 'rightHip',
+    'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'
+]
+
+KEYPOINT_INDEX = {name: i for i, name in enumerate(KEYPOINT_NAMES)}
+
+# Joint angle -> (outer, vertex, outer) keypoints
+JOINT_MAP: Dict[str, Tuple[str, str, str]] = {
+    'leftArm': ('leftShoulder', 'leftElbow', 'leftWrist'),
+    'rightArm': ('rightShoulder', 'rightElbow', 'rightWrist'),
+    'leftThigh': ('leftHip', 'leftKnee', 'leftAnkle'),
+    'rightThigh': ('rightHip', 'rightKnee', 'rightAnkle'),
+}
+
+# Angles the app reads under a second name
+DUPLICATED_JOINTS = {
+    'leftElbow': 'leftArm',
+    'rightElbow': 'rightArm',
+    'leftLeg': 'leftThigh',
+    'rightLeg': 'rightThigh',
+}
+
+ANGLE_NAMES = [
+    'leftArm', 'rightArm', 'leftElbow', 'rightElbow',
+    'leftThigh', 'rightThigh', 'leftLeg', 'rightLeg'
+]
+
+ANGLE_INDEX = {name: i for i, name in enumerate(ANGLE_NAMES)}
+
+# Zero vector threshold - matches TypeScript ZERO_VECTOR_THRESHOLD
+EPSILON = 1e-9
+
+BINARY_MAGIC = b'PSEQ'
+BINARY_VERSION = 1
+_BINARY_ALIGN = 64
+
+
+def calculate_angle(p1: Dict, p2: Dict, p3: Dict) -> float:
+    """
+    Calculate angle between three points regardless of confidence.
+    """
+    v1 = (p1['x'] - p2['x'], p1['y'] - p2['y'])
+    v2 = (p3['x'] - p2['x'], p3['y'] - p2['y'])
+
+    norm1 = math.hypot(*v1)
+    norm2 = math.hypot(*v2)
+    # Use threshold to avoid floating-point comparison issues
+    if norm1 <= EPSILON or norm2 <= EPSILON:
+        return 0.0
+
+    cos_angle = (v1[0] * v2[0] + v1[1] * v2[1]) / (norm1 * norm2)
+    return math.degrees(math.acos(max(-1.0, min(1.0, cos_angle))))
+
+
+def joint_confidence(points: Iterable[Dict]) -> float:
+    """
+    Calculate the minimum confidence across keypoints used for an angle.
+    """
+    confidences = [float(p.get('confidence', 0.0)) for p in points]
+    if not confidences:
+        return 0.0
+    return min(confidences)
+
+
+def calculate_angles(keypoints: Dict) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Calculate joint angles and their confidence from one frame's keypoints.
+
+    A joint with a missing or zero-confidence keypoint gets angle 0.0.
+
+    Args:
+        keypoints: Dictionary of keypoint name -> {x, y, confidence}
+
+    Returns:
+        (angles, angle_confidence) dictionaries in ANGLE_NAMES order
+    """
+    computed = {}
+    for joint, triple in JOINT_MAP.items():
+        points = [keypoints.get(name) for name in triple]
+        if any(point is None for point in points):
+            computed[joint] = (0.0, 0.0)
+            continue
+
+        confidence = joint_confidence(points)
+        angle = calculate_angle(*points) if confidence != 0.0 else 0.0
+        computed[joint] = (angle, confidence)
+
+    angles = {}
+    angle_confidence = {}
+    for name in ANGLE_NAMES:
+        angle, confidence = computed[DUPLICATED_JOINTS.get(name, name)]
+        angles[name] = angle
+        angle_confidence[name] = confidence
+
+    return angles, angle_confidence
+
+
+def compute_angles(keypoints: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized calculate_angles() over many frames.
+
+    Missing keypoints should be given confidence 0, which zeroes the joint
+    exactly like calculate_angles() does for absent keys.
+
+    Args:
+        keypoints: Array [N, 17, 3] of (x, y, confidence)
+
+    Returns:
+        (angles [N, 8], angle_confidence [N, 8]) float64 in ANGLE_NAMES order
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    n = keypoints.shape[0]
+    angles = np.zeros((n, len(ANGLE_NAMES)), dtype=np.float64)
+    confidence = np.zeros_like(angles)
+
+    for joint, triple in JOINT_MAP.items():
+        p1, p2, p3 = (keypoints[:, KEYPOINT_INDEX[name]] for name in triple)
+        joint_conf = np.minimum(np.minimum(p1[:, 2], p2[:, 2]), p3[:, 2])
+
+        v1 = p1[:, :2] - p2[:, :2]
+        v2 = p3[:, :2] - p2[:, :2]
+        norm1 = np.hypot(v1[:, 0], v1[:, 1])
+        norm2 = np.hypot(v2[:, 0], v2[:, 1])
+        valid = (joint_conf != 0.0) & (norm1 > EPSILON) & (norm2 > EPSILON)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos_angle = np.where(valid, (v1 * v2).sum(axis=1) / (norm1 * norm2), 1.0)
+        joint_angles = np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+
+        angles[:, ANGLE_INDEX[joint]] = np.where(valid, joint_angles, 0.0)
+        confidence[:, ANGLE_INDEX[joint]] = joint_conf
+
+    for duplicate, source in DUPLICATED_JOINTS.items():
+        angles[:, ANGLE_INDEX[duplicate]] = angles[:, ANGLE_INDEX[source]]
+        confidence[:, ANGLE_INDEX[duplicate]] = confidence[:, ANGLE_INDEX[source]]
+
+    return angles, confidence
+
+
+def keypoints_to_dict(keypoints: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """Convert one frame's [17, 3] keypoints to the JSON dictionary form."""
+    return {
+        name: {'x': x, 'y': y, 'confidence': c}
+        for name, (x, y, c) in zip(KEYPOINT_NAMES, np.asarray(keypoints).tolist())
+    }
+
+
+def keypoints_from_dict(keypoints: Dict) -> List[Tuple[float, float, float]]:
+    """Convert one frame's keypoint dictionary to rows (missing -> zeros)."""
+    rows = []
+    for name in KEYPOINT_NAMES:
+        kp = keypoints.get(name)
+        if kp:
+            rows.append((kp.get('x', 0.0), kp.get('y', 0.0), kp.get('confidence', 0.0)))
+        else:
+            rows.append((0.0, 0.0, 0.0))
+    return rows
+
+
+class PoseSequence:
+    """Columnar pose data for one song."""
+
+    __slots__ = (
+        'song_id', 'fps', 'keypoints', 'angles', 'angle_confidence',
+        'timestamps', 'frame_numbers', 'metadata'
+    )
+
+    def __init__(
+        self,
+        keypoints: np.ndarray,
+        fps: float,
+        song_id: str = '',
+        timestamps: Optional[np.ndarray] = None,
+        frame_numbers: Optional[np.ndarray] = None,
+        angles: Optional[np.ndarray] = None,
+        angle_confidence: Optional[np.ndarray] = None,
+        metadata: Optional[Dict] = None
+    ):
+        """
+        Create a sequence; arrays are used as-is when already the right dtype.
+
+        Args:
+            keypoints: Array [N, 17, 3]
+            fps: Frames per second
+            song_id: Song identifier
+            timestamps: Seconds per frame (default: frame_numbers / fps)
+            frame_numbers: Frame numbers (default: 0..N-1)
+            angles: Angles [N, 8] (default: computed from keypoints)
+            angle_confidence: Angle confidences [N, 8] (computed with angles)
+            metadata: Extra top-level JSON fields (modelVersion, inputSize, ...)
+        """
+        self.keypoints = np.asarray(keypoints, dtype=np.float32).reshape(-1, len(KEYPOINT_NAMES), 3)
+        n = len(self.keypoints)
+        self.fps = float(fps)
+        self.song_id = song_id
+
+        if frame_numbers is None:
+            frame_numbers = np.arange(n, dtype=np.int32)
+        self.frame_numbers = np.asarray(frame_numbers, dtype=np.int32)
+
+        if timestamps is None:
+            timestamps = self.frame_numbers / self.fps if self.fps > 0 else np.zeros(n)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+
+        if angles is None or angle_confidence is None:
+            angles, angle_confidence = compute_angles(self.keypoints)
+        self.angles = np.asarray(angles, dtype=np.float64)
+        self.angle_confidence = np.asarray(angle_confidence, dtype=np.float64)
+
+        self.metadata = dict(metadata or {})
+
+    def __len__(self) -> int:
+        return len(self.keypoints)
+
+    def __repr__(self) -> str:
+        return f"PoseSequence(song_id={self.song_id!r}, frames={len(self)}, fps={self.fps})"
+
+    @property
+    def duration(self) -> float:
+        """Timestamp of the last frame plus one frame interval."""
+        if len(self) == 0:
+            return 0.0
+        return float(self.timestamps[-1]) + (1.0 / self.fps if self.fps > 0 else 0.0)
+
+    def __getitem__(self, index: slice) -> 'PoseSequence':
+        """Slice frames; basic slices return views sharing memory."""
+        if not isinstance(index, slice):
+            raise TypeError("PoseSequence only supports slicing; use frame(i) for a single frame")
+        return PoseSequence(
+            self.keypoints[index],
+            self.fps,
+            self.song_id,
+            timestamps=self.timestamps[index],
+            frame_numbers=self.frame_numbers[index],
+            angles=self.angles[index],
+            angle_confidence=self.angle_confidence[index],
+            metadata=self.metadata
+        )
+
+    def slice_time(self, start: float, end: float) -> 'PoseSequence':
+        """
+        Frames with start <= timestamp < end, as a view.
+
+        Args:
+            start: Start time in seconds
+            end: End time in seconds
+
+        Returns:
+            PoseSequence sharing memory with this one
+        """
+        first = int(np.searchsorted(self.timestamps, start, side='left'))
+        last = int(np.searchsorted(self.timestamps, end, side='left'))
+        return self[first:last]
+
+    def keypoint(self, name: str) -> np.ndarray:
+        """View [N, 3] of one keypoint across all frames."""
+        return self.keypoints[:, KEYPOINT_INDEX[name]]
+
+    def angle(self, name: str) -> np.ndarray:
+        """View [N] of one joint angle across all frames."""
+        return self.angles[:, ANGLE_INDEX[name]]
+
+    def recompute_angles(self) -> None:
+        """Recompute angles and confidences from the keypoints."""
+        self.angles, self.angle_confidence = compute_angles(self.keypoints)
+
+    def frame(self, i: int) -> Dict:
+        """Frame i in the JSON dictionary form."""
+        return {
+            'frameNumber': int(self.frame_numbers[i]),
+            'timestamp': float(self.timestamps[i]),
+            'keypoints': keypoints_to_dict(self.keypoints[i]),
+            'angles': dict(zip(ANGLE_NAMES, self.angles[i].tolist())),
+            'angleConfidence': dict(zip(ANGLE_NAMES, self.angle_confidence[i].tolist())),
+        }
+
+    def to_frames(self) -> List[Dict]:
+        """All frames in the JSON dictionary form."""
+        keypoints = self.keypoints.tolist()
+        angles = self.angles.tolist()
+        confidence = self.angle_confidence.tolist()
+        return [
+            {
+                'frameNumber': frame_number,
+                'timestamp': timestamp,
+                'keypoints': {
+                    name: {'x': x, 'y': y, 'confidence': c}
+                    for name, (x, y, c) in zip(KEYPOINT_NAMES, keypoints[i])
+                },
+                'angles': dict(zip(ANGLE_NAMES, angles[i])),
+                'angleConfidence': dict(zip(ANGLE_NAMES, confidence[i])),
+            }
+            for i, (frame_number, timestamp) in enumerate(
+                zip(self.frame_numbers.tolist(), self.timestamps.tolist())
+            )
+        ]
+
+    def to_dict(self) -> Dict:
+        """The full pose JSON document."""
+        return {
+            'songId': self.song_id,
+            'fps': self.fps,
+            'totalFrames': len(self),
+            **self.metadata,
+            'frames': self.to_frames(),
+        }
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: List[Dict],
+        fps: float,
+        song_id: str = '',
+        metadata: Optional[Dict] = None
+    ) -> 'PoseSequence':
+        """
+        Build a sequence from JSON-style frame dictionaries.
+
+        Stored angles are kept when every frame has angles and
+        angleConfidence; otherwise they are recomputed from the keypoints.
+        """
+        n = len(frames)
+        keypoints = np.array(
+            [keypoints_from_dict(frame.get('keypoints') or {}) for frame in frames],
+            dtype=np.float32
+        ).reshape(n, len(KEYPOINT_NAMES), 3)
+        frame_numbers = np.array([frame.get('frameNumber', i) for i, frame in enumerate(frames)], dtype=np.int32)
+        timestamps = np.array(
+            [frame.get('timestamp', frame_number / fps if fps else 0.0)
+             for frame, frame_number in zip(frames, frame_numbers.tolist())],
+            dtype=np.float64
+        )
+
+        angles = angle_confidence = None
+        if all(
+            len(frame.get('angles') or ()) == len(ANGLE_NAMES)
+            and len(frame.get('angleConfidence') or ()) == len(ANGLE_NAMES)
+            for frame in frames
+        ):
+            angles = np.array([[frame['angles'][name] for name in ANGLE_NAMES] for frame in frames],
+                              dtype=np.float64).reshape(n, len(ANGLE_NAMES))
+            angle_confidence = np.array(
+                [[frame['angleConfidence'][name] for name in ANGLE_NAMES] for frame in frames],
+                dtype=np.float64
+            ).reshape(n, len(ANGLE_NAMES))
+
+        return cls(keypoints, fps, song_id, timestamps, frame_numbers, angles, angle_confidence, metadata)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PoseSequence':
+        """Build a sequence from a parsed pose JSON document."""
+        metadata = {k: v for k, v in data.items() if k not in ('songId', 'fps', 'totalFrames', 'frames')}
+        return cls.from_frames(data.get('frames', []), data.get('fps', 0.0), data.get('songId', ''), metadata)
+
+    @classmethod
+    def from_json(cls, path: Union[str, Path]) -> 'PoseSequence':
+        """
+        Load a pose JSON file.
+
+        Frames are streamed (pose_stream.iter_pose_file) so the whole
+        dict-of-dict document is never held in memory at once.
+        """
+        from pose_stream import iter_pose_file
+
+        header: Dict = {}
+        rows = []
+        frame_numbers = []
+        timestamps = []
+        angles = []
+        angle_confidence = []
+        stored_angles = True
+
+        for i, frame in enumerate(iter_pose_file(str(path), header)):
+            rows.append(keypoints_from_dict(frame.get('keypoints') or {}))
+            frame_numbers.append(frame.get('frameNumber', i))
+            timestamps.append(frame.get('timestamp'))
+            if stored_angles:
+                frame_angles = frame.get('angles') or {}
+                frame_confidence = frame.get('angleConfidence') or {}
+                if len(frame_angles) == len(ANGLE_NAMES) and len(frame_confidence) == len(ANGLE_NAMES):
+                    angles.append([frame_angles[name] for name in ANGLE_NAMES])
+                    angle_confidence.append([frame_confidence[name] for name in ANGLE_NAMES])
+                else:
+                    stored_angles = False
+
+        fps = header.get('fps', 0.0)
+        n = len(rows)
+        if any(t is None for t in timestamps):
+            timestamps = [t if t is not None else f / fps for t, f in zip(timestamps, frame_numbers)]
+
+        metadata = {k: v for k, v in header.items() if k not in ('songId', 'fps', 'totalFrames', 'frames')}
+        return cls(
+            np.array(rows, dtype=np.float32).reshape(n, len(KEYPOINT_NAMES), 3),
+            fps,
+            header.get('songId', Path(path).stem),
+            timestamps=np.array(timestamps, dtype=np.float64),
+            frame_numbers=np.array(frame_numbers, dtype=np.int32),
+            angles=np.array(angles, dtype=np.float64).reshape(n, len(ANGLE_NAMES)) if stored_angles else None,
+            angle_confidence=(
+                np.array(angle_confidence, dtype=np.float64).reshape(n, len(ANGLE_NAMES)) if stored_angles else None
+            ),
+            metadata=metadata
+        )
+
+    def to_json(self, path: Union[str, Path], indent: Optional[int] = 2) -> None:
+        """Write the pose JSON file atomically (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=indent)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'keypoints': self.keypoints,
+            'angles': self.angles,
+            'angle_confidence': self.angle_confidence,
+            'timestamps': self.timestamps,
+            'frame_numbers': self.frame_numbers,
+        }
+
+    def save_binary(self, path: Union[str, Path]) -> None:
+        """
+        Write the compact binary form (.pseq) atomically.
+
+        Layout: magic, uint32 version, uint32 header length, JSON header,
+        then each array little-endian and 64-byte aligned so load_binary()
+        can map it in place.
+        """
+        path = Path(path)
+        arrays = {name: np.ascontiguousarray(a, dtype=a.dtype.newbyteorder('<'))
+                  for name, a in self._arrays().items()}
+
+        # Offsets are relative to the aligned start of the data section
+        entries = {}
+        offset = 0
+        for name, array in arrays.items():
+            entries[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += -(-array.nbytes // _BINARY_ALIGN) * _BINARY_ALIGN
+
+        header = json.dumps({
+            'songId': self.song_id,
+            'fps': self.fps,
+            'metadata': self.metadata,
+            'arrays': entries,
+        }).encode('utf-8')
+        prefix_len = len(BINARY_MAGIC) + 8 + len(header)
+        data_start = -(-prefix_len // _BINARY_ALIGN) * _BINARY_ALIGN
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(BINARY_MAGIC)
+                f.write(np.array([BINARY_VERSION, len(header)], dtype='<u4').tobytes())
+                f.write(header)
+                f.write(b'\0' * (data_start - prefix_len))
+                for _, array in arrays.items():
+                    f.write(array.tobytes())
+                    f.write(b'\0' * (-array.nbytes % _BINARY_ALIGN))
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def load_binary(cls, path: Union[str, Path], mmap: bool = True) -> 'PoseSequence':
+        """
+        Load the binary form.
+
+        Args:
+            path: .pseq file
+            mmap: Map arrays read-only from the file instead of reading them
+
+        Returns:
+            PoseSequence whose arrays are views into the mapped file
+        """
+        with open(path, 'rb') as f:
+            magic = f.read(len(BINARY_MAGIC))
+            if magic != BINARY_MAGIC:
+                raise ValueError(f"Not a pose sequence file: {path}")
+            version, header_len = np.frombuffer(f.read(8), dtype='<u4')
+            if version != BINARY_VERSION:
+                raise ValueError(f"Unsupported pose sequence version {version}: {path}")
+            header = json.loads(f.read(int(header_len)))
+
+        prefix_len = len(BINARY_MAGIC) + 8 + int(header_len)
+        data_start = -(-prefix_len // _BINARY_ALIGN) * _BINARY_ALIGN
+
+        if mmap:
+            buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        else:
+            buffer = np.fromfile(path, dtype=np.uint8)
+
+        arrays = {}
+        for name, entry in header['arrays'].items():
+            dtype = np.dtype(entry['dtype'])
+            shape = tuple(entry['shape'])
+            count = int(np.prod(shape))
+            start = data_start + entry['offset']
+            arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=start).reshape(shape)
+
+        return cls(
+            arrays['keypoints'],
+            header['fps'],
+            header['songId'],
+            timestamps=arrays['timestamps'],
+            frame_numbers=arrays['frame_numbers'],
+            angles=arrays['angles'],
+            angle_confidence=arrays['angle_confidence'],
+            metadata=header.get('metadata')
+        )
+
+
+def load_pose_sequence(path: Union[str, Path]) -> PoseSequence:
+    """Load a pose file, binary (.pseq) or JSON, by extension."""
+    if Path(path).suffix == '.pseq':
+        return PoseSequence.load_binary(path)
+    return PoseSequence.from_json(path)
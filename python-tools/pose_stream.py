@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Streaming reader and validator for pose data JSON files.
+
+validate_json.py and validate_poses.py used to json.load() the whole file
+and then look at the first (and last) frame only, which is slow on long
+songs and blind to corruption in the middle. This module parses the file
+incrementally - one frame object at a time with json's raw_decode - so
+memory stays bounded by the chunk size plus one frame, and checks every
+frame:
+
+- all 17 keypoints with x/y in [0, 1] (small tolerance) and confidence in [0, 1]
+- all 8 angles in [0, 180]
+- angleConfidence present with values in [0, 1]
+- strictly increasing frameNumber and timestamp
+- frame count matching totalFrames
+"""
+
+import json
+import math
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pose_sequence import ANGLE_NAMES, KEYPOINT_NAMES
+
+
+REQUIRED_FIELDS = ['songId', 'fps', 'totalFrames', 'frames']
+
+# Characters read per chunk
+CHUNK_SIZE = 1 << 20
+
+# Largest single value (one frame) we are willing to buffer before giving up
+MAX_VALUE_SIZE = 8 << 20
+
+# Keypoints of limbs just outside the frame can be predicted slightly
+# beyond the image edge
+POSITION_TOLERANCE = 0.05
+
+# Errors collected per file before validation stops
+MAX_ERRORS = 50
+
+_WHITESPACE = ' \t\n\r'
+
+# Characters that can continue a number cut off at the end of a chunk
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+
+class PoseStreamError(ValueError):
+    """Raised when the file is not well-formed pose JSON."""
+
+
+class _ChunkedDecoder:
+    """Decodes JSON values one at a time from a file read in chunks."""
+
+    def __init__(self, f, chunk_size: Optional[int] = None):
+        self.f = f
+        self.chunk_size = chunk_size or CHUNK_SIZE
+        self.buf = ''
+        self.pos = 0
+        self.consumed = 0  # characters dropped from the front of buf
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed text so the buffer never grows past one value
+        self.consumed += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise PoseStreamError(f"Invalid JSON: expected '{char}' but found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A scalar at the end of the buffer may continue in the next
+                # chunk (raw_decode("29.") returns 29), so it is only complete
+                # once something other than number characters follows it
+                if (self.eof or self.buf[self.pos] in '{["'
+                        or _NUMBER_TAIL.match(self.buf, end).end() < len(self.buf)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise PoseStreamError(
+                        f"Invalid JSON: {e.msg} (character {self.consumed + e.pos})"
+                    ) from None
+            if len(self.buf) - self.pos > MAX_VALUE_SIZE:
+                raise PoseStreamError(
+                    f"Invalid JSON: value at character {self.consumed + self.pos} "
+                    f"exceeds {MAX_VALUE_SIZE} characters"
+                )
+            self._fill()
+
+
+def iter_pose_file(json_path: str, header: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Stream the frames of a pose JSON file.
+
+    Args:
+        json_path: Path to pose JSON file
+        header: Optional dict filled with the top-level fields other than
+            "frames" (fields after the frames array appear once exhausted)
+
+    Yields:
+        Frame dictionaries in file order
+
+    Raises:
+        PoseStreamError: If the file is not a well-formed JSON object
+    """
+    if header is None:
+        header = {}
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        stream = _ChunkedDecoder(f)
+        stream.expect('{')
+
+        if stream.peek() == '}':
+            stream.pos += 1
+            return
+
+        while True:
+            key = stream.value()
+            if not isinstance(key, str):
+                raise PoseStreamError("Invalid JSON: object keys must be strings")
+            stream.expect(':')
+
+            if key == 'frames' and stream.peek() == '[':
+                header['frames'] = []  # marks the field as present
+                stream.pos += 1
+                if stream.peek() == ']':
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        separator = stream.peek()
+                        stream.pos += 1
+                        if separator == ']':
+                            break
+                        if separator != ',':
+                            raise PoseStreamError(
+                                f"Invalid JSON: expected ',' or ']' in frames but found {separator or 'end of file'!r}"
+                            )
+            else:
+                header[key] = stream.value()
+
+            separator = stream.peek()
+            stream.pos += 1
+            if separator == '}':
+                break
+            if separator != ',':
+                raise PoseStreamError(
+                    f"Invalid JSON: expected ',' or '}}' but found {separator or 'end of file'!r}"
+                )
+
+        if stream.peek() != '':
+            raise PoseStreamError("Invalid JSON: extra data after top-level object")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _in_unit_range(value: Any, tolerance: float = 0.0) -> bool:
+    return _is_number(value) and -tolerance <= value <= 1.0 + tolerance
+
+
+def _frame_ok(frame: Any) -> bool:
+    """
+    Fast check for the common case of a fully valid frame.
+
+    validate_frame() builds detailed messages but costs several times more;
+    it only runs for frames this rejects.
+    """
+    low = -POSITION_TOLERANCE
+    high = 1.0 + POSITION_TOLERANCE
+    try:
+        if type(frame['frameNumber']) is not int or not 0 <= frame['timestamp'] < math.inf:
+            return False
+        keypoints = frame['keypoints']
+        for name in KEYPOINT_NAMES:
+            kp = keypoints[name]
+            if not (low <= kp['x'] <= high and low <= kp['y'] <= high and 0 <= kp['confidence'] <= 1):
+                return False
+        angles = frame['angles']
+        confidence = frame.get('angleConfidence')
+        for name in ANGLE_NAMES:
+            if not 0 <= angles[name] <= 180:
+                return False
+            if confidence is not None and not 0 <= confidence[name] <= 1:
+                return False
+    except (KeyError, TypeError):
+        return False
+    return True
+
+
+def validate_frame(frame: Any, idx: int) -> List[str]:
+    """
+    Validate a single frame's structure and value ranges.
+
+    Args:
+        frame: Decoded frame
+        idx: Position of the frame in the frames array
+
+    Returns:
+        List of errors (empty if valid)
+    """
+    if not isinstance(frame, dict):
+        return [f"Frame {idx}: must be an object"]
+
+    errors = []
+
+    for field in ('frameNumber', 'timestamp', 'keypoints', 'angles'):
+        if field not in frame:
+            errors.append(f"Frame {idx}: missing {field}")
+
+    if 'frameNumber' in frame and (
+        not isinstance(frame['frameNumber'], int) or isinstance(frame['frameNumber'], bool)
+    ):
+        errors.append(f"Frame {idx}: frameNumber must be an integer")
+
+    if 'timestamp' in frame and not (_is_number(frame['timestamp']) and frame['timestamp'] >= 0):
+        errors.append(f"Frame {idx}: timestamp must be a non-negative number")
+
+    keypoints = frame.get('keypoints')
+    if keypoints is not None:
+        if not isinstance(keypoints, dict):
+            errors.append(f"Frame {idx}: keypoints must be an object")
+        else:
+            for name in KEYPOINT_NAMES:
+                kp = keypoints.get(name)
+                if kp is None:
+                    errors.append(f"Frame {idx}: missing keypoint {name}")
+                elif not isinstance(kp, dict) or not all(k in kp for k in ('x', 'y', 'confidence')):
+                    errors.append(f"Frame {idx}: keypoint {name} missing x, y, or confidence")
+                else:
+                    if not (_in_unit_range(kp['x'], POSITION_TOLERANCE)
+                            and _in_unit_range(kp['y'], POSITION_TOLERANCE)):
+                        errors.append(f"Frame {idx}: keypoint {name} position out of range (0-1): ({kp['x']}, {kp['y']})")
+                    if not _in_unit_range(kp['confidence']):
+                        errors.append(f"Frame {idx}: keypoint {name} confidence out of range (0-1): {kp['confidence']}")
+
+    angles = frame.get('angles')
+    if angles is not None:
+        if not isinstance(angles, dict):
+            errors.append(f"Frame {idx}: angles must be an object")
+        else:
+            for name in ANGLE_NAMES:
+                if name not in angles:
+                    errors.append(f"Frame {idx}: missing angle {name}")
+                elif not _is_number(angles[name]):
+                    errors.append(f"Frame {idx}: angle {name} must be a number")
+                elif not 0 <= angles[name] <= 180:
+                    errors.append(f"Frame {idx}: angle {name} out of range (0-180): {angles[name]}")
+
+    angle_confidence = frame.get('angleConfidence')
+    if angle_confidence is not None:
+        if not isinstance(angle_confidence, dict):
+            errors.append(f"Frame {idx}: angleConfidence must be an object")
+        else:
+            for name in ANGLE_NAMES:
+                if name not in angle_confidence:
+                    errors.append(f"Frame {idx}: missing angleConfidence {name}")
+                elif not _in_unit_range(angle_confidence[name]):
+                    errors.append(f"Frame {idx}: angleConfidence {name} out of range (0-1): {angle_confidence[name]}")
+
+    return errors
+
+
+def validate_pose_stream(
+    json_path: str,
+    max_errors: int = MAX_ERRORS
+) -> Tuple[bool, List[str], Dict[str, Any]]:
+    """
+    Validate every frame of a pose data JSON file in bounded memory.
+
+    Args:
+        json_path: Path to pose JSON file
+        max_errors: Stop after collecting this many errors
+
+    Returns:
+        (is_valid, errors, stats) where stats has frameCount and the header
+        fields songId/fps/totalFrames when present
+    """
+    errors: List[str] = []
+    header: Dict[str, Any] = {}
+    frame_count = 0
+    missing_confidence = 0
+    prev_frame_number = None
+    prev_timestamp = None
+    truncated = False
+
+    try:
+        for idx, frame in enumerate(iter_pose_file(json_path, header)):
+            frame_count += 1
+            if not _frame_ok(frame):
+                errors.extend(validate_frame(frame, idx))
+
+            if isinstance(frame, dict):
+                if 'angleConfidence' not in frame:
+                    missing_confidence += 1
+
+                frame_number = frame.get('frameNumber')
+                if isinstance(frame_number, int):
+                    if prev_frame_number is not None and frame_number <= prev_frame_number:
+                        errors.append(
+                            f"Frame {idx}: frameNumber {frame_number} not greater than previous {prev_frame_number}"
+                        )
+                    prev_frame_number = frame_number
+
+                timestamp = frame.get('timestamp')
+                if _is_number(timestamp):
+                    if prev_timestamp is not None and timestamp <= prev_timestamp:
+                        errors.append(
+                            f"Frame {idx}: timestamp {timestamp} not greater than previous {prev_timestamp}"
+                        )
+                    prev_timestamp = timestamp
+
+            if len(errors) >= max_errors:
+                truncated = True
+                break
+    except FileNotFoundError:
+        return False, [f"File not found: {json_path}"], {'frameCount': 0}
+    except PoseStreamError as e:
+        errors.append(str(e))
+        return False, errors, {'frameCount': frame_count}
+
+    stats = {'frameCount': frame_count}
+    stats.update({k: header[k] for k in ('songId', 'fps', 'totalFrames') if k in header})
+
+    if truncated:
+        errors = errors[:max_errors]
+        errors.append(f"Stopped after {max_errors} errors")
+        return False, errors, stats
+
+    for field in REQUIRED_FIELDS:
+        if field not in header:
+            errors.append(f"Missing required field: {field}")
+
+    if 'songId' in header and not isinstance(header['songId'], str):
+        errors.append("songId must be a string")
+
+    if 'frames' in header and not isinstance(header['frames'], list):
+        errors.append("frames must be a list")
+
+    if 'fps' in header and not (_is_number(header['fps']) and header['fps'] > 0):
+        errors.append("fps must be a positive number")
+
+    total_frames = header.get('totalFrames')
+    if 'totalFrames' in header:
+        if not isinstance(total_frames, int) or isinstance(total_frames, bool) or total_frames <= 0:
+            errors.append("totalFrames must be a positive integer")
+        elif 'frames' in header and frame_count != total_frames:
+            errors.append(f"Frame count mismatch: expected {total_frames}, got {frame_count}")
+
+    if missing_confidence:
+        errors.append(
+            f"{missing_confidence} frame(s) missing angleConfidence "
+            f"(run backfill_pose_confidence.py)"
+        )
+
+    return len(errors) == 0, errors, stats
@@ -11,25 +11,34 @@ import json
 import numpy as np
 import torch
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import argparse
 from tqdm import tqdm
 
 from create_lightweight_model import LightweightPoseModel
+from model_config import resolve_input_size
+from pose_sequence import KEYPOINT_NAMES, calculate_angle as shared_calculate_angle
 
 
 class ExecuTorchPoseDetector:
     """Pose detector using ExecuTorch/PyTorch model."""
     
-    def __init__(self, model_path: str, use_executorch: bool = False):
+    def __init__(
+        self,
+        model_path: str,
+        use_executorch: bool = False,
+        input_size: Optional[int] = None
+    ):
         """
         Initialize pose detector.
         
         Args:
             model_path: Path to model (.pt for PyTorch, .pte for ExecuTorch)
             use_executorch: Whether to use ExecuTorch runtime (requires mobile device)
+            input_size: Square input size (default: configured lightweight size)
         """
         self.use_executorch = use_executorch
+        self.input_size = resolve_input_size('lightweight', input_size)
         
         if use_executorch:
             # ExecuTorch runtime (for mobile/production)
@@ -84,10 +93,10 @@ class ExecuTorchPoseDetector:
             frame: Input frame (BGR format)
             
         Returns:
-            Preprocessed tensor [1, 3, 192, 192]
+            Preprocessed tensor [1, 3, input_size, input_size]
         """
-        # Resize to 192x192
-        resized = cv2.resize(frame, (192, 192))
+        # Resize to the model input size
+        resized = cv2.resize(frame, (self.input_size, self.input_size))
         
         # Convert BGR to RGB
         rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
@@ -110,18 +119,10 @@ class ExecuTorchPoseDetector:
         Returns:
             Dictionary mapping keypoint names to {x, y, confidence}
         """
-        # COCO keypoint names (17 keypoints)
-        keypoint_names = [
-            'nose', 'leftEye', 'rightEye', 'leftEar', 'rightEar',
-            'leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow',
-            'leftWrist', 'rightWrist', 'leftHip', 'rightHip',
-            'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'
-        ]
-        
         keypoints = {}
         output_np = output[0].cpu().numpy()  # [17, 3]
         
-        for i, name in enumerate(keypoint_names):
+        for i, name in enumerate(KEYPOINT_NAMES):
             x, y, confidence = output_np[i]
             keypoints[name] = {
                 'x': float(x),
@@ -142,18 +143,11 @@ def calculate_angle(p1: Dict, p2: Dict, p3: Dict) -> float:
     Returns:
         Angle in degrees
     """
+    # This pipeline gates on confidence instead of reporting angleConfidence
     if not all(p['confidence'] > 0.5 for p in [p1, p2, p3]):
         return 0.0
     
-    # Calculate vectors
-    v1 = np.array([p1['x'] - p2['x'], p1['y'] - p2['y']])
-    v2 = np.array([p3['x'] - p2['x'], p3['y'] - p2['y']])
-    
-    # Calculate angle
-    cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-6)
-    angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
-    
-    return float(np.degrees(angle))
+    return shared_calculate_angle(p1, p2, p3)
 
 
 def calculate_angles(keypoints: Dict) -> Dict[str, float]:
@@ -223,7 +217,8 @@ def extract_poses_from_video(
     model_path: str,
     output_path: str,
     use_executorch: bool = False,
-    progress_callback=None
+    progress_callback=None,
+    input_size: Optional[int] = None
 ) -> None:
     """
     Extract pose data from video and save as JSON.
@@ -234,10 +229,11 @@ def extract_poses_from_video(
         output_path: Path to save JSON output
         use_executorch: Whether to use ExecuTorch runtime
         progress_callback: Optional callback for progress updates
+        input_size: Square input size (default: configured lightweight size)
     """
     # Load model
     print(f"Loading model from {model_path}...")
-    detector = ExecuTorchPoseDetector(model_path, use_executorch)
+    detector = ExecuTorchPoseDetector(model_path, use_executorch, input_size)
     
     # Open video
     print(f"Processing video: {video_path}")
@@ -331,6 +327,12 @@ def main():
         action='store_true',
         help='Use ExecuTorch runtime (requires .pte model)'
     )
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=None,
+        help='Model input size (default: models/input_size.json or 192)'
+    )
     
     args = parser.parse_args()
     
@@ -344,7 +346,8 @@ def main():
         str(video_path),
         args.model,
         str(output_file),
-        use_executorch=args.executorch
+        use_executorch=args.executorch,
+        input_size=args.imgsz
     )
 
 
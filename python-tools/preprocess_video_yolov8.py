@@ -13,40 +13,43 @@ YOLOv8s-pose improvements:
 """
 
 import cv2
-import json
 import numpy as np
-import torch
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 import argparse
 from tqdm import tqdm
 
-
-# COCO keypoint names (17 keypoints)
-KEYPOINT_NAMES = [
-    'nose', 'leftEye', 'rightEye', 'leftEar', 'rightEar',
-    'leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow',
-    'leftWrist', 'rightWrist', 'leftHip', 'rightHip',
-    'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'
-]
-
-# Zero vector threshold - matches TypeScript ZERO_VECTOR_THRESHOLD
-EPSILON = 1e-9
+from model_config import ULTRALYTICS_DEFAULT_SIZE, configured_input_size
+from pose_chunks import chunks_dir_for, write_chunks
+from pose_daemon import submit_extract
+from pose_manifest import record_pose_file
+from pose_sequence import KEYPOINT_NAMES, PoseSequence, keypoints_to_dict
 
 
 class YOLOv8PoseDetector:
     """Pose detector using YOLOv8s-pose model."""
     
-    INPUT_SIZE = 256
+    INPUT_SIZE = ULTRALYTICS_DEFAULT_SIZE
     
-    def __init__(self, model_name: str = 'yolov8s-pose.pt', device: str = 'auto'):
+    def __init__(
+        self,
+        model_name: str = 'yolov8s-pose.pt',
+        device: str = 'auto',
+        input_size: Optional[int] = None
+    ):
         """
         Initialize YOLOv8s-pose detector.
         
         Args:
             model_name: Model name or path (default: yolov8s-pose.pt)
             device: Device to run on ('auto', 'cpu', 'cuda', 'mps')
+            input_size: Square inference size (default: size saved by
+                        sweep_input_size.py --apply, else ultralytics' 640)
         """
+        self.input_size = configured_input_size('yolov8', input_size)
+
+        # Imported here so CLIs that hand work to the pose daemon stay fast
+        import torch
         try:
             from ultralytics import YOLO
         except ImportError:
@@ -80,38 +83,48 @@ class YOLOv8PoseDetector:
         Returns:
             Dictionary of keypoint names to {x, y, confidence} dicts
         """
+        return keypoints_to_dict(self.detect_keypoints(frame))
+    
+    def detect_keypoints(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Detect pose keypoints from a frame as an array.
+        
+        Args:
+            frame: Input frame (BGR format from OpenCV)
+            
+        Returns:
+            Array [17, 3] of normalized (x, y, confidence) in KEYPOINT_NAMES order
+        """
         # Convert BGR to RGB
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         
-        # Run inference with YOLOv8
-        results = self.model(frame_rgb, verbose=False)
+        # Run inference with YOLOv8 (ultralytics picks 640 when no size is configured)
+        if self.input_size is None:
+            results = self.model(frame_rgb, verbose=False)
+        else:
+            results = self.model(frame_rgb, imgsz=self.input_size, verbose=False)
         
         # Parse results
-        keypoints = self._parse_results(results, frame.shape[:2])
-        
-        return keypoints
+        return self._parse_results(results, frame.shape[:2])
     
     def _parse_results(
         self, 
         results, 
         original_shape: tuple
-    ) -> Dict[str, Dict[str, float]]:
+    ) -> np.ndarray:
         """
-        Parse YOLOv8 results to keypoint dictionary.
+        Parse YOLOv8 results to a keypoint array.
         
         Args:
             results: YOLOv8 inference results
             original_shape: Original frame shape (height, width)
             
         Returns:
-            Dictionary mapping keypoint names to {x, y, confidence}
+            Array [17, 3] of normalized (x, y, confidence), zeros if no detection
         """
-        keypoints = {}
-        orig_h, orig_w = original_shape
-        
         # Initialize with zero confidence
-        for name in KEYPOINT_NAMES:
-            keypoints[name] = {'x': 0.0, 'y': 0.0, 'confidence': 0.0}
+        keypoints = np.zeros((len(KEYPOINT_NAMES), 3), dtype=np.float32)
+        orig_h, orig_w = original_shape
         
         # Check if any detections
         if len(results) == 0 or results[0].keypoints is None:
@@ -132,104 +145,25 @@ class YOLOv8PoseDetector:
         
         # Extract keypoints for best detection
         kpts_data = result.keypoints.data[best_idx].cpu().numpy()  # [17, 3]
+        count = min(len(kpts_data), len(KEYPOINT_NAMES))
         
-        for i, name in enumerate(KEYPOINT_NAMES):
-            if i < len(kpts_data):
-                x, y, conf = kpts_data[i]
-                # Normalize to [0, 1]
-                keypoints[name] = {
-                    'x': float(x / orig_w),
-                    'y': float(y / orig_h),
-                    'confidence': float(conf)
-                }
+        # Normalize to [0, 1]
+        keypoints[:count, 0] = kpts_data[:count, 0] / orig_w
+        keypoints[:count, 1] = kpts_data[:count, 1] / orig_h
+        keypoints[:count, 2] = kpts_data[:count, 2]
         
         return keypoints
 
 
-def calculate_angle(p1: Dict, p2: Dict, p3: Dict) -> float:
-    """
-    Calculate angle between three points regardless of confidence.
-    """
-    v1 = np.array([p1['x'] - p2['x'], p1['y'] - p2['y']])
-    v2 = np.array([p3['x'] - p2['x'], p3['y'] - p2['y']])
-    
-    norm1 = np.linalg.norm(v1)
-    norm2 = np.linalg.norm(v2)
-    # Use threshold to avoid floating-point comparison issues
-    if norm1 <= EPSILON or norm2 <= EPSILON:
-        return 0.0
-    
-    cos_angle = np.dot(v1, v2) / (norm1 * norm2)
-    angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
-    
-    return float(np.degrees(angle))
-
-
-def joint_confidence(points: List[Dict]) -> float:
-    """
-    Calculate the minimum confidence across keypoints used for an angle.
-    """
-    if not points:
-        return 0.0
-    confidences = [float(p.get('confidence', 0.0)) for p in points]
-    return float(min(confidences))
-
-
-def calculate_angles(keypoints: Dict) -> tuple[Dict[str, float], Dict[str, float]]:
-    """
-    Calculate joint angles from keypoints.
-    
-    Uses the SAME algorithm as previous versions to ensure
-    backward compatibility and equivalent results.
-    
-    Args:
-        keypoints: Dictionary of keypoint positions
-        
-    Returns:
-        Dictionary of joint angles
-    """
-    angles = {}
-    angle_confidence = {}
-
-    def set_angle(name: str, joints: List[str]):
-        points = [keypoints[j] for j in joints if j in keypoints]
-        if len(points) != 3:
-            angle_confidence[name] = 0.0
-            angles[name] = 0.0
-            return
-
-        confidence = joint_confidence(points)
-        angle_confidence[name] = confidence
-        if confidence == 0.0:
-            angles[name] = 0.0
-        else:
-            angles[name] = calculate_angle(*points)
-
-    set_angle('leftArm', ['leftShoulder', 'leftElbow', 'leftWrist'])
-    angle_confidence['leftElbow'] = angle_confidence.get('leftArm', 0.0)
-    angles['leftElbow'] = angles.get('leftArm', 0.0)
-
-    set_angle('rightArm', ['rightShoulder', 'rightElbow', 'rightWrist'])
-    angle_confidence['rightElbow'] = angle_confidence.get('rightArm', 0.0)
-    angles['rightElbow'] = angles.get('rightArm', 0.0)
-
-    set_angle('leftThigh', ['leftHip', 'leftKnee', 'leftAnkle'])
-    angle_confidence['leftLeg'] = angle_confidence.get('leftThigh', 0.0)
-    angles['leftLeg'] = angles.get('leftThigh', 0.0)
-
-    set_angle('rightThigh', ['rightHip', 'rightKnee', 'rightAnkle'])
-    angle_confidence['rightLeg'] = angle_confidence.get('rightThigh', 0.0)
-    angles['rightLeg'] = angles.get('rightThigh', 0.0)
-
-    return angles, angle_confidence
-
-
 def extract_poses_from_video(
     video_path: str,
     output_path: str,
     model_name: str = 'yolov8s-pose.pt',
     device: str = 'auto',
-    progress_callback=None
+    progress_callback=None,
+    input_size: Optional[int] = None,
+    detector: Optional[YOLOv8PoseDetector] = None,
+    chunk_seconds: Optional[float] = None
 ) -> None:
     """
     Extract pose data from video and save as JSON.
@@ -240,9 +174,14 @@ def extract_poses_from_video(
         model_name: YOLOv8 model name or path
         device: Device to run on
         progress_callback: Optional callback for progress updates
+        input_size: Square inference size (default: configured size, else 640)
+        detector: Already loaded detector to reuse (skips model loading)
+        chunk_seconds: Also write a time-chunked copy (<songId>.chunks/)
+            with chunks of this many seconds
     """
     # Load model
-    detector = YOLOv8PoseDetector(model_name, device)
+    if detector is None:
+        detector = YOLOv8PoseDetector(model_name, device, input_size)
     
     # Open video
     print(f"Processing video: {video_path}")
@@ -256,7 +195,7 @@ def extract_poses_from_video(
     
     print(f"Video info: {total_frames} frames at {fps} fps")
     
-    frames_data = []
+    keypoints_rows = []
     frame_num = 0
     
     # Progress bar
@@ -268,25 +207,11 @@ def extract_poses_from_video(
             
             try:
                 # Detect pose
-                keypoints = detector.detect_pose(frame)
-                angles, angle_confidence = calculate_angles(keypoints)
-                
-                frames_data.append({
-                    "frameNumber": frame_num,
-                    "timestamp": frame_num / fps,
-                    "keypoints": keypoints,
-                    "angles": angles,
-                    "angleConfidence": angle_confidence,
-                })
+                keypoints_rows.append(detector.detect_keypoints(frame))
             except Exception as e:
                 print(f"\n⚠ Error processing frame {frame_num}: {e}")
-                # Add empty frame data
-                frames_data.append({
-                    "frameNumber": frame_num,
-                    "timestamp": frame_num / fps,
-                    "keypoints": {name: {'x': 0, 'y': 0, 'confidence': 0} for name in KEYPOINT_NAMES},
-                    "angles": {}
-                })
+                # Add empty frame data (zero confidence -> zero angles)
+                keypoints_rows.append(np.zeros((len(KEYPOINT_NAMES), 3), dtype=np.float32))
             
             frame_num += 1
             pbar.update(1)
@@ -297,24 +222,33 @@ def extract_poses_from_video(
     
     cap.release()
     
-    # Prepare output (SAME FORMAT as previous versions)
+    # Prepare output (SAME FORMAT as previous versions); angles are
+    # computed for all frames at once
     song_id = Path(video_path).stem
-    output = {
-        "songId": song_id,
-        "fps": fps,
-        "totalFrames": frame_num,
-        "modelVersion": "yolov8s-pose",
-        "modelAccuracy": "64.0 AP (COCO)",
-        "frames": frames_data
-    }
+    sequence = PoseSequence(
+        np.array(keypoints_rows, dtype=np.float32).reshape(-1, len(KEYPOINT_NAMES), 3),
+        fps,
+        song_id,
+        metadata={
+            "modelVersion": "yolov8s-pose",
+            "modelAccuracy": "64.0 AP (COCO)",
+            "inputSize": detector.input_size or ULTRALYTICS_DEFAULT_SIZE,
+        }
+    )
     
     # Save JSON
     output_file = Path(output_path)
-    output_file.parent.mkdir(parents=True, exist_ok=True)
     
     print(f"Saving pose data to {output_file}...")
-    with open(output_file, 'w') as f:
-        json.dump(output, f, indent=2)
+    sequence.to_json(output_file)
+    if chunk_seconds:
+        chunks_dir = chunks_dir_for(output_file)
+        index = write_chunks(sequence, chunks_dir, chunk_seconds)
+        print(f"✓ {len(index['chunks'])} chunk(s) saved to {chunks_dir}")
+    try:
+        record_pose_file(output_file, sequence)
+    except OSError as e:
+        print(f"⚠ Could not update pose manifest: {e}")
     
     print(f"✓ Successfully processed {frame_num} frames")
     print(f"✓ Output saved to {output_file}")
@@ -346,6 +280,23 @@ def main():
         choices=['auto', 'cpu', 'cuda', 'mps'],
         help='Device to run inference on'
     )
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=None,
+        help='Inference input size (default: models/input_size.json or 640)'
+    )
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Run locally even if the pose daemon is running'
+    )
+    parser.add_argument(
+        '--chunk-seconds',
+        type=float,
+        default=None,
+        help='Also write <songId>.chunks/ split into chunks of this many seconds'
+    )
     
     args = parser.parse_args()
     
@@ -354,12 +305,25 @@ def main():
     output_dir = Path(args.output)
     output_file = output_dir / f"{video_path.stem}.json"
     
+    # Hand off to the pose daemon if one is running (model already loaded)
+    if not args.no_daemon and submit_extract(
+        str(video_path),
+        str(output_file),
+        model_name=args.model,
+        device=args.device,
+        input_size=args.imgsz,
+        chunk_seconds=args.chunk_seconds
+    ):
+        return
+    
     # Process video
     extract_poses_from_video(
         str(video_path),
         str(output_file),
         model_name=args.model,
-        device=args.device
+        device=args.device,
+        input_size=args.imgsz,
+        chunk_seconds=args.chunk_seconds
     )
 
 
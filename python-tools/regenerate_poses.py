@@ -21,7 +21,9 @@ from datetime import datetime
 from pathlib import Path
 
 # Import the YOLOv8 preprocessing function
-from preprocess_video_yolov8 import extract_poses_from_video
+from preprocess_video_yolov8 import YOLOv8PoseDetector, extract_poses_from_video
+from pose_daemon import submit_extract
+from pose_manifest import MANIFEST_NAME, iter_pose_files
 
 
 def backup_existing_poses(poses_dir: Path, backup_dir: Path) -> int:
@@ -39,7 +41,7 @@ def backup_existing_poses(poses_dir: Path, backup_dir: Path) -> int:
         print(f"No existing poses directory: {poses_dir}")
         return 0
     
-    json_files = list(poses_dir.glob("*.json"))
+    json_files = iter_pose_files(poses_dir)
     
     if not json_files:
         print("No existing JSON files to backup")
@@ -73,7 +75,7 @@ def delete_old_poses(poses_dir: Path) -> int:
     if not poses_dir.exists():
         return 0
     
-    json_files = list(poses_dir.glob("*.json"))
+    json_files = iter_pose_files(poses_dir)
     
     if not json_files:
         print("No JSON files to delete")
@@ -85,6 +87,9 @@ def delete_old_poses(poses_dir: Path) -> int:
         json_file.unlink()
         print(f"  ✗ Deleted: {json_file.name}")
     
+    # Entries are recreated as the new files are extracted
+    (poses_dir / MANIFEST_NAME).unlink(missing_ok=True)
+    
     return len(json_files)
 
 
@@ -111,7 +116,8 @@ def regenerate_poses(
     videos_dir: Path,
     poses_dir: Path,
     model_name: str = "yolov8s-pose.pt",
-    device: str = "auto"
+    device: str = "auto",
+    use_daemon: bool = True
 ) -> tuple:
     """
     Regenerate pose JSON files from videos.
@@ -121,6 +127,7 @@ def regenerate_poses(
         poses_dir: Directory to save pose JSON files
         model_name: YOLOv8 model to use
         device: Device to run inference on
+        use_daemon: Submit jobs to the pose daemon when it is running
         
     Returns:
         Tuple of (success_count, failed_count)
@@ -139,6 +146,7 @@ def regenerate_poses(
     
     success_count = 0
     failed_videos = []
+    detector = None  # loaded once, on the first video run locally
     
     for i, video_file in enumerate(video_files, 1):
         print(f"\n[{i}/{len(video_files)}] Processing: {video_file.name}")
@@ -147,12 +155,18 @@ def regenerate_poses(
         output_file = poses_dir / f"{video_file.stem}.json"
         
         try:
-            extract_poses_from_video(
-                str(video_file),
-                str(output_file),
-                model_name=model_name,
-                device=device
-            )
+            if not (use_daemon and submit_extract(
+                str(video_file), str(output_file), model_name=model_name, device=device
+            )):
+                if detector is None:
+                    detector = YOLOv8PoseDetector(model_name, device)
+                extract_poses_from_video(
+                    str(video_file),
+                    str(output_file),
+                    model_name=model_name,
+                    device=device,
+                    detector=detector
+                )
             success_count += 1
         except Exception as e:
             print(f"✗ Error: {e}")
@@ -206,6 +220,11 @@ def main():
         choices=["auto", "cpu", "cuda", "mps"],
         help="Device to run inference on"
     )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run locally even if the pose daemon is running"
+    )
     
     args = parser.parse_args()
     
@@ -246,7 +265,8 @@ def main():
         videos_dir,
         poses_dir,
         model_name=args.model,
-        device=args.device
+        device=args.device,
+        use_daemon=not args.no_daemon
     )
     
     # Summary
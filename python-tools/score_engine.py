@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Vectorized scoring engine mirroring mobile/services/scoreCalculator.ts.
+
+The app scores one frame at a time with calculateFrameScore(); this module
+implements the same rules over arrays so whole sessions (or many sessions
+at once) can be scored offline or server-side in one pass:
+
+- a joint is skipped if either angle is missing/non-finite (NaN here),
+  either stored angle confidence is below JOINT_CONFIDENCE_THRESHOLD
+  (NaN confidence = not provided = no gate), or either angle is exactly 0
+- an attempted joint matches if |user - reference| <= threshold
+- frame score = matches / attempted * 100 (0 if nothing was attempted)
+- final score = mean frame score, weighted score = linear weights 1..N,
+  breakdown = per-joint match percentage over frames where it was attempted
+
+Arrays are [..., 8] in TRACKED_JOINTS order (same as ANGLE_NAMES); any
+leading dimensions (frames, sessions x frames) are scored together.
+
+test_score_engine.py checks parity with the TypeScript implementation on
+fixtures/score_golden.json, which the mobile test suite also checks.
+
+Usage:
+    uv run python score_engine.py user_poses.json ../mobile/assets/poses/30minutos.json
+    uv run python score_engine.py --benchmark 10000
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pose_sequence import ANGLE_NAMES, PoseSequence
+
+
+TRACKED_JOINTS = list(ANGLE_NAMES)
+
+JOINT_CONFIDENCE_THRESHOLD = 0.3
+
+# Maximum angle difference (degrees) for a joint to count as matched
+DEFAULT_THRESHOLD = 20.0
+
+# (minimum score, rating), checked in order - getPerformanceRating()
+PERFORMANCE_RATINGS = [
+    (90, 'Perfect!'),
+    (80, 'Excellent!'),
+    (70, 'Great!'),
+    (60, 'Good!'),
+    (50, 'Nice Try!'),
+]
+
+
+def arrays_from_samples(samples: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert app-style angle samples ({joint: angle, angleConfidence: {...}})
+    to arrays, keeping the TypeScript meaning of missing values.
+
+    A missing or null angle becomes NaN (skipped). A missing confidence
+    becomes NaN (no gate), but a null confidence becomes 0 because
+    `null < 0.3` is true in JavaScript.
+
+    Returns:
+        (angles [N, 8], confidence [N, 8])
+    """
+    angles = np.full((len(samples), len(TRACKED_JOINTS)), np.nan)
+    confidence = np.full_like(angles, np.nan)
+    for i, sample in enumerate(samples):
+        stored = sample.get('angleConfidence') or {}
+        for j, joint in enumerate(TRACKED_JOINTS):
+            value = sample.get(joint)
+            if value is not None:
+                angles[i, j] = value
+            if joint in stored:
+                confidence[i, j] = stored[joint] if stored[joint] is not None else 0.0
+    return angles, confidence
+
+
+def valid_joints(angles: np.ndarray, confidence: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Joints usable for comparison on one side (angles [..., 8]).
+
+    Missing/non-finite angles, angles of exactly 0 (low-confidence
+    detections) and confidences below JOINT_CONFIDENCE_THRESHOLD are out;
+    NaN confidence means not provided, so no gate.
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    valid = np.isfinite(angles) & (angles != 0)
+    if confidence is not None:
+        with np.errstate(invalid='ignore'):
+            valid &= ~(np.asarray(confidence, dtype=np.float64) < JOINT_CONFIDENCE_THRESHOLD)
+    return valid
+
+
+def score_frames(
+    user_angles: np.ndarray,
+    reference_angles: np.ndarray,
+    user_confidence: Optional[np.ndarray] = None,
+    reference_confidence: Optional[np.ndarray] = None,
+    threshold: float = DEFAULT_THRESHOLD
+) -> Dict[str, np.ndarray]:
+    """
+    calculateFrameScore() for every frame at once.
+
+    Args:
+        user_angles: User angles [..., 8], NaN where missing
+        reference_angles: Reference angles [..., 8], NaN where missing
+        user_confidence: User angle confidences [..., 8] (None or NaN = not provided)
+        reference_confidence: Reference angle confidences [..., 8]
+        threshold: Maximum angle difference for a match
+
+    Returns:
+        Dict with score [...], matches bool [..., 8] (False where not
+        attempted), attempted bool [..., 8], attemptedJoints [...] and
+        skippedJoints [...]
+    """
+    user_angles = np.asarray(user_angles, dtype=np.float64)
+    reference_angles = np.asarray(reference_angles, dtype=np.float64)
+
+    attempted = valid_joints(user_angles, user_confidence) & valid_joints(reference_angles, reference_confidence)
+    with np.errstate(invalid='ignore'):
+        matches = attempted & (np.abs(user_angles - reference_angles) <= threshold)
+
+    attempted_joints = attempted.sum(axis=-1)
+    match_count = matches.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = np.where(attempted_joints > 0, match_count / attempted_joints * 100, 0.0)
+
+    return {
+        'score': score,
+        'matches': matches,
+        'attempted': attempted,
+        'attemptedJoints': attempted_joints,
+        'skippedJoints': len(TRACKED_JOINTS) - attempted_joints,
+    }
+
+
+def final_score(frame_scores: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    calculateFinalScore(): mean over the last axis (0 for no frames).
+
+    Args:
+        frame_scores: Scores [..., N]
+        mask: Frames that exist [..., N] (for padded sessions)
+    """
+    frame_scores = np.asarray(frame_scores, dtype=np.float64)
+    if mask is None:
+        mask = np.ones(frame_scores.shape, dtype=bool)
+    count = mask.sum(axis=-1)
+    total = np.where(mask, frame_scores, 0.0).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, total / count, 0.0)
+
+
+def weighted_score(frame_scores: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    calculateWeightedScore(): later frames weigh more (weights 1..N).
+
+    Args:
+        frame_scores: Scores [..., N]
+        mask: Frames that exist [..., N]; must be a prefix of each session
+    """
+    frame_scores = np.asarray(frame_scores, dtype=np.float64)
+    if mask is None:
+        mask = np.ones(frame_scores.shape, dtype=bool)
+    weights = np.where(mask, np.arange(1, frame_scores.shape[-1] + 1), 0)
+    weight_sum = weights.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(weight_sum > 0, (frame_scores * weights).sum(axis=-1) / weight_sum, 0.0)
+
+
+def score_breakdown(
+    matches: np.ndarray,
+    attempted: np.ndarray,
+    mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    calculateScoreBreakdown(): per-joint match percentage.
+
+    Args:
+        matches: Matches [..., N, 8]
+        attempted: Attempted joints [..., N, 8]
+        mask: Frames that exist [..., N]
+
+    Returns:
+        Percentages [..., 8] (0 for joints never attempted)
+    """
+    if mask is not None:
+        attempted = attempted & mask[..., None]
+        matches = matches & mask[..., None]
+    attempts = attempted.sum(axis=-2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(attempts > 0, matches.sum(axis=-2) / attempts * 100, 0.0)
+
+
+def performance_rating(score: float) -> str:
+    """getPerformanceRating()."""
+    for minimum, rating in PERFORMANCE_RATINGS:
+        if score >= minimum:
+            return rating
+    return 'Keep Practicing!'
+
+
+def score_session(
+    user_angles: np.ndarray,
+    reference_angles: np.ndarray,
+    user_confidence: Optional[np.ndarray] = None,
+    reference_confidence: Optional[np.ndarray] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    mask: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Score one session [N, 8] or a batch of sessions [S, N, 8].
+
+    Args:
+        user_angles: User angles, frames aligned with the reference
+        reference_angles: Reference angles
+        user_confidence: User angle confidences
+        reference_confidence: Reference angle confidences
+        threshold: Maximum angle difference for a match
+        mask: Frames that exist [..., N] when sessions are padded to one
+            length (padding must come after each session's frames)
+
+    Returns:
+        score_frames() output plus finalScore [...], weightedScore [...]
+        and breakdown [..., 8]
+    """
+    frames = score_frames(user_angles, reference_angles, user_confidence, reference_confidence, threshold)
+    frames['finalScore'] = final_score(frames['score'], mask)
+    frames['weightedScore'] = weighted_score(frames['score'], mask)
+    frames['breakdown'] = score_breakdown(frames['matches'], frames['attempted'], mask)
+    return frames
+
+
+def reference_indices(timestamps: np.ndarray, fps: float, frame_count: int) -> np.ndarray:
+    """Reference frame for each video position, as the game screen picks it."""
+    return np.floor(np.asarray(timestamps, dtype=np.float64) * fps).astype(np.int64) % frame_count
+
+
+def score_recording(
+    user: PoseSequence,
+    reference: PoseSequence,
+    threshold: float = DEFAULT_THRESHOLD,
+    align: bool = False
+) -> Dict:
+    """
+    Score a recorded user pose sequence against a reference song.
+
+    Each user frame is compared with the reference frame at its timestamp
+    (the video position when it was captured), or with align=True, with
+    the frame DTW matched it to (timing_alignment.py), which scores form
+    without penalizing timing.
+
+    Returns:
+        Summary dict (finalScore, weightedScore, rating, breakdown, frame
+        and joint counts, and the timing summary if aligned) in the app's units
+    """
+    timing = None
+    if align:
+        from timing_alignment import align_sequences
+
+        alignment = align_sequences(user, reference)
+        index = alignment.reference_index
+        timing = alignment.summary()
+    else:
+        index = reference_indices(user.timestamps, reference.fps, len(reference))
+    result = score_session(
+        user.angles,
+        reference.angles[index],
+        user.angle_confidence,
+        reference.angle_confidence[index],
+        threshold
+    )
+    final = float(result['finalScore'])
+    summary = {
+        'frames': len(user),
+        'finalScore': final,
+        'weightedScore': float(result['weightedScore']),
+        'rating': performance_rating(final),
+        'breakdown': dict(zip(TRACKED_JOINTS, result['breakdown'].tolist())),
+        'attemptedJoints': int(result['attemptedJoints'].sum()),
+        'skippedJoints': int(result['skippedJoints'].sum()),
+    }
+    if timing is not None:
+        summary['timing'] = timing
+    return summary
+
+
+def benchmark(sessions: int, frames: int = 300, seed: int = 0) -> float:
+    """
+    Score random sessions in one batch.
+
+    Returns:
+        Sessions per second
+    """
+    rng = np.random.default_rng(seed)
+    shape = (sessions, frames, len(TRACKED_JOINTS))
+    user = rng.uniform(0, 180, shape)
+    reference = rng.uniform(0, 180, shape)
+    user_confidence = rng.random(shape)
+    reference_confidence = rng.random(shape)
+
+    start = time.perf_counter()
+    score_session(user, reference, user_confidence, reference_confidence)
+    return sessions / (time.perf_counter() - start)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Score recorded poses against a reference song')
+    parser.add_argument('user', nargs='?', help='User pose JSON (angles + timestamps)')
+    parser.add_argument('reference', nargs='?', help='Reference pose JSON')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f'Maximum angle difference for a match (default: {DEFAULT_THRESHOLD:g})'
+    )
+    parser.add_argument(
+        '--align',
+        action='store_true',
+        help='Match frames by DTW timing alignment before scoring (form only)'
+    )
+    parser.add_argument('--report', default=None, help='Write the result as JSON')
+    parser.add_argument(
+        '--benchmark',
+        type=int,
+        default=None,
+        metavar='SESSIONS',
+        help='Score this many random 300-frame sessions and report throughput'
+    )
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        rate = benchmark(args.benchmark)
+        print(f"✓ {rate:,.0f} sessions/s ({args.benchmark} sessions x 300 frames)")
+        return
+
+    if not args.user or not args.reference:
+        parser.error('user and reference pose files are required')
+
+    result = score_recording(
+        PoseSequence.from_json(args.user),
+        PoseSequence.from_json(args.reference),
+        args.threshold,
+        align=args.align
+    )
+
+    print(f"Score: {result['finalScore']:.1f}% ({result['rating']}) over {result['frames']} frames")
+    print(f"Weighted: {result['weightedScore']:.1f}%")
+    if 'timing' in result:
+        print(f"Timing offset: {result['timing']['offsetSeconds'] * 1000:+.0f} ms (positive = late)")
+    for joint, value in result['breakdown'].items():
+        print(f"  {joint:<12} {value:5.1f}%")
+
+    if args.report:
+        with open(Path(args.report), 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Report saved to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
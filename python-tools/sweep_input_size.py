@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Input-resolution sweep for the pose models.
+
+Runs pose extraction on a sample of frames from our videos at several
+square input sizes, compares the resulting joint angles against a
+high-resolution YOLOv8s-pose reference and measures inference latency per
+size. The smallest size that stays within the angle error budget is
+recommended and, with --apply, written to models/input_size.json so that
+extraction and export pick it up.
+
+Usage:
+    uv run python sweep_input_size.py --videos ../songs/
+    uv run python sweep_input_size.py --videos ../songs/ --sizes 160,192,224,256 --apply
+    uv run python sweep_input_size.py --videos ../songs/ --family lightweight --model models/lightweight_pose.pt
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from model_config import resolve_input_size, save_input_size
+from pose_sequence import calculate_angles
+from preprocess_video_yolov8 import YOLOv8PoseDetector
+from regenerate_poses import find_videos
+
+
+DEFAULT_SIZES = [160, 192, 224, 256, 288, 320]
+
+# Matches JOINT_CONFIDENCE_THRESHOLD in mobile/services/scoreCalculator.ts
+JOINT_CONFIDENCE_THRESHOLD = 0.3
+
+# Unique joints (leftElbow/leftLeg etc. duplicate these and would double count)
+SWEEP_JOINTS = ['leftArm', 'rightArm', 'leftThigh', 'rightThigh']
+
+
+def sample_frames(video_path: Path, num_frames: int) -> List[np.ndarray]:
+    """
+    Read evenly spaced frames from a video.
+
+    Args:
+        video_path: Path to video
+        num_frames: Number of frames to sample
+
+    Returns:
+        List of BGR frames
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        print(f"⚠ Could not open video: {video_path}")
+        return []
+
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    wanted = set(np.linspace(0, max(total - 1, 0), num_frames).astype(int).tolist())
+
+    frames = []
+    frame_num = 0
+    while frame_num <= max(wanted, default=-1):
+        if not cap.grab():
+            break
+        if frame_num in wanted:
+            ret, frame = cap.retrieve()
+            if ret:
+                frames.append(frame)
+        frame_num += 1
+
+    cap.release()
+    return frames
+
+
+def angle_errors(reference: Dict, candidate: Dict) -> List[float]:
+    """
+    Absolute angle differences for joints both results are confident about.
+
+    Args:
+        reference: Reference keypoints
+        candidate: Keypoints at the size under test
+
+    Returns:
+        List of absolute angle errors in degrees
+    """
+    ref_angles, ref_conf = calculate_angles(reference)
+    cand_angles, cand_conf = calculate_angles(candidate)
+
+    errors = []
+    for joint in SWEEP_JOINTS:
+        if ref_conf[joint] >= JOINT_CONFIDENCE_THRESHOLD and cand_conf[joint] >= JOINT_CONFIDENCE_THRESHOLD:
+            errors.append(abs(ref_angles[joint] - cand_angles[joint]))
+    return errors
+
+
+def keypoint_errors(reference: Dict, candidate: Dict) -> List[float]:
+    """Normalized L2 distance per keypoint both results are confident about."""
+    errors = []
+    for name, ref in reference.items():
+        cand = candidate.get(name)
+        if cand is None:
+            continue
+        if ref['confidence'] >= JOINT_CONFIDENCE_THRESHOLD and cand['confidence'] >= JOINT_CONFIDENCE_THRESHOLD:
+            errors.append(float(np.hypot(ref['x'] - cand['x'], ref['y'] - cand['y'])))
+    return errors
+
+
+class _LightweightSweepDetector:
+    """Adapter giving ExecuTorchPoseDetector a mutable input size."""
+
+    def __init__(self, model_path: str):
+        from preprocess_video_executorch import ExecuTorchPoseDetector
+        self.detector = ExecuTorchPoseDetector(model_path)
+        self.input_size = self.detector.input_size
+
+    def detect_pose(self, frame: np.ndarray) -> Dict:
+        self.detector.input_size = self.input_size
+        return self.detector.detect_pose(frame)
+
+
+def run_sweep(
+    videos: List[Path],
+    sizes: List[int],
+    reference_size: int = 640,
+    frames_per_video: int = 48,
+    family: str = 'yolov8',
+    model: Optional[str] = None,
+    device: str = 'auto',
+    warmup: int = 2
+) -> Dict:
+    """
+    Measure angle error and latency for each input size.
+
+    Args:
+        videos: Videos to sample frames from
+        sizes: Input sizes to evaluate
+        reference_size: Input size of the YOLOv8s-pose reference
+        frames_per_video: Frames sampled per video
+        family: 'yolov8' or 'lightweight'
+        model: Model name/path for the family under test
+        device: Device to run YOLO on
+        warmup: Untimed inferences per size before measuring
+
+    Returns:
+        Dictionary with per-size results
+    """
+    for size in sizes:
+        resolve_input_size(family, size)  # validate
+
+    reference = YOLOv8PoseDetector('yolov8s-pose.pt', device, reference_size)
+    if family == 'yolov8':
+        if model and model != 'yolov8s-pose.pt':
+            detector = YOLOv8PoseDetector(model, device)
+        else:
+            detector = reference
+    else:
+        detector = _LightweightSweepDetector(model or 'models/lightweight_pose.pt')
+
+    stats = {size: {'angle_errors': [], 'keypoint_errors': [], 'latencies': [], 'detected': 0}
+             for size in sizes}
+    num_frames = 0
+
+    for video in videos:
+        frames = sample_frames(video, frames_per_video)
+        print(f"  {video.name}: {len(frames)} frames")
+        if not frames:
+            continue
+
+        reference.input_size = reference_size
+        ref_keypoints = [reference.detect_pose(frame) for frame in frames]
+        num_frames += len(frames)
+
+        for size in sizes:
+            detector.input_size = size
+            for frame in frames[:warmup]:
+                detector.detect_pose(frame)
+
+            size_stats = stats[size]
+            for frame, ref in zip(frames, ref_keypoints):
+                start = time.perf_counter()
+                keypoints = detector.detect_pose(frame)
+                size_stats['latencies'].append((time.perf_counter() - start) * 1000)
+
+                if any(kp['confidence'] > 0 for kp in keypoints.values()):
+                    size_stats['detected'] += 1
+                size_stats['angle_errors'].extend(angle_errors(ref, keypoints))
+                size_stats['keypoint_errors'].extend(keypoint_errors(ref, keypoints))
+
+    results = []
+    for size in sizes:
+        s = stats[size]
+        angles = np.array(s['angle_errors']) if s['angle_errors'] else np.array([np.nan])
+        kpts = np.array(s['keypoint_errors']) if s['keypoint_errors'] else np.array([np.nan])
+        latencies = np.array(s['latencies']) if s['latencies'] else np.array([np.nan])
+        results.append({
+            'size': size,
+            'mean_angle_error': float(np.mean(angles)),
+            'p95_angle_error': float(np.percentile(angles, 95)),
+            'mean_keypoint_error': float(np.mean(kpts)),
+            'mean_latency_ms': float(np.mean(latencies)),
+            'p50_latency_ms': float(np.median(latencies)),
+            'detection_rate': s['detected'] / max(num_frames, 1),
+            'angle_samples': len(s['angle_errors']),
+        })
+
+    return {
+        'family': family,
+        'reference_size': reference_size,
+        'num_videos': len(videos),
+        'num_frames': num_frames,
+        'results': results,
+    }
+
+
+def recommend_size(results: List[Dict], max_angle_error: float) -> Dict:
+    """
+    Pick the input size with the best speed/accuracy trade-off.
+
+    The smallest size whose mean angle error is within budget wins (latency
+    grows with size, and timing noise should not pick a larger input). If no
+    size is within budget, the most accurate size is returned instead.
+
+    Args:
+        results: Per-size results from run_sweep()
+        max_angle_error: Mean angle error budget in degrees
+
+    Returns:
+        The chosen per-size result
+    """
+    valid = [r for r in results if not np.isnan(r['mean_angle_error'])]
+    if not valid:
+        raise ValueError("No size produced comparable angles; check the sample videos")
+
+    within_budget = [r for r in valid if r['mean_angle_error'] <= max_angle_error]
+    if within_budget:
+        return min(within_budget, key=lambda r: r['size'])
+    return min(valid, key=lambda r: r['mean_angle_error'])
+
+
+def print_sweep_results(sweep: Dict, chosen: Dict, max_angle_error: float) -> None:
+    """Print sweep results as a table."""
+    print("\n" + "=" * 72)
+    print(f"Input Size Sweep ({sweep['family']}, reference: YOLOv8s-pose @ {sweep['reference_size']})")
+    print("=" * 72)
+    print(f"Videos: {sweep['num_videos']}, frames: {sweep['num_frames']}")
+    print(f"\n  {'Size':>5} {'Angle err':>10} {'p95':>8} {'Kpt err':>9} {'Latency':>10} {'p50':>8} {'Detect':>8}")
+    for r in sweep['results']:
+        marker = " ←" if r['size'] == chosen['size'] else ""
+        print(f"  {r['size']:>5} {r['mean_angle_error']:>9.2f}° {r['p95_angle_error']:>7.2f}° "
+              f"{r['mean_keypoint_error']:>9.4f} {r['mean_latency_ms']:>8.1f}ms {r['p50_latency_ms']:>6.1f}ms "
+              f"{r['detection_rate'] * 100:>7.1f}%{marker}")
+    print("=" * 72)
+
+    if chosen['mean_angle_error'] <= max_angle_error:
+        print(f"✓ Recommended input size: {chosen['size']} "
+              f"(mean angle error {chosen['mean_angle_error']:.2f}° ≤ {max_angle_error}°)")
+    else:
+        print(f"⚠ No size within {max_angle_error}° budget; most accurate is {chosen['size']}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Sweep model input sizes and recommend the best speed/accuracy trade-off"
+    )
+    parser.add_argument(
+        "--videos",
+        type=str,
+        default="../songs",
+        help="Directory containing video files"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma-separated input sizes to evaluate"
+    )
+    parser.add_argument(
+        "--reference-size",
+        type=int,
+        default=640,
+        help="Input size of the high-resolution YOLOv8s-pose reference"
+    )
+    parser.add_argument(
+        "--family",
+        default="yolov8",
+        choices=["yolov8", "lightweight"],
+        help="Model family to sweep"
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="Model name or path for the family under test"
+    )
+    parser.add_argument(
+        "--sample-videos",
+        type=int,
+        default=3,
+        help="Number of videos to sample"
+    )
+    parser.add_argument(
+        "--frames-per-video",
+        type=int,
+        default=48,
+        help="Frames sampled per video"
+    )
+    parser.add_argument(
+        "--max-angle-error",
+        type=float,
+        default=5.0,
+        help="Mean angle error budget in degrees"
+    )
+    parser.add_argument(
+        "--device",
+        default="auto",
+        choices=["auto", "cpu", "cuda", "mps"],
+        help="Device to run inference on"
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Write the recommended size to models/input_size.json"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Optional path to write the sweep results as JSON"
+    )
+
+    args = parser.parse_args()
+
+    videos = find_videos(Path(args.videos))
+    if not videos:
+        print(f"✗ No video files found in {args.videos}")
+        return
+
+    # Spread the sample across the catalog
+    if len(videos) > args.sample_videos:
+        idx = np.linspace(0, len(videos) - 1, args.sample_videos).astype(int)
+        videos = [videos[i] for i in idx]
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    print("Sampling frames...")
+    sweep = run_sweep(
+        videos,
+        sizes,
+        reference_size=args.reference_size,
+        frames_per_video=args.frames_per_video,
+        family=args.family,
+        model=args.model,
+        device=args.device,
+    )
+
+    chosen = recommend_size(sweep['results'], args.max_angle_error)
+    sweep['recommended_size'] = chosen['size']
+    sweep['max_angle_error'] = args.max_angle_error
+    print_sweep_results(sweep, chosen, args.max_angle_error)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(sweep, f, indent=2)
+        print(f"✓ Report saved to {args.report}")
+
+    if args.apply:
+        save_input_size(args.family, chosen['size'], {
+            'reference_size': sweep['reference_size'],
+            'max_angle_error': args.max_angle_error,
+            'mean_angle_error': chosen['mean_angle_error'],
+            'mean_latency_ms': chosen['mean_latency_ms'],
+            'num_frames': sweep['num_frames'],
+        })
+        print(f"✓ Saved {args.family} input size {chosen['size']} to models/input_size.json")
+        print("  Extraction (--imgsz) and export now default to this size.")
+        print("  Re-export the .pte model so the app matches the reference poses.")
+    else:
+        print("\nRun with --apply to make this the default for extraction and export.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for the confidence backfill: the vectorized rewrite produces the same
+angles and confidences as the original per-frame code, unchanged files are
+left alone, and a file that fails makes the run exit non-zero.
+"""
+
+import contextlib
+import io
+import json
+import math
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import backfill_pose_confidence
+from backfill_pose_confidence import process_pose_file
+from pose_sequence import ANGLE_NAMES, KEYPOINT_NAMES
+
+JOINT_MAP = {
+    "leftArm": ("leftShoulder", "leftElbow", "leftWrist"),
+    "rightArm": ("rightShoulder", "rightElbow", "rightWrist"),
+    "leftThigh": ("leftHip", "leftKnee", "leftAnkle"),
+    "rightThigh": ("rightHip", "rightKnee", "rightAnkle"),
+}
+
+DUPLICATED_JOINTS = {
+    "leftElbow": "leftArm",
+    "rightElbow": "rightArm",
+    "leftLeg": "leftThigh",
+    "rightLeg": "rightThigh",
+}
+
+
+def per_frame_angles(keypoints: dict) -> tuple:
+    """The original backfill's recalculate_angles(), one frame at a time."""
+    angles = {name: 0.0 for name in ANGLE_NAMES}
+    confidence = {name: 0.0 for name in ANGLE_NAMES}
+
+    for joint, triple in JOINT_MAP.items():
+        points = [keypoints.get(name) for name in triple]
+        if any(point is None for point in points):
+            continue
+        confidence[joint] = min(float(point.get("confidence", 0.0)) for point in points)
+        if confidence[joint] == 0.0:
+            continue
+
+        p1, p2, p3 = points
+        v1 = (p1["x"] - p2["x"], p1["y"] - p2["y"])
+        v2 = (p3["x"] - p2["x"], p3["y"] - p2["y"])
+        mag1, mag2 = math.hypot(*v1), math.hypot(*v2)
+        if mag1 <= 1e-9 or mag2 <= 1e-9:
+            continue
+        cos_angle = max(-1.0, min(1.0, (v1[0] * v2[0] + v1[1] * v2[1]) / (mag1 * mag2)))
+        angles[joint] = math.degrees(math.acos(cos_angle))
+
+    for duplicate, source in DUPLICATED_JOINTS.items():
+        confidence[duplicate] = confidence[source]
+        angles[duplicate] = angles[source]
+    return angles, confidence
+
+
+def sample_pose_data(frames: int = 60) -> dict:
+    """Old-format pose file with the awkward cases real extractions contain."""
+    rng = np.random.default_rng(0)
+    data = {"songId": "sample", "fps": 30.0, "totalFrames": frames, "frames": []}
+    for i in range(frames):
+        keypoints = {
+            name: {"x": float(x), "y": float(y), "confidence": float(c)}
+            for name, (x, y, c) in zip(KEYPOINT_NAMES, rng.uniform(0, 1, (len(KEYPOINT_NAMES), 3)))
+        }
+        if i % 7 == 1:
+            keypoints["leftWrist"]["confidence"] = 0.0  # unseen joint
+        if i % 7 == 2:
+            del keypoints["rightKnee"]  # missing keypoint
+        if i % 7 == 3:
+            keypoints["leftElbow"] = dict(keypoints["leftShoulder"])  # zero-length limb
+        if i % 7 == 4:
+            keypoints["rightShoulder"] = {"x": 0.2, "y": 0.5, "confidence": 0.9}
+            keypoints["rightElbow"] = {"x": 0.4, "y": 0.5, "confidence": 0.9}
+            keypoints["rightWrist"] = {"x": 0.6, "y": 0.5, "confidence": 0.9}  # straight arm
+        if i % 7 == 5:
+            del keypoints["leftHip"]["confidence"]
+        frame = {"frameNumber": i, "timestamp": i / 30.0, "keypoints": keypoints,
+                 "angles": {name: 0.0 for name in ANGLE_NAMES}}
+        if i % 2:
+            frame["angleConfidence"] = {name: 1.0 for name in ANGLE_NAMES}  # stale
+        data["frames"].append(frame)
+    return data
+
+
+class TestParity(unittest.TestCase):
+    """process_pose_file() matches the per-frame implementation."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "sample.json"
+        self.data = sample_pose_data()
+        self.path.write_text(json.dumps(self.data, indent=2))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_output_as_per_frame_code(self):
+        status, frame_count = process_pose_file(self.path)
+
+        self.assertEqual((status, frame_count), ("changed", 60))
+        with open(self.path) as f:
+            result = json.load(f)
+
+        self.assertEqual(
+            {k: v for k, v in result.items() if k != "frames"},
+            {k: v for k, v in self.data.items() if k != "frames"}
+        )
+        for i, (frame, original) in enumerate(zip(result["frames"], self.data["frames"])):
+            angles, confidence = per_frame_angles(original["keypoints"])
+            with self.subTest(frame=i):
+                self.assertEqual(frame["keypoints"], original["keypoints"])
+                self.assertEqual(list(frame["angles"]), list(angles))
+                self.assertEqual(list(frame["angleConfidence"]), list(confidence))
+                np.testing.assert_allclose(list(frame["angles"].values()), list(angles.values()),
+                                           rtol=0, atol=1e-9)
+                self.assertEqual(frame["angleConfidence"], confidence)
+
+        self.assertFalse(any(path.name.endswith(".tmp") for path in self.path.parent.iterdir()))
+
+    def test_second_run_leaves_file_alone(self):
+        process_pose_file(self.path)
+        content = self.path.read_bytes()
+        mtime = self.path.stat().st_mtime_ns
+
+        self.assertEqual(process_pose_file(self.path), ("unchanged", 60))
+        self.assertEqual(self.path.read_bytes(), content)
+        self.assertEqual(self.path.stat().st_mtime_ns, mtime)
+
+    def test_dry_run_does_not_write(self):
+        content = self.path.read_bytes()
+        self.assertEqual(process_pose_file(self.path, dry_run=True), ("changed", 60))
+        self.assertEqual(self.path.read_bytes(), content)
+
+
+class TestCli(unittest.TestCase):
+    """main() over a directory with the process pool."""
+
+    def run_cli(self, poses: Path) -> tuple:
+        argv = ["backfill_pose_confidence.py", "--poses-dir", str(poses), "--jobs", "2"]
+        output = io.StringIO()
+        code = 0
+        with mock.patch("sys.argv", argv), contextlib.redirect_stdout(output):
+            try:
+                backfill_pose_confidence.main()
+            except SystemExit as e:
+                code = e.code
+        return code, output.getvalue()
+
+    def test_failure_exits_non_zero(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            poses = Path(tmp)
+            for name in ("alpha", "beta"):
+                (poses / f"{name}.json").write_text(json.dumps(sample_pose_data(10)))
+
+            code, output = self.run_cli(poses)
+            self.assertEqual(code, 0)
+            self.assertIn("Summary: 2 changed, 0 unchanged, 0 failed", output)
+
+            (poses / "broken.json").write_text('{"frames": [')
+            code, output = self.run_cli(poses)
+            self.assertEqual(code, 1)
+            self.assertIn("✗ Failed broken.json", output)
+            self.assertIn("Summary: 0 changed, 2 unchanged, 1 failed", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
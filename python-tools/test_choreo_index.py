@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Tests for the choreography index: incremental rebuilds only re-embed
+changed songs, approximate search agrees with exact search, and an empty
+catalog builds and queries cleanly.
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from choreo_index import (
+    LSH_TABLES,
+    ChoreoIndex,
+    build_index,
+    embedding_dims,
+    lsh_codes,
+    lsh_planes,
+)
+from pose_sequence import KEYPOINT_INDEX, KEYPOINT_NAMES, PoseSequence
+
+FPS = 30.0
+# One beat every 15 frames, so windows start on whole frames
+BPM = 120.0
+
+
+def dancer_keypoints(frames: int, seed: int) -> np.ndarray:
+    """A standing figure whose limbs wander smoothly (no repeating moves)."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.35, 0.65, (len(KEYPOINT_NAMES), 2))
+    base[[KEYPOINT_INDEX['leftShoulder'], KEYPOINT_INDEX['rightShoulder']], 1] = 0.3
+    base[[KEYPOINT_INDEX['leftHip'], KEYPOINT_INDEX['rightHip']], 1] = 0.6
+
+    drift = np.cumsum(rng.normal(0, 0.01, (frames, len(KEYPOINT_NAMES), 2)), axis=0)
+    kernel = np.ones(9) / 9
+    drift = np.apply_along_axis(lambda track: np.convolve(track, kernel, mode='same'), 0, drift)
+
+    keypoints = np.empty((frames, len(KEYPOINT_NAMES), 3), dtype=np.float32)
+    keypoints[:, :, :2] = base + drift
+    keypoints[:, :, 2] = 0.9
+    return keypoints
+
+
+def write_song(path: Path, keypoints: np.ndarray) -> None:
+    PoseSequence(keypoints, FPS, path.stem, metadata={'bpm': BPM}).to_json(path)
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    """build_index() reuses songs until their content changes."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.poses = Path(self.tmp.name)
+        write_song(self.poses / 'alpha.json', dancer_keypoints(300, seed=1))
+        write_song(self.poses / 'beta.json', dancer_keypoints(300, seed=2))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self) -> dict:
+        return build_index(self.poses, bpm=BPM)
+
+    def test_rebuild_reuses_touches_and_removes(self):
+        stats = self.build()
+        self.assertEqual((stats['songs'], stats['embedded'], stats['reused']), (2, 2, 0))
+        self.assertGreater(stats['windows'], 0)
+        embeddings = np.array(ChoreoIndex(self.poses / 'choreo_index').embeddings)
+
+        stats = self.build()
+        self.assertEqual((stats['embedded'], stats['reused'], stats['removed']), (0, 2, 0))
+
+        # Touched but unchanged: the sha256 matches, so nothing is re-embedded
+        alpha = self.poses / 'alpha.json'
+        stat = alpha.stat()
+        os.utime(alpha, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        stats = self.build()
+        self.assertEqual((stats['embedded'], stats['reused']), (0, 2))
+        index = ChoreoIndex(self.poses / 'choreo_index')
+        self.assertEqual(index.songs[0]['mtimeNs'], alpha.stat().st_mtime_ns)
+        np.testing.assert_array_equal(index.embeddings, embeddings)
+
+        # Changed content is re-embedded
+        write_song(alpha, dancer_keypoints(240, seed=3))
+        stats = self.build()
+        self.assertEqual((stats['embedded'], stats['reused']), (1, 1))
+
+        # Removed songs drop out along with their cached embeddings
+        (self.poses / 'beta.json').unlink()
+        stats = self.build()
+        self.assertEqual((stats['songs'], stats['removed']), (1, 1))
+        index = ChoreoIndex(self.poses / 'choreo_index')
+        self.assertEqual([song['file'] for song in index.songs], ['alpha.json'])
+        self.assertEqual(len(index), index.songs[0]['rows'][1])
+        self.assertFalse((self.poses / 'choreo_index' / 'songs' / 'beta.npz').exists())
+
+    def test_force_re_embeds_everything(self):
+        self.build()
+        stats = build_index(self.poses, bpm=BPM, force=True)
+        self.assertEqual((stats['embedded'], stats['reused']), (2, 0))
+
+
+class TestSearch(unittest.TestCase):
+    """Exact and approximate queries."""
+
+    # beta repeats alpha's moves two seconds (one window hop is one second) earlier
+    SHIFT_FRAMES = 60
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        poses = Path(cls.tmp.name)
+        alpha = dancer_keypoints(900, seed=4)
+        beta = np.concatenate([alpha[cls.SHIFT_FRAMES:], dancer_keypoints(cls.SHIFT_FRAMES, seed=5)])
+        write_song(poses / 'alpha.json', alpha)
+        write_song(poses / 'beta.json', beta)
+        for seed in range(6, 10):
+            write_song(poses / f"other{seed}.json", dancer_keypoints(900, seed=seed))
+        build_index(poses, bpm=BPM)
+        cls.index = ChoreoIndex(poses / 'choreo_index')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_window_finds_itself(self):
+        embeddings = np.asarray(self.index.embeddings)
+        for row in range(0, len(self.index), 7):
+            for approximate in (False, True):
+                with self.subTest(row=row, approximate=approximate):
+                    results = self.index.search(embeddings[row], k=5, approximate=approximate)
+                    # alpha's windows reappear in beta, so the top match can be a tie
+                    best = [result['row'] for result in results if result['similarity'] >= results[0]['similarity']]
+                    self.assertIn(row, best)
+                    self.assertAlmostEqual(results[0]['similarity'], 1.0, places=3)
+
+    def test_approximate_matches_exact_on_candidates(self):
+        embeddings = np.asarray(self.index.embeddings)
+        k = 2
+        branches = set()
+        for row in range(len(self.index)):
+            with self.subTest(row=row):
+                candidates = self.index.candidates(embeddings[row])
+                self.assertIn(row, candidates)
+                approximate = self.index.search(embeddings[row], k=k, approximate=True)
+                exact = self.index.search(embeddings[row], k=k)
+
+                if len(candidates) < k:
+                    # Too few candidates: falls back to exact search
+                    self.assertEqual(approximate, exact)
+                    branches.add('exact')
+                    continue
+                branches.add('approximate')
+                # Only candidates are scored, with the same similarity and order as exact search
+                self.assertTrue(all(result['row'] in candidates for result in approximate))
+                similarity = np.asarray(self.index.embeddings) @ embeddings[row]
+                best = candidates[np.argsort(-similarity[candidates], kind='stable')[:k]]
+                self.assertEqual(
+                    [result['similarity'] for result in approximate],
+                    [round(float(similarity[i]), 4) for i in best]
+                )
+                self.assertGreaterEqual(exact[-1]['similarity'], approximate[-1]['similarity'])
+        self.assertEqual(branches, {'exact', 'approximate'})
+
+    def test_find_move_in_other_song(self):
+        shift = self.SHIFT_FRAMES / FPS
+        for approximate in (False, True):
+            with self.subTest(approximate=approximate):
+                results = self.index.find_move('alpha', 10.0, k=3, approximate=approximate, other_songs=True)
+                self.assertEqual(results[0]['songId'], 'beta')
+                self.assertAlmostEqual(results[0]['start'] + shift, self.index.start[self.index.window_at('alpha', 10.0)])
+                self.assertGreater(results[0]['similarity'], 0.99)
+
+    def test_similar_songs(self):
+        results = self.index.similar_songs('alpha', k=2)
+        self.assertEqual(results[0]['songId'], 'beta')
+
+    def test_unknown_song(self):
+        with self.assertRaises(KeyError):
+            self.index.find_move('missing', 1.0)
+
+
+class TestEmptyCatalog(unittest.TestCase):
+    """No pose files (or no windows) still builds a queryable index."""
+
+    def test_lsh_codes_without_windows(self):
+        codes = lsh_codes(np.zeros((0, embedding_dims()), dtype=np.float32), lsh_planes(embedding_dims()))
+        self.assertEqual(codes.shape, (0, LSH_TABLES))
+
+    def test_build_and_query_empty_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stats = build_index(tmp)
+            index = ChoreoIndex(Path(tmp) / 'choreo_index')
+
+            self.assertEqual((stats['songs'], stats['windows']), (0, 0))
+            self.assertEqual(len(index), 0)
+            query = np.ones(embedding_dims(), dtype=np.float32)
+            self.assertEqual(index.search(query), [])
+            self.assertEqual(index.search(query, approximate=True), [])
+
+    def test_song_too_short_for_a_window(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_song(Path(tmp) / 'short.json', dancer_keypoints(20, seed=1))
+            stats = build_index(tmp, bpm=BPM)
+            index = ChoreoIndex(Path(tmp) / 'choreo_index')
+
+            self.assertEqual((stats['songs'], stats['windows']), (1, 0))
+            self.assertEqual(index.similar_songs('short'), [])
+            with self.assertRaises(KeyError):
+                index.window_at('short', 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
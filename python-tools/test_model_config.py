@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for input size configuration: a malformed or invalid
+models/input_size.json falls back to the defaults instead of breaking the
+modules that resolve their size at import time.
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from model_config import (
+    DEFAULT_INPUT_SIZES,
+    configured_input_size,
+    load_input_sizes,
+    resolve_input_size,
+    save_input_size,
+)
+
+
+class TestLoadInputSizes(unittest.TestCase):
+    """load_input_sizes() and configured_input_size() tolerate bad configs."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = Path(self.tmp.name) / 'input_size.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, content: str) -> tuple:
+        self.config.write_text(content)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            sizes = load_input_sizes(self.config)
+            configured = configured_input_size('yolov8', config_path=self.config)
+        return sizes, configured, output.getvalue()
+
+    def test_missing_config_uses_defaults(self):
+        self.assertEqual(load_input_sizes(self.config), DEFAULT_INPUT_SIZES)
+        self.assertIsNone(configured_input_size('yolov8', config_path=self.config))
+
+    def test_valid_config_overrides(self):
+        sizes, configured, output = self.load(json.dumps({'yolov8': 320}))
+        self.assertEqual(sizes, {'yolov8': 320, 'lightweight': DEFAULT_INPUT_SIZES['lightweight']})
+        self.assertEqual(configured, 320)
+        self.assertEqual(output, '')
+
+    def test_malformed_config_falls_back_with_warning(self):
+        for content in ('{"yolov8": 3', '[320]', ''):
+            with self.subTest(content=content):
+                sizes, configured, output = self.load(content)
+                self.assertEqual(sizes, DEFAULT_INPUT_SIZES)
+                self.assertIsNone(configured)
+                self.assertIn('⚠', output)
+
+    def test_invalid_size_falls_back_with_warning(self):
+        for size in (250, 0, -32, True, '320'):
+            with self.subTest(size=size):
+                sizes, configured, output = self.load(json.dumps({'yolov8': size, 'lightweight': 160}))
+                self.assertEqual(sizes, {'yolov8': DEFAULT_INPUT_SIZES['yolov8'], 'lightweight': 160})
+                self.assertIsNone(configured)
+                self.assertIn('yolov8', output)
+
+    def test_explicit_sizes_are_still_validated(self):
+        with self.assertRaises(ValueError):
+            resolve_input_size('yolov8', 250)
+        with self.assertRaises(ValueError):
+            configured_input_size('yolov8', 250, config_path=self.config)
+        with self.assertRaises(ValueError):
+            save_input_size('yolov8', 250, config_path=self.config)
+        self.assertFalse(self.config.exists())
+
+    def test_save_replaces_malformed_config(self):
+        self.config.write_text('not json')
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_input_size('lightweight', 224, {'mean_angle_error': 1.5}, config_path=self.config)
+
+        data = json.loads(self.config.read_text())
+        self.assertEqual(data['lightweight'], 224)
+        self.assertEqual(data['sweeps']['lightweight'], {'mean_angle_error': 1.5})
+        self.assertEqual(load_input_sizes(self.config)['lightweight'], 224)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Tests for time-chunked pose assets: segment loads through the seek
+offsets must equal slicing the full sequence, and regenerating a segment
+must rewrite only the chunks it overlaps, with the same frames at chunk
+boundaries as decoding the video from the start.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from pose_chunks import ChunkedPoses, load_segment, regenerate_segment, write_chunks
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+
+
+def sample_sequence(frames: int, fps: float, seed: int = 0) -> PoseSequence:
+    rng = np.random.default_rng(seed)
+    return PoseSequence(
+        rng.random((frames, len(KEYPOINT_NAMES), 3)).astype(np.float32),
+        fps,
+        'test_song',
+        metadata={'modelVersion': 'yolov8s-pose'},
+    )
+
+
+def assert_same_frames(actual: PoseSequence, expected: PoseSequence) -> None:
+    np.testing.assert_array_equal(actual.frame_numbers, expected.frame_numbers)
+    np.testing.assert_array_equal(actual.timestamps, expected.timestamps)
+    np.testing.assert_array_equal(actual.keypoints, expected.keypoints)
+    np.testing.assert_array_equal(actual.angles, expected.angles)
+    np.testing.assert_array_equal(actual.angle_confidence, expected.angle_confidence)
+
+
+class FrameMeanDetector:
+    """Stand-in detector whose keypoints encode the frame's mean pixel value."""
+
+    def __init__(self):
+        self.frames = 0
+
+    def detect_keypoints(self, frame: np.ndarray) -> np.ndarray:
+        self.frames += 1
+        value = float(frame.mean()) / 255.0
+        return np.full((len(KEYPOINT_NAMES), 3), value, dtype=np.float32)
+
+
+class KeyframeSeekingCapture:
+    """VideoCapture whose frame seeks land on the previous keyframe, like many codecs."""
+
+    KEYFRAME_INTERVAL = 12
+    VideoCapture = cv2.VideoCapture
+
+    def __init__(self, path):
+        self.cap = self.VideoCapture(path)
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            value = int(value) // self.KEYFRAME_INTERVAL * self.KEYFRAME_INTERVAL
+        return self.cap.set(prop, value)
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+
+class TestChunkedSegments(unittest.TestCase):
+    """load_segment() equals slicing the full sequence."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_segments_match_full_sequence(self):
+        rng = np.random.default_rng(1)
+        for fps, frames, chunk_seconds in [(30.0, 400, 4.0), (29.97, 331, 2.5), (24.0, 250, 3.0)]:
+            sequence = sample_sequence(frames, fps)
+            chunks_dir = self.dir / f"fps{fps}.chunks"
+            index = write_chunks(sequence, chunks_dir, chunk_seconds)
+            chunked = ChunkedPoses(chunks_dir)
+
+            self.assertEqual(index['totalFrames'], frames)
+            self.assertGreater(len(index['chunks']), 2)
+
+            boundaries = [chunk['start'] for chunk in index['chunks']]
+            ranges = [
+                (0.0, sequence.duration),
+                # Exactly on and just around chunk boundaries
+                (boundaries[1], boundaries[2]),
+                (boundaries[1] - 0.01, boundaries[1] + 0.01),
+                (boundaries[1] - 1.3, boundaries[2] + 0.7),
+                # Open-ended and empty ranges
+                (-5.0, 0.5),
+                (sequence.duration - 0.4, sequence.duration + 10),
+                (2.0, 2.0),
+            ]
+            ranges += [tuple(sorted(rng.uniform(-1, sequence.duration + 1, 2))) for _ in range(40)]
+
+            for t0, t1 in ranges:
+                with self.subTest(fps=fps, t0=t0, t1=t1):
+                    assert_same_frames(chunked.load_segment(t0, t1), sequence.slice_time(t0, t1))
+
+            assert_same_frames(chunked.load_all(), sequence)
+            self.assertEqual(load_segment(chunks_dir, 0, 1).metadata, sequence.metadata)
+
+    def test_segment_reads_only_overlapping_chunks(self):
+        sequence = sample_sequence(300, 30.0)
+        chunks_dir = self.dir / 'song.chunks'
+        write_chunks(sequence, chunks_dir, 2.0)
+
+        # Corrupt every chunk except the one covering 4-6s
+        for path in chunks_dir.glob('chunk_*.json'):
+            if path.name != 'chunk_0002.json':
+                path.write_text('not json')
+
+        assert_same_frames(load_segment(chunks_dir, 4.5, 5.5), sequence.slice_time(4.5, 5.5))
+
+    def test_rechunking_removes_stale_chunks(self):
+        chunks_dir = self.dir / 'song.chunks'
+        write_chunks(sample_sequence(300, 30.0), chunks_dir, 2.0)
+        write_chunks(sample_sequence(90, 30.0), chunks_dir, 2.0)
+
+        self.assertEqual(sorted(p.name for p in chunks_dir.glob('chunk_*.json')),
+                         ['chunk_0000.json', 'chunk_0001.json'])
+
+
+class TestRegenerateSegment(unittest.TestCase):
+    """regenerate_segment() rewrites only the overlapping chunks."""
+
+    FPS = 10.0
+    FRAMES = 60
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.video = self.dir / 'song.avi'
+        writer = cv2.VideoWriter(str(self.video), cv2.VideoWriter_fourcc(*'MJPG'), self.FPS, (32, 32))
+        for i in range(self.FRAMES):
+            writer.write(np.full((32, 32, 3), i * 4, dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_overlapping_chunks_are_rewritten(self):
+        sequence = sample_sequence(self.FRAMES, self.FPS)
+        chunks_dir = self.dir / 'song.chunks'
+        write_chunks(sequence, chunks_dir, 2.0)
+        detector = FrameMeanDetector()
+
+        rewritten = regenerate_segment(str(self.video), chunks_dir, 2.5, 3.5, detector=detector)
+
+        self.assertEqual(rewritten, ['chunk_0001.json'])
+        self.assertEqual(detector.frames, 20)
+
+        reloaded = ChunkedPoses(chunks_dir)
+        assert_same_frames(reloaded.load_segment(0, 2.0), sequence.slice_time(0, 2.0))
+        assert_same_frames(reloaded.load_segment(4.0, 6.0), sequence.slice_time(4.0, 6.0))
+
+        regenerated = reloaded.load_segment(2.0, 4.0)
+        np.testing.assert_array_equal(regenerated.frame_numbers, np.arange(20, 40))
+        # MJPG is lossy; the stand-in keypoints track each frame's gray level
+        np.testing.assert_allclose(regenerated.keypoints[:, 0, 0], np.arange(20, 40) * 4 / 255.0, atol=0.02)
+        self.assertEqual(reloaded.index['totalFrames'], self.FRAMES)
+
+    def test_chunk_boundaries_match_sequential_decode(self):
+        # mp4v has inter frames, unlike MJPG
+        video = self.dir / 'song.mp4'
+        writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*'mp4v'), self.FPS, (32, 32))
+        for i in range(self.FRAMES):
+            writer.write(np.full((32, 32, 3), i * 4, dtype=np.uint8))
+        writer.release()
+
+        cap = cv2.VideoCapture(str(video))
+        detector = FrameMeanDetector()
+        expected = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            expected.append(detector.detect_keypoints(frame)[0, 0])
+        cap.release()
+        self.assertEqual(len(expected), self.FRAMES)
+
+        for seek in ('accurate', 'keyframe'):
+            for t0, t1 in [(2.5, 3.5), (3.9, 4.1), (4.5, 6.0)]:
+                with self.subTest(seek=seek, t0=t0, t1=t1):
+                    chunks_dir = self.dir / f"{seek}_{t0}.chunks"
+                    write_chunks(sample_sequence(self.FRAMES, self.FPS), chunks_dir, 2.0)
+                    capture = KeyframeSeekingCapture if seek == 'keyframe' else cv2.VideoCapture
+                    with mock.patch.object(cv2, 'VideoCapture', capture):
+                        regenerate_segment(str(video), chunks_dir, t0, t1, detector=FrameMeanDetector())
+
+                    regenerated = ChunkedPoses(chunks_dir).load_segment(t0, t1)
+                    frames = regenerated.frame_numbers
+                    self.assertEqual(frames[0], int(t0 * self.FPS))
+                    np.testing.assert_array_equal(regenerated.keypoints[:, 0, 0], np.array(expected)[frames])
+
+    def test_rejects_ranges_outside_the_asset(self):
+        chunks_dir = self.dir / 'song.chunks'
+        write_chunks(sample_sequence(self.FRAMES, self.FPS), chunks_dir, 2.0)
+
+        with self.assertRaises(ValueError):
+            regenerate_segment(str(self.video), chunks_dir, 100, 110, detector=FrameMeanDetector())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for the .posez export: decoded poses stay within the accuracy gate,
+confidence quantization never changes which joints scoring uses, and the
+files are much smaller than the JSON they replace.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pose_codec import (
+    CONFIDENCE_LEVELS,
+    MAX_ANGLE_ERROR,
+    check_accuracy,
+    decode,
+    encode,
+    encode_file,
+    load_posez,
+    save_posez,
+)
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+from score_engine import JOINT_CONFIDENCE_THRESHOLD
+
+
+def dance_sequence(frames: int = 300, fps: float = 30.0, seed: int = 0) -> PoseSequence:
+    """Smoothly moving keypoints, like a real extraction, with some unseen ones."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames)[:, None] / fps
+    base = rng.uniform(0.2, 0.8, (1, len(KEYPOINT_NAMES), 2))
+    phase = rng.uniform(0, 2 * np.pi, (1, len(KEYPOINT_NAMES), 1))
+    keypoints = np.empty((frames, len(KEYPOINT_NAMES), 3), dtype=np.float32)
+    keypoints[:, :, :2] = base + 0.1 * np.sin(2 * np.pi * 0.5 * t[:, :, None] + phase)
+    keypoints[:, :, 2] = rng.uniform(0.0, 1.0, (frames, len(KEYPOINT_NAMES)))
+    keypoints[rng.random((frames, len(KEYPOINT_NAMES))) < 0.05, 2] = 0.0
+    return PoseSequence(keypoints, fps, 'test_song', metadata={'modelVersion': 'yolov8s-pose'})
+
+
+class TestRoundTrip(unittest.TestCase):
+    """encode()/decode() and the file helpers."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_decoded_sequence_is_within_tolerance(self):
+        sequence = dance_sequence()
+        decoded = decode(encode(sequence))
+
+        self.assertEqual(decoded.song_id, sequence.song_id)
+        self.assertEqual(decoded.fps, sequence.fps)
+        self.assertEqual(decoded.metadata, sequence.metadata)
+        np.testing.assert_array_equal(decoded.frame_numbers, sequence.frame_numbers)
+        np.testing.assert_allclose(decoded.timestamps, sequence.timestamps, rtol=0, atol=1e-9)
+
+        accuracy = check_accuracy(sequence, decoded)
+        self.assertLess(accuracy['maxAngleError'], MAX_ANGLE_ERROR)
+        self.assertLess(accuracy['maxKeypointError'], 2.0 / 65535)
+        # Up to one level off next to zero and the threshold, half a level elsewhere
+        self.assertLessEqual(accuracy['maxConfidenceError'], 1.0 / CONFIDENCE_LEVELS + 1e-6)
+        self.assertEqual(accuracy['confidenceFlips'], 0)
+        self.assertEqual(accuracy['thresholdFlips'], 0)
+
+    def test_irregular_frames_and_timestamps(self):
+        sequence = dance_sequence(40)
+        sequence = PoseSequence(
+            sequence.keypoints,
+            sequence.fps,
+            sequence.song_id,
+            timestamps=np.sort(np.random.default_rng(3).uniform(0, 2, 40)),
+            frame_numbers=np.arange(40) * 2 + 5,
+        )
+        decoded = decode(encode(sequence))
+
+        np.testing.assert_array_equal(decoded.frame_numbers, sequence.frame_numbers)
+        np.testing.assert_array_equal(decoded.timestamps, sequence.timestamps)
+
+    def test_file_round_trip(self):
+        sequence = dance_sequence(50)
+        path = self.dir / 'song.posez'
+
+        size = save_posez(sequence, path)
+
+        self.assertEqual(size, path.stat().st_size)
+        np.testing.assert_array_equal(load_posez(path).keypoints, decode(encode(sequence)).keypoints)
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            decode(b'JSON' + bytes(16))
+
+
+class TestConfidenceQuantization(unittest.TestCase):
+    """Decoded confidences stay on the same side of zero and the threshold."""
+
+    def decoded_confidence(self, values: np.ndarray) -> np.ndarray:
+        keypoints = np.full((len(values), len(KEYPOINT_NAMES), 3), 0.5, dtype=np.float32)
+        keypoints[:, 0, 2] = values
+        sequence = PoseSequence(keypoints, 30.0, 'test_song')
+        return decode(encode(sequence)).keypoints[:, 0, 2]
+
+    def test_threshold_side_is_preserved(self):
+        values = np.concatenate([
+            np.linspace(0.29, 0.31, 2001),
+            [75.5 / 255, 76 / 255, 76.4 / 255, 76.5 / 255, 76.6 / 255, 77 / 255],
+            [JOINT_CONFIDENCE_THRESHOLD, np.nextafter(np.float32(JOINT_CONFIDENCE_THRESHOLD), np.float32(0))],
+        ]).astype(np.float32)
+
+        decoded = self.decoded_confidence(values)
+
+        original_above = values.astype(np.float64) >= JOINT_CONFIDENCE_THRESHOLD
+        decoded_above = decoded.astype(np.float64) >= JOINT_CONFIDENCE_THRESHOLD
+        np.testing.assert_array_equal(decoded_above, original_above)
+
+    def test_seen_keypoints_stay_seen(self):
+        values = np.array([0.0, 1e-6, 0.001, 0.5 / 255, 1.0 / 255, 1.0], dtype=np.float32)
+
+        decoded = self.decoded_confidence(values)
+
+        np.testing.assert_array_equal(decoded > 0, values > 0)
+        self.assertEqual(decoded[0], 0.0)
+        self.assertEqual(decoded[-1], 1.0)
+
+    def test_rounds_to_nearest_away_from_the_threshold(self):
+        values = np.random.default_rng(4).uniform(0.0, 1.0, 5000).astype(np.float32)
+        decoded = self.decoded_confidence(values)
+
+        error = np.abs(decoded.astype(np.float64) - values)
+        near_edge = (values < 1.0 / 255) | (np.abs(values - JOINT_CONFIDENCE_THRESHOLD) < 1.0 / 255)
+        self.assertLessEqual(error[~near_edge].max(), 0.5 / CONFIDENCE_LEVELS + 1e-6)
+        self.assertLessEqual(error.max(), 1.0 / CONFIDENCE_LEVELS + 1e-6)
+
+    def test_check_accuracy_counts_threshold_flips(self):
+        sequence = dance_sequence(20)
+        decoded = decode(encode(sequence))
+        keypoints = decoded.keypoints.copy()
+        # Push one frame's confidences just across the threshold
+        keypoints[0, :, 2] = np.where(
+            sequence.keypoints[0, :, 2] >= JOINT_CONFIDENCE_THRESHOLD, 0.29, 0.31
+        )
+        tampered = PoseSequence(keypoints, decoded.fps, decoded.song_id)
+
+        self.assertEqual(check_accuracy(sequence, decoded)['thresholdFlips'], 0)
+        self.assertGreater(check_accuracy(sequence, tampered)['thresholdFlips'], 0)
+
+
+class TestEncodeFile(unittest.TestCase):
+    """encode_file() report entries."""
+
+    def test_report_entry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            sequence = dance_sequence()
+            json_path = tmp / 'song.json'
+            sequence.to_json(json_path)
+
+            entry = encode_file(json_path, tmp / 'out')
+
+            self.assertEqual(entry['frames'], len(sequence))
+            self.assertEqual(entry['posezBytes'], (tmp / 'out' / 'song.posez').stat().st_size)
+            self.assertLess(entry['posezBytes'], entry['jsonGzipBytes'])
+            self.assertEqual(entry['ratio'], round(entry['jsonBytes'] / entry['posezBytes'], 1))
+            self.assertGreater(entry['ratio'], 10)
+            self.assertEqual(entry['accuracy']['thresholdFlips'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
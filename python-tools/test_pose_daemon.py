@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for the pose daemon: the JSON-lines protocol over a real Unix socket
+with a stubbed detector and extraction, the detector LRU cache, and the
+fallback to local extraction when no daemon is listening.
+"""
+
+import contextlib
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import preprocess_video_yolov8
+from pose_daemon import (
+    SOCKET_ENV,
+    PoseDaemonServer,
+    PoseWorker,
+    _request,
+    ping,
+    submit_extract,
+    submit_job,
+)
+
+TOTAL_FRAMES = 5
+
+
+class StubDetector:
+    """Stands in for YOLOv8PoseDetector; counts how often a model is loaded."""
+
+    loads = []
+
+    def __init__(self, model_name='yolov8s-pose.pt', device='auto', input_size=None):
+        StubDetector.loads.append((model_name, device, input_size))
+        self.model = object()
+
+
+def stub_extract(video_path, output_path, model_name, device, progress_callback,
+                 input_size, detector, chunk_seconds):
+    """Reports progress frame by frame and writes the output file."""
+    if Path(video_path).name == 'broken.mp4':
+        raise ValueError("Could not open video")
+    for frame in range(1, TOTAL_FRAMES + 1):
+        progress_callback(frame, TOTAL_FRAMES)
+    Path(output_path).write_text('{}')
+
+
+class TestDaemonProtocol(unittest.TestCase):
+    """Requests and streamed events over the Unix socket."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.socket_path = str(self.dir / 'daemon.sock')
+        StubDetector.loads = []
+
+        for name, stub in (('YOLOv8PoseDetector', StubDetector), ('extract_poses_from_video', stub_extract)):
+            patcher = mock.patch.object(preprocess_video_yolov8, name, stub)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.worker = PoseWorker()
+        self.server = PoseDaemonServer(self.socket_path, self.worker)
+        self.worker.start()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.worker.stop()
+        self.tmp.cleanup()
+
+    def extract_request(self, video: str = 'song.mp4') -> dict:
+        return {
+            'type': 'extract',
+            'video': str(self.dir / video),
+            'output': str(self.dir / f"{Path(video).stem}.json"),
+            'imgsz': 256,
+        }
+
+    def test_ping(self):
+        status = ping(self.socket_path)
+        self.assertEqual(status['event'], 'pong')
+        self.assertEqual(status['pid'], os.getpid())
+        self.assertEqual((status['queued'], status['current'], status['models']), (0, None, []))
+
+    def test_extract_streams_events(self):
+        events = []
+        done = submit_job(self.extract_request(), self.socket_path, events.append)
+
+        self.assertEqual([event['event'] for event in events],
+                         ['queued', 'started'] + ['progress'] * TOTAL_FRAMES + ['done'])
+        self.assertEqual(events[0]['position'], 0)
+        self.assertEqual([event['frame'] for event in events if event['event'] == 'progress'],
+                         list(range(1, TOTAL_FRAMES + 1)))
+        self.assertIs(done, events[-1])
+        self.assertEqual(done['output'], str(self.dir / 'song.json'))
+        self.assertTrue((self.dir / 'song.json').exists())
+
+    def test_model_stays_loaded_between_jobs(self):
+        submit_job(self.extract_request('one.mp4'), self.socket_path)
+        submit_job(self.extract_request('two.mp4'), self.socket_path)
+
+        self.assertEqual(StubDetector.loads, [('yolov8s-pose.pt', 'auto', 256)])
+        status = ping(self.socket_path)
+        self.assertEqual(status['models'], [['yolov8s-pose.pt', 'auto', 256]])
+        self.assertEqual(status['jobsCompleted'], 2)
+
+    def test_job_error_is_raised_and_counted(self):
+        with self.assertRaisesRegex(RuntimeError, 'ValueError: Could not open video'):
+            submit_job(self.extract_request('broken.mp4'), self.socket_path)
+
+        status = ping(self.socket_path)
+        self.assertEqual((status['jobsCompleted'], status['jobsFailed']), (0, 1))
+
+    def test_invalid_requests(self):
+        for request in ({'type': 'extract'}, {'type': 'train', 'video': 'x.mp4'}):
+            with self.subTest(request=request):
+                event = _request(request, self.socket_path)
+                self.assertEqual(event['event'], 'error')
+                self.assertIn('Invalid request', event['message'])
+
+    def test_submit_extract_uses_daemon(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            handled = submit_extract(str(self.dir / 'song.mp4'), str(self.dir / 'song.json'),
+                                     socket_path=self.socket_path)
+
+        self.assertTrue(handled)
+        self.assertIn('pose daemon', output.getvalue())
+        self.assertTrue((self.dir / 'song.json').exists())
+
+    def test_shutdown(self):
+        event = _request({'type': 'shutdown'}, self.socket_path)
+        self.assertEqual(event['event'], 'stopping')
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+
+
+class TestDetectorCache(unittest.TestCase):
+    """PoseWorker.get_detector() keeps the most recently used models."""
+
+    def test_least_recently_used_is_evicted(self):
+        StubDetector.loads = []
+        worker = PoseWorker(max_models=2)
+        with mock.patch.object(preprocess_video_yolov8, 'YOLOv8PoseDetector', StubDetector):
+            first = worker.get_detector('a.pt', 'cpu', 256)
+            worker.get_detector('b.pt', 'cpu', 256)
+            self.assertIs(worker.get_detector('a.pt', 'cpu', 256), first)
+            worker.get_detector('c.pt', 'cpu', 256)
+            worker.get_detector('a.pt', 'cpu', 256)
+
+        # Oldest first: b was evicted when c loaded, a was used last
+        self.assertEqual([key[0] for key in worker.detectors], ['c.pt', 'a.pt'])
+        self.assertEqual([load[0] for load in StubDetector.loads], ['a.pt', 'b.pt', 'c.pt'])
+
+
+class TestLocalFallback(unittest.TestCase):
+    """Without a daemon the CLI extracts locally."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_no_socket(self):
+        self.assertFalse(submit_extract('song.mp4', 'song.json', socket_path=str(self.dir / 'missing.sock')))
+
+    def test_stale_socket(self):
+        path = str(self.dir / 'stale.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        self.assertTrue(Path(path).exists())
+        self.assertFalse(submit_extract('song.mp4', 'song.json', socket_path=path))
+        self.assertIsNone(ping(path))
+
+    def test_cli_runs_locally(self):
+        argv = ['preprocess_video_yolov8.py', str(self.dir / 'song.mp4'), '--output', str(self.dir)]
+        with mock.patch.dict(os.environ, {SOCKET_ENV: str(self.dir / 'missing.sock')}), \
+                mock.patch('sys.argv', argv), \
+                mock.patch.object(preprocess_video_yolov8, 'extract_poses_from_video') as local:
+            preprocess_video_yolov8.main()
+
+        local.assert_called_once()
+        self.assertEqual(local.call_args.args, (str(self.dir / 'song.mp4'), str(self.dir / 'song.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
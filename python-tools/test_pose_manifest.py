@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tests for the pose manifest: refresh() only re-scans files whose size or
+mtime changed while checks are keyed on the sha256 (so touching a file does
+not make it "changed"), recorded checks drive needs_check() and
+needs_regeneration(), and concurrent saves merge instead of overwriting.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pose_manifest import MANIFEST_NAME, PoseManifest, iter_pose_files, record_pose_file
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+
+
+def write_song(path: Path, frames: int = 30, seed: int = 0, **metadata) -> PoseSequence:
+    keypoints = np.random.default_rng(seed).uniform(0.1, 0.9, (frames, len(KEYPOINT_NAMES), 3))
+    sequence = PoseSequence(keypoints, 30.0, path.stem, metadata=metadata)
+    sequence.to_json(path)
+    return sequence
+
+
+def touch(path: Path) -> None:
+    """Move the mtime forward without changing the contents."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestRefresh(unittest.TestCase):
+    """refresh() and the recorded file facts."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.poses = Path(self.tmp.name)
+        write_song(self.poses / 'alpha.json', frames=30, modelVersion='yolov8s-pose', inputSize=256)
+        write_song(self.poses / 'beta.json', frames=45, seed=1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def refresh(self) -> tuple:
+        manifest = PoseManifest(self.poses)
+        counts = manifest.refresh()
+        manifest.save()
+        return counts, manifest
+
+    def test_entries(self):
+        counts, manifest = self.refresh()
+
+        self.assertEqual(counts, (2, 0))
+        alpha = manifest.entries['alpha.json']
+        self.assertEqual((alpha['songId'], alpha['frameCount'], alpha['totalFrames']), ('alpha', 30, 30))
+        self.assertEqual((alpha['modelVersion'], alpha['inputSize']), ('yolov8s-pose', 256))
+        self.assertAlmostEqual(alpha['duration'], 1.0)
+        self.assertEqual(alpha['bytes'], (self.poses / 'alpha.json').stat().st_size)
+        self.assertEqual(alpha['variants'], {'json': 'alpha.json'})
+        self.assertTrue(alpha['coverage']['hasAngleConfidence'])
+
+        with open(self.poses / MANIFEST_NAME) as f:
+            self.assertEqual(sorted(json.load(f)['files']), ['alpha.json', 'beta.json'])
+        self.assertFalse((self.poses / f".{MANIFEST_NAME}.tmp").exists())
+
+    def test_only_changed_files_are_rescanned(self):
+        _, first = self.refresh()
+        self.assertEqual(self.refresh()[0], (0, 0))
+
+        # Touched: re-scanned (mtime differs) but the checksum is unchanged
+        touch(self.poses / 'beta.json')
+        counts, manifest = self.refresh()
+        self.assertEqual(counts, (1, 0))
+        self.assertEqual(manifest.entries['beta.json']['sha256'], first.entries['beta.json']['sha256'])
+
+        # Rewritten: new checksum and contents
+        write_song(self.poses / 'alpha.json', frames=60, seed=2)
+        counts, manifest = self.refresh()
+        self.assertEqual(counts, (1, 0))
+        self.assertNotEqual(manifest.entries['alpha.json']['sha256'], first.entries['alpha.json']['sha256'])
+        self.assertEqual(manifest.entries['alpha.json']['frameCount'], 60)
+
+        # Removed
+        (self.poses / 'beta.json').unlink()
+        counts, manifest = self.refresh()
+        self.assertEqual(counts, (0, 1))
+        self.assertEqual(list(PoseManifest(self.poses).entries), ['alpha.json'])
+
+    def test_new_variant_without_rescan(self):
+        self.refresh()
+        (self.poses / 'alpha.posez').write_bytes(b'PSEZ')
+
+        counts, manifest = self.refresh()
+
+        self.assertEqual(counts, (0, 0))
+        self.assertEqual(manifest.entries['alpha.json']['variants'], {'json': 'alpha.json', 'posez': 'alpha.posez'})
+
+    def test_unreadable_file_is_kept(self):
+        (self.poses / 'broken.json').write_text('{"frames": [')
+
+        _, manifest = self.refresh()
+
+        entry = manifest.entries['broken.json']
+        self.assertIn('error', entry)
+        self.assertIn('sha256', entry)
+        stale = dict(manifest.needs_regeneration())
+        self.assertTrue(stale['broken.json'][0].startswith('unreadable'))
+
+    def test_concurrent_saves_merge(self):
+        self.refresh()
+        write_song(self.poses / 'gamma.json', seed=3)
+        write_song(self.poses / 'delta.json', seed=4)
+
+        first, second = PoseManifest(self.poses), PoseManifest(self.poses)
+        first.record(self.poses / 'gamma.json')
+        second.record(self.poses / 'delta.json')
+        first.save()
+        second.save()
+
+        self.assertEqual(sorted(PoseManifest(self.poses).entries),
+                         ['alpha.json', 'beta.json', 'delta.json', 'gamma.json'])
+
+    def test_record_pose_file(self):
+        sequence = write_song(self.poses / 'gamma.json', frames=12, seed=3)
+        record_pose_file(self.poses / 'gamma.json', sequence)
+        record_pose_file(self.poses / '.gamma.json.tmp', sequence)
+
+        entries = PoseManifest(self.poses).entries
+        self.assertEqual(list(entries), ['gamma.json'])
+        self.assertEqual(entries['gamma.json']['frameCount'], 12)
+        # Size and mtime were recorded too, so refresh() does not re-scan it
+        manifest = PoseManifest(self.poses)
+        self.assertEqual(manifest.refresh([self.poses / 'gamma.json']), (0, 0))
+
+
+class TestChecks(unittest.TestCase):
+    """record_check(), needs_check() and needs_regeneration()."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.poses = Path(self.tmp.name)
+        write_song(self.poses / 'alpha.json', modelVersion='yolov8s-pose', inputSize=256)
+        write_song(self.poses / 'beta.json', seed=1, modelVersion='yolov8s-pose', inputSize=256)
+        self.manifest = PoseManifest(self.poses)
+        self.manifest.refresh()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_needs_check_after_rewrite_only(self):
+        self.assertEqual([path.name for path in self.manifest.needs_check('validation')], ['alpha.json', 'beta.json'])
+        for name in ('alpha.json', 'beta.json'):
+            self.manifest.record_check(name, 'validation', 'valid', errors=0)
+        self.manifest.save()
+
+        manifest = PoseManifest(self.poses)
+        self.assertEqual(manifest.needs_check('validation'), [])
+        self.assertEqual(manifest.entries['alpha.json']['checks']['validation']['errors'], 0)
+
+        touch(self.poses / 'beta.json')
+        write_song(self.poses / 'alpha.json', seed=5)
+        manifest.refresh()
+
+        self.assertEqual(manifest.needs_check('validation'), [self.poses / 'alpha.json'])
+        # Checks are per name: backfill was never recorded
+        self.assertEqual(len(manifest.needs_check('backfill')), 2)
+
+    def test_needs_regeneration(self):
+        self.assertEqual(self.manifest.needs_regeneration('yolov8s-pose', 256), [])
+
+        self.assertEqual(
+            self.manifest.needs_regeneration('yolov8m-pose', 320),
+            [(name, ['modelVersion yolov8s-pose != yolov8m-pose', 'inputSize 256 != 320'])
+             for name in ('alpha.json', 'beta.json')]
+        )
+
+    def test_failed_validation_until_file_changes(self):
+        self.manifest.record_check('alpha.json', 'validation', 'invalid', errors=3)
+        self.assertEqual(self.manifest.needs_regeneration(), [('alpha.json', ['failed validation'])])
+
+        write_song(self.poses / 'alpha.json', seed=6)
+        self.manifest.refresh()
+        self.assertEqual(self.manifest.needs_regeneration(), [])
+
+    def test_frame_count_mismatch(self):
+        data = json.loads((self.poses / 'beta.json').read_text())
+        data['totalFrames'] = 40
+        (self.poses / 'beta.json').write_text(json.dumps(data))
+        self.manifest.refresh()
+
+        self.assertEqual(self.manifest.needs_regeneration(), [('beta.json', ['30 frames, header says 40'])])
+
+
+class TestIterPoseFiles(unittest.TestCase):
+    """iter_pose_files() lists only pose JSON files."""
+
+    def test_skips_manifest_hidden_and_other_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            poses = Path(tmp)
+            for name in ('beta.json', 'alpha.json', MANIFEST_NAME, '.alpha.json.tmp', '.hidden.json',
+                         'alpha.posez', 'notes.txt'):
+                (poses / name).write_text('{}')
+            (poses / 'nested').mkdir()
+            (poses / 'nested' / 'gamma.json').write_text('{}')
+
+            self.assertEqual(iter_pose_files(poses), [poses / 'alpha.json', poses / 'beta.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
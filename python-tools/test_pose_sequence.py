@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared pose core: the vectorized angle math against the
+per-frame reference, and the JSON and binary (.pseq) round trips.
+"""
+
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pose_sequence import (
+    ANGLE_NAMES,
+    BINARY_MAGIC,
+    KEYPOINT_NAMES,
+    PoseSequence,
+    _BINARY_ALIGN,
+    calculate_angles,
+    compute_angles,
+    keypoints_to_dict,
+    load_pose_sequence,
+)
+
+
+def random_keypoints(frames: int, seed: int = 0) -> np.ndarray:
+    """Keypoints with some zero-confidence and coincident points mixed in."""
+    rng = np.random.default_rng(seed)
+    keypoints = rng.random((frames, len(KEYPOINT_NAMES), 3)).astype(np.float32)
+    keypoints[rng.random((frames, len(KEYPOINT_NAMES))) < 0.1, 2] = 0.0
+    # Elbow on top of the shoulder: zero-length vector
+    coincident = rng.random(frames) < 0.1
+    keypoints[coincident, KEYPOINT_NAMES.index('leftElbow'), :2] = \
+        keypoints[coincident, KEYPOINT_NAMES.index('leftShoulder'), :2]
+    return keypoints
+
+
+def sample_sequence(frames: int = 50) -> PoseSequence:
+    return PoseSequence(
+        random_keypoints(frames),
+        30.0,
+        'test_song',
+        metadata={'modelVersion': 'yolov8s-pose', 'inputSize': 640},
+    )
+
+
+class TestComputeAngles(unittest.TestCase):
+    """compute_angles must match calculate_angles frame by frame."""
+
+    def test_matches_per_frame_reference(self):
+        keypoints = random_keypoints(500, seed=1)
+        angles, confidence = compute_angles(keypoints)
+
+        for i in range(len(keypoints)):
+            expected_angles, expected_conf = calculate_angles(keypoints_to_dict(keypoints[i]))
+            np.testing.assert_allclose(angles[i], [expected_angles[n] for n in ANGLE_NAMES], rtol=0, atol=1e-9)
+            np.testing.assert_allclose(confidence[i], [expected_conf[n] for n in ANGLE_NAMES], rtol=0, atol=1e-9)
+
+    def test_missing_keypoint_matches_zero_confidence(self):
+        """An absent key in the dict form equals a zero-confidence row."""
+        rng = random.Random(2)
+        for _ in range(50):
+            keypoints = random_keypoints(1, seed=rng.randrange(1000))[0]
+            missing = rng.choice(KEYPOINT_NAMES)
+            frame = keypoints_to_dict(keypoints)
+            del frame[missing]
+            keypoints[KEYPOINT_NAMES.index(missing)] = 0.0
+
+            expected_angles, expected_conf = calculate_angles(frame)
+            angles, confidence = compute_angles(keypoints[None])
+            np.testing.assert_allclose(angles[0], [expected_angles[n] for n in ANGLE_NAMES], rtol=0, atol=1e-9)
+            np.testing.assert_allclose(confidence[0], [expected_conf[n] for n in ANGLE_NAMES], rtol=0, atol=1e-9)
+
+    def test_duplicated_joints_share_values(self):
+        angles, _ = compute_angles(random_keypoints(20))
+        np.testing.assert_array_equal(angles[:, ANGLE_NAMES.index('leftElbow')], angles[:, ANGLE_NAMES.index('leftArm')])
+        np.testing.assert_array_equal(angles[:, ANGLE_NAMES.index('rightLeg')], angles[:, ANGLE_NAMES.index('rightThigh')])
+
+
+class TestPoseSequenceFormats(unittest.TestCase):
+    """JSON and binary round trips."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertSequencesEqual(self, actual: PoseSequence, expected: PoseSequence, exact: bool = True):
+        self.assertEqual(actual.song_id, expected.song_id)
+        self.assertEqual(actual.fps, expected.fps)
+        self.assertEqual(actual.metadata, expected.metadata)
+        np.testing.assert_array_equal(actual.frame_numbers, expected.frame_numbers)
+        compare = np.testing.assert_array_equal if exact else (
+            lambda a, b: np.testing.assert_allclose(a, b, rtol=0, atol=1e-6)
+        )
+        for name in ('keypoints', 'angles', 'angle_confidence', 'timestamps'):
+            compare(getattr(actual, name), getattr(expected, name))
+
+    def test_json_round_trip(self):
+        sequence = sample_sequence()
+        path = self.dir / 'song.json'
+        sequence.to_json(path)
+
+        loaded = PoseSequence.from_json(path)
+        with open(path) as f:
+            document = json.load(f)
+
+        self.assertEqual(document['totalFrames'], len(sequence))
+        self.assertEqual(document['inputSize'], 640)
+        # float32 keypoints go through JSON as float64 text
+        self.assertSequencesEqual(loaded, sequence, exact=False)
+        self.assertSequencesEqual(loaded, PoseSequence.from_dict(document))
+
+    def test_json_without_angles_recomputes_them(self):
+        sequence = sample_sequence(10)
+        document = sequence.to_dict()
+        for frame in document['frames']:
+            del frame['angles']
+        path = self.dir / 'song.json'
+        path.write_text(json.dumps(document))
+
+        loaded = PoseSequence.from_json(path)
+
+        np.testing.assert_allclose(loaded.angles, sequence.angles, rtol=0, atol=1e-4)
+
+    def test_binary_round_trip(self):
+        sequence = sample_sequence()
+        path = self.dir / 'song.pseq'
+        sequence.save_binary(path)
+
+        for mmap in (True, False):
+            with self.subTest(mmap=mmap):
+                loaded = PoseSequence.load_binary(path, mmap=mmap)
+                self.assertSequencesEqual(loaded, sequence)
+                self.assertEqual(loaded.keypoints.dtype, np.float32)
+                self.assertEqual(loaded.frame_numbers.dtype, np.int32)
+
+        self.assertSequencesEqual(load_pose_sequence(path), sequence)
+
+    def test_binary_empty_sequence(self):
+        sequence = PoseSequence(np.zeros((0, len(KEYPOINT_NAMES), 3)), 30.0, 'empty')
+        path = self.dir / 'empty.pseq'
+        sequence.save_binary(path)
+
+        loaded = PoseSequence.load_binary(path)
+
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(loaded.angles.shape, (0, len(ANGLE_NAMES)))
+
+    def test_binary_arrays_are_aligned_zero_copy_views(self):
+        path = self.dir / 'song.pseq'
+        sample_sequence(33).save_binary(path)
+
+        loaded = PoseSequence.load_binary(path, mmap=True)
+        file_size = path.stat().st_size
+
+        for name in ('keypoints', 'angles', 'angle_confidence', 'timestamps', 'frame_numbers'):
+            with self.subTest(array=name):
+                array = getattr(loaded, name)
+                self.assertFalse(array.flags.owndata)
+                self.assertFalse(array.flags.writeable)
+                self.assertIsInstance(_root(array), np.memmap)
+                # mmap starts page-aligned, so pointer alignment is file-offset alignment
+                self.assertEqual(array.ctypes.data % _BINARY_ALIGN, 0)
+        self.assertEqual(file_size % _BINARY_ALIGN, 0)
+
+        # Slicing keeps sharing the mapping
+        window = loaded.slice_time(0.2, 0.5)
+        self.assertTrue(np.shares_memory(window.keypoints, loaded.keypoints))
+        np.testing.assert_array_equal(window.timestamps, loaded.timestamps[6:15])
+
+    def test_binary_rejects_other_files(self):
+        path = self.dir / 'song.pseq'
+        path.write_bytes(b'JSON' + bytes(60))
+        with self.assertRaises(ValueError):
+            PoseSequence.load_binary(path)
+
+        sample_sequence(2).save_binary(path)
+        data = bytearray(path.read_bytes())
+        data[len(BINARY_MAGIC)] = 99  # version
+        path.write_bytes(bytes(data))
+        with self.assertRaises(ValueError):
+            PoseSequence.load_binary(path)
+
+
+def _root(array: np.ndarray):
+    while isinstance(array, np.ndarray) and array.base is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array
+
+
+if __name__ == '__main__':
+    unittest.main()
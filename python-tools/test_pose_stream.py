@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming pose JSON reader: the same frames and header come
+out whatever the chunk size (values split across chunks, including numbers
+like 29.97 cut after the point), and every frame is checked, not just the
+first and last.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import pose_stream
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+from pose_stream import PoseStreamError, iter_pose_file, validate_pose_stream
+
+CHUNK_SIZES = list(range(1, 41)) + [64, 127, 1000]
+
+
+def dance_sequence(frames: int = 20, fps: float = 29.97) -> PoseSequence:
+    rng = np.random.default_rng(0)
+    keypoints = rng.uniform(0.1, 0.9, (frames, len(KEYPOINT_NAMES), 3)).astype(np.float32)
+    return PoseSequence(keypoints, fps, 'test_song')
+
+
+class TestChunkedReading(unittest.TestCase):
+    """iter_pose_file() agrees with json.load() for any chunk size."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path: Path, chunk_size: int) -> tuple:
+        header = {}
+        with mock.patch.object(pose_stream, 'CHUNK_SIZE', chunk_size):
+            frames = list(iter_pose_file(str(path), header))
+        return header, frames
+
+    def test_numbers_split_across_chunks(self):
+        path = self.dir / 'header.json'
+        path.write_text('{"songId":"s","frames":[],"fps":29.97,"totalFrames":0}')
+
+        for chunk_size in CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                header, frames = self.read(path, chunk_size)
+                self.assertEqual(frames, [])
+                self.assertEqual(header, {'songId': 's', 'frames': [], 'fps': 29.97, 'totalFrames': 0})
+
+    def test_scalars_at_chunk_boundaries(self):
+        values = [0, 12, -3.5, 1e-05, 2.5E+3, 29.97, True, False, None, 'x', [1.25], {'a': 10}]
+        path = self.dir / 'scalars.json'
+        path.write_text(json.dumps({'frames': values, 'fps': 100.125}, separators=(',', ':')))
+
+        for chunk_size in range(1, 12):
+            with self.subTest(chunk_size=chunk_size):
+                header, frames = self.read(path, chunk_size)
+                self.assertEqual(frames, values)
+                self.assertEqual(header['fps'], 100.125)
+
+    def test_pose_file_round_trip(self):
+        path = self.dir / 'song.json'
+        dance_sequence(frames=3).to_json(path)
+        with open(path) as f:
+            expected = json.load(f)
+
+        for chunk_size in CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                header, frames = self.read(path, chunk_size)
+                self.assertEqual(frames, expected['frames'])
+                self.assertEqual(header['fps'], expected['fps'])
+                self.assertEqual(header['totalFrames'], expected['totalFrames'])
+                with mock.patch.object(pose_stream, 'CHUNK_SIZE', chunk_size):
+                    valid, errors, stats = validate_pose_stream(str(path))
+                self.assertTrue(valid, errors)
+                self.assertEqual(stats['frameCount'], 3)
+
+    def test_truncated_file(self):
+        path = self.dir / 'song.json'
+        dance_sequence().to_json(path)
+        text = path.read_text()
+        path.write_text(text[:len(text) // 2])
+
+        for chunk_size in (7, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaises(PoseStreamError):
+                    self.read(path, chunk_size)
+
+
+class TestValidation(unittest.TestCase):
+    """validate_pose_stream() checks every frame."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'song.json'
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / 'song.json'
+            dance_sequence().to_json(source)
+            with open(source) as f:
+                self.data = json.load(f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def validate(self, text: str = None) -> tuple:
+        self.path.write_text(text if text is not None else json.dumps(self.data))
+        return validate_pose_stream(str(self.path))
+
+    def test_valid(self):
+        valid, errors, stats = self.validate()
+        self.assertTrue(valid, errors)
+        self.assertEqual(stats, {'frameCount': 20, 'songId': 'test_song', 'fps': 29.97, 'totalFrames': 20})
+
+    def test_corrupt_json_mid_file(self):
+        text = json.dumps(self.data)
+        middle = text.index('"frameNumber": 10')
+        valid, errors, stats = self.validate(text[:middle] + '"frameNumber": 10,,' + text[middle + 18:])
+
+        self.assertFalse(valid)
+        self.assertTrue(errors[-1].startswith('Invalid JSON'), errors)
+        self.assertEqual(stats['frameCount'], 10)
+
+    def test_bad_values_mid_file(self):
+        self.data['frames'][10]['keypoints']['nose']['x'] = 5.0
+        self.data['frames'][11]['angles']['leftArm'] = 270.0
+
+        valid, errors, _ = self.validate()
+
+        self.assertFalse(valid)
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith('Frame 10: keypoint nose position out of range'))
+        self.assertTrue(errors[1].startswith('Frame 11: angle leftArm out of range'))
+
+    def test_timestamps_and_frame_numbers_must_increase(self):
+        frames = self.data['frames']
+        frames[5]['timestamp'] = frames[4]['timestamp']
+        frames[8]['frameNumber'] = frames[6]['frameNumber']
+
+        valid, errors, _ = self.validate()
+
+        self.assertFalse(valid)
+        self.assertIn(f"Frame 5: timestamp {frames[4]['timestamp']} not greater than previous "
+                      f"{frames[4]['timestamp']}", errors)
+        self.assertIn("Frame 8: frameNumber 6 not greater than previous 7", errors)
+
+    def test_total_frames_mismatch(self):
+        del self.data['frames'][-3:]
+
+        valid, errors, stats = self.validate()
+
+        self.assertFalse(valid)
+        self.assertEqual(errors, ["Frame count mismatch: expected 20, got 17"])
+        self.assertEqual(stats['frameCount'], 17)
+
+    def test_errors_are_capped(self):
+        for frame in self.data['frames']:
+            frame['keypoints']['nose']['confidence'] = 2.0
+
+        self.path.write_text(json.dumps(self.data))
+        valid, errors, _ = validate_pose_stream(str(self.path), max_errors=5)
+
+        self.assertFalse(valid)
+        self.assertEqual(errors[-1], "Stopped after 5 errors")
+        self.assertEqual(len(errors), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
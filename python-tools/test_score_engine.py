@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the vectorized scoring engine.
+
+fixtures/score_golden.json holds inputs and the outputs of
+mobile/services/scoreCalculator.ts for them; the mobile suite checks the
+TypeScript side against the same file
+(services/__tests__/scoreCalculator.golden.test.ts).
+"""
+
+import json
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from score_engine import (
+    TRACKED_JOINTS,
+    arrays_from_samples,
+    benchmark,
+    performance_rating,
+    score_frames,
+    score_session,
+)
+
+
+GOLDEN_FILE = Path(__file__).parent / 'fixtures' / 'score_golden.json'
+
+
+class TestScoreEngineParity(unittest.TestCase):
+    """Compare score_engine with the TypeScript golden outputs."""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_FILE, 'r') as f:
+            cls.golden = json.load(f)
+
+    def test_frame_cases(self):
+        """Per-frame score, matches and skipped joints match calculateFrameScore."""
+        for case in self.golden['frames']:
+            with self.subTest(case=case['name']):
+                user, user_conf = arrays_from_samples([case['user']])
+                reference, reference_conf = arrays_from_samples([case['reference']])
+                result = score_frames(user, reference, user_conf, reference_conf, case['threshold'])
+                expected = case['expected']
+
+                self.assertAlmostEqual(result['score'][0], expected['score'], places=9)
+                self.assertEqual(result['attemptedJoints'][0], expected['attemptedJoints'])
+                self.assertEqual(result['skippedJoints'][0], expected['skippedJoints'])
+
+                attempted = result['attempted'][0]
+                matches = {
+                    joint: bool(result['matches'][0, j])
+                    for j, joint in enumerate(TRACKED_JOINTS) if attempted[j]
+                }
+                skipped = [joint for j, joint in enumerate(TRACKED_JOINTS) if not attempted[j]]
+                self.assertEqual(matches, expected['matches'])
+                self.assertEqual(skipped, expected['skippedJointsList'])
+
+    def test_sessions(self):
+        """Session scores, weighted score and breakdown match the TS helpers."""
+        for session in self.golden['sessions']:
+            with self.subTest(session=session['name']):
+                user, user_conf = arrays_from_samples([f['user'] for f in session['frames']])
+                reference, reference_conf = arrays_from_samples([f['reference'] for f in session['frames']])
+                result = score_session(user, reference, user_conf, reference_conf, session['threshold'])
+                expected = session['expected']
+
+                np.testing.assert_allclose(result['score'], expected['frameScores'], rtol=0, atol=1e-9)
+                np.testing.assert_array_equal(result['attemptedJoints'], expected['attemptedJoints'])
+                self.assertAlmostEqual(float(result['finalScore']), expected['finalScore'], places=9)
+                self.assertAlmostEqual(float(result['weightedScore']), expected['weightedScore'], places=9)
+                np.testing.assert_allclose(
+                    result['breakdown'],
+                    [expected['breakdown'][joint] for joint in TRACKED_JOINTS],
+                    rtol=0,
+                    atol=1e-9
+                )
+                self.assertEqual(performance_rating(float(result['finalScore'])), expected['rating'])
+
+    def test_batched_sessions_match_individual(self):
+        """Padded sessions scored together give the per-session results."""
+        sessions = [s for s in self.golden['sessions'] if s['threshold'] == 20]
+        length = max(len(s['frames']) for s in sessions)
+
+        shape = (len(sessions), length, len(TRACKED_JOINTS))
+        user = np.full(shape, np.nan)
+        reference = np.full(shape, np.nan)
+        user_conf = np.full(shape, np.nan)
+        reference_conf = np.full(shape, np.nan)
+        mask = np.zeros(shape[:2], dtype=bool)
+        for i, session in enumerate(sessions):
+            n = len(session['frames'])
+            user[i, :n], user_conf[i, :n] = arrays_from_samples([f['user'] for f in session['frames']])
+            reference[i, :n], reference_conf[i, :n] = arrays_from_samples([f['reference'] for f in session['frames']])
+            mask[i, :n] = True
+
+        result = score_session(user, reference, user_conf, reference_conf, mask=mask)
+
+        np.testing.assert_allclose(
+            result['finalScore'], [s['expected']['finalScore'] for s in sessions], rtol=0, atol=1e-9
+        )
+        np.testing.assert_allclose(
+            result['weightedScore'], [s['expected']['weightedScore'] for s in sessions], rtol=0, atol=1e-9
+        )
+
+    def test_ratings(self):
+        """getPerformanceRating boundaries."""
+        for case in self.golden['ratings']:
+            self.assertEqual(performance_rating(case['score']), case['rating'])
+
+    def test_throughput(self):
+        """Thousands of 300-frame sessions per second."""
+        self.assertGreater(benchmark(1000), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the input size sweep: the recommendation picks the smallest size
+within the angle error budget, and error measurements only compare joints
+both detections are confident about.
+"""
+
+import unittest
+
+import numpy as np
+
+from pose_sequence import KEYPOINT_NAMES
+from sweep_input_size import angle_errors, keypoint_errors, recommend_size
+
+
+def result(size: int, mean_angle_error: float, latency: float = 10.0) -> dict:
+    return {'size': size, 'mean_angle_error': mean_angle_error, 'mean_latency_ms': latency}
+
+
+def standing_pose(confidence: float = 0.9, shift: float = 0.0) -> dict:
+    """Keypoints of a figure with bent arms and legs."""
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(0.3, 0.7, (len(KEYPOINT_NAMES), 2))
+    return {
+        name: {'x': float(x) + shift, 'y': float(y), 'confidence': confidence}
+        for name, (x, y) in zip(KEYPOINT_NAMES, coords)
+    }
+
+
+class TestRecommendSize(unittest.TestCase):
+    """recommend_size() trade-off."""
+
+    def test_smallest_size_within_budget(self):
+        results = [result(160, 6.0), result(192, 4.5), result(224, 3.0), result(256, 2.0)]
+        self.assertEqual(recommend_size(results, max_angle_error=5.0)['size'], 192)
+        self.assertEqual(recommend_size(results, max_angle_error=4.5)['size'], 192)
+        self.assertEqual(recommend_size(results, max_angle_error=10.0)['size'], 160)
+
+    def test_latency_noise_does_not_pick_a_larger_size(self):
+        results = [result(256, 1.0, latency=8.0), result(192, 2.0, latency=9.0)]
+        self.assertEqual(recommend_size(results, max_angle_error=5.0)['size'], 192)
+
+    def test_most_accurate_when_none_within_budget(self):
+        results = [result(160, 9.0), result(192, 7.0), result(224, 8.0)]
+        self.assertEqual(recommend_size(results, max_angle_error=5.0)['size'], 192)
+
+    def test_sizes_without_comparable_angles_are_skipped(self):
+        results = [result(160, float('nan')), result(192, 4.0)]
+        self.assertEqual(recommend_size(results, max_angle_error=5.0)['size'], 192)
+
+        with self.assertRaises(ValueError):
+            recommend_size([result(160, float('nan'))], max_angle_error=5.0)
+
+
+class TestErrors(unittest.TestCase):
+    """Angle and keypoint errors against the reference."""
+
+    def test_identical_poses(self):
+        pose = standing_pose()
+        self.assertEqual(angle_errors(pose, pose), [0.0] * 4)
+        self.assertEqual(keypoint_errors(pose, pose), [0.0] * len(KEYPOINT_NAMES))
+
+    def test_translation_changes_positions_not_angles(self):
+        errors = angle_errors(standing_pose(), standing_pose(shift=0.1))
+        np.testing.assert_allclose(errors, 0.0, atol=1e-6)
+        np.testing.assert_allclose(keypoint_errors(standing_pose(), standing_pose(shift=0.1)), 0.1)
+
+    def test_unconfident_joints_are_skipped(self):
+        self.assertEqual(angle_errors(standing_pose(), standing_pose(confidence=0.2)), [])
+        self.assertEqual(keypoint_errors(standing_pose(confidence=0.2), standing_pose()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for timing alignment: the vectorized banded DTW against a plain
+per-cell DTW over the same band, and recovery of known timing offsets
+(positive when the user is late), including through score_recording().
+"""
+
+import unittest
+
+import numpy as np
+
+from pose_sequence import ANGLE_NAMES, KEYPOINT_NAMES, PoseSequence
+from score_engine import score_recording
+from timing_alignment import MISSING_COST, _prepare, align, banded_dtw, estimate_offset, frame_distances
+
+
+def dance_angles(frames: int, seed: int = 0) -> np.ndarray:
+    """Smooth, non-repeating joint angle tracks in degrees."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames)[:, None]
+    angles = np.full((frames, len(ANGLE_NAMES)), 90.0)
+    for period in (17.0, 43.0, 101.0):
+        phase = rng.uniform(0, 2 * np.pi, len(ANGLE_NAMES))
+        angles += rng.uniform(10, 25, len(ANGLE_NAMES)) * np.sin(2 * np.pi * t / period + phase)
+    return angles
+
+
+def brute_force_dtw(user, reference, user_conf, reference_conf, band, centers, missing_cost=MISSING_COST):
+    """Cell-by-cell DTW over the band with open begin and end; returns the total cost."""
+    user, user_valid = _prepare(user, user_conf)
+    reference, reference_valid = _prepare(reference, reference_conf)
+    n, m = len(user), len(reference)
+    total = np.full((n, m), np.inf)
+    for i in range(n):
+        for j in range(max(0, centers[i] - band), min(m, centers[i] + band + 1)):
+            cost = frame_distances(user[i], user_valid[i], reference[j], reference_valid[j], missing_cost)
+            best = 0.0 if i == 0 else min(total[i - 1, j], total[i - 1, j - 1] if j > 0 else np.inf)
+            if j > 0:
+                best = min(best, total[i, j - 1])
+            total[i, j] = cost + best
+    return total[-1].min()
+
+
+def path_cost(path, user, reference, user_conf, reference_conf):
+    user, user_valid = _prepare(user, user_conf)
+    reference, reference_valid = _prepare(reference, reference_conf)
+    return float(frame_distances(
+        user[path[:, 0]], user_valid[path[:, 0]], reference[path[:, 1]], reference_valid[path[:, 1]]
+    ).sum())
+
+
+def poses(angles: np.ndarray, fps: float = 30.0) -> PoseSequence:
+    return PoseSequence(
+        np.zeros((len(angles), len(KEYPOINT_NAMES), 3)),
+        fps,
+        'test_song',
+        angles=angles,
+        angle_confidence=np.ones_like(angles),
+    )
+
+
+class TestBandedDTW(unittest.TestCase):
+    """banded_dtw() equals DTW computed cell by cell."""
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        for case in range(60):
+            n = int(rng.integers(1, 40))
+            m = max(1, n + int(rng.integers(-5, 20)))
+            band = int(rng.integers(1, 8))
+            # Non-decreasing centres with repeats and skips, possibly running off either end
+            centers = int(rng.integers(-band - 2, m // 2 + 1)) + np.cumsum(rng.choice([0, 1, 1, 1, 2], n)) - 1
+            user = rng.uniform(0, 180, (n, len(ANGLE_NAMES)))
+            reference = rng.uniform(0, 180, (m, len(ANGLE_NAMES)))
+            user_conf = rng.uniform(0, 1, user.shape)
+            reference_conf = rng.uniform(0, 1, reference.shape)
+
+            with self.subTest(case=case, n=n, m=m, band=band):
+                expected = brute_force_dtw(user, reference, user_conf, reference_conf, band, centers)
+                if not np.isfinite(expected):
+                    with self.assertRaises(ValueError):
+                        banded_dtw(user, reference, user_conf, reference_conf, band=band, centers=centers)
+                    continue
+
+                path, total = banded_dtw(user, reference, user_conf, reference_conf, band=band, centers=centers)
+
+                self.assertAlmostEqual(total, expected, places=6)
+                self.assertAlmostEqual(path_cost(path, user, reference, user_conf, reference_conf), total, places=6)
+                # Every step is diagonal, up or left, and stays in the band
+                steps = np.diff(path, axis=0)
+                self.assertTrue(all(tuple(step) in {(1, 1), (1, 0), (0, 1)} for step in steps))
+                self.assertTrue(np.all(np.abs(path[:, 1] - centers[path[:, 0]]) <= band))
+                self.assertEqual(path[-1, 0], n - 1)
+
+    def test_open_begin_and_end(self):
+        """A clip from mid-song starts and ends where it matches, not at the band edge."""
+        reference = dance_angles(200)
+        user = reference[50:150]
+
+        path, total = banded_dtw(user, reference, band=15, centers=np.arange(50, 150))
+
+        self.assertAlmostEqual(total, 0.0)
+        self.assertEqual(tuple(path[0]), (0, 50))
+        self.assertEqual(tuple(path[-1]), (99, 149))
+        np.testing.assert_array_equal(path[:, 1] - path[:, 0], 50)
+
+    def test_band_outside_reference(self):
+        with self.assertRaises(ValueError):
+            banded_dtw(dance_angles(20), dance_angles(30), band=5, centers=np.arange(20) + 100)
+
+    def test_rejects_decreasing_centers(self):
+        with self.assertRaises(ValueError):
+            banded_dtw(dance_angles(3), dance_angles(30), band=5, centers=np.array([5, 4, 6]))
+
+
+class TestOffsetRecovery(unittest.TestCase):
+    """A known lag is found with the right sign (positive = user late)."""
+
+    LAG = 5
+
+    def setUp(self):
+        self.reference = dance_angles(300, seed=2)
+        # The user shows reference frame i - LAG at frame i
+        self.user = np.concatenate([self.reference[:1].repeat(self.LAG, axis=0), self.reference[:-self.LAG]])
+
+    def test_estimate_offset(self):
+        for lag in (self.LAG, -self.LAG):
+            user = np.roll(self.reference, lag, axis=0)
+            with self.subTest(lag=lag):
+                offset = estimate_offset(user, self.reference, max_lag=20)
+                self.assertEqual(offset['lag'], lag)
+                self.assertAlmostEqual(offset['refinedLag'], lag, delta=0.5)
+
+    def test_align(self):
+        alignment = align(self.user, self.reference, fps=30.0)
+        summary = alignment.summary()
+
+        self.assertEqual(alignment.offset_frames, self.LAG)
+        self.assertAlmostEqual(alignment.offset_seconds, self.LAG / 30.0, delta=0.5 / 30.0)
+        self.assertGreater(summary['offsetSeconds'], 0)
+        np.testing.assert_array_equal(alignment.reference_index[self.LAG:], np.arange(300 - self.LAG))
+        self.assertLess(summary['alignedCost'], 0.01)
+        self.assertGreater(summary['unalignedCost'], 1.0)
+
+    def test_score_recording_aligned(self):
+        user, reference = poses(self.user), poses(self.reference)
+
+        plain = score_recording(user, reference)
+        aligned = score_recording(user, reference, align=True)
+
+        self.assertNotIn('timing', plain)
+        self.assertEqual(aligned['timing']['offsetFrames'], self.LAG)
+        self.assertGreater(aligned['timing']['offsetSeconds'], 0)
+        self.assertEqual(aligned['finalScore'], 100.0)
+        self.assertLess(plain['finalScore'], aligned['finalScore'])
+
+
+if __name__ == '__main__':
+    unittest.main()
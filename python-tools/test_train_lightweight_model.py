@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Tests for lightweight model distillation on CPU: the loss, the per-video
+train/validation hold-out, PCK evaluation and checkpoint resume, using
+synthetic tensors, a tiny generated video and a small stand-in model
+(the real backbone downloads ImageNet weights).
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+
+import train_lightweight_model
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+from train_lightweight_model import (
+    PCK_THRESHOLD,
+    PoseDistillationDataset,
+    distillation_loss,
+    evaluate,
+    train,
+)
+
+FRAMES = 20
+
+
+class TinyPoseModel(nn.Module):
+    """Stand-in with the backbone/pose_head layout train() expects."""
+
+    def __init__(self):
+        super().__init__()
+        self.backbone = nn.Sequential(nn.Conv2d(3, 3, 1), nn.AdaptiveAvgPool2d(2))
+        self.pose_head = nn.Sequential(nn.Flatten(), nn.Linear(12, len(KEYPOINT_NAMES) * 3))
+
+    def forward(self, x):
+        return torch.sigmoid(self.pose_head(self.backbone(x))).view(-1, len(KEYPOINT_NAMES), 3)
+
+
+class ConstantModel(nn.Module):
+    """Returns the same keypoints for every image."""
+
+    def __init__(self, output: torch.Tensor):
+        super().__init__()
+        self.output = output
+
+    def forward(self, x):
+        return self.output.expand(x.shape[0], -1, -1)
+
+
+def frame_keypoints(frame_number: int) -> np.ndarray:
+    """Keypoints that identify the frame they were labelled on."""
+    keypoints = np.full((len(KEYPOINT_NAMES), 3), 0.9, dtype=np.float32)
+    keypoints[:, 0] = frame_number / 100.0
+    return keypoints
+
+
+def write_pair(directory: Path, name: str = 'song') -> tuple:
+    video = directory / f"{name}.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*'MJPG'), 10.0, (32, 32))
+    for i in range(FRAMES):
+        writer.write(np.full((32, 32, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+    poses = directory / f"{name}.json"
+    keypoints = np.stack([frame_keypoints(i) for i in range(FRAMES)])
+    PoseSequence(keypoints, 10.0, name).to_json(poses)
+    return video, poses
+
+
+def frame_numbers(dataset: PoseDistillationDataset) -> list:
+    return sorted(round(float(target[0, 0]) * 100) for _, target in dataset)
+
+
+class TestDistillationLoss(unittest.TestCase):
+    """distillation_loss(): confidence-weighted coordinates plus confidence BCE."""
+
+    def setUp(self):
+        generator = torch.Generator().manual_seed(0)
+        self.target = torch.rand(4, len(KEYPOINT_NAMES), 3, generator=generator)
+        self.pred = torch.rand(4, len(KEYPOINT_NAMES), 3, generator=generator)
+
+    def test_matches_manual_computation(self):
+        confidence = self.target[:, :, 2]
+        weights = confidence * (confidence >= 0.3).float()
+        diff = (self.pred[:, :, :2] - self.target[:, :, :2]).abs()
+        smooth_l1 = torch.where(diff < 0.02, 0.5 * diff ** 2 / 0.02, diff - 0.01).sum(dim=2)
+        p = self.pred[:, :, 2]
+        bce = -(confidence * torch.log(p) + (1 - confidence) * torch.log(1 - p)).mean()
+        expected = (smooth_l1 * weights).sum() / weights.sum() + 0.5 * bce
+
+        loss = distillation_loss(self.pred, self.target, min_confidence=0.3, confidence_weight=0.5)
+
+        self.assertAlmostEqual(loss.item(), expected.item(), places=5)
+
+    def test_unsure_keypoints_do_not_affect_coordinates(self):
+        target = self.target.clone()
+        target[:, :5, 2] = 0.1
+        moved = self.pred.clone()
+        moved[:, :5, :2] += 10.0
+
+        self.assertAlmostEqual(
+            distillation_loss(moved, target).item(), distillation_loss(self.pred, target).item(), places=5
+        )
+
+    def test_perfect_coordinates_leave_confidence_term(self):
+        target = self.target.clone()
+        target[:, :, 2] = (target[:, :, 2] > 0.5).float()
+        pred = target.clone()
+
+        self.assertLess(distillation_loss(pred, target).item(), 1e-4)
+        pred[:, :, 2] = 0.5
+        self.assertAlmostEqual(distillation_loss(pred, target).item(), 0.5 * np.log(2), places=4)
+
+    def test_no_confident_keypoints(self):
+        target = self.target.clone()
+        target[:, :, 2] = 0.0
+        loss = distillation_loss(self.pred, target)
+        self.assertTrue(torch.isfinite(loss))
+
+
+class TestDataset(unittest.TestCase):
+    """The last val_fraction of each video is held out."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.pairs = [write_pair(self.dir)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_splits_are_disjoint_per_video(self):
+        train_set = PoseDistillationDataset(self.pairs, 'train', val_fraction=0.25, frame_stride=1,
+                                            input_size=16, shuffle_buffer=4)
+        val_set = PoseDistillationDataset(self.pairs, 'val', val_fraction=0.25, frame_stride=1, input_size=16)
+
+        self.assertEqual(frame_numbers(train_set), list(range(15)))
+        self.assertEqual(frame_numbers(val_set), list(range(15, 20)))
+
+        image, target = next(iter(val_set))
+        self.assertEqual(tuple(image.shape), (3, 16, 16))
+        self.assertEqual(tuple(target.shape), (len(KEYPOINT_NAMES), 3))
+        # Frame 15 was written with gray level 150 (MJPG is lossy)
+        self.assertAlmostEqual(float(image.mean()), 150 / 255, delta=0.02)
+
+    def test_stride_counts_from_the_split_start(self):
+        val_set = PoseDistillationDataset(self.pairs, 'val', val_fraction=0.25, frame_stride=2, input_size=16)
+        self.assertEqual(frame_numbers(val_set), [15, 17, 19])
+
+    def test_shuffle_changes_with_epoch(self):
+        train_set = PoseDistillationDataset(self.pairs, 'train', val_fraction=0.25, frame_stride=1,
+                                            input_size=16, shuffle_buffer=8)
+        orders = []
+        for epoch in (0, 1):
+            train_set.set_epoch(epoch)
+            orders.append([round(float(target[0, 0]) * 100) for _, target in train_set])
+        self.assertEqual(sorted(orders[0]), sorted(orders[1]))
+        self.assertNotEqual(orders[0], orders[1])
+
+    def test_rejects_unknown_split(self):
+        with self.assertRaises(ValueError):
+            PoseDistillationDataset(self.pairs, 'test')
+
+
+class TestEvaluate(unittest.TestCase):
+    """evaluate() scores only confident keypoints."""
+
+    def test_pck_and_errors(self):
+        target = torch.zeros(1, len(KEYPOINT_NAMES), 3)
+        target[:, :, 2] = 1.0
+        target[:, 16, 2] = 0.1  # not scored
+        output = target.clone()
+        output[:, :8, 0] += PCK_THRESHOLD / 2   # hits
+        output[:, 8:16, 0] += PCK_THRESHOLD * 2  # misses
+        output[:, 16, 0] += 5.0
+        output[:, :, 2] = 0.8
+        images = torch.zeros(2, 3, 8, 8)
+        loader = [(images, target.expand(2, -1, -1))]
+
+        results = evaluate(ConstantModel(output), loader)
+
+        self.assertEqual(results['num_samples'], 2)
+        self.assertAlmostEqual(results['pck'], 0.5)
+        self.assertAlmostEqual(results['mean_error'], (8 * PCK_THRESHOLD / 2 + 8 * PCK_THRESHOLD * 2) / 16)
+        self.assertAlmostEqual(results['keypoints']['nose']['pck'], 1.0)
+        self.assertEqual(results['keypoints'][KEYPOINT_NAMES[16]]['count'], 0)
+        self.assertEqual(results['keypoints'][KEYPOINT_NAMES[0]]['count'], 2)
+        self.assertAlmostEqual(results['confidence_mae'], (16 * 0.2 + 0.7) / 17, places=6)
+
+
+class TestCheckpointResume(unittest.TestCase):
+    """train() checkpoints every epoch and resumes from last.pt."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.pairs = [write_pair(self.dir)]
+        patcher = mock.patch.object(train_lightweight_model, 'LightweightPoseModel', TinyPoseModel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_train(self, epochs: int, resume: bool) -> dict:
+        return train(
+            self.pairs,
+            output_path=str(self.dir / 'model.pt'),
+            checkpoint_dir=str(self.dir / 'checkpoints'),
+            resume=resume,
+            epochs=epochs,
+            batch_size=4,
+            frame_stride=1,
+            val_fraction=0.25,
+        )
+
+    def test_resume_continues_from_last_epoch(self):
+        self.run_train(epochs=1, resume=False)
+        last = torch.load(self.dir / 'checkpoints' / 'last.pt', weights_only=False)
+        self.assertEqual(last['epoch'], 0)
+        self.assertTrue((self.dir / 'checkpoints' / 'best.pt').exists())
+
+        with mock.patch.object(train_lightweight_model, 'evaluate', wraps=evaluate) as evaluated:
+            self.run_train(epochs=2, resume=True)
+        # One epoch trained, plus the final evaluation of the best model
+        self.assertEqual(evaluated.call_count, 2)
+        resumed = torch.load(self.dir / 'checkpoints' / 'last.pt', weights_only=False)
+        self.assertEqual(resumed['epoch'], 1)
+        self.assertLessEqual(resumed['best_error'], last['best_error'])
+        self.assertTrue(resumed['optimizer_state']['state'])
+
+        # Everything done: nothing left to train, the best weights are exported
+        with mock.patch.object(train_lightweight_model, 'evaluate', wraps=evaluate) as evaluated:
+            results = self.run_train(epochs=2, resume=True)
+        self.assertEqual(evaluated.call_count, 1)
+        self.assertEqual(results['num_samples'], 5)
+        best = torch.load(self.dir / 'checkpoints' / 'best.pt', weights_only=False)['model_state']
+        exported = torch.load(self.dir / 'model.pt', weights_only=True)
+        for name, tensor in best.items():
+            torch.testing.assert_close(exported[name], tensor)
+
+
+if __name__ == '__main__':
+    unittest.main()
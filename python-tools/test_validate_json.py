@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the validate_json.py CLI: the --report schema, the exit code, and
+a file whose validation crashes (serially or in a --jobs worker) being
+reported as a failure instead of aborting the run.
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import validate_json
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+
+SUMMARY_FIELDS = {'total', 'valid', 'invalid', 'totalFrames', 'totalBytes', 'wallTime'}
+FILE_FIELDS = {'file', 'status', 'errors', 'frameCount', 'fileSize', 'parseTime'}
+
+
+def write_song(path: Path, frames: int = 10) -> None:
+    keypoints = np.random.default_rng(0).uniform(0.1, 0.9, (frames, len(KEYPOINT_NAMES), 3))
+    PoseSequence(keypoints, 30.0, path.stem).to_json(path)
+
+
+class TestCli(unittest.TestCase):
+    """main() over a directory of pose files."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.poses = self.dir / 'poses'
+        self.poses.mkdir()
+        self.report = self.dir / 'report' / 'validation.json'
+        write_song(self.poses / 'alpha.json', frames=10)
+        write_song(self.poses / 'beta.json', frames=12)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args: str) -> int:
+        argv = ['validate_json.py', str(self.poses), '--report', str(self.report), *args]
+        with mock.patch('sys.argv', argv), contextlib.redirect_stdout(io.StringIO()):
+            try:
+                validate_json.main()
+            except SystemExit as e:
+                return e.code
+        return 0
+
+    def load_report(self) -> dict:
+        with open(self.report) as f:
+            return json.load(f)
+
+    def test_all_valid(self):
+        self.assertEqual(self.run_cli(), 0)
+
+        report = self.load_report()
+        self.assertEqual(set(report), {'generatedAt', 'summary', 'files'})
+        self.assertEqual(set(report['summary']), SUMMARY_FIELDS)
+        self.assertEqual(
+            {k: report['summary'][k] for k in ('total', 'valid', 'invalid', 'totalFrames')},
+            {'total': 2, 'valid': 2, 'invalid': 0, 'totalFrames': 22}
+        )
+        self.assertEqual(report['summary']['totalBytes'],
+                         sum(path.stat().st_size for path in self.poses.glob('*.json')))
+        self.assertEqual([entry['file'] for entry in report['files']], ['alpha.json', 'beta.json'])
+        for entry in report['files']:
+            self.assertEqual(set(entry), FILE_FIELDS)
+            self.assertEqual((entry['status'], entry['errors']), ('valid', []))
+
+    def test_invalid_file_exits_non_zero(self):
+        data = json.loads((self.poses / 'beta.json').read_text())
+        data['totalFrames'] = 99
+        (self.poses / 'beta.json').write_text(json.dumps(data))
+
+        self.assertEqual(self.run_cli(), 1)
+
+        report = self.load_report()
+        self.assertEqual((report['summary']['valid'], report['summary']['invalid']), (1, 1))
+        beta = report['files'][1]
+        self.assertEqual(beta['status'], 'invalid')
+        self.assertEqual(beta['errors'], ["Frame count mismatch: expected 99, got 12"])
+
+    def test_crash_is_a_per_file_failure(self):
+        # Not UTF-8: reading it raises UnicodeDecodeError inside validate_file()
+        (self.poses / 'gamma.json').write_bytes(b'{"songId": "\xff\xfe"}')
+
+        for jobs in ('1', '2'):
+            with self.subTest(jobs=jobs):
+                self.report.unlink(missing_ok=True)
+
+                self.assertEqual(self.run_cli('--jobs', jobs), 1)
+
+                report = self.load_report()
+                self.assertEqual((report['summary']['total'], report['summary']['invalid']), (3, 1))
+                gamma = report['files'][2]
+                self.assertEqual(set(gamma), FILE_FIELDS)
+                self.assertEqual(gamma['file'], 'gamma.json')
+                self.assertEqual(gamma['status'], 'invalid')
+                self.assertTrue(gamma['errors'][0].startswith('Validation failed: UnicodeDecodeError'))
+                self.assertEqual([entry['status'] for entry in report['files'][:2]], ['valid', 'valid'])
+
+    def test_missing_path(self):
+        argv = ['validate_json.py', str(self.dir / 'missing')]
+        with mock.patch('sys.argv', argv), contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(SystemExit) as raised:
+                validate_json.main()
+        self.assertEqual(raised.exception.code, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the song watcher with a fake ingester on a temp directory:
+videos are only ingested once their size and mtime settle, the ingest
+manifest records what was processed, and converted outputs in <songs>/720p/
+are not picked up again.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import watch_songs
+from watch_songs import MANIFEST_NAME, IngestManifest, watch
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping advances the clock and runs a hook."""
+
+    def __init__(self, on_sleep=None):
+        self.now = 0.0
+        self.on_sleep = on_sleep
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        if self.on_sleep:
+            self.on_sleep(self.now)
+
+
+class FakeIngester:
+    """Records what was ingested (and when) instead of converting and extracting."""
+
+    def __init__(self, clock: FakeClock, fail: tuple = ()):
+        self.clock = clock
+        self.fail = fail
+        self.calls = []
+
+    def ingest(self, video: Path) -> dict:
+        self.calls.append((video.name, video.stat().st_size, self.clock.now))
+        if video.name in self.fail:
+            raise RuntimeError(f"720p conversion failed for {video.name}")
+        return {'converted': None, 'poses': f"poses/{video.stem}.json"}
+
+
+class TestWatch(unittest.TestCase):
+    """watch() with once=True on a temp songs directory."""
+
+    INTERVAL = 2.0
+    SETTLE = 5.0
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.songs = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_watch(self, on_sleep=None, fail: tuple = (), retry_failed: bool = False) -> tuple:
+        clock = FakeClock(on_sleep)
+        ingester = FakeIngester(clock, fail)
+        manifest = IngestManifest(self.songs / MANIFEST_NAME)
+        with mock.patch.object(watch_songs, 'time', clock), mock.patch('builtins.print'):
+            counts = watch(self.songs, ingester, manifest, workers=2, interval=self.INTERVAL,
+                           settle=self.SETTLE, once=True, retry_failed=retry_failed)
+        return counts, ingester.calls
+
+    def manifest(self) -> dict:
+        with open(self.songs / MANIFEST_NAME) as f:
+            return json.load(f)['videos']
+
+    def test_waits_for_video_to_settle(self):
+        video = self.songs / 'song.mp4'
+        video.write_bytes(b'x' * 10)
+
+        def still_downloading(now):
+            if now <= 2 * self.INTERVAL:
+                with open(video, 'ab') as f:
+                    f.write(b'x' * 10)
+
+        counts, calls = self.run_watch(still_downloading)
+
+        self.assertEqual(counts, (1, 0))
+        # Ingested once, complete, and only after the last write at t=4 settled
+        self.assertEqual([call[:2] for call in calls], [('song.mp4', 30)])
+        self.assertGreaterEqual(calls[0][2], 2 * self.INTERVAL + self.SETTLE)
+
+    def test_manifest_bookkeeping(self):
+        (self.songs / 'song.mp4').write_bytes(b'x' * 10)
+
+        counts, calls = self.run_watch()
+        self.assertEqual((counts, len(calls)), ((1, 0), 1))
+        entry = self.manifest()['song.mp4']
+        stat = (self.songs / 'song.mp4').stat()
+        self.assertEqual((entry['status'], entry['size'], entry['mtime']), ('ok', 10, stat.st_mtime))
+        self.assertEqual(entry['poses'], 'poses/song.json')
+        self.assertFalse((self.songs / (MANIFEST_NAME + '.tmp')).exists())
+
+        # Unchanged: nothing to do in the next run
+        counts, calls = self.run_watch()
+        self.assertEqual((counts, calls), ((0, 0), []))
+
+        # Changed: ingested again
+        (self.songs / 'song.mp4').write_bytes(b'y' * 20)
+        counts, calls = self.run_watch()
+        self.assertEqual([call[:2] for call in calls], [('song.mp4', 20)])
+        self.assertEqual(self.manifest()['song.mp4']['size'], 20)
+
+    def test_failures_are_recorded_and_retried_on_request(self):
+        (self.songs / 'good.mp4').write_bytes(b'x')
+        (self.songs / 'bad.mp4').write_bytes(b'x')
+
+        counts, _ = self.run_watch(fail=('bad.mp4',))
+        self.assertEqual(counts, (1, 1))
+        entry = self.manifest()['bad.mp4']
+        self.assertEqual(entry['status'], 'failed')
+        self.assertIn('conversion failed', entry['error'])
+
+        counts, calls = self.run_watch()
+        self.assertEqual((counts, calls), ((0, 0), []))
+
+        counts, calls = self.run_watch(retry_failed=True)
+        self.assertEqual((counts, [call[0] for call in calls]), ((1, 0), ['bad.mp4']))
+        self.assertEqual(self.manifest()['bad.mp4']['status'], 'ok')
+
+    def test_converted_outputs_are_not_ingested(self):
+        (self.songs / 'song.mp4').write_bytes(b'x')
+        (self.songs / '720p').mkdir()
+        (self.songs / '720p' / 'song.mp4').write_bytes(b'x')
+        (self.songs / 'notes.txt').write_text('not a video')
+
+        counts, calls = self.run_watch()
+
+        self.assertEqual(counts, (1, 0))
+        self.assertEqual([call[0] for call in calls], ['song.mp4'])
+        self.assertEqual(list(self.manifest()), ['song.mp4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
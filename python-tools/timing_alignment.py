@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Timing alignment between user and reference angle sequences.
+
+Scoring compares user frame t with reference frame t, so a dancer who is
+consistently late loses points as if their form were wrong. This module
+separates the two:
+
+1. estimate_offset() - global lag search: the mean per-frame angle
+   distance for every lag within +/- max_offset, with parabolic sub-frame
+   refinement of the best one
+2. banded_dtw() - dynamic time warping inside a band of +/- w frames
+   around the offset diagonal, with open begin/end on the reference axis.
+   Each row is computed in one vectorized step (the left-neighbour
+   recurrence is rewritten as a prefix-sum + running minimum), only two
+   cost rows are kept, and backtracking uses int8 step codes, so memory
+   is O(N * w) bytes even for full-length songs
+
+The frame distance is the mean absolute angle difference over joints
+usable on both sides (score_engine.valid_joints); frames with no shared
+joints cost missing_cost.
+
+Offsets are positive when the user is late.
+
+Usage:
+    uv run python timing_alignment.py user_poses.json ../mobile/assets/poses/30minutos.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from pose_sequence import PoseSequence
+from score_engine import valid_joints
+
+
+# Cost of a frame pair without a joint usable on both sides (degrees)
+MISSING_COST = 30.0
+
+# Default search range for the global offset and half-width of the band
+MAX_OFFSET_SECONDS = 2.0
+BAND_SECONDS = 0.5
+
+# Lags whose overlap covers less than this fraction of the user frames are ignored
+MIN_OVERLAP = 0.5
+
+# Step codes stored per band cell for backtracking
+STEP_DIAGONAL = 0
+STEP_UP = 1        # next user frame, same reference frame
+STEP_LEFT = 2      # same user frame, next reference frame
+STEP_START = 3
+
+
+def _prepare(angles: np.ndarray, confidence: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Angles with unusable joints zeroed, and the validity mask as float."""
+    angles = np.asarray(angles, dtype=np.float64)
+    valid = valid_joints(angles, confidence)
+    return np.where(valid, angles, 0.0), valid.astype(np.float64)
+
+
+def frame_distances(
+    user: np.ndarray,
+    user_valid: np.ndarray,
+    reference: np.ndarray,
+    reference_valid: np.ndarray,
+    missing_cost: float = MISSING_COST
+) -> np.ndarray:
+    """
+    Mean absolute angle difference over shared valid joints.
+
+    All arguments broadcast against each other ([..., 8]); inputs come from
+    _prepare().
+
+    Returns:
+        Distances [...]
+    """
+    both = user_valid * reference_valid
+    count = both.sum(axis=-1)
+    total = (np.abs(user - reference) * both).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, total / count, missing_cost)
+
+
+def estimate_offset(
+    user_angles: np.ndarray,
+    reference_angles: np.ndarray,
+    user_confidence: Optional[np.ndarray] = None,
+    reference_confidence: Optional[np.ndarray] = None,
+    max_lag: int = 60,
+    centers: Optional[np.ndarray] = None
+) -> Dict:
+    """
+    Find the global lag minimizing the mean frame distance.
+
+    Args:
+        user_angles: User angles [N, 8]
+        reference_angles: Reference angles [M, 8]
+        user_confidence: User angle confidences [N, 8]
+        reference_confidence: Reference angle confidences [M, 8]
+        max_lag: Largest lag tried in either direction (frames)
+        centers: Reference frame each user frame is compared with at lag 0
+            (default: the same index)
+
+    Returns:
+        Dict with lag (int frames, user[i] ~ reference[centers[i] - lag]),
+        refinedLag (sub-frame), cost at the best lag, and lags/costs arrays
+    """
+    user, user_valid = _prepare(user_angles, user_confidence)
+    reference, reference_valid = _prepare(reference_angles, reference_confidence)
+    n, m = len(user), len(reference)
+    if centers is None:
+        centers = np.arange(n)
+
+    # Only frames where the user has something to compare count
+    has_pose = user_valid.any(axis=-1)
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    costs = np.full(len(lags), np.inf)
+    for k, lag in enumerate(lags):
+        columns = centers - lag
+        overlap = has_pose & (columns >= 0) & (columns < m)
+        if overlap.sum() < MIN_OVERLAP * max(has_pose.sum(), 1):
+            continue
+        columns = columns[overlap]
+        costs[k] = frame_distances(
+            user[overlap], user_valid[overlap], reference[columns], reference_valid[columns]
+        ).mean()
+
+    if not np.isfinite(costs).any():
+        return {'lag': 0, 'refinedLag': 0.0, 'cost': float('nan'), 'lags': lags, 'costs': costs}
+
+    best = int(np.argmin(costs))
+    refined = float(lags[best])
+    if 0 < best < len(lags) - 1 and np.isfinite(costs[best - 1:best + 2]).all():
+        left, middle, right = costs[best - 1:best + 2]
+        curvature = left - 2 * middle + right
+        if curvature > 0:
+            refined += 0.5 * (left - right) / curvature
+
+    return {
+        'lag': int(lags[best]),
+        'refinedLag': refined,
+        'cost': float(costs[best]),
+        'lags': lags,
+        'costs': costs,
+    }
+
+
+def banded_dtw(
+    user_angles: np.ndarray,
+    reference_angles: np.ndarray,
+    user_confidence: Optional[np.ndarray] = None,
+    reference_confidence: Optional[np.ndarray] = None,
+    band: int = 15,
+    centers: Optional[np.ndarray] = None,
+    missing_cost: float = MISSING_COST
+) -> Tuple[np.ndarray, float]:
+    """
+    DTW restricted to reference frames centers[i] +/- band for user frame i.
+
+    The path may start and end anywhere inside the band on the reference
+    axis (open begin/end), so a recording that starts or stops mid-song
+    doesn't have to stretch to the reference's first or last frame.
+
+    Args:
+        user_angles: User angles [N, 8] (rows)
+        reference_angles: Reference angles [M, 8] (columns)
+        user_confidence: User angle confidences [N, 8]
+        reference_confidence: Reference angle confidences [M, 8]
+        band: Half-width of the band in frames
+        centers: Non-decreasing band centre per user frame (default 0..N-1)
+        missing_cost: Cost of frame pairs without shared valid joints
+
+    Returns:
+        (path [K, 2] of (user frame, reference frame), total path cost)
+
+    Raises:
+        ValueError: If the band never overlaps the reference
+    """
+    user, user_valid = _prepare(user_angles, user_confidence)
+    reference, reference_valid = _prepare(reference_angles, reference_confidence)
+    n, m = len(user), len(reference)
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.int64), 0.0
+    if centers is None:
+        centers = np.arange(n)
+    centers = np.asarray(centers, dtype=np.int64)
+    if np.any(np.diff(centers) < 0):
+        raise ValueError("centers must be non-decreasing")
+
+    width = 2 * band + 1
+    offsets = np.arange(width)
+    starts = centers - band
+    steps = np.full((n, width), STEP_START, dtype=np.int8)
+
+    previous = None
+    for i in range(n):
+        columns = starts[i] + offsets
+        inside = (columns >= 0) & (columns < m)
+        clipped = np.clip(columns, 0, m - 1)
+        cost = frame_distances(user[i], user_valid[i], reference[clipped], reference_valid[clipped], missing_cost)
+        cost = np.where(inside, cost, 0.0)
+
+        if previous is None:
+            # Open begin: the path can enter anywhere on the first row
+            arrival = np.where(inside, 0.0, np.inf)
+            from_diagonal = np.zeros(width, dtype=bool)
+        else:
+            shift = starts[i] - starts[i - 1]
+            up_index = offsets + shift
+            diagonal_index = up_index - 1
+            up = np.where((up_index >= 0) & (up_index < width),
+                          previous[np.clip(up_index, 0, width - 1)], np.inf)
+            diagonal = np.where((diagonal_index >= 0) & (diagonal_index < width),
+                                previous[np.clip(diagonal_index, 0, width - 1)], np.inf)
+            from_diagonal = diagonal <= up
+            arrival = np.where(inside, np.minimum(diagonal, up), np.inf)
+
+        # D[j] = min(arrival[j], D[j-1]) + cost[j] as a prefix sum + running min:
+        # D[j] = S[j] + min_{k <= j}(arrival[k] - S[k-1]), S = cumsum(cost)
+        prefix = np.cumsum(cost)
+        entry = arrival - (prefix - cost)
+        current = prefix + np.minimum.accumulate(entry)
+        from_left = np.zeros(width, dtype=bool)
+        from_left[1:] = current[:-1] + cost[1:] < arrival[1:] + cost[1:]
+        current = np.where(inside, current, np.inf)
+
+        if previous is not None:
+            steps[i] = np.where(from_left, STEP_LEFT, np.where(from_diagonal, STEP_DIAGONAL, STEP_UP))
+        else:
+            steps[i] = np.where(from_left, STEP_LEFT, STEP_START)
+        previous = current
+
+    if not np.isfinite(previous).any():
+        raise ValueError("Band does not overlap the reference sequence")
+
+    # Open end: best cell anywhere on the last row
+    b = int(np.argmin(previous))
+    total = float(previous[b])
+    i = n - 1
+    path = []
+    while True:
+        path.append((i, int(starts[i] + b)))
+        step = steps[i, b]
+        if step == STEP_START:
+            break
+        if step == STEP_LEFT:
+            b -= 1
+        else:
+            shift = int(starts[i] - starts[i - 1])
+            b = b + shift - (1 if step == STEP_DIAGONAL else 0)
+            i -= 1
+
+    return np.array(path[::-1], dtype=np.int64), total
+
+
+class Alignment:
+    """Result of align(): global offset plus the local warping path."""
+
+    def __init__(
+        self,
+        fps: float,
+        offset: Dict,
+        path: np.ndarray,
+        path_cost: float,
+        user_count: int,
+        centers: np.ndarray,
+        unaligned_cost: float
+    ):
+        self.fps = fps
+        self.offset_frames = offset['lag']
+        self.offset_seconds = float(offset['refinedLag'] / fps) if fps else 0.0
+        self.offset_cost = offset['cost']
+        self.path = path
+        self.path_cost = path_cost
+        self.unaligned_cost = unaligned_cost
+
+        # Reference frame matched to each user frame (mean over the path)
+        sums = np.bincount(path[:, 0], weights=path[:, 1], minlength=user_count)
+        counts = np.bincount(path[:, 0], minlength=user_count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matched = sums / counts
+        self.reference_index = np.rint(np.where(counts > 0, matched, centers)).astype(np.int64)
+
+        # Positive = user behind the reference at that frame
+        self.local_offset = (centers - np.where(counts > 0, matched, centers)) / fps if fps else np.zeros(user_count)
+
+    def summary(self) -> Dict:
+        """Timing vs form numbers for reports (seconds and degrees)."""
+        deviation = np.abs(self.local_offset - self.offset_seconds)
+        return {
+            'offsetSeconds': round(self.offset_seconds, 4),
+            'offsetFrames': self.offset_frames,
+            'meanLocalOffset': round(float(self.local_offset.mean()), 4) if len(self.local_offset) else 0.0,
+            'localOffsetStd': round(float(self.local_offset.std()), 4) if len(self.local_offset) else 0.0,
+            'p95TimingDeviation': round(float(np.percentile(deviation, 95)), 4) if len(deviation) else 0.0,
+            # Mean angle distance before and after removing timing error
+            'unalignedCost': round(self.unaligned_cost, 3),
+            'alignedCost': round(self.path_cost / len(self.path), 3) if len(self.path) else 0.0,
+            'pathLength': int(len(self.path)),
+        }
+
+
+def align(
+    user_angles: np.ndarray,
+    reference_angles: np.ndarray,
+    user_confidence: Optional[np.ndarray] = None,
+    reference_confidence: Optional[np.ndarray] = None,
+    fps: float = 30.0,
+    centers: Optional[np.ndarray] = None,
+    max_offset: float = MAX_OFFSET_SECONDS,
+    band: float = BAND_SECONDS,
+    missing_cost: float = MISSING_COST
+) -> Alignment:
+    """
+    Global offset search followed by banded DTW around that offset.
+
+    Args:
+        user_angles: User angles [N, 8]
+        reference_angles: Reference angles [M, 8] at the same frame rate
+        user_confidence: User angle confidences [N, 8]
+        reference_confidence: Reference angle confidences [M, 8]
+        fps: Frame rate of both sequences
+        centers: Reference frame for each user frame at zero offset
+            (default: the same index)
+        max_offset: Largest global offset searched, seconds
+        band: DTW band half-width around the offset diagonal, seconds
+        missing_cost: Cost of frame pairs without shared valid joints
+
+    Returns:
+        Alignment
+    """
+    n = len(user_angles)
+    centers = np.arange(n) if centers is None else np.asarray(centers, dtype=np.int64)
+
+    offset = estimate_offset(
+        user_angles, reference_angles, user_confidence, reference_confidence,
+        max_lag=max(1, round(max_offset * fps)), centers=centers
+    )
+    lag_zero = offset['costs'][len(offset['costs']) // 2]
+
+    path, path_cost = banded_dtw(
+        user_angles, reference_angles, user_confidence, reference_confidence,
+        band=max(1, round(band * fps)), centers=centers - offset['lag'], missing_cost=missing_cost
+    )
+    return Alignment(fps, offset, path, path_cost, n, centers, float(lag_zero))
+
+
+def align_sequences(
+    user: PoseSequence,
+    reference: PoseSequence,
+    max_offset: float = MAX_OFFSET_SECONDS,
+    band: float = BAND_SECONDS
+) -> Alignment:
+    """
+    Align a recorded user sequence with a reference song.
+
+    The reference is resampled at the user's frame rate (nearest earlier
+    frame, as the game screen picks it) so DTW steps are one frame on both
+    axes, and each user frame's timestamp (video position) gives its band
+    centre. reference_index is mapped back to reference frames.
+    """
+    grid_count = max(1, int(np.ceil(reference.duration * user.fps)))
+    grid_to_reference = np.minimum(
+        np.floor(np.arange(grid_count) / user.fps * reference.fps).astype(np.int64), len(reference) - 1
+    )
+    centers = np.floor(user.timestamps * user.fps + 1e-6).astype(np.int64)
+
+    alignment = align(
+        user.angles,
+        reference.angles[grid_to_reference],
+        user.angle_confidence,
+        reference.angle_confidence[grid_to_reference],
+        fps=user.fps,
+        centers=centers,
+        max_offset=max_offset,
+        band=band
+    )
+    alignment.reference_index = grid_to_reference[np.clip(alignment.reference_index, 0, grid_count - 1)]
+    return alignment
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Separate timing from form errors with DTW alignment')
+    parser.add_argument('user', help='User pose JSON (angles + timestamps)')
+    parser.add_argument('reference', help='Reference pose JSON')
+    parser.add_argument(
+        '--max-offset',
+        type=float,
+        default=MAX_OFFSET_SECONDS,
+        help=f'Largest global offset searched in seconds (default: {MAX_OFFSET_SECONDS:g})'
+    )
+    parser.add_argument(
+        '--band',
+        type=float,
+        default=BAND_SECONDS,
+        help=f'DTW band half-width in seconds (default: {BAND_SECONDS:g})'
+    )
+    parser.add_argument('--report', default=None, help='Write the summary as JSON')
+
+    args = parser.parse_args()
+
+    alignment = align_sequences(
+        PoseSequence.from_json(args.user),
+        PoseSequence.from_json(args.reference),
+        max_offset=args.max_offset,
+        band=args.band
+    )
+    summary = alignment.summary()
+
+    direction = 'late' if summary['offsetSeconds'] > 0 else 'early'
+    print(f"Global offset: {abs(summary['offsetSeconds']) * 1000:.0f} ms {direction}")
+    print(f"Local timing: std {summary['localOffsetStd'] * 1000:.0f} ms, "
+          f"p95 deviation {summary['p95TimingDeviation'] * 1000:.0f} ms")
+    print(f"Form (mean angle error): {summary['unalignedCost']:.1f}° unaligned -> "
+          f"{summary['alignedCost']:.1f}° aligned")
+
+    if args.report:
+        with open(Path(args.report), 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Report saved to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+"""
+Distill YOLOv8s-pose outputs into the lightweight pose model.
+
+`create_lightweight_model.py` ships LightweightPoseModel with an untrained
+pose head. The pose JSON files in mobile/assets/poses were produced by
+YOLOv8s-pose from the reference videos, so together with those videos they
+form a labelled dataset we can distill from.
+
+This script:
+1. Pairs each pose JSON file with its source video
+2. Streams frames and YOLO keypoints (no frame cache on disk or in memory)
+3. Trains the pose head (optionally the backbone) on CPU
+4. Checkpoints every epoch and can resume
+5. Evaluates per-keypoint error against the YOLO labels
+
+Usage:
+    uv run python train_lightweight_model.py --videos ../songs/
+    uv run python train_lightweight_model.py --videos ../songs/ --train-backbone --epochs 10
+    uv run python train_lightweight_model.py --videos ../songs/ --evaluate-only
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.utils.data import DataLoader, IterableDataset, get_worker_info
+
+from create_lightweight_model import LightweightPoseModel
+from model_config import resolve_input_size
+from pose_manifest import iter_pose_files
+from pose_sequence import KEYPOINT_NAMES, PoseSequence
+from regenerate_poses import find_videos
+
+
+# Input size of the lightweight model (matches preprocess_video_executorch)
+INPUT_SIZE = resolve_input_size('lightweight')
+
+# Keypoints below this YOLO confidence do not contribute to the coordinate loss
+MIN_TARGET_CONFIDENCE = 0.3
+
+# PCK threshold as a fraction of the (normalized) frame size
+PCK_THRESHOLD = 0.05
+
+
+def find_training_pairs(poses_dir: Path, videos_dir: Path) -> List[Tuple[Path, Path]]:
+    """
+    Match pose JSON files with their source videos by file stem.
+
+    Args:
+        poses_dir: Directory containing pose JSON files
+        videos_dir: Directory containing the reference videos
+
+    Returns:
+        List of (video_path, pose_path) tuples
+    """
+    videos = {video.stem: video for video in find_videos(videos_dir)}
+    pairs = []
+
+    for pose_file in iter_pose_files(poses_dir):
+        video = videos.get(pose_file.stem)
+        if video is None:
+            print(f"⚠ No video found for {pose_file.name}, skipping")
+            continue
+        pairs.append((video, pose_file))
+
+    return pairs
+
+
+def load_keypoint_targets(pose_path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load YOLO keypoints from a pose JSON file.
+
+    Args:
+        pose_path: Path to pose JSON file
+
+    Returns:
+        Tuple of (frame_numbers [N], keypoints [N, 17, 3]) arrays
+    """
+    sequence = PoseSequence.from_json(pose_path)
+    return sequence.frame_numbers.astype(np.int64), sequence.keypoints
+
+
+def preprocess_frame(frame: np.ndarray, input_size: int = INPUT_SIZE) -> torch.Tensor:
+    """
+    Preprocess a BGR frame exactly like ExecuTorchPoseDetector.preprocess_frame.
+
+    Args:
+        frame: Input frame (BGR format from OpenCV)
+        input_size: Square model input size
+
+    Returns:
+        Tensor [3, input_size, input_size] normalized to [0, 1]
+    """
+    resized = cv2.resize(frame, (input_size, input_size))
+    rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+    normalized = rgb.astype(np.float32) / 255.0
+    return torch.from_numpy(normalized).permute(2, 0, 1)
+
+
+class PoseDistillationDataset(IterableDataset):
+    """
+    Streams (frame, YOLO keypoints) pairs from videos and pose JSON files.
+
+    Frames are decoded sequentially (seeking is slow and inaccurate with most
+    codecs) and only the frames selected by `frame_stride` are retrieved and
+    resized. The last `val_fraction` of every video is held out for
+    validation so that near-duplicate neighbouring frames do not leak between
+    the splits.
+    """
+
+    def __init__(
+        self,
+        pairs: List[Tuple[Path, Path]],
+        split: str = 'train',
+        val_fraction: float = 0.1,
+        frame_stride: int = 2,
+        input_size: int = INPUT_SIZE,
+        shuffle_buffer: int = 256,
+        seed: int = 0
+    ):
+        """
+        Initialize dataset.
+
+        Args:
+            pairs: List of (video_path, pose_path) tuples
+            split: 'train' or 'val'
+            val_fraction: Fraction of each video held out for validation
+            frame_stride: Use every Nth frame
+            input_size: Square model input size
+            shuffle_buffer: Size of the shuffle buffer (train split only)
+            seed: Random seed for the shuffle buffer
+        """
+        if split not in ('train', 'val'):
+            raise ValueError(f"split must be 'train' or 'val', got {split!r}")
+
+        self.pairs = pairs
+        self.split = split
+        self.val_fraction = val_fraction
+        self.frame_stride = max(1, frame_stride)
+        self.input_size = input_size
+        self.shuffle_buffer = shuffle_buffer if split == 'train' else 0
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """Change the shuffle order for a new epoch."""
+        self.epoch = epoch
+
+    def _split_range(self, num_frames: int) -> Tuple[int, int]:
+        split_at = int(num_frames * (1.0 - self.val_fraction))
+        if self.split == 'train':
+            return 0, split_at
+        return split_at, num_frames
+
+    def _iter_pair(self, video_path: Path, pose_path: Path) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        frame_numbers, keypoints = load_keypoint_targets(pose_path)
+        if len(frame_numbers) == 0:
+            return
+
+        targets = {int(n): i for i, n in enumerate(frame_numbers)}
+        start, end = self._split_range(int(frame_numbers.max()) + 1)
+
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            print(f"⚠ Could not open video: {video_path}")
+            return
+
+        try:
+            frame_num = 0
+            while frame_num < end:
+                wanted = (
+                    frame_num >= start
+                    and (frame_num - start) % self.frame_stride == 0
+                    and frame_num in targets
+                )
+                # grab() decodes without the BGR conversion, retrieve() only when needed
+                if not cap.grab():
+                    break
+                if wanted:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        yield (
+                            preprocess_frame(frame, self.input_size),
+                            torch.from_numpy(keypoints[targets[frame_num]]),
+                        )
+                frame_num += 1
+        finally:
+            cap.release()
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        pairs = list(self.pairs)
+        rng = random.Random(self.seed + self.epoch)
+        if self.split == 'train':
+            rng.shuffle(pairs)
+
+        # Shard videos across DataLoader workers
+        worker = get_worker_info()
+        if worker is not None:
+            pairs = pairs[worker.id::worker.num_workers]
+
+        buffer: List[Tuple[torch.Tensor, torch.Tensor]] = []
+        for video_path, pose_path in pairs:
+            for sample in self._iter_pair(video_path, pose_path):
+                if self.shuffle_buffer <= 0:
+                    yield sample
+                    continue
+                if len(buffer) < self.shuffle_buffer:
+                    buffer.append(sample)
+                    continue
+                idx = rng.randrange(len(buffer))
+                yield buffer[idx]
+                buffer[idx] = sample
+
+        rng.shuffle(buffer)
+        yield from buffer
+
+
+def distillation_loss(
+    pred: torch.Tensor,
+    target: torch.Tensor,
+    min_confidence: float = MIN_TARGET_CONFIDENCE,
+    confidence_weight: float = 0.5
+) -> torch.Tensor:
+    """
+    Loss between lightweight model output and YOLO keypoints.
+
+    Coordinates use a smooth L1 loss weighted by YOLO confidence, masked where
+    YOLO itself is unsure. Confidences are regressed with binary cross entropy
+    so the student learns when a keypoint is not visible.
+
+    Args:
+        pred: Student output [B, 17, 3]
+        target: YOLO keypoints [B, 17, 3]
+        min_confidence: Minimum YOLO confidence for a coordinate to count
+        confidence_weight: Weight of the confidence term
+
+    Returns:
+        Scalar loss tensor
+    """
+    target_conf = target[:, :, 2]
+    weights = target_conf * (target_conf >= min_confidence).float()
+
+    coord_loss = F.smooth_l1_loss(pred[:, :, :2], target[:, :, :2], reduction='none', beta=0.02).sum(dim=2)
+    coord_loss = (coord_loss * weights).sum() / weights.sum().clamp(min=1e-6)
+
+    conf_loss = F.binary_cross_entropy(pred[:, :, 2].clamp(1e-6, 1 - 1e-6), target_conf)
+
+    return coord_loss + confidence_weight * conf_loss
+
+
+def evaluate(
+    model: nn.Module,
+    loader: DataLoader,
+    min_confidence: float = MIN_TARGET_CONFIDENCE
+) -> Dict:
+    """
+    Evaluate per-keypoint error of the lightweight model against YOLO.
+
+    Only keypoints YOLO is confident about are scored.
+
+    Args:
+        model: Lightweight pose model
+        loader: Validation DataLoader
+        min_confidence: Minimum YOLO confidence for a keypoint to be scored
+
+    Returns:
+        Dictionary with overall and per-keypoint metrics
+    """
+    model.eval()
+
+    num_keypoints = len(KEYPOINT_NAMES)
+    error_sum = np.zeros(num_keypoints, dtype=np.float64)
+    pck_hits = np.zeros(num_keypoints, dtype=np.int64)
+    counts = np.zeros(num_keypoints, dtype=np.int64)
+    conf_abs_error = 0.0
+    num_samples = 0
+    loss_sum = 0.0
+    num_batches = 0
+
+    with torch.no_grad():
+        for images, targets in loader:
+            outputs = model(images)
+            loss_sum += distillation_loss(outputs, targets, min_confidence).item()
+            num_batches += 1
+
+            outputs_np = outputs.numpy()
+            targets_np = targets.numpy()
+
+            mask = targets_np[:, :, 2] >= min_confidence  # [B, 17]
+            dist = np.linalg.norm(outputs_np[:, :, :2] - targets_np[:, :, :2], axis=2)  # [B, 17]
+
+            error_sum += np.where(mask, dist, 0.0).sum(axis=0)
+            pck_hits += (mask & (dist <= PCK_THRESHOLD)).sum(axis=0)
+            counts += mask.sum(axis=0)
+            conf_abs_error += np.abs(outputs_np[:, :, 2] - targets_np[:, :, 2]).sum()
+            num_samples += images.shape[0]
+
+    safe_counts = np.maximum(counts, 1)
+    per_keypoint = {
+        name: {
+            'mean_error': float(error_sum[i] / safe_counts[i]),
+            'pck': float(pck_hits[i] / safe_counts[i]),
+            'count': int(counts[i]),
+        }
+        for i, name in enumerate(KEYPOINT_NAMES)
+    }
+
+    total = max(int(counts.sum()), 1)
+    return {
+        'num_samples': num_samples,
+        'loss': loss_sum / max(num_batches, 1),
+        'mean_error': float(error_sum.sum() / total),
+        'pck': float(pck_hits.sum() / total),
+        'pck_threshold': PCK_THRESHOLD,
+        'confidence_mae': float(conf_abs_error / max(num_samples * num_keypoints, 1)),
+        'keypoints': per_keypoint,
+    }
+
+
+def set_backbone_trainable(model: LightweightPoseModel, trainable: bool) -> None:
+    """Freeze or unfreeze the MobileNetV3 backbone."""
+    for param in model.backbone.parameters():
+        param.requires_grad = trainable
+
+
+def save_checkpoint(path: Path, model: nn.Module, optimizer, epoch: int, best_error: float, config: Dict) -> None:
+    """Save a resumable training checkpoint."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    torch.save({
+        'epoch': epoch,
+        'model_state': model.state_dict(),
+        'optimizer_state': optimizer.state_dict(),
+        'best_error': best_error,
+        'config': config,
+    }, tmp_path)
+    tmp_path.replace(path)
+
+
+def train(
+    pairs: List[Tuple[Path, Path]],
+    output_path: str = "models/lightweight_pose.pt",
+    checkpoint_dir: str = "models/checkpoints",
+    init_weights: Optional[str] = None,
+    resume: bool = False,
+    epochs: int = 5,
+    batch_size: int = 32,
+    learning_rate: float = 1e-3,
+    train_backbone: bool = False,
+    backbone_learning_rate: float = 1e-4,
+    val_fraction: float = 0.1,
+    frame_stride: int = 2,
+    num_workers: int = 0,
+    seed: int = 0
+) -> Dict:
+    """
+    Distill YOLO keypoints into LightweightPoseModel.
+
+    Args:
+        pairs: List of (video_path, pose_path) tuples
+        output_path: Where to save the final (best) state dict
+        checkpoint_dir: Directory for resumable checkpoints
+        init_weights: Optional state dict to start from
+        resume: Resume from checkpoint_dir/last.pt if present
+        epochs: Number of epochs
+        batch_size: Batch size
+        learning_rate: Learning rate for the pose head
+        train_backbone: Also fine-tune the MobileNetV3 backbone
+        backbone_learning_rate: Learning rate for the backbone
+        val_fraction: Fraction of each video held out for validation
+        frame_stride: Use every Nth frame
+        num_workers: DataLoader worker processes
+        seed: Random seed
+
+    Returns:
+        Evaluation results of the best model
+    """
+    torch.manual_seed(seed)
+
+    model = LightweightPoseModel()
+    if init_weights:
+        model.load_state_dict(torch.load(init_weights, weights_only=True))
+        print(f"✓ Initialized from {init_weights}")
+
+    set_backbone_trainable(model, train_backbone)
+
+    param_groups = [{'params': model.pose_head.parameters(), 'lr': learning_rate}]
+    if train_backbone:
+        param_groups.append({'params': model.backbone.parameters(), 'lr': backbone_learning_rate})
+    optimizer = torch.optim.AdamW(param_groups, weight_decay=1e-4)
+
+    config = {
+        'epochs': epochs,
+        'batch_size': batch_size,
+        'learning_rate': learning_rate,
+        'train_backbone': train_backbone,
+        'backbone_learning_rate': backbone_learning_rate,
+        'val_fraction': val_fraction,
+        'frame_stride': frame_stride,
+        'input_size': INPUT_SIZE,
+        'songs': [pose.stem for _, pose in pairs],
+    }
+
+    checkpoint_path = Path(checkpoint_dir)
+    start_epoch = 0
+    best_error = float('inf')
+
+    if resume and (checkpoint_path / 'last.pt').exists():
+        checkpoint = torch.load(checkpoint_path / 'last.pt', weights_only=False)
+        model.load_state_dict(checkpoint['model_state'])
+        if checkpoint['config'].get('train_backbone') == train_backbone:
+            optimizer.load_state_dict(checkpoint['optimizer_state'])
+        else:
+            print("⚠ Backbone setting changed since checkpoint, starting with a fresh optimizer")
+        start_epoch = checkpoint['epoch'] + 1
+        best_error = checkpoint['best_error']
+        print(f"✓ Resumed from epoch {checkpoint['epoch'] + 1} (best error {best_error:.4f})")
+
+    train_set = PoseDistillationDataset(
+        pairs, 'train', val_fraction=val_fraction, frame_stride=frame_stride, seed=seed
+    )
+    val_set = PoseDistillationDataset(
+        pairs, 'val', val_fraction=val_fraction, frame_stride=frame_stride, seed=seed
+    )
+    train_loader = DataLoader(train_set, batch_size=batch_size, num_workers=num_workers)
+    val_loader = DataLoader(val_set, batch_size=batch_size, num_workers=num_workers)
+
+    for epoch in range(start_epoch, epochs):
+        train_set.set_epoch(epoch)
+        model.train()
+        if not train_backbone:
+            # Keep frozen BatchNorm statistics from ImageNet
+            model.backbone.eval()
+
+        epoch_start = time.perf_counter()
+        loss_sum = 0.0
+        num_batches = 0
+        num_samples = 0
+
+        for images, targets in train_loader:
+            optimizer.zero_grad()
+            loss = distillation_loss(model(images), targets)
+            loss.backward()
+            optimizer.step()
+
+            loss_sum += loss.item()
+            num_batches += 1
+            num_samples += images.shape[0]
+
+            if num_batches % 50 == 0:
+                print(f"  [epoch {epoch + 1}] batch {num_batches}: loss {loss_sum / num_batches:.4f}")
+
+        elapsed = time.perf_counter() - epoch_start
+        results = evaluate(model, val_loader)
+
+        print(f"\nEpoch {epoch + 1}/{epochs}: "
+              f"train loss {loss_sum / max(num_batches, 1):.4f}, "
+              f"val loss {results['loss']:.4f}, "
+              f"val error {results['mean_error']:.4f}, "
+              f"PCK@{PCK_THRESHOLD} {results['pck'] * 100:.1f}% "
+              f"({num_samples / max(elapsed, 1e-6):.1f} frames/s)")
+
+        if results['mean_error'] < best_error:
+            best_error = results['mean_error']
+            save_checkpoint(checkpoint_path / 'best.pt', model, optimizer, epoch, best_error, config)
+            print(f"  ✓ New best model (error {best_error:.4f})")
+
+        save_checkpoint(checkpoint_path / 'last.pt', model, optimizer, epoch, best_error, config)
+
+    # Export the best weights in the plain state dict format used everywhere else
+    best_path = checkpoint_path / 'best.pt'
+    if best_path.exists():
+        model.load_state_dict(torch.load(best_path, weights_only=False)['model_state'])
+
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    torch.save(model.state_dict(), output_file)
+    print(f"\n✓ Saved distilled model to {output_file}")
+
+    return evaluate(model, val_loader)
+
+
+def print_evaluation(results: Dict) -> None:
+    """
+    Print evaluation results in a readable format.
+
+    Args:
+        results: Results from evaluate()
+    """
+    print("\n" + "=" * 60)
+    print("Lightweight Model vs YOLOv8s-pose")
+    print("=" * 60)
+    print(f"Frames evaluated: {results['num_samples']}")
+    print(f"Mean keypoint error: {results['mean_error']:.4f} (normalized)")
+    print(f"PCK@{results['pck_threshold']}: {results['pck'] * 100:.1f}%")
+    print(f"Confidence MAE: {results['confidence_mae']:.4f}")
+    print(f"\n  {'Keypoint':<15} {'Error':>8} {'PCK':>8} {'Count':>8}")
+    for name, stats in results['keypoints'].items():
+        print(f"  {name:<15} {stats['mean_error']:>8.4f} {stats['pck'] * 100:>7.1f}% {stats['count']:>8}")
+    print("=" * 60)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Distill YOLOv8s-pose keypoints into the lightweight pose model"
+    )
+    parser.add_argument(
+        "--videos",
+        type=str,
+        default="../songs",
+        help="Directory containing the reference videos"
+    )
+    parser.add_argument(
+        "--poses",
+        type=str,
+        default="../mobile/assets/poses",
+        help="Directory containing YOLOv8s-pose JSON files"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="models/lightweight_pose.pt",
+        help="Path to save the distilled model state dict"
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=str,
+        default="models/checkpoints",
+        help="Directory for resumable checkpoints"
+    )
+    parser.add_argument(
+        "--init-weights",
+        type=str,
+        default=None,
+        help="Optional state dict to initialize from"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume from the last checkpoint"
+    )
+    parser.add_argument("--epochs", type=int, default=5, help="Number of epochs")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size")
+    parser.add_argument("--lr", type=float, default=1e-3, help="Pose head learning rate")
+    parser.add_argument(
+        "--train-backbone",
+        action="store_true",
+        help="Also fine-tune the MobileNetV3 backbone (slower)"
+    )
+    parser.add_argument("--backbone-lr", type=float, default=1e-4, help="Backbone learning rate")
+    parser.add_argument(
+        "--val-fraction",
+        type=float,
+        default=0.1,
+        help="Fraction of each video held out for validation"
+    )
+    parser.add_argument("--frame-stride", type=int, default=2, help="Use every Nth frame")
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--threads", type=int, default=None, help="Torch CPU threads")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--evaluate-only",
+        action="store_true",
+        help="Only evaluate --init-weights (or --output) against YOLO"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Optional path to write the evaluation results as JSON"
+    )
+
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    pairs = find_training_pairs(Path(args.poses), Path(args.videos))
+    if not pairs:
+        print(f"✗ No (video, pose file) pairs found in {args.videos} and {args.poses}")
+        return
+
+    print("=" * 60)
+    print("Lightweight Pose Model Distillation")
+    print("=" * 60)
+    print(f"Songs: {', '.join(pose.stem for _, pose in pairs)}")
+    print(f"Backbone: {'trainable' if args.train_backbone else 'frozen'}")
+    print(f"Device: cpu ({torch.get_num_threads()} threads)")
+
+    if args.evaluate_only:
+        weights = args.init_weights or args.output
+        model = LightweightPoseModel()
+        model.load_state_dict(torch.load(weights, weights_only=True))
+        val_set = PoseDistillationDataset(
+            pairs, 'val', val_fraction=args.val_fraction, frame_stride=args.frame_stride
+        )
+        results = evaluate(model, DataLoader(val_set, batch_size=args.batch_size, num_workers=args.workers))
+    else:
+        results = train(
+            pairs,
+            output_path=args.output,
+            checkpoint_dir=args.checkpoint_dir,
+            init_weights=args.init_weights,
+            resume=args.resume,
+            epochs=args.epochs,
+            batch_size=args.batch_size,
+            learning_rate=args.lr,
+            train_backbone=args.train_backbone,
+            backbone_learning_rate=args.backbone_lr,
+            val_fraction=args.val_fraction,
+            frame_stride=args.frame_stride,
+            num_workers=args.workers,
+            seed=args.seed,
+        )
+
+    print_evaluation(results)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,153 +3,232 @@
 Validation script for pose data JSON files.
 """
 
-import json
 import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from pose_manifest import MANIFEST_NAME, PoseManifest, iter_pose_files
+from pose_stream import validate_pose_stream
 
 
 def validate_pose_json(json_path: str) -> tuple[bool, List[str]]:
     """
     Validate a pose data JSON file.
     
+    Every frame is checked while the file is streamed (see pose_stream.py),
+    so memory use does not grow with the file size.
+    
     Returns:
         (is_valid, list_of_errors)
     """
-    errors = []
+    is_valid, errors, _ = validate_pose_stream(json_path)
+    return is_valid, errors
+
+
+def validate_file(json_path: str) -> Dict:
+    """
+    Validate one file and collect report metadata.
     
-    try:
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        return False, [f"Invalid JSON: {e}"]
-    except FileNotFoundError:
-        return False, [f"File not found: {json_path}"]
-    
-    # Check required top-level fields
-    required_fields = ['songId', 'fps', 'totalFrames', 'frames']
-    for field in required_fields:
-        if field not in data:
-            errors.append(f"Missing required field: {field}")
-    
-    if errors:
-        return False, errors
-    
-    # Validate data types
-    if not isinstance(data['songId'], str):
-        errors.append("songId must be a string")
-    
-    if not isinstance(data['fps'], (int, float)) or data['fps'] <= 0:
-        errors.append("fps must be a positive number")
-    
-    if not isinstance(data['totalFrames'], int) or data['totalFrames'] <= 0:
-        errors.append("totalFrames must be a positive integer")
-    
-    if not isinstance(data['frames'], list):
-        errors.append("frames must be a list")
-        return False, errors
-    
-    # Validate frames
-    if len(data['frames']) != data['totalFrames']:
-        errors.append(f"Frame count mismatch: expected {data['totalFrames']}, got {len(data['frames'])}")
-    
-    # Validate frame structure (sample first and last frames)
-    frames_to_check = [0, len(data['frames']) - 1] if len(data['frames']) > 1 else [0]
-    
-    for idx in frames_to_check:
-        if idx >= len(data['frames']):
-            continue
-        
-        frame = data['frames'][idx]
-        
-        # Check frame fields
-        if 'frameNumber' not in frame:
-            errors.append(f"Frame {idx}: missing frameNumber")
-        
-        if 'timestamp' not in frame:
-            errors.append(f"Frame {idx}: missing timestamp")
-        
-        if 'keypoints' not in frame:
-            errors.append(f"Frame {idx}: missing keypoints")
-        
-        if 'angles' not in frame:
-            errors.append(f"Frame {idx}: missing angles")
-        
-        # Validate keypoints structure
-        if 'keypoints' in frame and isinstance(frame['keypoints'], dict):
-            for kp_name, kp_data in frame['keypoints'].items():
-                if not isinstance(kp_data, dict):
-                    errors.append(f"Frame {idx}: keypoint {kp_name} must be a dict")
-                    continue
-                
-                required_kp_fields = ['x', 'y', 'confidence']
-                for field in required_kp_fields:
-                    if field not in kp_data:
-                        errors.append(f"Frame {idx}: keypoint {kp_name} missing {field}")
-        
-        # Validate angles structure
-        if 'angles' in frame and isinstance(frame['angles'], dict):
-            expected_angles = ['leftArm', 'rightArm', 'leftElbow', 'rightElbow', 
-                             'leftThigh', 'rightThigh', 'leftLeg', 'rightLeg']
-            for angle_name in expected_angles:
-                if angle_name not in frame['angles']:
-                    errors.append(f"Frame {idx}: missing angle {angle_name}")
+    Returns:
+        Dict with file, status, errors, frameCount, fileSize and parseTime
+    """
+    path = Path(json_path)
+    start = time.perf_counter()
+    is_valid, errors, stats = validate_pose_stream(json_path)
+    
+    return {
+        'file': path.name,
+        'status': 'valid' if is_valid else 'invalid',
+        'errors': errors,
+        'frameCount': stats['frameCount'],
+        'fileSize': path.stat().st_size if path.exists() else 0,
+        'parseTime': round(time.perf_counter() - start, 4),
+    }
+
+
+def failed_result(json_path: str, error: BaseException) -> Dict:
+    """
+    Report entry for a file whose validation raised instead of returning.
     
-    return len(errors) == 0, errors
+    Returns:
+        Dict with the same fields as validate_file(), status "invalid"
+    """
+    path = Path(json_path)
+    try:
+        file_size = path.stat().st_size
+    except OSError:
+        file_size = 0
+    
+    return {
+        'file': path.name,
+        'status': 'invalid',
+        'errors': [f"Validation failed: {type(error).__name__}: {error}"],
+        'frameCount': 0,
+        'fileSize': file_size,
+        'parseTime': 0.0,
+    }
 
 
-def validate_directory(directory: str) -> None:
-    """Validate all JSON files in a directory."""
+def print_result(result: Dict) -> None:
+    """Print one file's validation result."""
+    if result['status'] == 'valid':
+        print(f"✓ {result['file']}: VALID")
+    else:
+        print(f"✗ {result['file']}: INVALID")
+        for error in result['errors']:
+            print(f"  - {error}")
+
+
+def validate_directory(directory: str, jobs: int = 1, files: Optional[List[Path]] = None) -> List[Dict]:
+    """
+    Validate all JSON files in a directory.
+    
+    Args:
+        directory: Directory containing pose JSON files
+        jobs: Number of worker processes (0 = one per CPU)
+        files: Only validate these files (default: every pose file)
+    
+    Returns:
+        List of per-file results sorted by file name
+    """
     
     directory = Path(directory)
-    json_files = list(directory.glob('*.json'))
+    # Largest first so a big file doesn't start last and hold up the pool
+    if files is None:
+        files = iter_pose_files(directory)
+    json_files = sorted(files, key=lambda f: f.stat().st_size, reverse=True)
     
     if not json_files:
         print(f"No JSON files found in {directory}")
-        return
+        return []
+    
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(json_files))
     
-    print(f"Validating {len(json_files)} JSON file(s)...")
+    print(f"Validating {len(json_files)} JSON file(s)" + (f" with {jobs} processes..." if jobs > 1 else "..."))
     print("=" * 60)
     
-    valid_count = 0
-    invalid_count = 0
+    results = []
+    
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(validate_file, str(f)): f for f in json_files}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A crash (or a killed worker) fails this file, not the run
+                    result = failed_result(str(futures[future]), e)
+                print_result(result)
+                results.append(result)
+    else:
+        for json_file in json_files:
+            try:
+                result = validate_file(str(json_file))
+            except Exception as e:
+                result = failed_result(str(json_file), e)
+            print_result(result)
+            results.append(result)
     
-    for json_file in json_files:
-        is_valid, errors = validate_pose_json(str(json_file))
-        
-        if is_valid:
-            print(f"✓ {json_file.name}: VALID")
-            valid_count += 1
-        else:
-            print(f"✗ {json_file.name}: INVALID")
-            for error in errors:
-                print(f"  - {error}")
-            invalid_count += 1
+    valid_count = sum(1 for r in results if r['status'] == 'valid')
     
     print("=" * 60)
-    print(f"Results: {valid_count} valid, {invalid_count} invalid")
+    print(f"Results: {valid_count} valid, {len(results) - valid_count} invalid")
+    
+    return sorted(results, key=lambda r: r['file'])
+
+
+def write_report(results: List[Dict], report_path: str, wall_time: float) -> None:
+    """
+    Write validation results as a JSON report.
+    
+    Args:
+        results: Per-file results from validate_file()
+        report_path: Where to write the report
+        wall_time: Total elapsed seconds
+    """
+    valid_count = sum(1 for r in results if r['status'] == 'valid')
+    report = {
+        'generatedAt': datetime.now().isoformat(timespec='seconds'),
+        'summary': {
+            'total': len(results),
+            'valid': valid_count,
+            'invalid': len(results) - valid_count,
+            'totalFrames': sum(r['frameCount'] for r in results),
+            'totalBytes': sum(r['fileSize'] for r in results),
+            'wallTime': round(wall_time, 3),
+        },
+        'files': results,
+    }
+    
+    report_file = Path(report_path)
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {report_file}")
 
 
 def main():
     parser = argparse.ArgumentParser(description='Validate pose data JSON files')
     parser.add_argument('path', help='Path to JSON file or directory')
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Worker processes for directory validation (0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--report',
+        default=None,
+        help='Write a JSON report to this path'
+    )
+    parser.add_argument(
+        '--changed-only',
+        action='store_true',
+        help='Only validate files that changed since their last validation (uses manifest.json)'
+    )
     
     args = parser.parse_args()
     
     path = Path(args.path)
+    start = time.perf_counter()
     
     if path.is_file():
-        is_valid, errors = validate_pose_json(str(path))
-        if is_valid:
-            print(f"✓ {path.name}: VALID")
-        else:
-            print(f"✗ {path.name}: INVALID")
-            for error in errors:
-                print(f"  - {error}")
+        results = [validate_file(str(path))]
+        print_result(results[0])
     elif path.is_dir():
-        validate_directory(str(path))
+        # Record results in the manifest when there is one (or we need it)
+        manifest = None
+        if args.changed_only or (path / MANIFEST_NAME).exists():
+            manifest = PoseManifest(path)
+            manifest.refresh()
+        
+        files = manifest.needs_check('validation') if args.changed_only else None
+        if files == []:
+            print("✓ No files changed since their last validation")
+            results = []
+        else:
+            results = validate_directory(str(path), args.jobs, files)
+        
+        if manifest is not None:
+            for result in results:
+                manifest.record_check(result['file'], 'validation', result['status'], errors=len(result['errors']))
+            manifest.save()
     else:
         print(f"Error: {path} is not a valid file or directory")
+        sys.exit(2)
+    
+    if args.report:
+        write_report(results, args.report, time.perf_counter() - start)
+    
+    if any(r['status'] != 'valid' for r in results):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
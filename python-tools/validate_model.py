@@ -4,41 +4,219 @@ Validate exported ExecuTorch model against PyTorch baseline.
 
 This script compares the outputs of the ExecuTorch model with the
 original PyTorch model to ensure accuracy is maintained after export.
+
+The .pte program is loaded through the ExecuTorch pybindings. A missing
+or unloadable .pte (or runtime) is an error. With --allow-stub, a local
+stub that wraps the PyTorch model behind the same `forward((input,))`
+interface is used instead so the pipeline itself can be exercised; its
+differences are zero by construction, so a stubbed run never passes.
+
+The exit status is non-zero whenever validation fails, so CI can gate on it.
+Without videos to sample there is nothing to compare and validation fails;
+--ranges-only explicitly opts into checking the PyTorch model's output
+ranges on random inputs instead, which does not load the .pte at all.
+
+Both models are run over real frames sampled from our videos, in batches,
+and the report shows keypoint differences (mean/max/per keypoint), joint
+angle differences and per-frame latency side by side.
 """
 
 import argparse
-import torch
-import numpy as np
+import json
+import sys
+import time
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import torch
 
 from create_lightweight_model import LightweightPoseModel
+from model_config import resolve_input_size
+from pose_sequence import ANGLE_NAMES, KEYPOINT_NAMES, compute_angles
+from regenerate_poses import find_videos
+
+
+# Matches JOINT_CONFIDENCE_THRESHOLD in mobile/services/scoreCalculator.ts
+JOINT_CONFIDENCE_THRESHOLD = 0.3
+
+# Unique joints (the duplicated elbow/leg angles would double count)
+COMPARED_JOINTS = ['leftArm', 'rightArm', 'leftThigh', 'rightThigh']
+
+
+class PyTorchStubModule:
+    """
+    Stand-in for an ExecuTorch module when the runtime is unavailable.
+
+    Mirrors the pybindings `forward((input,)) -> [output]` interface by
+    running the PyTorch model, so differences are zero by construction and
+    only the pipeline itself is being exercised.
+    """
+
+    is_stub = True
+
+    def __init__(self, model: torch.nn.Module):
+        self.model = model
+
+    def forward(self, inputs: Tuple[torch.Tensor, ...]) -> List[torch.Tensor]:
+        with torch.no_grad():
+            return [self.model(*inputs)]
+
 
+def _stub_or_raise(reason: str, pytorch_model: torch.nn.Module, allow_stub: bool) -> PyTorchStubModule:
+    if not allow_stub:
+        raise RuntimeError(f"{reason} (pass --allow-stub to exercise the pipeline without it)")
+    print(f"⚠ {reason}")
+    print("  Using local PyTorch stub (differences will be zero, validation cannot pass)")
+    return PyTorchStubModule(pytorch_model)
 
-def load_models(pte_path: str, pytorch_path: str) -> Tuple:
+
+def load_executorch_module(pte_path: str, pytorch_model: torch.nn.Module, allow_stub: bool = False):
+    """
+    Load a .pte program through the ExecuTorch pybindings.
+
+    Args:
+        pte_path: Path to ExecuTorch .pte file
+        pytorch_model: PyTorch model used by the stub
+        allow_stub: Fall back to PyTorchStubModule when the runtime or the
+                    file is missing or fails to load
+
+    Returns:
+        Module exposing forward((input,)) -> [output]
+
+    Raises:
+        RuntimeError: If the .pte can't be loaded and allow_stub is False
+    """
+    if not Path(pte_path).exists():
+        return _stub_or_raise(f"ExecuTorch model not found at {pte_path}", pytorch_model, allow_stub)
+
+    try:
+        import executorch.extension.pybindings.portable_lib as exec_lib
+    except ImportError:
+        return _stub_or_raise("Cannot import ExecuTorch runtime (pip install executorch)", pytorch_model, allow_stub)
+
+    try:
+        try:
+            module = exec_lib._load_for_executorch(pte_path)
+        except AttributeError:
+            module = exec_lib.load(pte_path)
+    except Exception as e:
+        return _stub_or_raise(f"Failed to load ExecuTorch model: {e}", pytorch_model, allow_stub)
+
+    print(f"✓ ExecuTorch model loaded from {pte_path}")
+    return module
+
+
+def load_models(
+    pte_path: str,
+    pytorch_path: str,
+    model_type: str = 'lightweight',
+    input_size: Optional[int] = None,
+    allow_stub: bool = False
+) -> Tuple:
     """
     Load both ExecuTorch and PyTorch models.
-    
+
     Args:
         pte_path: Path to ExecuTorch .pte file
-        pytorch_path: Path to PyTorch .pt file
-        
+        pytorch_path: Path to PyTorch .pt file (lightweight model only)
+        model_type: 'lightweight' or 'yolov8'
+        input_size: Square input size the .pte was exported with
+        allow_stub: Use the PyTorch stub if the .pte can't be loaded
+
     Returns:
         Tuple of (executorch_module, pytorch_model)
     """
     print("Loading models...")
-    
-    # Load PyTorch model
-    pt_model = LightweightPoseModel()
-    pt_model.load_state_dict(torch.load(pytorch_path, weights_only=True))
-    pt_model.eval()
-    print(f"✓ PyTorch model loaded from {pytorch_path}")
-    
-    # Note: ExecuTorch runtime validation requires the runtime library
-    # which may not be available in all environments
-    print(f"✓ Models loaded successfully")
-    
-    return None, pt_model
+
+    if model_type == 'yolov8':
+        from export_model_yolov8 import YOLOv8PoseForExport
+        pt_model = YOLOv8PoseForExport(input_size)
+        pt_model.eval()
+        print("✓ PyTorch YOLOv8s-pose export wrapper loaded")
+    else:
+        pt_model = LightweightPoseModel()
+        pt_model.load_state_dict(torch.load(pytorch_path, weights_only=True))
+        pt_model.eval()
+        print(f"✓ PyTorch model loaded from {pytorch_path}")
+
+    et_module = load_executorch_module(pte_path, pt_model, allow_stub)
+    print("✓ Models loaded successfully")
+
+    return et_module, pt_model
+
+
+def run_executorch(et_module, batch: torch.Tensor) -> torch.Tensor:
+    """
+    Run an ExecuTorch module frame by frame (exported programs have batch 1).
+
+    Args:
+        et_module: Module exposing forward((input,)) -> [output]
+        batch: Input batch [B, 3, H, W]
+
+    Returns:
+        Output tensor [B, 17, 3]
+    """
+    outputs = []
+    for i in range(batch.shape[0]):
+        output = et_module.forward((batch[i:i + 1].contiguous(),))[0]
+        if not isinstance(output, torch.Tensor):
+            output = torch.tensor(output)
+        outputs.append(output)
+    return torch.cat(outputs, dim=0)
+
+
+def iter_frame_batches(
+    videos: List[Path],
+    num_frames: int,
+    batch_size: int,
+    input_size: int
+) -> Iterator[torch.Tensor]:
+    """
+    Stream preprocessed batches of real frames sampled evenly from videos.
+
+    Args:
+        videos: Videos to sample from
+        num_frames: Total number of frames across all videos
+        batch_size: Frames per batch
+        input_size: Square model input size
+
+    Yields:
+        Tensors [B, 3, input_size, input_size] normalized to [0, 1]
+    """
+    per_video = max(1, num_frames // max(len(videos), 1))
+    batch = []
+
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        if not cap.isOpened():
+            print(f"⚠ Could not open video: {video}")
+            continue
+
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        wanted = set(np.linspace(0, max(total - 1, 0), min(per_video, max(total, 1))).astype(int).tolist())
+        last = max(wanted, default=-1)
+
+        frame_num = 0
+        while frame_num <= last:
+            if not cap.grab():
+                break
+            if frame_num in wanted:
+                ret, frame = cap.retrieve()
+                if ret:
+                    resized = cv2.resize(frame, (input_size, input_size))
+                    rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+                    batch.append(torch.from_numpy(rgb.astype(np.float32) / 255.0).permute(2, 0, 1))
+                    if len(batch) == batch_size:
+                        yield torch.stack(batch)
+                        batch = []
+            frame_num += 1
+
+        cap.release()
+
+    if batch:
+        yield torch.stack(batch)
 
 
 def compare_outputs(
@@ -48,27 +226,27 @@ def compare_outputs(
 ) -> dict:
     """
     Compare outputs from PyTorch and ExecuTorch models.
-    
+
     Args:
-        pytorch_output: Output from PyTorch model
-        executorch_output: Output from ExecuTorch model
+        pytorch_output: Output from PyTorch model [B, 17, 3]
+        executorch_output: Output from ExecuTorch model [B, 17, 3]
         threshold: Acceptable difference threshold (default 5%)
-        
+
     Returns:
         Dictionary with comparison metrics
     """
     # Calculate differences
     abs_diff = torch.abs(executorch_output - pytorch_output)
-    
+
     mean_diff = abs_diff.mean().item()
     max_diff = abs_diff.max().item()
-    
+
     # Calculate per-keypoint differences
-    keypoint_diffs = abs_diff[0].mean(dim=1)  # Average over (x, y, conf)
-    
+    keypoint_diffs = abs_diff.mean(dim=(0, 2))  # Average over batch and (x, y, conf)
+
     # Check if within threshold
     passed = mean_diff < threshold
-    
+
     results = {
         'mean_difference': mean_diff,
         'max_difference': max_diff,
@@ -76,42 +254,192 @@ def compare_outputs(
         'passed': passed,
         'keypoint_differences': keypoint_diffs.tolist()
     }
-    
+
     return results
 
 
-def validate_model_accuracy(pytorch_path: str, num_samples: int = 10) -> dict:
+def angle_differences(pytorch_output: torch.Tensor, executorch_output: torch.Tensor) -> List[float]:
+    """
+    Joint angle differences for joints both models are confident about.
+
+    Args:
+        pytorch_output: Output from PyTorch model [B, 17, 3]
+        executorch_output: Output from ExecuTorch model [B, 17, 3]
+
+    Returns:
+        List of absolute angle differences in degrees
+    """
+    pt_angles, pt_conf = compute_angles(pytorch_output.numpy())
+    et_angles, et_conf = compute_angles(executorch_output.numpy())
+    columns = [ANGLE_NAMES.index(joint) for joint in COMPARED_JOINTS]
+
+    confident = (
+        (pt_conf[:, columns] >= JOINT_CONFIDENCE_THRESHOLD)
+        & (et_conf[:, columns] >= JOINT_CONFIDENCE_THRESHOLD)
+    )
+    diffs = np.abs(pt_angles[:, columns] - et_angles[:, columns])[confident]
+    return diffs.tolist()
+
+
+def validate_on_corpus(
+    et_module,
+    pt_model: torch.nn.Module,
+    batches: Iterator[torch.Tensor],
+    threshold: float = 0.05
+) -> dict:
+    """
+    Run both models over a corpus of real frames and compare.
+
+    Args:
+        et_module: ExecuTorch module (or stub)
+        pt_model: PyTorch model
+        batches: Iterator of input batches
+        threshold: Acceptable mean difference threshold
+
+    Returns:
+        Dictionary with aggregated comparison metrics and latencies
+    """
+    num_frames = 0
+    diff_sum = 0.0
+    max_diff = 0.0
+    keypoint_diff_sum = np.zeros(len(KEYPOINT_NAMES), dtype=np.float64)
+    angle_diffs: List[float] = []
+    pt_time = 0.0
+    et_time = 0.0
+
+    for batch in batches:
+        start = time.perf_counter()
+        with torch.no_grad():
+            pt_output = pt_model(batch)
+        pt_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        et_output = run_executorch(et_module, batch)
+        et_time += time.perf_counter() - start
+
+        comparison = compare_outputs(pt_output, et_output, threshold)
+        size = batch.shape[0]
+        diff_sum += comparison['mean_difference'] * size
+        max_diff = max(max_diff, comparison['max_difference'])
+        keypoint_diff_sum += np.asarray(comparison['keypoint_differences']) * size
+        angle_diffs.extend(angle_differences(pt_output, et_output))
+        num_frames += size
+
+        print(f"  {num_frames} frames compared", end="\r")
+
+    print()
+    frames = max(num_frames, 1)
+    angles = np.asarray(angle_diffs) if angle_diffs else np.zeros(1)
+    mean_diff = diff_sum / frames
+    stub = getattr(et_module, 'is_stub', False)
+
+    return {
+        'num_frames': num_frames,
+        'executorch_stub': stub,
+        'mean_difference': mean_diff,
+        'max_difference': max_diff,
+        'threshold': threshold,
+        # A stub compares PyTorch with itself, which proves nothing about the export
+        'passed': num_frames > 0 and not stub and mean_diff < threshold,
+        'keypoint_differences': {
+            name: float(keypoint_diff_sum[i] / frames) for i, name in enumerate(KEYPOINT_NAMES)
+        },
+        'angle_difference': {
+            'mean': float(angles.mean()),
+            'max': float(angles.max()),
+            'p95': float(np.percentile(angles, 95)),
+            'samples': len(angle_diffs),
+        },
+        'latency_ms_per_frame': {
+            'pytorch': pt_time * 1000 / frames,
+            'executorch': et_time * 1000 / frames,
+        },
+    }
+
+
+def print_corpus_results(results: dict) -> None:
+    """
+    Print corpus validation results in a readable format.
+
+    Args:
+        results: Results from validate_on_corpus()
+    """
+    print("\n" + "=" * 60)
+    print("ExecuTorch vs PyTorch on Real Frames")
+    print("=" * 60)
+
+    if results['executorch_stub']:
+        print("⚠ ExecuTorch runtime unavailable - compared against local PyTorch stub")
+
+    print(f"\nFrames compared: {results['num_frames']}")
+    print("\nKeypoint differences:")
+    print(f"  Mean: {results['mean_difference']:.6f}")
+    print(f"  Max:  {results['max_difference']:.6f}")
+    for name, diff in results['keypoint_differences'].items():
+        print(f"    {name:<15} {diff:.6f}")
+
+    angles = results['angle_difference']
+    print(f"\nAngle differences ({angles['samples']} confident joints):")
+    print(f"  Mean: {angles['mean']:.3f}°  p95: {angles['p95']:.3f}°  Max: {angles['max']:.3f}°")
+
+    latency = results['latency_ms_per_frame']
+    print("\nLatency per frame:")
+    print(f"  {'PyTorch (batched)':<22} {latency['pytorch']:>8.2f} ms")
+    print(f"  {'ExecuTorch (batch 1)':<22} {latency['executorch']:>8.2f} ms")
+    if latency['pytorch'] > 0:
+        print(f"  Ratio: {latency['executorch'] / latency['pytorch']:.2f}x")
+
+    print("\n" + "=" * 60)
+    if results['passed']:
+        print(f"✓ Validation PASSED (mean difference < {results['threshold']})")
+    elif results['executorch_stub']:
+        print("✗ Validation FAILED (no ExecuTorch program was run)")
+    elif results['num_frames'] == 0:
+        print("✗ Validation FAILED (no frames compared)")
+    else:
+        print(f"✗ Validation FAILED (mean difference ≥ {results['threshold']})")
+    print("=" * 60)
+
+
+def validate_model_accuracy(
+    pytorch_path: str,
+    num_samples: int = 10,
+    input_size: Optional[int] = None
+) -> dict:
     """
     Validate model accuracy with multiple random inputs.
-    
+
     Args:
         pytorch_path: Path to PyTorch model
         num_samples: Number of random samples to test
-        
+        input_size: Square model input size
+
     Returns:
         Dictionary with validation results
     """
     print(f"\nValidating model with {num_samples} random samples...")
-    
+
+    input_size = resolve_input_size('lightweight', input_size)
+
     # Load PyTorch model
     model = LightweightPoseModel()
     model.load_state_dict(torch.load(pytorch_path, weights_only=True))
     model.eval()
-    
+
     results = {
         'num_samples': num_samples,
         'all_outputs_valid': True,
         'samples': []
     }
-    
+
     for i in range(num_samples):
         # Generate random input
-        test_input = torch.rand(1, 3, 192, 192)
-        
+        test_input = torch.rand(1, 3, input_size, input_size)
+
         # Run inference
         with torch.no_grad():
             output = model(test_input)
-        
+
         # Validate output
         sample_result = {
             'sample_id': i,
@@ -123,30 +451,30 @@ def validate_model_accuracy(pytorch_path: str, num_samples: int = 10) -> dict:
                 (output >= 0).all() and (output <= 1).all()
             ).item()
         }
-        
+
         results['samples'].append(sample_result)
-        
+
         if not sample_result['all_in_range']:
             results['all_outputs_valid'] = False
-    
+
     return results
 
 
 def print_validation_results(results: dict) -> None:
     """
     Print validation results in a readable format.
-    
+
     Args:
         results: Validation results dictionary
     """
     print("\n" + "=" * 60)
     print("Validation Results")
     print("=" * 60)
-    
+
     print(f"\nNumber of samples tested: {results['num_samples']}")
     print(f"All outputs valid: {'✓ Yes' if results['all_outputs_valid'] else '✗ No'}")
-    
-    print(f"\nSample statistics:")
+
+    print("\nSample statistics:")
     for sample in results['samples'][:3]:  # Show first 3 samples
         print(f"\n  Sample {sample['sample_id']}:")
         print(f"    Output shape: {sample['output_shape']}")
@@ -154,10 +482,10 @@ def print_validation_results(results: dict) -> None:
         print(f"    Y range: [{sample['y_range'][0]:.3f}, {sample['y_range'][1]:.3f}]")
         print(f"    Confidence range: [{sample['conf_range'][0]:.3f}, {sample['conf_range'][1]:.3f}]")
         print(f"    All in range [0,1]: {'✓' if sample['all_in_range'] else '✗'}")
-    
+
     if results['num_samples'] > 3:
         print(f"\n  ... and {results['num_samples'] - 3} more samples")
-    
+
     print("\n" + "=" * 60)
     if results['all_outputs_valid']:
         print("✓ Validation PASSED")
@@ -171,11 +499,17 @@ def main():
     parser = argparse.ArgumentParser(
         description="Validate exported ExecuTorch model"
     )
+    parser.add_argument(
+        "--model-type",
+        default="lightweight",
+        choices=["lightweight", "yolov8"],
+        help="Which model the .pte was exported from"
+    )
     parser.add_argument(
         "--pytorch-model",
         type=str,
         default="models/lightweight_pose.pt",
-        help="Path to PyTorch model checkpoint"
+        help="Path to PyTorch model checkpoint (lightweight model)"
     )
     parser.add_argument(
         "--pte-model",
@@ -183,38 +517,118 @@ def main():
         default="models/pose_model.pte",
         help="Path to ExecuTorch .pte file"
     )
+    parser.add_argument(
+        "--videos",
+        type=str,
+        default="../songs",
+        help="Directory of videos to sample real frames from"
+    )
+    parser.add_argument(
+        "--num-frames",
+        type=int,
+        default=2000,
+        help="Number of real frames to compare"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="Frames per batch"
+    )
+    parser.add_argument(
+        "--imgsz",
+        type=int,
+        default=None,
+        help="Input size the .pte was exported with (default: configured size)"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="Acceptable mean keypoint difference"
+    )
     parser.add_argument(
         "--num-samples",
         type=int,
         default=10,
-        help="Number of random samples to test"
+        help="Number of random samples to test with --ranges-only"
+    )
+    parser.add_argument(
+        "--ranges-only",
+        action="store_true",
+        help="Only check lightweight PyTorch output ranges on random inputs (does not validate the .pte)"
+    )
+    parser.add_argument(
+        "--allow-stub",
+        action="store_true",
+        help="Run against a PyTorch stub if the .pte or runtime is unavailable (never passes)"
     )
-    
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Optional path to write corpus results as JSON"
+    )
+
     args = parser.parse_args()
-    
+
     print("=" * 60)
     print("ExecuTorch Model Validation")
     print("=" * 60)
-    
+
     # Check if files exist
-    if not Path(args.pytorch_model).exists():
+    if args.model_type == 'lightweight' and not Path(args.pytorch_model).exists():
         print(f"✗ Error: PyTorch model not found at {args.pytorch_model}")
+        sys.exit(1)
+
+    family = 'yolov8' if args.model_type == 'yolov8' else 'lightweight'
+    input_size = resolve_input_size(family, args.imgsz)
+
+    if args.ranges_only:
+        if args.model_type == 'yolov8':
+            print("✗ Error: --ranges-only only applies to the lightweight model")
+            sys.exit(1)
+        print("⚠ Checking PyTorch output ranges on random inputs only; the .pte is not validated")
+        results = validate_model_accuracy(args.pytorch_model, args.num_samples, args.imgsz)
+        print_validation_results(results)
+        if not results['all_outputs_valid']:
+            sys.exit(1)
         return
-    
-    if not Path(args.pte_model).exists():
-        print(f"⚠ Warning: ExecuTorch model not found at {args.pte_model}")
-        print(f"  Skipping ExecuTorch comparison")
-        print(f"  Will validate PyTorch model only")
-    
-    # Validate PyTorch model accuracy
-    results = validate_model_accuracy(args.pytorch_model, args.num_samples)
-    
-    # Print results
-    print_validation_results(results)
-    
-    print("\nNote: Full ExecuTorch runtime validation requires the")
-    print("      ExecuTorch runtime library on the target platform.")
-    print("      This validation confirms the PyTorch model works correctly.")
+
+    videos_dir = Path(args.videos)
+    videos = find_videos(videos_dir) if videos_dir.exists() else []
+
+    if not videos:
+        print(f"✗ Error: No videos found in {args.videos}")
+        print("  Exports can only be validated on real frames (--videos)")
+        if args.model_type == 'lightweight':
+            print("  Use --ranges-only to just check PyTorch output ranges")
+        sys.exit(1)
+
+    try:
+        et_module, pt_model = load_models(
+            args.pte_model, args.pytorch_model, args.model_type, args.imgsz, args.allow_stub
+        )
+    except RuntimeError as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
+
+    print(f"\nComparing on up to {args.num_frames} frames from {len(videos)} video(s) "
+          f"at {input_size}x{input_size}...")
+    batches = iter_frame_batches(videos, args.num_frames, args.batch_size, input_size)
+    results = validate_on_corpus(et_module, pt_model, batches, args.threshold)
+    results['model_type'] = args.model_type
+    results['input_size'] = input_size
+
+    print_corpus_results(results)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Report saved to {args.report}")
+
+    if not results['passed']:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,9 @@ Video processing tools for Bachata Bro
 - Convert to 720p
 - Cut/trim video segments
 - Convert MKV to MP4
+
+The functions raise instead of exiting so long-running callers (e.g.
+watch_songs.py) survive a bad file; only the CLI exits.
 """
 
 import argparse
@@ -12,8 +15,24 @@ import sys
 from pathlib import Path
 
 
+class FFmpegNotFoundError(RuntimeError):
+    """ffmpeg is not installed or not on PATH."""
+
+
+def _require_file(input_path: str) -> Path:
+    input_file = Path(input_path)
+    if not input_file.exists():
+        raise FileNotFoundError(f"File not found: {input_path}")
+    return input_file
+
+
 def run_ffmpeg(cmd: list, input_file: Path, output_file: Path) -> bool:
-    """Run ffmpeg command and show results"""
+    """
+    Run ffmpeg command and show results
+
+    Raises:
+        FFmpegNotFoundError: If ffmpeg is not installed
+    """
     try:
         result = subprocess.run(
             cmd,
@@ -34,17 +53,18 @@ def run_ffmpeg(cmd: list, input_file: Path, output_file: Path) -> bool:
             return False
             
     except FileNotFoundError:
-        print("❌ ffmpeg not found. Install with: sudo apt install ffmpeg")
-        sys.exit(1)
+        raise FFmpegNotFoundError("ffmpeg not found. Install with: sudo apt install ffmpeg") from None
 
 
-def convert_to_720p(input_path: str, output_path: str = None) -> None:
-    """Convert video to 720p resolution"""
-    input_file = Path(input_path)
-    
-    if not input_file.exists():
-        print(f"Error: File not found: {input_path}")
-        sys.exit(1)
+def convert_to_720p(input_path: str, output_path: str = None) -> bool:
+    """
+    Convert video to 720p resolution, returns True on success
+
+    Raises:
+        FileNotFoundError: If the input file doesn't exist
+        FFmpegNotFoundError: If ffmpeg is not installed
+    """
+    input_file = _require_file(input_path)
     
     if output_path is None:
         output_file = input_file.parent / f"{input_file.stem}_720p{input_file.suffix}"
@@ -66,7 +86,7 @@ def convert_to_720p(input_path: str, output_path: str = None) -> None:
         str(output_file)
     ]
     
-    run_ffmpeg(cmd, input_file, output_file)
+    return run_ffmpeg(cmd, input_file, output_file)
 
 
 def cut_video(input_path: str, start: str, end: str, output_path: str = None) -> None:
@@ -83,12 +103,13 @@ def cut_video(input_path: str, start: str, end: str, output_path: str = None) ->
         cut_video("video.mp4", "00:30", "02:45")  # 30s to 2m45s
         cut_video("video.mp4", "1:30:00", "1:45:00")  # 1h30m to 1h45m
         cut_video("video.mp4", "90", "180")  # 90s to 180s
+
+    Raises:
+        FileNotFoundError: If the input file doesn't exist
+        ValueError: If the times can't be parsed or end is not after start
+        FFmpegNotFoundError: If ffmpeg is not installed
     """
-    input_file = Path(input_path)
-    
-    if not input_file.exists():
-        print(f"Error: File not found: {input_path}")
-        sys.exit(1)
+    input_file = _require_file(input_path)
     
     if output_path is None:
         output_file = input_file.parent / f"{input_file.stem}_cut{input_file.suffix}"
@@ -119,40 +140,40 @@ def cut_video(input_path: str, start: str, end: str, output_path: str = None) ->
     try:
         start_seconds = parse_time(start)
         end_seconds = parse_time(end)
-        duration = end_seconds - start_seconds
-        
-        if duration <= 0:
-            print(f"Error: End time must be after start time")
-            sys.exit(1)
-        
-        # Use -t (duration) instead of -to for clarity
-        cmd = [
-            'ffmpeg',
-            '-ss', start,
-            '-i', str(input_file),
-            '-t', str(duration),
-            '-c:v', 'libx264',
-            '-crf', '23',
-            '-preset', 'fast',
-            '-c:a', 'aac',
-            '-b:a', '192k',
-            '-y',
-            str(output_file)
-        ]
     except ValueError as e:
-        print(f"Error parsing time: {e}")
-        sys.exit(1)
+        raise ValueError(f"Error parsing time: {e}") from None
+    duration = end_seconds - start_seconds
+    
+    if duration <= 0:
+        raise ValueError("End time must be after start time")
+    
+    # Use -t (duration) instead of -to for clarity
+    cmd = [
+        'ffmpeg',
+        '-ss', start,
+        '-i', str(input_file),
+        '-t', str(duration),
+        '-c:v', 'libx264',
+        '-crf', '23',
+        '-preset', 'fast',
+        '-c:a', 'aac',
+        '-b:a', '192k',
+        '-y',
+        str(output_file)
+    ]
     
     run_ffmpeg(cmd, input_file, output_file)
 
 
 def convert_to_mp4(input_path: str, output_path: str = None) -> None:
-    """Convert video to MP4 format (works for MKV, AVI, MOV, etc.)"""
-    input_file = Path(input_path)
-    
-    if not input_file.exists():
-        print(f"Error: File not found: {input_path}")
-        sys.exit(1)
+    """
+    Convert video to MP4 format (works for MKV, AVI, MOV, etc.)
+
+    Raises:
+        FileNotFoundError: If the input file doesn't exist
+        FFmpegNotFoundError: If ffmpeg is not installed
+    """
+    input_file = _require_file(input_path)
     
     if output_path is None:
         output_file = input_file.parent / f"{input_file.stem}.mp4"
@@ -240,14 +261,21 @@ Examples:
     
     args = parser.parse_args()
     
-    if args.command == '720p':
-        convert_to_720p(args.input, args.output)
-    elif args.command == 'cut':
-        cut_video(args.input, args.start, args.end, args.output)
-    elif args.command == 'mp4':
-        convert_to_mp4(args.input, args.output)
-    else:
-        parser.print_help()
+    try:
+        if args.command == '720p':
+            convert_to_720p(args.input, args.output)
+        elif args.command == 'cut':
+            cut_video(args.input, args.start, args.end, args.output)
+        elif args.command == 'mp4':
+            convert_to_mp4(args.input, args.output)
+        else:
+            parser.print_help()
+    except FFmpegNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -17,20 +17,19 @@ Usage:
 Examples:
     python visualize_tracking.py dance_video.mp4
     python visualize_tracking.py dance_video.mp4 ./output/tracked_video.mp4
+    python visualize_tracking.py dance_video.mp4 ./output/tracked_video.mp4 --headless
+
+With --headless and an output path, the job runs on the pose daemon when it
+is running (see pose_daemon.py).
 """
 
 import cv2
 import numpy as np
-import torch
 import argparse
 from pathlib import Path
 from tqdm import tqdm
 
-try:
-    from ultralytics import YOLO
-except ImportError:
-    print("Error: ultralytics not installed. Install with: pip install ultralytics")
-    exit(1)
+from pose_daemon import ProgressPrinter, submit_job
 
 
 # COCO keypoint connections for skeleton drawing
@@ -59,7 +58,10 @@ def visualize_tracking(
     output_path: str = None,
     model_name: str = 'yolov8s-pose.pt',
     device: str = 'auto',
-    show_all: bool = False
+    show_all: bool = False,
+    headless: bool = False,
+    model=None,
+    progress_callback=None
 ):
     """
     Visualize pose tracking on video.
@@ -70,19 +72,30 @@ def visualize_tracking(
         model_name: YOLOv8 model name
         device: Device to run on
         show_all: If True, show all detected people; if False, only show the tracked one
+        headless: If True, don't open a display window
+        model: Already loaded YOLO model to reuse (skips model loading)
+        progress_callback: Optional callback for progress updates
     """
-    # Determine device
-    if device == 'auto':
-        if torch.cuda.is_available():
-            device = 'cuda'
-        elif torch.backends.mps.is_available():
-            device = 'mps'
-        else:
-            device = 'cpu'
-    
-    print(f"Loading YOLOv8s-pose model on {device}...")
-    model = YOLO(model_name)
-    model.to(device)
+    if model is None:
+        import torch
+        try:
+            from ultralytics import YOLO
+        except ImportError:
+            print("Error: ultralytics not installed. Install with: pip install ultralytics")
+            exit(1)
+
+        # Determine device
+        if device == 'auto':
+            if torch.cuda.is_available():
+                device = 'cuda'
+            elif torch.backends.mps.is_available():
+                device = 'mps'
+            else:
+                device = 'cpu'
+        
+        print(f"Loading YOLOv8s-pose model on {device}...")
+        model = YOLO(model_name)
+        model.to(device)
     
     # Open video
     cap = cv2.VideoCapture(video_path)
@@ -107,7 +120,10 @@ def visualize_tracking(
         out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
         print(f"Output will be saved to: {output_path}")
     
-    print("\nProcessing video... (Press 'q' to quit)")
+    if headless:
+        print("\nProcessing video...")
+    else:
+        print("\nProcessing video... (Press 'q' to quit)")
     
     with tqdm(total=total_frames, desc="Processing", unit="frame") as pbar:
         while cap.isOpened():
@@ -155,19 +171,25 @@ def visualize_tracking(
             if out:
                 out.write(frame)
             
-            # Display frame (optional - comment out if running headless)
-            cv2.imshow('Pose Tracking Visualization', frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                print("\nStopped by user")
-                break
+            # Display frame
+            if not headless:
+                cv2.imshow('Pose Tracking Visualization', frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    print("\nStopped by user")
+                    break
             
             pbar.update(1)
+            
+            # Progress callback
+            if progress_callback and pbar.n % 10 == 0:
+                progress_callback(pbar.n, total_frames)
     
     # Cleanup
     cap.release()
     if out:
         out.release()
-    cv2.destroyAllWindows()
+    if not headless:
+        cv2.destroyAllWindows()
     
     if output_path:
         print(f"\n✓ Output saved to: {output_path}")
@@ -255,15 +277,44 @@ def main():
         action='store_true',
         help='Show all detected people (tracked one highlighted)'
     )
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help='Do not open a display window (requires an output path to be useful)'
+    )
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Run locally even if the pose daemon is running'
+    )
     
     args = parser.parse_args()
     
+    # The daemon has no display, so only headless runs with an output go there
+    if args.headless and args.output and not args.no_daemon:
+        try:
+            event = submit_job({
+                'type': 'visualize',
+                'video': str(Path(args.video).resolve()),
+                'output': str(Path(args.output).resolve()),
+                'model': args.model,
+                'device': args.device,
+                'show_all': args.show_all,
+            }, on_event=ProgressPrinter("Processing"))
+        except RuntimeError as e:
+            print(f"Error: pose daemon job failed: {e}")
+            return
+        if event is not None:
+            print(f"\n✓ Output saved to: {event['output']} (pose daemon, {event['seconds']:.1f}s)")
+            return
+    
     visualize_tracking(
         args.video,
         args.output,
         args.model,
         args.device,
-        args.show_all
+        args.show_all,
+        headless=args.headless
     )
 
 
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Watch the songs directory and ingest new or changed videos.
+
+Adding a song used to mean converting it with video_tools.py and then
+running preprocess_video_yolov8.py by hand (or a full regenerate_poses.py
+sweep). This watcher polls the songs directory instead:
+
+1. Waits until a video's size and mtime stop changing (partial downloads)
+2. Converts it to 720p if it is taller than that (into <songs>/720p/)
+3. Extracts poses, through the pose daemon when it is running
+4. Writes every output via a temp file + rename so readers never see
+   half-written files
+5. Records what was processed in <songs>/.ingest_manifest.json so only
+   new or changed videos are picked up next time
+
+Usage:
+    uv run python watch_songs.py
+    uv run python watch_songs.py --songs ../songs --output ../mobile/assets/poses
+    uv run python watch_songs.py --once   # ingest pending videos and exit
+"""
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+
+import cv2
+
+from pose_daemon import submit_extract
+from pose_manifest import record_pose_file
+from regenerate_poses import find_videos
+
+
+MANIFEST_NAME = '.ingest_manifest.json'
+
+# Videos taller than this are converted before extraction
+MAX_HEIGHT = 720
+
+
+class IngestManifest:
+    """Thread-safe record of processed videos, persisted atomically."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.videos: Dict[str, Dict] = {}
+        if path.exists():
+            with open(path, 'r') as f:
+                self.videos = json.load(f).get('videos', {})
+
+    def is_processed(
+        self,
+        video: Path,
+        signature: Tuple[int, float],
+        retry_failed: bool = False
+    ) -> bool:
+        """True if this size/mtime of the video was already ingested."""
+        with self.lock:
+            entry = self.videos.get(video.name)
+        if entry is None or (entry.get('size'), entry.get('mtime')) != signature:
+            return False
+        return entry.get('status') == 'ok' or not retry_failed
+
+    def record(self, video: Path, entry: Dict) -> None:
+        with self.lock:
+            self.videos[video.name] = entry
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'videos': self.videos}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def file_signature(path: Path) -> Tuple[int, float]:
+    """Return (size, mtime) used to detect changes."""
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime
+
+
+def video_height(video: Path) -> int:
+    """Return the frame height of a video (0 if it cannot be opened)."""
+    cap = cv2.VideoCapture(str(video))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) if cap.isOpened() else 0
+    cap.release()
+    return height
+
+
+class SongIngester:
+    """Converts and extracts poses for one video at a time per worker."""
+
+    def __init__(
+        self,
+        converted_dir: Path,
+        poses_dir: Path,
+        model_name: str = 'yolov8s-pose.pt',
+        device: str = 'auto',
+        convert: bool = True,
+        use_daemon: bool = True
+    ):
+        self.converted_dir = converted_dir
+        self.poses_dir = poses_dir
+        self.model_name = model_name
+        self.device = device
+        self.convert = convert
+        self.use_daemon = use_daemon
+        self._local = threading.local()  # one detector per worker thread
+
+    def ingest(self, video: Path) -> Dict:
+        """
+        Convert (if needed) and extract poses for a video.
+
+        Args:
+            video: Video in the songs directory
+
+        Returns:
+            Manifest entry for the video
+        """
+        source = video
+        converted = None
+
+        if self.convert and video_height(video) > MAX_HEIGHT:
+            converted = self._convert(video)
+            source = converted
+
+        pose_file = self.poses_dir / f"{video.stem}.json"
+        self._extract(source, pose_file)
+
+        return {
+            'converted': str(converted) if converted else None,
+            'poses': str(pose_file),
+        }
+
+    def _convert(self, video: Path) -> Path:
+        from video_tools import convert_to_720p
+
+        self.converted_dir.mkdir(parents=True, exist_ok=True)
+        output = self.converted_dir / f"{video.stem}.mp4"
+        tmp_output = self.converted_dir / f".{video.stem}.tmp.mp4"
+
+        if not convert_to_720p(str(video), str(tmp_output)):
+            tmp_output.unlink(missing_ok=True)
+            raise RuntimeError(f"720p conversion failed for {video.name}")
+
+        os.replace(tmp_output, output)
+        return output
+
+    def _extract(self, source: Path, pose_file: Path) -> None:
+        from preprocess_video_yolov8 import YOLOv8PoseDetector, extract_poses_from_video
+
+        self.poses_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = pose_file.with_name(f".{pose_file.name}.tmp")
+
+        try:
+            if not (self.use_daemon and submit_extract(
+                str(source), str(tmp_file), model_name=self.model_name, device=self.device
+            )):
+                detector = getattr(self._local, 'detector', None)
+                if detector is None:
+                    detector = YOLOv8PoseDetector(self.model_name, self.device)
+                    self._local.detector = detector
+                extract_poses_from_video(
+                    str(source),
+                    str(tmp_file),
+                    model_name=self.model_name,
+                    device=self.device,
+                    detector=detector
+                )
+            os.replace(tmp_file, pose_file)
+            record_pose_file(pose_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+
+def watch(
+    songs_dir: Path,
+    ingester: SongIngester,
+    manifest: IngestManifest,
+    workers: int = 2,
+    interval: float = 2.0,
+    settle: float = 5.0,
+    once: bool = False,
+    retry_failed: bool = False
+) -> Tuple[int, int]:
+    """
+    Poll the songs directory and ingest videos once they stop changing.
+
+    Args:
+        songs_dir: Directory to watch
+        ingester: SongIngester doing the work
+        manifest: Manifest of processed videos
+        workers: Maximum number of videos processed concurrently
+        interval: Seconds between scans
+        settle: Seconds a video's size/mtime must stay unchanged
+        once: Exit once nothing is pending instead of watching forever
+        retry_failed: Retry videos that failed in an earlier run even if
+            they did not change (each version is attempted once per run)
+
+    Returns:
+        Tuple of (succeeded, failed) counts
+    """
+    pending: Dict[Path, Tuple[Tuple[int, float], float]] = {}
+    in_flight: Dict[Path, Tuple[Future, Tuple[int, float]]] = {}
+    attempted = set()
+    succeeded = 0
+    failed = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            now = time.monotonic()
+
+            for video in find_videos(songs_dir):
+                if video in in_flight:
+                    continue
+                try:
+                    signature = file_signature(video)
+                except FileNotFoundError:
+                    continue
+                if (video, signature) in attempted or manifest.is_processed(video, signature, retry_failed):
+                    continue
+
+                previous = pending.get(video)
+                if previous is None or previous[0] != signature:
+                    # New or still being written: restart the settle timer
+                    if previous is None:
+                        print(f"… Detected {video.name}, waiting for it to settle")
+                    pending[video] = (signature, now)
+                    continue
+
+                # Bound the backlog handed to the pool to the worker count
+                if now - previous[1] >= settle and len(in_flight) < workers:
+                    del pending[video]
+                    attempted.add((video, signature))
+                    print(f"▶ Ingesting {video.name}")
+                    in_flight[video] = (executor.submit(ingester.ingest, video), signature)
+
+            for video, (future, signature) in list(in_flight.items()):
+                if not future.done():
+                    continue
+                del in_flight[video]
+
+                entry = {
+                    'size': signature[0],
+                    'mtime': signature[1],
+                    'processedAt': datetime.now().isoformat(timespec='seconds'),
+                }
+                try:
+                    entry.update(future.result())
+                    entry['status'] = 'ok'
+                    succeeded += 1
+                    print(f"✓ Ingested {video.name} → {entry['poses']}")
+                except Exception as e:
+                    entry['status'] = 'failed'
+                    entry['error'] = str(e)
+                    failed += 1
+                    print(f"✗ Failed to ingest {video.name}: {e}")
+                manifest.record(video, entry)
+
+            if once and not pending and not in_flight:
+                return succeeded, failed
+
+            time.sleep(interval)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Watch the songs directory and ingest new videos'
+    )
+    parser.add_argument(
+        '--songs',
+        default='../songs',
+        help='Directory to watch for videos'
+    )
+    parser.add_argument(
+        '--output',
+        default='../mobile/assets/poses',
+        help='Output directory for pose JSON files'
+    )
+    parser.add_argument(
+        '--converted',
+        default=None,
+        help='Directory for 720p conversions (default: <songs>/720p)'
+    )
+    parser.add_argument(
+        '--model',
+        default='yolov8s-pose.pt',
+        help='YOLOv8 model name or path'
+    )
+    parser.add_argument(
+        '--device',
+        default='auto',
+        choices=['auto', 'cpu', 'cuda', 'mps'],
+        help='Device to run inference on'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=2,
+        help='Maximum number of videos processed concurrently'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=2.0,
+        help='Seconds between directory scans'
+    )
+    parser.add_argument(
+        '--settle',
+        type=float,
+        default=5.0,
+        help='Seconds a file must stay unchanged before it is ingested'
+    )
+    parser.add_argument(
+        '--no-convert',
+        action='store_true',
+        help='Skip 720p conversion'
+    )
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Run extraction locally even if the pose daemon is running'
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Retry videos that failed last time even if unchanged'
+    )
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='Ingest pending videos and exit instead of watching'
+    )
+
+    args = parser.parse_args()
+
+    songs_dir = Path(args.songs)
+    if not songs_dir.exists():
+        print(f"✗ Songs directory not found: {songs_dir}")
+        return
+
+    convert = not args.no_convert
+    if convert and shutil.which('ffmpeg') is None:
+        print("⚠ ffmpeg not found - 720p conversion disabled")
+        convert = False
+
+    ingester = SongIngester(
+        Path(args.converted) if args.converted else songs_dir / '720p',
+        Path(args.output),
+        model_name=args.model,
+        device=args.device,
+        convert=convert,
+        use_daemon=not args.no_daemon
+    )
+    manifest = IngestManifest(songs_dir / MANIFEST_NAME)
+
+    print("=" * 60)
+    print("Watching for new songs")
+    print("=" * 60)
+    print(f"Songs:  {songs_dir.absolute()}")
+    print(f"Output: {Path(args.output).absolute()}")
+    print(f"Workers: {args.workers}, settle: {args.settle}s")
+    if not args.once:
+        print("Press Ctrl+C to stop\n")
+
+    try:
+        succeeded, failed = watch(
+            songs_dir,
+            ingester,
+            manifest,
+            workers=args.workers,
+            interval=args.interval,
+            settle=args.settle,
+            once=args.once,
+            retry_failed=args.retry_failed
+        )
+        print(f"\n✓ Ingested: {succeeded}, failed: {failed}")
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == '__main__':
+    main()
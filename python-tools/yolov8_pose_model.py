@@ -19,6 +19,9 @@ import torch.nn as nn
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from model_config import resolve_input_size
+from pose_sequence import KEYPOINT_NAMES
+
 
 class YOLOv8PoseWrapper(nn.Module):
     """
@@ -33,23 +36,19 @@ class YOLOv8PoseWrapper(nn.Module):
     This allows drop-in replacement of the old LightweightPoseModel.
     """
     
-    # Input size for YOLOv8s-pose
-    INPUT_SIZE = 256
+    # Default input size for YOLOv8s-pose (see model_config.py)
+    INPUT_SIZE = resolve_input_size('yolov8')
     
     # COCO keypoint names (17 keypoints) - same order as before
-    KEYPOINT_NAMES = [
-        'nose', 'leftEye', 'rightEye', 'leftEar', 'rightEar',
-        'leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow',
-        'leftWrist', 'rightWrist', 'leftHip', 'rightHip',
-        'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'
-    ]
+    KEYPOINT_NAMES = KEYPOINT_NAMES
     
-    def __init__(self, pretrained: bool = True):
+    def __init__(self, pretrained: bool = True, input_size: Optional[int] = None):
         """
         Initialize YOLOv8s-pose wrapper.
         
         Args:
             pretrained: Whether to load pretrained weights
+            input_size: Square input size (default: configured YOLOv8 size)
         """
         super().__init__()
         
@@ -76,7 +75,7 @@ class YOLOv8PoseWrapper(nn.Module):
         self.model.eval()
         
         # Store model info
-        self.input_size = self.INPUT_SIZE
+        self.input_size = resolve_input_size('yolov8', input_size)
         self.num_keypoints = 17
         
     def forward(self, x: torch.Tensor) -> torch.Tensor:
@@ -84,7 +83,7 @@ class YOLOv8PoseWrapper(nn.Module):
         Forward pass - returns keypoints in [B, 17, 3] format.
         
         Args:
-            x: Input tensor of shape [B, 3, 256, 256], normalized to [0, 1]
+            x: Input tensor of shape [B, 3, input_size, input_size], normalized to [0, 1]
             
         Returns:
             Keypoints tensor of shape [B, 17, 3] where each keypoint has (x, y, confidence)
@@ -153,8 +152,8 @@ class YOLOv8PoseWrapper(nn.Module):
                 kpts = best_det[5:56].reshape(17, 3)
                 
                 # Normalize coordinates to [0, 1] (they're in pixel coords relative to input size)
-                kpts[:, 0] = kpts[:, 0] / self.INPUT_SIZE  # x
-                kpts[:, 1] = kpts[:, 1] / self.INPUT_SIZE  # y
+                kpts[:, 0] = kpts[:, 0] / self.input_size  # x
+                kpts[:, 1] = kpts[:, 1] / self.input_size  # y
                 # confidence is already in [0, 1]
                 
                 # Clamp to valid range
@@ -179,7 +178,7 @@ class YOLOv8PoseWrapper(nn.Module):
         import cv2
         
         # Resize to model input size
-        resized = cv2.resize(frame_rgb, (self.INPUT_SIZE, self.INPUT_SIZE))
+        resized = cv2.resize(frame_rgb, (self.input_size, self.input_size))
         
         # Normalize to [0, 1]
         normalized = resized.astype(np.float32) / 255.0
@@ -216,11 +215,13 @@ class YOLOv8PoseExportable(nn.Module):
     3. Is optimized for torch.export compatibility
     """
     
-    INPUT_SIZE = 256
+    INPUT_SIZE = resolve_input_size('yolov8')
     
-    def __init__(self):
+    def __init__(self, input_size: Optional[int] = None):
         super().__init__()
         
+        self.input_size = resolve_input_size('yolov8', input_size)
+        
         # Load YOLOv8s-pose backbone and head
         from ultralytics import YOLO
         yolo = YOLO('yolov8s-pose.pt')
@@ -238,7 +239,7 @@ class YOLOv8PoseExportable(nn.Module):
         Forward pass optimized for export.
         
         Args:
-            x: Input tensor [B, 3, 256, 256]
+            x: Input tensor [B, 3, input_size, input_size]
             
         Returns:
             Keypoints [B, 17, 3]
@@ -267,8 +268,8 @@ class YOLOv8PoseExportable(nn.Module):
         kpts = best_dets[:, 5:56].reshape(batch_size, 17, 3)
         
         # Normalize coordinates
-        kpts[:, :, 0] = kpts[:, :, 0] / self.INPUT_SIZE
-        kpts[:, :, 1] = kpts[:, :, 1] / self.INPUT_SIZE
+        kpts[:, :, 0] = kpts[:, :, 0] / self.input_size
+        kpts[:, :, 1] = kpts[:, :, 1] / self.input_size
         
         # Clamp to valid range
         kpts = torch.clamp(kpts, 0.0, 1.0)
@@ -291,7 +292,7 @@ def create_and_save_model(output_path: str = "models/yolov8s_pose.pt") -> None:
     
     print(f"✓ Model created successfully")
     print(f"  Model type: YOLOv8s-pose")
-    print(f"  Input size: {model.INPUT_SIZE}x{model.INPUT_SIZE}")
+    print(f"  Input size: {model.input_size}x{model.input_size}")
     print(f"  Output: 17 COCO keypoints")
     
     # Count parameters
@@ -322,8 +323,8 @@ def test_model(model_path: str = "models/yolov8s_pose.pt") -> None:
     model = YOLOv8PoseWrapper(pretrained=True)
     model.eval()
     
-    # Create dummy input (256x256 RGB image)
-    dummy_input = torch.rand(1, 3, 256, 256)
+    # Create dummy input at the configured input size
+    dummy_input = torch.rand(1, 3, model.input_size, model.input_size)
     
     print(f"  Input shape: {dummy_input.shape}")
     